@@ -3,25 +3,18 @@ import sys
 sys.stdout.reconfigure(encoding='utf-8')
 import argparse
 import asyncio
-import pywifi
-from pywifi import const
-from bleak import BleakScanner
-import subprocess
-import json
-import time
-import select
-import requests
-import re
-import csv
-from datetime import datetime
+import signal
 import warnings
 warnings.simplefilter(action='ignore', category=FutureWarning)
 
-from audit import *
 from color import *
-from wifi import *
-from bluetooth import *
-from rtl import *
+from backends import load_backend, BackendUnavailable
+from sinks import make_sink, OUTPUT_FORMATS
+from store import query_store, STORE_PATH
+from report import REPORT_FORMATS
+from replay import Recorder, Replay
+from daemon_client import DAEMON_SOCKET, DaemonError, daemon_request, serve_from_daemon
+from airodump import parse_channels
 
 def display_banner():
     banner = """
@@ -40,16 +33,14 @@ def display_banner():
     print(f"{Color.CYAN}{Style.BRIGHT}{banner}{Style.RESET_ALL}")
 
 
-def get_mac_vendor(mac_address):
-    url = f"https://api.macvendors.com/{mac_address}"
+def backend(name, replay=None):
+    """Imports a scan mode on demand; exits with a message if its dependencies are missing"""
     try:
-        response = requests.get(url, timeout=2)
-        if response.status_code == 200:
-            return f"{Color.GREEN}{Style.BRIGHT}{response.text.strip()}{Style.RESET_ALL}"
-        else:
-            return f"{Color.RED}{Style.BRIGHT}Unknown{Style.RESET_ALL}"
-    except requests.RequestException:
-        return f"{Color.RED}{Style.BRIGHT}Unknown{Style.RESET_ALL}"
+        return load_backend(name, check_packages=replay is None)
+    except BackendUnavailable as e:
+        print(f"{Color.RED}{Style.BRIGHT}[!]{Style.RESET_ALL} {e}")
+        sys.exit(1)
+
 
 async def main():
     display_banner()
@@ -60,59 +51,152 @@ async def main():
     parser.add_argument("-a", "--bssid", type=str, help="BSSID (AP MAC) for deauth attack")#
     parser.add_argument("-c", "--station", type=str, help="Station (Client MAC) for deauth attack (optional)")#
     parser.add_argument("--filter-ssid", type=str, help="Filter by specific SSID")
-    parser.add_argument("--filter-channel", type=str, help="Filter by channel range (e.g., 1-6)")
+    parser.add_argument("--filter-channel", type=str, help="Filter by channels, separated by '-' (e.g., 1-6-11)")
     parser.add_argument("--min-signal", type=int, help="Filter networks by minimum signal strength (e.g., -50 dBm)")
-    parser.add_argument("--wifi-channels", action="store_true", help="Analyze Wi-Fi channels and recommend the best one")
+    parser.add_argument("--live-wifi", action="store_true", help="Stream new/changed/lost networks and clients until CTRL+C")
+    parser.add_argument("--wifi-channels", action="store_true", help="Analyze Wi-Fi channels and recommend the best ones (also live with --live-wifi)")
+    parser.add_argument("--channel-width", type=int, choices=(20, 40, 80), default=20, help="Channel width for --wifi-channels in MHz (default: 20)")
     
     ## BT ##
     parser.add_argument("-b", "--bluetooth", action="store_true", help="Scan Bluetooth devices")
+    parser.add_argument("--live-ble", action="store_true", help="Stream Bluetooth devices (RSSI min/max/average) until CTRL+C")
     
     ## radio ##
     parser.add_argument("-f", "--frequency", type=str, nargs="?", const="433.92M", default=None,
-                    help="Enable RTL433 scan (default: 433.92M if no value given)")
+                    help="Enable RTL433 scan (default: 433.92M if no value given; comma-separated bands hop one SDR, e.g. 433.92M,868M)")
+    parser.add_argument("--sdr", action="append", metavar="FREQ@DEVICE",
+                        help="Add a receiver: rtl_433 on FREQ with device selector DEVICE (-d), e.g. 433.92M@0 or 868M@:00000002. "
+                             "Repeat for several SDRs read in parallel, their events merged in time order")
+    parser.add_argument("--revisit", type=float, default=None, help="Longest time in seconds a band goes unheard when hopping (default: 120)")
     parser.add_argument("--gain", type=str, help="RTL433 gain (e.g., auto, 40)")
     parser.add_argument("--protocol", type=str, help="Enable specific decoding protocol (e.g., 40 for Acurite)")
-    parser.add_argument("--output", type=str, choices=["json", "csv", "log", "mqtt", "influx"], default="json",
-                        help="Output format (default: json)")
+    parser.add_argument("--output", type=str, choices=OUTPUT_FORMATS,
+                        help="Also write observations (Wi-Fi, Bluetooth, RTL433) as json, csv, log, mqtt, influx or sqlite")
+    parser.add_argument("--output-target", type=str,
+                        help="File ('-' for stdout), database (sqlite), udp://host:port or tcp://host:port (influx), host:port/topic (mqtt)")
     parser.add_argument("--live-sdr", action="store_true", help="Enable live monitoring mode (only works with -f)")
+    parser.add_argument("--window", type=int, default=60, help="Minutes of events kept in memory by --live-sdr (default: 60)")
+    parser.add_argument("--dedup-window", type=float, default=2.0, help="Merge identical rtl_433 packets from one sensor within this many seconds (default: 2)")
 
     ## general ##
+    parser.add_argument("--online-vendors", action="store_true", help="Query api.macvendors.com (cached) for MACs missing from the local OUI database")
     parser.add_argument("-T", "--timeout", type=int, default=10, help="Maximum scan/deauth time (in seconds)")
     parser.add_argument("--audit", action="store_true", help="Run a full audit (Wi-Fi, Bluetooth, RTL433 at 433 & 868 MHz)")
+    parser.add_argument("--query", type=str, nargs="?", const="", default=None,
+                        help="Show when a MAC/BSSID or rtl_433 model/id/channel was last seen (all devices if no value given)")
+    parser.add_argument("--db", type=str, default=STORE_PATH, help=f"Observation store read by --query (default: {STORE_PATH})")
+    parser.add_argument("--since", type=int, help="Limit --query to the last N minutes")
+    parser.add_argument("--record", type=str, help="Also record the raw Wi-Fi, Bluetooth and RTL433 input to a replay file")
+    parser.add_argument("--replay", type=str, help="Read -w/-b/-f (and --live-*) input from a replay file instead of the radios")
+    parser.add_argument("--replay-speed", type=float, default=1.0, help="Replay speed multiplier, 0 = as fast as possible (default: 1)")
+    parser.add_argument("--pcap", type=str, help="Read -w / --live-wifi from an 802.11 pcap (radiotap, e.g. airodump-ng's .cap) or '-' for a pipe")
+    parser.add_argument("--daemon", action="store_true", help="Keep the scanners running and serve their state to later Airspy.py calls (-w/-b/-f pick the sources)")
+    parser.add_argument("--daemon-socket", type=str, default=DAEMON_SOCKET, help=f"Unix socket of the daemon (default: {DAEMON_SOCKET})")
+    parser.add_argument("--no-daemon", action="store_true", help="Scan locally even when a daemon is running")
+    parser.add_argument("--stop-daemon", action="store_true", help="Stop the running daemon")
+    parser.add_argument("--audit-config", type=str, help="JSON audit plan: scans, radios and durations (default: audit.json if present)")
+    parser.add_argument("--audit-report", type=str, choices=REPORT_FORMATS, default="markdown",
+                        help="Report rendered from audit.jsonl at the end of --audit: audit.md or audit.html (default: markdown)")
     
 
 
     args = parser.parse_args()
 
-    if not any(vars(args).values()):
+    if all(value == parser.get_default(name) for name, value in vars(args).items()):
         print("[!] Please specify at least one option (-w, -b, -f, -d)")
         parser.print_help()
         sys.exit(1)
 
-    if args.audit:
-        await audit_scan()
+    if args.filter_channel:
+        try:
+            parse_channels(args.filter_channel)
+        except ValueError as e:
+            parser.error(str(e))
+
+    if args.query is not None:
+        query_store(args.db, args.query, args.since)
         sys.exit(0)
 
-    if args.wifi:
-        scan_wifi(args.timeout, args.filter_ssid, args.filter_channel, args.min_signal, args.wifi_channels)
-    
-    if args.bluetooth:
-        await scan_bluetooth(args.timeout)
+    if args.stop_daemon:
+        try:
+            daemon_request({"cmd": "stop"}, args.daemon_socket)
+            print(f"{Color.GREEN}{Style.BRIGHT}[*]{Style.RESET_ALL} Daemon stopped.")
+        except (OSError, DaemonError) as e:
+            print(f"{Color.RED}{Style.BRIGHT}[!]{Style.RESET_ALL} No daemon on {args.daemon_socket}: {e}")
+        sys.exit(0)
+
+    # A running daemon answers scans at once; outputs, recordings and replays stay local
+    if not (args.daemon or args.no_daemon or args.audit or args.deauth or args.output or args.record or args.replay or args.pcap):
+        if await serve_from_daemon(args, args.daemon_socket):
+            return
+
+    replay = None
+    if args.replay:
+        try:
+            replay = Replay(args.replay, args.replay_speed)
+        except (OSError, ValueError) as e:
+            print(f"{Color.RED}{Style.BRIGHT}[!]{Style.RESET_ALL} Cannot read replay file: {e}")
+            sys.exit(1)
+    recorder = Recorder(args.record) if args.record else None
+    sink = make_sink(args.output, args.output_target) if args.output else None
+    try:
+        if args.daemon:
+            selected = args.wifi or args.live_wifi or args.bluetooth or args.live_ble or args.frequency or args.sdr
+            try:
+                daemon = backend("daemon", replay).AirspyDaemon(
+                    args.daemon_socket, wifi=bool(args.wifi or args.live_wifi or not selected),
+                    ble=bool(args.bluetooth or args.live_ble or not selected), frequency=args.frequency, gain=args.gain,
+                    protocol=args.protocol, sink=sink, replay=replay, dedup_window=args.dedup_window, receivers=args.sdr)
+                await daemon.serve()
+            except (RuntimeError, OSError, ValueError) as e:
+                print(f"{Color.RED}{Style.BRIGHT}[!]{Style.RESET_ALL} Cannot start the daemon: {e}")
+            return
+
+        if args.audit:
+            await backend("audit").audit_scan(args.online_vendors, args.audit_config, sink, args.audit_report)
+            return
+
+        if args.live_wifi:
+            backend("wifi", replay).scan_wifi_live(sink=sink, analyze_channels=args.wifi_channels, channel_width=args.channel_width,
+                                                   recorder=recorder, replay=replay, pcap=args.pcap)
+        elif args.wifi:
+            backend("wifi", replay).scan_wifi(args.timeout, args.filter_ssid, args.filter_channel, args.min_signal, args.wifi_channels, args.online_vendors, sink, args.channel_width,
+                                              recorder, replay, args.pcap)
         
-    if args.live_sdr and not args.frequency:
-        print(f"{Color.RED}{Style.BRIGHT}[!]{Style.RESET_ALL} {Color.CYAN}{Style.BRIGHT}--live-sdr{Style.RESET_ALL} requires -f to be specified.")
-        sys.exit(1)
-    elif args.live_sdr and args.frequency:
-        scan_rtl433_live(args.frequency, args.gain, args.protocol, args.output)
-    elif args.frequency:
-        scan_rtl433(args.timeout, args.frequency, args.gain, args.protocol, args.output)
+        if args.live_ble:
+            await backend("ble", replay).scan_bluetooth_live(sink, recorder=recorder, replay=replay)
+        elif args.bluetooth:
+            await backend("ble", replay).scan_bluetooth(args.timeout, args.online_vendors, sink, recorder=recorder, replay=replay)
+            
+        if args.live_sdr and not (args.frequency or args.sdr):
+            print(f"{Color.RED}{Style.BRIGHT}[!]{Style.RESET_ALL} {Color.CYAN}{Style.BRIGHT}--live-sdr{Style.RESET_ALL} requires -f or --sdr to be specified.")
+            sys.exit(1)
+        hop = {"revisit": args.revisit} if args.revisit else {}
+        if args.sdr:
+            hop["receivers"] = args.sdr
+        if args.live_sdr:
+            backend("sdr", replay).scan_rtl433_live(args.frequency, args.gain, args.protocol, sink, args.dedup_window, args.window,
+                                                    recorder=recorder, replay=replay, **hop)
+        elif args.frequency or args.sdr:
+            backend("sdr", replay).scan_rtl433(args.timeout, args.frequency, args.gain, args.protocol, sink, args.dedup_window,
+                                               recorder, replay, **hop)
+    finally:
+        if recorder:
+            recorder.close()
+            counts = ", ".join(f"{count} {source}" for source, count in recorder.counts.items() if count)
+            print(f"{Color.GREEN}{Style.BRIGHT}[*]{Style.RESET_ALL} Recorded {counts or 'nothing'} to {args.record}")
+        if sink:
+            sink.close()
+            print(f"{Color.GREEN}{Style.BRIGHT}[*]{Style.RESET_ALL} {sink.written} observations written ({args.output}), {sink.dropped} dropped")
 
     
     if args.deauth:
         if not args.bssid:
             print(f"{Color.RED}{Style.BRIGHT}[!]{Style.RESET_ALL} You must specify a BSSID with `-a <BSSID>` for the deauth attack.")
             sys.exit(1)
-        deauth(args.bssid, args.station, args.timeout)
+        backend("wifi").deauth(args.bssid, args.station, args.timeout)
 
 if __name__ == "__main__":
+    # Exit normally on SIGTERM so scans stop their radios and remove their capture directories
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(128 + signum))
     asyncio.run(main())
\ No newline at end of file
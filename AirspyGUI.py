@@ -6,36 +6,46 @@ import sys
 import subprocess
 import json
 import time
-import csv
-import requests
-from PySide6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, QTableWidget,
+import threading
+from collections import namedtuple
+from PySide6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, QTableWidget, QTableView, QLineEdit,
                                 QTableWidgetItem, QLabel, QTabWidget, QHeaderView, QDialog, QPushButton, QProgressBar, QTextEdit, QFileDialog)
 from PySide6.QtCore import Qt, Signal, QThread
 from PySide6.QtGui import QPixmap, QTextCursor
 from qt_material import apply_stylesheet
-import select
-from bleak import BleakScanner
 import asyncio
-import pyshark
-
-def get_mac_vendor(mac_address):
-    url = f"https://api.macvendors.com/{mac_address}"
-    try:
-        response = requests.get(url, timeout=2)
-        if response.status_code == 200:
-            return response.text.strip()
-    except requests.RequestException:
-        pass
-    return "Unknown"
-
-def scan_rtl433_live(frequency="433.92M"):
-    return subprocess.Popen(["rtl_433", "-d", "soapy", "-f", frequency, "-F", "json"],
-                            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, bufsize=1)
-
-async def scan_bluetooth():
-    devices = await BleakScanner.discover()
-    return [{"Name": dev.name or "Unknown", "Address": dev.address, "Signal": f"{dev.rssi} dBm"} for dev in devices]
-    
+from oui import get_mac_vendor, format_mac
+from airodump import AirodumpWatcher
+from capture import CaptureSession
+from rtl_reader import rtl433_command, read_rtl433
+from rtl_multi import read_receivers
+from rtl_aggregate import DeviceAggregator, LIVE_MAX_DEVICES, LIVE_IDLE
+from ble_tracker import BleTracker, track_ble
+from rssi import RssiHistory
+from gui_models import KeyedTableModel, make_proxy
+
+# A Wi-Fi table row: the AccessPoint and its Client records, signals already smoothed
+WifiRow = namedtuple("WifiRow", "ap vendor clients")
+
+WIFI_COLUMNS = [("SSID", lambda row: row.ap.essid or "<Hidden>"), ("BSSID", lambda row: format_mac(row.ap.bssid)),
+                ("Vendor", lambda row: row.vendor), ("Signal (avg)", lambda row: row.ap.signal),
+                ("Channel", lambda row: row.ap.channel), ("Security", lambda row: row.ap.security),
+                ("Clients", lambda row: len(row.clients))]
+BLUETOOTH_COLUMNS = [("Name", "Name"), ("Address", "Address"), ("Signal (avg)", "Signal"), ("p10 / p90", "p10 / p90"),
+                     ("Advertisements", "Advertisements")]
+RTL_COLUMNS = [("Model", "Model"), ("Count", "Count"), ("Last Seen", "Last Seen"), ("Data", "Data")]
+
+UI_FRAME_RATE = 4          # table refreshes per second, at most
+WORKER_STOP_TIMEOUT = 5000 # ms
+
+def bluetooth_rows(tracker):
+    """Rows for the Bluetooth table; the spread is over the recent readings (tracker.history)"""
+    history = tracker.history
+    return [{"Name": dev.name or "Unknown", "Address": format_mac(dev.address),
+             "Signal": None if dev.rssi_avg is None else round(tracker.signal(dev)),
+             "p10 / p90": f"{history.percentile(dev.address, 0.1)} / {history.percentile(dev.address, 0.9)}",
+             "Advertisements": dev.count} for dev in tracker.by_signal()]
+
 class AircrackWorker(QThread):
     result_signal = Signal(str)
 
@@ -73,18 +83,19 @@ class ClientPopup(QDialog):
 
         if clients:
             self.table = QTableWidget()
-            self.table.setColumnCount(3)
-            self.table.setHorizontalHeaderLabels(["Client MAC", "Signal (dBm)", "Deauth"])
+            self.table.setColumnCount(4)
+            self.table.setHorizontalHeaderLabels(["Client MAC", "Vendor", "Signal (dBm)", "Deauth"])
             self.table.setRowCount(len(clients))
             self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
 
             for row, client in enumerate(clients):
-                self.table.setItem(row, 0, QTableWidgetItem(client["Station"]))
-                self.table.setItem(row, 1, QTableWidgetItem(str(client["Signal"])))
+                self.table.setItem(row, 0, QTableWidgetItem(format_mac(client.station)))
+                self.table.setItem(row, 1, QTableWidgetItem(get_mac_vendor(client.station)))
+                self.table.setItem(row, 2, QTableWidgetItem(str(client.signal)))
 
                 deauth_button = QPushButton("Deauth")
                 deauth_button.clicked.connect(lambda _, c=client: self.deauth_client(c))
-                self.table.setCellWidget(row, 2, deauth_button)
+                self.table.setCellWidget(row, 3, deauth_button)
 
             layout.addWidget(self.table)
         else:
@@ -113,15 +124,14 @@ class ClientPopup(QDialog):
         self.setLayout(layout)
 
     def deauth_client(self, client):
-        station_mac = client["Station"].split(" ")[0]  
+        station_mac = format_mac(client.station)
         command = ["sudo", "aireplay-ng", "--deauth", "0", "-a", self.bssid, "-c", station_mac, "wlan0mon"]
 
         subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
         print(f"Sent deauth to {station_mac} on {self.bssid}")
         
     def capture_handshake(self):
-        file_prefix = "/tmp/eapol"
-        handshake_command = ["sudo", "airodump-ng", "-d", self.bssid, "-c", self.channel, "-w", file_prefix, "wlan0mon"]
+        session = CaptureSession(output_format="pcap", bssid=self.bssid, channel=self.channel, prefix="eapol")
         #deauth_command = ["sudo", "aireplay-ng", "--deauth", "0", "-a", self.bssid, "wlan0mon"]
         
         print("Starting handshake capture...")
@@ -129,7 +139,7 @@ class ClientPopup(QDialog):
         self.status_label.setText("Capturing handshake...")
         self.status_label.setStyleSheet("color: black;")
         
-        handshake_process = subprocess.Popen(handshake_command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        session.start()
         #time.sleep(5)
         #subprocess.Popen(deauth_command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
 
@@ -137,17 +147,17 @@ class ClientPopup(QDialog):
             time.sleep(0.3)
             self.progress_bar.setValue(i)
         
-        handshake_process.terminate()
-        handshake_process.wait()
+        session.stop()
         print("Capture stopped, checking for handshake...")
         
-        eapol_file = f"{file_prefix}-01.cap"
+        eapol_file = session.output("cap")
         destination_folder = os.path.join(os.getcwd(), "captured_handshake")
         destination_file = os.path.join(destination_folder, f"{self.ssid}.cap")
 
         os.makedirs(destination_folder, exist_ok=True)
 
         try:
+            import pyshark  # only needed for handshake captures
             cap = pyshark.FileCapture(eapol_file, display_filter="eapol")
             eapol_packets = list(cap)
             if eapol_packets:
@@ -162,7 +172,7 @@ class ClientPopup(QDialog):
             self.status_label.setText("Capture file not found!")
             self.status_label.setStyleSheet("color: red;")
         
-        subprocess.run("sudo rm /tmp/eap*", shell=True)
+        session.close()
         
         """
         wordlist = "/usr/share/wordlists/rockyou.txt"
@@ -174,7 +184,7 @@ class ClientPopup(QDialog):
         
 
 class NetworkScannerGUI(QMainWindow):
-    def __init__(self):
+    def __init__(self, receivers=None):
         super().__init__()
         self.setWindowTitle("Airspy")
         self.setGeometry(100, 100, 1200, 800)
@@ -205,15 +215,17 @@ class NetworkScannerGUI(QMainWindow):
 
         self.setup_wifi_tab()
         self.setup_other_tabs()
-        self.scanner = ScannerWorker("433.92M")
-        self.scanner.wifi_result.connect(self.update_wifi_table)
-        self.scanner.bluetooth_result.connect(self.update_bluetooth_table)
-        self.scanner.rtl_result.connect(self.update_rtl_table)
-        self.scanner.start()
+        # One streaming worker per radio, each refreshing its own tab as data arrives
+        self.workers = [(WifiWorker(), self.update_wifi_table),
+                        (BluetoothWorker(), self.update_bluetooth_table),
+                        (RtlWorker("433.92M", receivers), self.update_rtl_table)]
+        for worker, slot in self.workers:
+            worker.result.connect(slot)
+            worker.start()
 
     def exit_application(self):
         print("Exiting application...")
-        sys.exit(0)
+        self.close()
 
     def setup_wifi_tab(self):
         wifi_layout = QVBoxLayout(self.wifi_tab)
@@ -222,11 +234,9 @@ class NetworkScannerGUI(QMainWindow):
         self.wifi_scan_tab = QWidget()
         scan_layout = QVBoxLayout(self.wifi_scan_tab)
 
-        self.wifi_table = QTableWidget()
-        self.wifi_table.setColumnCount(6)
-        self.wifi_table.setHorizontalHeaderLabels(["SSID", "BSSID", "Signal", "Channel", "Security", "Clients"])
-        self.wifi_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
-        scan_layout.addWidget(self.wifi_table)
+        self.wifi_model = KeyedTableModel(WIFI_COLUMNS, lambda row: row.ap.bssid, self)
+        self.wifi_proxy = make_proxy(self.wifi_model, 3)
+        self.wifi_table = self.make_table_view(scan_layout, self.wifi_proxy)
 
         self.wifi_tabs.addTab(self.wifi_scan_tab, "Scan WiFi")
 
@@ -262,56 +272,54 @@ class NetworkScannerGUI(QMainWindow):
 
         wifi_layout.addWidget(self.wifi_tabs)
 
-        self.wifi_table.cellClicked.connect(self.on_wifi_clicked)
+        self.wifi_table.clicked.connect(self.on_wifi_clicked)
+
+    def make_table_view(self, layout, proxy):
+        """Filter box + sortable view over a proxy model"""
+        search = QLineEdit()
+        search.setPlaceholderText("Filter...")
+        search.textChanged.connect(proxy.setFilterFixedString)
+        layout.addWidget(search)
+        view = QTableView()
+        view.setModel(proxy)
+        # Enabling sorting re-sorts by the header indicator: point it at the model's sort first
+        view.horizontalHeader().setSortIndicator(proxy.sortColumn(), proxy.sortOrder())
+        view.setSortingEnabled(True)
+        view.setSelectionBehavior(QTableView.SelectRows)
+        view.verticalHeader().setVisible(False)
+        view.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        layout.addWidget(view)
+        return view
 
     def setup_other_tabs(self):
-        for tab, name, headers in [
-            (self.bluetooth_tab, "bluetooth", ["Name", "Address", "Signal"]),
-            (self.rtl_tab, "rtl", ["Model", "Data"])
-        ]:
-            layout = QVBoxLayout(tab)
-            table = QTableWidget()
-            table.setColumnCount(len(headers))
-            table.setHorizontalHeaderLabels(headers)
-            table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
-            layout.addWidget(table)
-            setattr(self, f"{name}_table", table)
-            
+        # Strongest devices first on the Bluetooth tab, most active sensors first on the SDR tab
+        self.bluetooth_model = KeyedTableModel(BLUETOOTH_COLUMNS, "Address", self)
+        self.bluetooth_proxy = make_proxy(self.bluetooth_model, 2)
+        self.bluetooth_table = self.make_table_view(QVBoxLayout(self.bluetooth_tab), self.bluetooth_proxy)
+        self.rtl_model = KeyedTableModel(RTL_COLUMNS, "Model", self)
+        self.rtl_proxy = make_proxy(self.rtl_model, 1)
+        self.rtl_table = self.make_table_view(QVBoxLayout(self.rtl_tab), self.rtl_proxy)
+
     def update_wifi_table(self, networks):
-        self.wifi_table.setRowCount(0)
-        self.wifi_networks = networks
-        for row_index, ap in enumerate(networks):
-            self.wifi_table.insertRow(row_index)
-            self.wifi_table.setItem(row_index, 0, QTableWidgetItem(ap["SSID"]))
-            self.wifi_table.setItem(row_index, 1, QTableWidgetItem(ap["BSSID"]))
-            self.wifi_table.setItem(row_index, 2, QTableWidgetItem(str(ap["Signal"])))
-            self.wifi_table.setItem(row_index, 3, QTableWidgetItem(str(ap["Channel"])))
-            self.wifi_table.setItem(row_index, 4, QTableWidgetItem(ap["Security"]))
-            self.wifi_table.setItem(row_index, 5, QTableWidgetItem(str(len(ap["Clients"]))))
+        self.wifi_model.update(networks)
 
     def update_rtl_table(self, signals):
-        self.rtl_table.setRowCount(len(signals))
-        for row, entry in enumerate(signals):
-            self.rtl_table.setItem(row, 0, QTableWidgetItem(entry["Model"]))
-            self.rtl_table.setItem(row, 1, QTableWidgetItem(entry["Data"]))
+        self.rtl_model.update(signals)
 
     def update_bluetooth_table(self, devices):
-        self.update_table(self.bluetooth_table, devices)
-    
-    def update_table(self, table, data):
-        table.setRowCount(len(data))
-        for row, entry in enumerate(data):
-            for col, key in enumerate(entry):
-                table.setItem(row, col, QTableWidgetItem(str(entry[key])))
-
-    def on_wifi_clicked(self, row, _):
-        ap = self.wifi_networks[row]
-        popup = ClientPopup(ap["SSID"], ap["BSSID"].split(" ")[0], ap["Channel"], ap["Clients"], self)
+        self.bluetooth_model.update(devices)
+
+    def on_wifi_clicked(self, index):
+        ap, _, clients = self.wifi_model.row_data(self.wifi_proxy.mapToSource(index).row())
+        popup = ClientPopup(ap.essid or "<Hidden>", format_mac(ap.bssid), ap.channel, clients, self)
         popup.exec()
 
     def closeEvent(self, event):
-        self.scanner.stop()
-        self.scanner.wait()
+        for worker, _ in self.workers:
+            worker.stop()
+        for worker, _ in self.workers:
+            if not worker.wait(WORKER_STOP_TIMEOUT):
+                print(f"{type(worker).__name__} did not stop in time")
         event.accept()
 
     def select_cap_file(self):
@@ -341,141 +349,133 @@ class NetworkScannerGUI(QMainWindow):
         self.output_text.append(result)
         self.output_text.moveCursor(QTextCursor.End)
 
-class ScannerWorker(QThread):
-    wifi_result = Signal(list)
-    bluetooth_result = Signal(list)
-    rtl_result = Signal(list)
+class StreamWorker(QThread):
+    """Streams one radio and emits `result` with the full row list when something changed,
+    at most UI_FRAME_RATE times per second however fast events arrive"""
+    result = Signal(list)
 
-    def __init__(self, rtl_frequency="433.92M"):
+    def __init__(self, frame_rate=UI_FRAME_RATE):
         super().__init__()
+        self.frame_interval = 1.0 / frame_rate
+        self.stop_event = threading.Event()
+        self.dirty = False
+        self.next_frame = 0.0
+
+    def flush(self):
+        """Called from the worker's loop at least once per frame interval"""
+        now = time.monotonic()
+        if self.dirty and now >= self.next_frame:
+            self.dirty = False
+            # Fixed grid, so a flush arriving slightly early does not skip a whole frame
+            self.next_frame = max(self.next_frame + self.frame_interval, now)
+            self.result.emit(self.rows())
+
+    def rows(self):
+        raise NotImplementedError
+
+    def stop(self):
+        self.stop_event.set()
+
+
+class WifiWorker(StreamWorker):
+    def __init__(self, interface="wlan0mon", **kwargs):
+        super().__init__(**kwargs)
+        self.interface = interface
+        self.watcher = None
+        self.history = RssiHistory()
+        self.vendors = {}
+
+    def vendor(self, mac):
+        vendor = self.vendors.get(mac)
+        if vendor is None:
+            vendor = self.vendors[mac] = get_mac_vendor(mac)
+        return vendor
+
+    def run(self):
+        # One airodump-ng for the worker's lifetime; the watcher only re-parses changed rows
+        with CaptureSession(self.interface, write_interval=1) as session:
+            self.watcher = AirodumpWatcher(session)
+            while not self.stop_event.wait(self.frame_interval) and session.running():
+                if self.watcher.poll():
+                    self.dirty = True
+                    now = time.time()
+                    for mac, signal, seen in self.watcher.signals():
+                        self.history.add(mac, signal, seen or now)
+                self.flush()
+
+    def signal(self, mac, signal):
+        return round(self.history.smoothed(mac, signal))
+
+    def rows(self):
+        clients = {}
+        for client in self.watcher.clients.values():
+            clients.setdefault(client.bssid, []).append(client._replace(signal=self.signal(client.station, client.signal)))
+        return [WifiRow(ap._replace(signal=self.signal(bssid, ap.signal)), self.vendor(bssid), clients.get(bssid, []))
+                for bssid, ap in self.watcher.aps.items()]
+
+
+class BluetoothWorker(StreamWorker):
+    def __init__(self, scanner_factory=None, **kwargs):
+        super().__init__(**kwargs)
+        self.scanner_factory = scanner_factory
+        self.tracker = BleTracker(history=RssiHistory())
+
+    def on_snapshot(self, tracker):
+        if tracker.expire() or tracker.take_changed():
+            self.dirty = True
+        self.flush()
+
+    def run(self):
+        try:
+            asyncio.run(track_ble(None, self.on_snapshot, self.frame_interval, self.tracker, self.stop_event,
+                                  self.scanner_factory))
+        except Exception as e:
+            print(f"Error scanning Bluetooth: {e}")
+
+    def rows(self):
+        return bluetooth_rows(self.tracker)
+
+
+class RtlWorker(StreamWorker):
+    def __init__(self, rtl_frequency="433.92M", receivers=None, **kwargs):
+        super().__init__(**kwargs)
         self.rtl_frequency = rtl_frequency
-        self.rtl_process = None
-        self.running = True
+        self.receivers = receivers     # several SDRs ('FREQ@DEVICE') merged into one table
+        self.devices = DeviceAggregator(max_devices=LIVE_MAX_DEVICES, idle=LIVE_IDLE)
+
+    def on_event(self, event):
+        self.devices.add(event)
+        self.dirty = True
+
+    async def stream(self):
+        if self.receivers:
+            reader = asyncio.ensure_future(read_receivers(self.receivers, None, self.on_event, self.stop_event))
+        else:
+            reader = asyncio.ensure_future(
+                read_rtl433(rtl433_command(self.rtl_frequency), None, self.on_event, self.stop_event))
+        while not reader.done():
+            await asyncio.wait({reader}, timeout=self.frame_interval)
+            if self.devices.evict():   # a quiet band still drops sensors idle past LIVE_IDLE
+                self.dirty = True
+            self.flush()
+        return reader.result()
 
     def run(self):
-        self.rtl_process = scan_rtl433_live(self.rtl_frequency)
-        while self.running:
-            print("--> scan wifi")
-            wifi_results = scan_wifi(10)
-            self.wifi_result.emit(wifi_results)
-            print("--> scan BT")
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            bt_results = loop.run_until_complete(scan_bluetooth())
-            self.bluetooth_result.emit(bt_results)
-            loop.close()
-            print("--> scan RTL")
-            rtl_results = self.read_rtl_output()
-            self.rtl_result.emit(rtl_results)
-            time.sleep(300)
-
-    def read_rtl_output(self):
-        results = []
-        start_time = time.time()
-        if not self.rtl_process:
-            return results
         try:
-            while time.time() - start_time < 10:
-                rlist, _, _ = select.select([self.rtl_process.stdout], [], [], 0.5)
-                if rlist:
-                    line = self.rtl_process.stdout.readline().strip()
-                    if line:
-                        try:
-                            data = json.loads(line)
-                            results.append({"Model": data.get("model", "Unknown"), "Data": json.dumps(data)})
-                        except json.JSONDecodeError:
-                            continue
-                if len(results) > 0:
-                    break
-                time.sleep(10)
+            asyncio.run(self.stream())
         except Exception as e:
             print(f"Error reading RTL-SDR output: {e}")
-        return results
 
-    def stop(self):
-        self.running = False
-        if self.rtl_process:
-            self.rtl_process.terminate()
-            self.rtl_process.wait()
-
-def scan_wifi(timeout):
-    print("WIFI SCAN")
-    csv_file = "/tmp/airodump-01.csv"
-    process = subprocess.Popen(
-        ["sudo", "airodump-ng", "wlan0mon", "--write", "/tmp/airodump", "--output-format", "csv"],
-        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
-    )
-    time.sleep(timeout)
-    process.terminate()
-    process.wait()
-
-    try:
-        with open(csv_file, "r", encoding="ISO-8859-1") as file:
-            reader = csv.reader(file)
-            rows = list(reader)
-    except FileNotFoundError:
-        return []
-
-    ap_list = []
-    client_list = []
-    parsing_clients = False
-
-    for row in rows:
-        if len(row) < 2:
-            continue
-        if "Station MAC" in row[0]:  
-            parsing_clients = True
-            continue
-
-        if not parsing_clients:
-            if len(row) > 13: 
-                try:
-                    bssid = row[0].strip()
-                    signal = int(row[8].strip()) if row[8].strip().lstrip('-').isdigit() else -100  
-                    channel = int(row[3].strip()) if row[3].strip().isdigit() else -1
-                    security = row[5].strip()
-                    cipher = row[6].strip() if row[6].strip() else "Unknown"
-                    auth = row[7].strip() if row[7].strip() else "Unknown"
-                    essid = row[13].strip()
-                    vendor = get_mac_vendor(bssid)
-
-                    ap_entry = {
-                        "SSID": essid if essid else "<Hidden>",
-                        "BSSID": f"{bssid} ({vendor})",
-                        "Signal": signal,
-                        "Channel": channel,
-                        "Security": f"{security} {cipher} {auth}",
-                        "Clients": []
-                    }
-                    ap_list.append(ap_entry)
-                except ValueError:
-                    continue
-        else:
-            if len(row) > 6:
-                try:
-                    station_mac = row[0].strip()
-                    associated_bssid = row[5].strip()
-                    signal = int(row[3].strip()) if row[3].strip().lstrip('-').isdigit() else -100
-                    vendor = get_mac_vendor(station_mac)
-
-                    client_entry = {
-                        "Station": f"{station_mac} ({vendor})",
-                        "Signal": signal
-                    }
-
-                    for ap in ap_list:
-                        if associated_bssid in ap["BSSID"]:
-                            ap["Clients"].append(client_entry)
-                            break
-                except ValueError:
-                    continue
-
-    subprocess.run("sudo rm /tmp/airodump-01.csv", shell=True)
-    return ap_list
+    def rows(self):
+        return [{"Model": stats.label, "Count": stats.count,
+                 "Last Seen": time.strftime("%H:%M:%S", time.localtime(stats.last_seen)),
+                 "Data": json.dumps(stats.last)} for stats in self.devices.by_activity()]
 
 if __name__ == "__main__":
+    # --sdr FREQ@DEVICE (repeatable) reads several SDRs into the SDR tab, as with Airspy.py
+    receivers = [arg for flag, arg in zip(sys.argv, sys.argv[1:]) if flag == "--sdr"]
     app = QApplication(sys.argv)
     apply_stylesheet(app, theme='dark_teal.xml')
-    window = NetworkScannerGUI()
+    window = NetworkScannerGUI(receivers)
     window.show()
     sys.exit(app.exec())
@@ -0,0 +1,351 @@
+import os
+import csv
+import time
+from array import array
+from collections import namedtuple
+from datetime import datetime
+
+from oui import mac_to_int
+from records import AccessPoint, Client
+
+###### AIRODUMP-NG CSV ######
+
+# airodump-ng rewrites its CSV every --write-interval seconds with two sections:
+# access points first, then stations after a "Station MAC" header line.
+
+WifiEvent = namedtuple("WifiEvent", "kind key data")
+
+AP_NEW = "ap_new"
+AP_SIGNAL = "ap_signal"
+AP_UPDATED = "ap_updated"
+AP_LOST = "ap_lost"
+CLIENT_NEW = "client_new"
+CLIENT_ASSOCIATED = "client_associated"
+CLIENT_SIGNAL = "client_signal"
+CLIENT_LOST = "client_lost"
+
+NOT_ASSOCIATED = "(not associated)"
+NO_MAC = 1 << 48                   # column value of a station's BSSID when it is not associated
+
+
+def parse_signal(value):
+    value = value.strip()
+    return int(value) if value.lstrip('-').isdigit() else -100
+
+
+def parse_count(value):
+    value = value.strip()
+    return int(value) if value.isdigit() else 0
+
+
+def parse_time(value):
+    try:
+        return time.mktime(datetime.strptime(value.strip(), "%Y-%m-%d %H:%M:%S").timetuple())
+    except ValueError:
+        return None
+
+
+def parse_probes(row):
+    """Probed ESSIDs: the last column, which airodump-ng does not quote, so commas split it"""
+    return tuple(essid.strip() for essid in row[6:] if essid.strip())
+
+
+def parse_security(row):
+    return f"{row[5].strip()} {row[6].strip() or 'Unknown'} {row[7].strip() or 'Unknown'}"
+
+
+def parse_bssid(value):
+    """A station's BSSID column: the AP's MAC, or None when it is not associated"""
+    return mac_to_int(value.strip())
+
+
+def parse_ap_row(row):
+    """Access point row -> AccessPoint, or None if the row is not a complete AP entry"""
+    if len(row) <= 13:
+        return None
+    bssid = mac_to_int(row[0].strip())
+    if bssid is None:
+        return None
+    channel = row[3].strip()
+    return AccessPoint(bssid, row[13].strip(), parse_signal(row[8]), int(channel) if channel.isdigit() else -1,
+                       parse_security(row), parse_count(row[9]), parse_count(row[10]), parse_time(row[2]))
+
+
+def parse_client_row(row):
+    """Station row -> Client, or None if the row is not a complete station entry"""
+    if len(row) <= 6:
+        return None
+    station = mac_to_int(row[0].strip())
+    if station is None:
+        return None
+    return Client(station, parse_bssid(row[5]), parse_signal(row[3]), parse_probes(row), parse_time(row[1]),
+                  parse_time(row[2]))
+
+
+class AirodumpWatcher:
+    """Follows a CSV that airodump-ng keeps rewriting and turns each rewrite into diff events.
+
+    Rows are compared as raw text first, so only rows whose content changed are parsed again.
+    """
+
+    def __init__(self, csv_file, lost_after=60, signal_delta=3):
+        self.csv_file = csv_file
+        self.lost_after = lost_after
+        self.signal_delta = signal_delta
+        self.raw = {}
+        self.aps = {}              # BSSID (int) -> AccessPoint
+        self.clients = {}          # station MAC (int) -> Client
+        self.file_state = None
+
+    def read_lines(self):
+        try:
+            stat = os.stat(self.csv_file)
+        except FileNotFoundError:
+            return None
+        if (stat.st_mtime_ns, stat.st_size) == self.file_state:
+            return None
+        try:
+            with open(self.csv_file, "r", encoding="ISO-8859-1") as file:
+                text = file.read()
+        except FileNotFoundError:
+            return None
+        self.file_state = (stat.st_mtime_ns, stat.st_size)
+        return text.splitlines()
+
+    def poll(self, now=None):
+        """Returns the list of WifiEvent produced since the previous poll"""
+        now = time.time() if now is None else now
+        events = []
+        lines = self.read_lines()
+
+        if lines is not None:
+            seen = set()
+            parsing_clients = False
+            for line in lines:
+                if line.startswith("Station MAC"):
+                    parsing_clients = True
+                    continue
+                key = line.split(",", 1)[0].strip()
+                if len(key) != 17 or key == "BSSID":
+                    continue
+                raw_key = (parsing_clients, key)
+                seen.add(raw_key)
+                if self.raw.get(raw_key) == line:
+                    continue
+
+                row = next(csv.reader([line]))
+                if parsing_clients:
+                    entry = parse_client_row(row)
+                    if entry:
+                        self.update_client(entry, events)
+                else:
+                    entry = parse_ap_row(row)
+                    if entry:
+                        self.update_ap(entry, events)
+                if entry:
+                    self.raw[raw_key] = line
+
+            # Entries dropped from the file (airodump restarted) are gone as well
+            for raw_key in [k for k in self.raw if k not in seen]:
+                del self.raw[raw_key]
+                self.forget(mac_to_int(raw_key[1]), raw_key[0], events)
+
+        self.expire(now, events)
+        return events
+
+    def signals(self):
+        """(MAC, signal, last seen) of every AP and station currently in the file"""
+        for bssid, ap in self.aps.items():
+            yield bssid, ap.signal, ap.last_seen
+        for station, client in self.clients.items():
+            yield station, client.signal, client.last_seen
+
+    def update_ap(self, ap, events):
+        previous = self.aps.get(ap.bssid)
+        self.aps[ap.bssid] = ap
+        if previous is None:
+            events.append(WifiEvent(AP_NEW, ap.bssid, ap))
+        elif (ap.channel, ap.security, ap.essid) != (previous.channel, previous.security, previous.essid):
+            events.append(WifiEvent(AP_UPDATED, ap.bssid, ap))
+        elif abs(ap.signal - previous.signal) >= self.signal_delta:
+            events.append(WifiEvent(AP_SIGNAL, ap.bssid, ap))
+
+    def update_client(self, client, events):
+        previous = self.clients.get(client.station)
+        self.clients[client.station] = client
+        if previous is None:
+            events.append(WifiEvent(CLIENT_NEW, client.station, client))
+            if client.bssid is not None:
+                events.append(WifiEvent(CLIENT_ASSOCIATED, client.station, client))
+        elif client.bssid != previous.bssid and client.bssid is not None:
+            events.append(WifiEvent(CLIENT_ASSOCIATED, client.station, client))
+        elif abs(client.signal - previous.signal) >= self.signal_delta:
+            events.append(WifiEvent(CLIENT_SIGNAL, client.station, client))
+
+    def forget(self, key, is_client, events):
+        table, kind = (self.clients, CLIENT_LOST) if is_client else (self.aps, AP_LOST)
+        entry = table.pop(key, None)
+        if entry is not None:
+            events.append(WifiEvent(kind, key, entry))
+
+    def expire(self, now, events):
+        for table, is_client in ((self.aps, False), (self.clients, True)):
+            stale = [key for key, entry in table.items()
+                     if entry.last_seen is not None and now - entry.last_seen > self.lost_after]
+            for key in stale:
+                # Keep the raw line: the row stays in the CSV, it only comes back if it changes
+                self.forget(key, is_client, events)
+
+
+class AirodumpCapture:
+    """Columnar snapshot of one airodump-ng CSV.
+
+    Each field is stored in its own column (array('h') for numbers, array('Q') for MACs),
+    with a BSSID -> AP row hash index and a BSSID -> client rows index, so association,
+    filtering and sorting are linear instead of AP x client nested scans. ap() and client()
+    build AccessPoint / Client records on demand.
+    """
+
+    def __init__(self):
+        self.bssid = array('Q')
+        self.signal = array('h')
+        self.channel = array('h')
+        self.security = []
+        self.essid = []
+        self.beacons = array('q')
+        self.data = array('q')         # "# IV" column: data frames seen
+
+        self.station = array('Q')
+        self.station_bssid = array('Q')    # NO_MAC when not associated
+        self.station_signal = array('h')
+        self.station_first = array('d')    # first / last seen, 0 when unknown
+        self.station_last = array('d')
+        self.station_probes = []
+
+        self.ap_index = {}
+        self.clients_by_ap = {}
+
+    def __len__(self):
+        return len(self.bssid)
+
+    @classmethod
+    def from_file(cls, csv_file):
+        """Streams the CSV row by row; raises FileNotFoundError like open()"""
+        with open(csv_file, "r", encoding="ISO-8859-1") as file:
+            return cls.from_rows(csv.reader(file))
+
+    @classmethod
+    def from_rows(cls, rows):
+        capture = cls()
+        parsing_clients = False
+        times = {}                     # timestamps repeat across rows: parse each once
+        def seen(value):
+            value = value.strip()
+            if value not in times:
+                times[value] = parse_time(value) or 0.0
+            return times[value]
+        bssids = {}                    # so do the BSSIDs of station rows
+        def bssid(value):
+            if value not in bssids:
+                bssids[value] = parse_bssid(value)
+            return bssids[value]
+
+        for row in rows:
+            if len(row) < 2:
+                continue
+            if "Station MAC" in row[0]:
+                parsing_clients = True
+                continue
+            if row[0].strip() == "BSSID":
+                continue
+            mac = mac_to_int(row[0].strip())
+            if mac is None:
+                continue
+            if parsing_clients:
+                if len(row) > 6:
+                    capture.add_client(mac, bssid(row[5]), parse_signal(row[3]), parse_probes(row),
+                                       seen(row[1]), seen(row[2]))
+            elif len(row) > 13:
+                channel = row[3].strip()
+                capture.add_ap(mac, parse_signal(row[8]), int(channel) if channel.isdigit() else -1,
+                               parse_security(row), row[13].strip(), parse_count(row[9]), parse_count(row[10]))
+        return capture
+
+    def add_ap(self, bssid, signal, channel, security, essid, beacons=0, data=0):
+        """`bssid` is a 48-bit int"""
+        self.ap_index[bssid] = len(self.bssid)
+        self.bssid.append(bssid)
+        self.signal.append(max(-32768, min(32767, signal)))
+        self.channel.append(max(-32768, min(32767, channel)))
+        self.security.append(security)
+        self.essid.append(essid)
+        self.beacons.append(beacons)
+        self.data.append(data)
+
+    def add_client(self, station, bssid, signal, probes=(), first_seen=None, last_seen=None):
+        """`station` and `bssid` are 48-bit ints, `bssid` None when not associated"""
+        bssid = NO_MAC if bssid is None else bssid
+        self.clients_by_ap.setdefault(bssid, []).append(len(self.station))
+        self.station.append(station)
+        self.station_bssid.append(bssid)
+        self.station_signal.append(max(-32768, min(32767, signal)))
+        self.station_first.append(first_seen or 0.0)
+        self.station_last.append(last_seen or 0.0)
+        self.station_probes.append(probes)
+
+    def ap(self, row):
+        return AccessPoint(self.bssid[row], self.essid[row], self.signal[row], self.channel[row], self.security[row],
+                           self.beacons[row], self.data[row])
+
+    def client(self, row):
+        bssid = self.station_bssid[row]
+        return Client(self.station[row], None if bssid == NO_MAC else bssid, self.station_signal[row],
+                      self.station_probes[row], self.station_first[row] or None, self.station_last[row] or None)
+
+    def clients(self):
+        """Every station, associated or not"""
+        return [self.client(row) for row in range(len(self.station))]
+
+    def stations_of(self, bssid):
+        return [self.station[row] for row in self.clients_by_ap.get(bssid, ())]
+
+    def clients_of(self, bssid):
+        return [self.client(row) for row in self.clients_by_ap.get(bssid, ())]
+
+    def select(self, ssid=None, channels=None, min_signal=None, hidden=True, rank=None):
+        """AP row numbers matching the filters, strongest signal first. `rank(bssid, signal)`
+        replaces the signal as the sort key (RssiHistory.smoothed, for instance)."""
+        signal, essid, channel = self.signal, self.essid, self.channel
+        rows = range(len(self.bssid))
+        if not hidden:
+            rows = [i for i in rows if essid[i]]
+        if ssid:
+            rows = [i for i in rows if essid[i] == ssid]
+        if channels:
+            channels = set(channels)
+            rows = [i for i in rows if channel[i] in channels]
+        if min_signal:
+            rows = [i for i in rows if signal[i] >= min_signal]
+        if rank is not None:
+            bssid = self.bssid
+            return sorted(rows, key=lambda i: rank(bssid[i], signal[i]), reverse=True)
+        return sorted(rows, key=signal.__getitem__, reverse=True)
+
+
+def parse_channels(text):
+    """--filter-channel value -> list of channels: '6' -> [6], '1-6-11' -> [1, 6, 11].
+    Raises ValueError when a channel is not a number."""
+    try:
+        return [int(channel) for channel in text.replace(",", "-").split("-") if channel.strip()]
+    except ValueError:
+        raise ValueError(f"bad channel list '{text}': expected channels separated by '-', e.g. 1-6-11") from None
+
+
+def load_capture(csv_file):
+    """AirodumpCapture for csv_file, or None when airodump-ng did not write it"""
+    try:
+        return AirodumpCapture.from_file(csv_file)
+    except FileNotFoundError:
+        return None
+
+###### END AIRODUMP-NG CSV ######
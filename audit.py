@@ -1,207 +1,211 @@
-import sys
-import argparse
+import os
 import asyncio
-import pywifi
-from pywifi import const
-from bleak import BleakScanner
-import subprocess
 import json
 import time
-import select
-import requests
-import re
-import csv
-from datetime import datetime
 import warnings
 warnings.simplefilter(action='ignore', category=FutureWarning)
 
 from color import *
-
-def get_mac_vendor(mac_address):
-    url = f"https://api.macvendors.com/{mac_address}"
-    try:
-        response = requests.get(url, timeout=2)
-        if response.status_code == 200:
-            return f"{Color.GREEN}{Style.BRIGHT}{response.text.strip()}{Style.RESET_ALL}"
-        else:
-            return f"{Color.RED}{Style.BRIGHT}Unknown{Style.RESET_ALL}"
-    except requests.RequestException:
-        return f"{Color.RED}{Style.BRIGHT}Unknown{Style.RESET_ALL}"
+from oui import format_mac, UNKNOWN, RANDOMIZED
+from vendor_cache import resolve_vendors, resolve_vendors_async
+from airodump import load_capture
+from capture import CaptureSession
+from rtl_reader import rtl433_command, run_rtl433, run_reader
+from rtl_hop import hop_rtl433, parse_bands
+from rtl_multi import read_receivers
+from rtl_aggregate import DeviceAggregator
+from sinks import ap_observation, client_observation, rtl433_observation
+from ble_tracker import track_ble
+from bluetooth import ble_observation
+from correlate import correlate_ble, correlate_stations
+from report import AuditReport, render_report, REPORT_EXTENSIONS
 
 ###### AUDIT PART ######
 
-AUDIT_FILE = "audit.txt"
+AUDIT_NAME = "audit"
+AUDIT_FILE = AUDIT_NAME + ".jsonl"     # the streamed report; audit.md / audit.html are rendered from it
 AUDIT_TIME = 30
-
-def save_to_audit(data):
-    """Saves scan results to audit.txt"""
-    with open(AUDIT_FILE, "a", encoding="utf-8") as f:
-        f.write(f"\n\n=== {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} ===\n")
-        f.write(data + "\n")
-
-def scan_wifi_A(timeout): 
-    """Scans Wi-Fi networks and writes results to audit.txt"""
+AUDIT_CONFIG = "audit.json"
+
+# Each step names the radio it needs: steps on different radios run at the same
+# time, steps sharing a radio run one after the other. Several SDR bands in one step
+# share its duration, the SDR hopping between them (see rtl_hop).
+AUDIT_PLAN = [
+    {"scan": "wifi", "resource": "wlan0mon", "duration": 10},
+    {"scan": "bluetooth", "resource": "hci0", "duration": 10},
+    {"scan": "rtl433", "resource": "sdr0", "duration": 2 * AUDIT_TIME, "frequency": "433.92M,868M"},
+]
+
+def load_audit_plan(config_file=None):
+    """Reads the audit plan from a JSON file (a list of steps like AUDIT_PLAN), or returns the default plan"""
+    path = config_file or AUDIT_CONFIG
+    if not os.path.isfile(path):
+        if config_file:
+            print(f"{Color.RED}{Style.BRIGHT}[!]{Style.RESET_ALL} Audit config {config_file} not found, using the default plan.")
+        return AUDIT_PLAN
+    with open(path, "r", encoding="utf-8") as f:
+        config = json.load(f)
+    return config.get("plan", []) if isinstance(config, dict) else config
+
+def correlation_summary(correlation):
+    return {"addresses": correlation.addresses, "devices": correlation.devices, "linked": correlation.linked}
+
+def count(counts, value):
+    counts[value] = counts.get(value, 0) + 1
+
+def scan_wifi_A(timeout, section, online_vendors=False, sink=None):
+    """Scans Wi-Fi networks and writes one record per AP and client to the report section"""
     #print(f"\n{Color.GREEN}{Style.BRIGHT}[*]{Style.RESET_ALL} Scanning Wi-Fi networks for {timeout}s...")
 
-    csv_file = "/tmp/airodump-01.csv"
-
-    process = subprocess.Popen(
-        ["sudo", "airodump-ng", "wlan0mon", "--write", "/tmp/airodump", "--output-format", "csv"],
-        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
-    )
+    with CaptureSession() as session:
+        time.sleep(timeout)
+        session.stop()
+        capture = load_capture(session)
 
-    time.sleep(timeout)
-    process.terminate()
-    process.wait()
-
-    try:
-        with open(csv_file, "r", encoding="ISO-8859-1") as file:
-            reader = csv.reader(file)
-            rows = list(reader)
-    except FileNotFoundError:
-        wifi_results = "Wi-Fi Scan Results:\n-------------------\nNo networks detected. Ensure your Wi-Fi adapter is in monitor mode.\n"
-        save_to_audit(wifi_results)
+    if capture is None:
+        section.error("No networks detected. Ensure your Wi-Fi adapter is in monitor mode.")
         return
 
-    ap_list = []
-    client_list = []
-    parsing_clients = False
+    rows = capture.select()
+    stations = range(len(capture.station))
+    vendors = resolve_vendors([capture.bssid[row] for row in rows] + list(capture.station), online_vendors)
 
+    security, channels, hidden = {}, {}, 0
     for row in rows:
-        if len(row) < 2:
-            continue
-        if "Station MAC" in row[0]:  
-            parsing_clients = True
-            continue
-
-        if not parsing_clients:
-            if len(row) > 13: 
-                try:
-                    bssid = row[0].strip()
-                    signal = int(row[8].strip()) if row[8].strip().lstrip('-').isdigit() else -100  
-                    security = row[5].strip() 
-                    cipher = row[6].strip() if row[6].strip() else "Unknown"  
-                    auth = row[7].strip() if row[7].strip() else "Unknown"  
-                    essid = row[13].strip()
-
-                    ap_list.append({"BSSID": bssid, "Signal": signal, "Security": f"{security} {cipher} {auth}", "ESSID": essid})
-                except ValueError:
-                    continue
-        else:
-            if len(row) > 6:
-                try:
-                    station_mac = row[0].strip()
-                    associated_bssid = row[5].strip()
-                    signal = int(row[3].strip()) if row[3].strip().lstrip('-').isdigit() else -100  
-
-                    client_list.append({"Station": station_mac, "BSSID": associated_bssid, "Signal": signal})
-                except ValueError:
-                    continue
-
-    ap_list.sort(key=lambda x: x["Signal"], reverse=True)
-
-    # Prepare audit report
-    wifi_results = f"\n=== Wi-Fi Scan Results ===\nScan Duration: {timeout}s\n{'-'*50}\n"
-
-    for ap in ap_list:
-        if ap['ESSID']:
-            wifi_results += f"\nSSID: {ap['ESSID']}\n"
-            wifi_results += f"   - BSSID: {ap['BSSID']} -> {get_mac_vendor(ap['BSSID'])}\n"
-            wifi_results += f"   - Signal Strength: {ap['Signal']} dBm\n"
-            wifi_results += f"   - Security: {ap['Security']}\n"
-
-            associated_clients = [c for c in client_list if c["BSSID"] == ap["BSSID"]]
-            if associated_clients:
-                wifi_results += "   +- Connected Devices:\n"
-                for client in associated_clients:
-                    wifi_results += f"      - Device: {client['Station']} -> {get_mac_vendor(client['Station'])} (Signal: {client['Signal']} dBm)\n"
-
-    if not ap_list:
-        wifi_results += "No Wi-Fi networks detected.\n"
-
-    save_to_audit(wifi_results)
-
-    # Clean up
-    subprocess.run("sudo rm /tmp/airodump-01.csv", shell=True)
-
-
-async def scan_bluetooth_A(timeout):
-    """Scans Bluetooth devices and writes results to audit.txt"""
+        ap = capture.ap(row)
+        clients = capture.clients_of(ap.bssid)
+        if sink:
+            sink.put(ap_observation(ap))
+            for client in clients:
+                sink.put(client_observation(client))
+        hidden += not ap.essid
+        count(security, ap.security)
+        count(channels, ap.channel)
+        section.add("ap", {"bssid": format_mac(ap.bssid), "vendor": vendors[ap.bssid] or UNKNOWN, "essid": ap.essid,
+                           "signal": ap.signal, "channel": ap.channel, "security": ap.security, "beacons": ap.beacons,
+                           "data": ap.data, "clients": len(clients)})
+
+    associated = 0
+    for row in stations:
+        client = capture.client(row)
+        associated += client.bssid is not None
+        section.add("client", {"station": format_mac(client.station), "vendor": vendors[client.station] or UNKNOWN,
+                               "bssid": None if client.bssid is None else format_mac(client.bssid),
+                               "signal": client.signal, "probes": list(client.probes),
+                               "first_seen": client.first_seen, "last_seen": client.last_seen})
+
+    section.summary({"aps": len(rows), "hidden": hidden, "clients": len(stations), "associated": associated,
+                     "security": security, "channels": dict(sorted(channels.items())),
+                     "stations": correlation_summary(correlate_stations(map(capture.client, stations)))})
+
+
+async def scan_bluetooth_A(timeout, section, online_vendors=False, sink=None):
+    """Scans Bluetooth devices and writes one record per device to the report section"""
     #print(f"\n{Color.GREEN}{Style.BRIGHT}[*]{Style.RESET_ALL} Scanning Bluetooth for {timeout}s...")
-    from bleak import BleakScanner
-
-    devices = await asyncio.wait_for(BleakScanner.discover(), timeout=timeout)
-    bluetooth_results = "Bluetooth Scan Results:\n----------------------\n"
-    
-    if devices:
-        for dev in devices:
-            bluetooth_results += f"{dev.address} ({get_mac_vendor(dev.address)}) - {dev.name or 'Unknown'} (RSSI: {dev.rssi} dBm)\n"
-    else:
-        bluetooth_results += "No Bluetooth devices found.\n"
-
-    save_to_audit(bluetooth_results)
+    try:
+        tracker = await track_ble(timeout)
+    except Exception as e:
+        section.error(f"Bluetooth scan failed: {e}")
+        return
 
-def scan_rtl433_A(timeout, frequency):
-    """Scans radio signals with rtl_433 at a given frequency and writes results to audit.txt"""
+    devices = tracker.by_signal()
+    vendors = await resolve_vendors_async([dev.address for dev in devices], online_vendors)
+
+    named = randomized = 0
+    for dev in devices:
+        vendor = vendors[dev.address]
+        named += bool(dev.name)
+        randomized += vendor == RANDOMIZED
+        section.add("ble", {"address": format_mac(dev.address), "vendor": vendor or UNKNOWN, "name": dev.name,
+                            "rssi": None if dev.rssi_avg is None else round(dev.rssi_avg, 1), "rssi_min": dev.rssi_min,
+                            "rssi_max": dev.rssi_max, "advertisements": dev.count,
+                            "first_seen": dev.first_seen, "last_seen": dev.last_seen})
+        if sink:
+            sink.put(ble_observation(dev, vendor))
+
+    section.summary({"devices": len(devices), "advertisements": tracker.advertisements, "named": named,
+                     "randomized": randomized, "estimate": correlation_summary(correlate_ble(devices))})
+
+def scan_rtl433_A(timeout, section, frequency, sink=None, receivers=None):
+    """Scans radio signals with rtl_433 at a given frequency (or with several SDRs, `receivers`
+    as 'FREQ@DEVICE') and writes one record per sensor to the report section"""
     #print(f"\n{Color.GREEN}{Style.BRIGHT}[*]{Style.RESET_ALL} Scanning radio signals at {frequency} MHz for {timeout}s...")
 
-    process = subprocess.Popen(
-        ["rtl_433", "-d", "soapy", "-f", frequency, "-F", "json"],
-        stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, bufsize=1
-    )
+    devices = DeviceAggregator()
 
-    results = []
-    start_time = time.time()
+    def on_event(event):
+        if devices.add(event) is not None and sink:
+            sink.put(rtl433_observation(event))
 
-    try:
-        while time.time() - start_time < timeout:
-            rlist, _, _ = select.select([process.stdout], [], [], 0.5)
-            if rlist:
-                line = process.stdout.readline().strip()
-                if line:
-                    try:
-                        data = json.loads(line)
-                        results.append(data)
-                    except json.JSONDecodeError:
-                        continue
-    except KeyboardInterrupt:
-        pass
-    finally:
-        process.terminate()
-        process.wait()
-
-    # Prepare audit report
-    rtl_results = f"\n=== RTL433 Scan Results ({frequency} MHz) ===\n"
-    rtl_results += f"Scan Duration: {timeout}s\n"
-    rtl_results += "-" * 50 + "\n"
-
-    if results:
-        for device in results[:10]:  # Limit to 10 results for brevity
-            rtl_results += f"\n--> Device Model: {device.get('model', 'Unknown')}\n"
-            for key, value in device.items():
-                if key != "model":
-                    rtl_results += f"   - {key}: {value}\n"
+    bands = parse_bands(frequency)
+    scheduler = pool = None
+    if receivers:
+        pool = run_reader(lambda stop: read_receivers(receivers, timeout, on_event, stop))
+    elif len(bands) > 1:
+        scheduler = run_reader(lambda stop: hop_rtl433(bands, timeout, on_event, stop))
     else:
-        rtl_results += "No devices detected.\n"
-
-    # Save to audit file
-    save_to_audit(rtl_results)
+        run_rtl433(rtl433_command(frequency), timeout, on_event)
+
+    models = {}
+    for stats in devices.by_activity():
+        count(models, stats.model)
+        section.add("rtl433", {"model": stats.model, "id": stats.id, "channel": stats.channel, "count": stats.count,
+                               "packets": stats.packets, "first_seen": stats.first_seen, "last_seen": stats.last_seen,
+                               "data": stats.last})
+
+    summary = {"devices": len(devices), "packets": devices.packets, "repeats_merged": devices.duplicates, "models": models}
+    if scheduler:
+        summary["bands"] = [{"band": band, "dwells": dwells, "radio_time": round(radio_time, 1),
+                             "transmissions": transmissions, "devices": band_devices}
+                            for band, dwells, radio_time, transmissions, band_devices, rate in scheduler.summary()]
+    if pool:
+        summary["receivers"] = pool.status()
+    section.summary(summary)
 
     
-async def audit_scan():
-    """Performs a full audit scan (Wi-Fi, Bluetooth, RTL433) and logs results"""
+async def run_audit_step(step, locks, report, online_vendors=False, sink=None):
+    """Runs one audit step once its radio is free; blocking scanners run in a worker thread"""
+    scan = step.get("scan")
+    duration = step.get("duration", AUDIT_TIME)
+    async with locks[step.get("resource", scan)]:
+        label = f"{scan} {', '.join(step['receivers']) if step.get('receivers') else step.get('frequency', '')}".strip()
+        if scan not in ("wifi", "bluetooth", "rtl433"):
+            print(f"{Color.RED}{Style.BRIGHT}[!]{Style.RESET_ALL} Unknown audit scan: {scan}")
+            return
+        print(f"{Color.GREEN}{Style.BRIGHT}[*]{Style.RESET_ALL} Audit: {label} ({duration}s) started")
+        section = report.section(scan, duration=duration,
+                                 **{key: step[key] for key in ("resource", "frequency", "receivers") if key in step})
+        try:
+            if scan == "wifi":
+                await asyncio.to_thread(scan_wifi_A, duration, section, online_vendors, sink)
+            elif scan == "bluetooth":
+                await scan_bluetooth_A(duration, section, online_vendors, sink)
+            else:
+                await asyncio.to_thread(scan_rtl433_A, duration, section, step.get("frequency", "433.92M"), sink,
+                                        step.get("receivers"))
+        except Exception as e:
+            section.error(f"{type(e).__name__}: {e}")
+            raise
+        print(f"{Color.GREEN}{Style.BRIGHT}[*]{Style.RESET_ALL} Audit: {label} done")
+
+async def audit_scan(online_vendors=False, config_file=None, sink=None, report_format="markdown"):
+    """Performs a full audit scan (Wi-Fi, Bluetooth, RTL433), streams the results to audit.jsonl
+    and renders them as Markdown or HTML"""
     print(f"\n{Color.GREEN}{Style.BRIGHT}[*]{Style.RESET_ALL} Starting full audit...")
 
-    # Reset audit file
-    with open(AUDIT_FILE, "w", encoding="utf-8") as f:
-        f.write(f"=== Full Audit Report - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} ===\n")
-
+    plan = load_audit_plan(config_file)
+    locks = {step.get("resource", step.get("scan")): asyncio.Lock() for step in plan}
 
-    scan_wifi_A(10)
-    await scan_bluetooth_A(10)
-    scan_rtl433_A(AUDIT_TIME, "433.92M")
-    scan_rtl433_A(AUDIT_TIME, "868M")
-
-    print(f"\n{Color.GREEN}{Style.BRIGHT}[*]{Style.RESET_ALL} Audit completed. Results saved in {AUDIT_FILE}")
+    start_time = time.time()
+    with AuditReport(AUDIT_FILE) as report:
+        results = await asyncio.gather(*(run_audit_step(step, locks, report, online_vendors, sink) for step in plan),
+                                       return_exceptions=True)
+    for step, result in zip(plan, results):
+        if isinstance(result, Exception):
+            print(f"{Color.RED}{Style.BRIGHT}[!]{Style.RESET_ALL} Audit step {step.get('scan')} failed: {result}")
+
+    rendered = render_report(AUDIT_FILE, AUDIT_NAME + REPORT_EXTENSIONS[report_format], report_format)
+    print(f"\n{Color.GREEN}{Style.BRIGHT}[*]{Style.RESET_ALL} Audit completed in {time.time() - start_time:.0f}s. "
+          f"Results saved in {AUDIT_FILE} ({report.records} records) and {rendered}")
 
 ###### END AUDIT PART ######
\ No newline at end of file
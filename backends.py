@@ -0,0 +1,48 @@
+import importlib
+import importlib.util
+from collections import namedtuple
+
+###### SCANNER BACKENDS ######
+
+# Scan modes register here by module name and are imported on first use, so a run
+# only loads the stack it selected: an rtl_433 scan never imports the Wi-Fi or BLE code,
+# and a missing optional package only matters to the mode that needs it.
+
+Backend = namedtuple("Backend", "name module packages description")
+
+BACKENDS = {}
+
+
+class BackendUnavailable(ImportError):
+    pass
+
+
+def register_backend(name, module, packages=(), description=""):
+    """`packages` are the third-party modules the backend needs at scan time"""
+    BACKENDS[name] = Backend(name, module, tuple(packages), description)
+
+
+def missing_packages(name):
+    return [package for package in BACKENDS[name].packages if importlib.util.find_spec(package) is None]
+
+
+def load_backend(name, check_packages=True):
+    """Imports the backend's module (once) and returns it. Replays need no radio
+    packages and skip the check."""
+    backend = BACKENDS[name]
+    missing = missing_packages(name) if check_packages else []
+    if missing:
+        raise BackendUnavailable(f"{backend.description} needs {', '.join(missing)} (pip install {' '.join(missing)})")
+    try:
+        return importlib.import_module(backend.module)
+    except ImportError as e:
+        raise BackendUnavailable(f"{backend.description} could not be loaded: {e}") from e
+
+
+register_backend("wifi", "wifi", (), "Wi-Fi scanning (airodump-ng)")
+register_backend("ble", "bluetooth", ("bleak",), "Bluetooth scanning")
+register_backend("sdr", "rtl", (), "RTL433 scanning (rtl_433)")
+register_backend("audit", "audit", (), "Full audit")
+register_backend("daemon", "daemon", (), "Airspy daemon")
+
+###### END SCANNER BACKENDS ######
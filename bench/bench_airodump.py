@@ -0,0 +1,66 @@
+import os
+import csv
+import sys
+import time
+import argparse
+import tempfile
+
+from fixtures import make_airodump_csv
+from airodump import AirodumpCapture
+
+
+def parse_lists(csv_file):
+    """The previous list-of-dicts parser, kept as the baseline"""
+    with open(csv_file, "r", encoding="ISO-8859-1") as file:
+        rows = list(csv.reader(file))
+    ap_list, client_list, parsing_clients = [], [], False
+    for row in rows:
+        if len(row) < 2:
+            continue
+        if "Station MAC" in row[0]:
+            parsing_clients = True
+            continue
+        if not parsing_clients and len(row) > 13:
+            signal = int(row[8].strip()) if row[8].strip().lstrip('-').isdigit() else -100
+            ap_list.append({"BSSID": row[0].strip(), "Signal": signal, "ESSID": row[13].strip()})
+        elif parsing_clients and len(row) > 6:
+            signal = int(row[3].strip()) if row[3].strip().lstrip('-').isdigit() else -100
+            client_list.append({"Station": row[0].strip(), "BSSID": row[5].strip(), "Signal": signal})
+    return ap_list, client_list
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="airodump-ng CSV parsing / association benchmark")
+    parser.add_argument("--aps", type=int, default=2000)
+    parser.add_argument("--stations", type=int, default=50000)
+    parser.add_argument("--skip-baseline", action="store_true", help="Skip the O(APs x clients) baseline")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_file = os.path.join(tmp, "airodump-01.csv")
+        make_airodump_csv(csv_file, args.aps, args.stations)
+        print(f"fixture: {args.aps} APs, {args.stations} stations, {os.path.getsize(csv_file) / 1e6:.1f} MB")
+
+        capture, parse_time = timed(AirodumpCapture.from_file, csv_file)
+        def associate():
+            return sum(len(capture.clients_of(capture.bssid[row])) for row in capture.select())
+        linked, link_time = timed(associate)
+        print(f"columnar : parse {parse_time * 1000:8.1f} ms | associate + sort {link_time * 1000:8.1f} ms | {linked} clients linked")
+
+        if not args.skip_baseline:
+            (ap_list, client_list), parse_time = timed(parse_lists, csv_file)
+            def associate_lists():
+                ap_list.sort(key=lambda x: x["Signal"], reverse=True)
+                return sum(len([c for c in client_list if c["BSSID"] == ap["BSSID"]]) for ap in ap_list)
+            linked, link_time = timed(associate_lists)
+            print(f"baseline : parse {parse_time * 1000:8.1f} ms | associate + sort {link_time * 1000:8.1f} ms | {linked} clients linked")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+import time
+import asyncio
+import threading
+import argparse
+
+import fixtures  # puts the repository root on sys.path
+from fake_ble import make_advertisements, mock_scanner_factory
+from oui import format_mac
+from ble_tracker import BleTracker, track_ble
+
+
+async def flood(advertisements, interval):
+    """Replays every advertisement as fast as the loop allows, snapshots included"""
+    snapshots = []
+    factory = mock_scanner_factory(advertisements)
+    tracker = BleTracker()
+
+    def on_snapshot(t):
+        start = time.perf_counter()
+        t.take_changed()
+        t.by_signal()
+        snapshots.append(time.perf_counter() - start)
+
+    stop = threading.Event()
+    start = time.perf_counter()
+    task = asyncio.ensure_future(track_ble(None, on_snapshot, interval, tracker, stop, factory))
+    while tracker.advertisements < len(advertisements):
+        await asyncio.sleep(0.01)
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await task
+    return tracker, elapsed, snapshots
+
+
+def main():
+    parser = argparse.ArgumentParser(description="BLE advertisement tracker benchmark (mock scanner)")
+    parser.add_argument("--count", type=int, default=500000, help="Advertisements to replay")
+    parser.add_argument("--devices", type=int, default=2000, help="Distinct addresses")
+    parser.add_argument("--interval", type=float, default=0.5, help="Snapshot interval")
+    args = parser.parse_args()
+
+    advertisements = make_advertisements(args.count, args.devices)
+    tracker, elapsed, snapshots = asyncio.run(flood(advertisements, args.interval))
+    print(f"tracked  : {tracker.advertisements} advertisements from {len(tracker)} devices in {elapsed:.2f}s "
+          f"({tracker.advertisements / elapsed:,.0f}/s)")
+    if snapshots:
+        print(f"snapshots: {len(snapshots)}, worst {max(snapshots) * 1000:.2f} ms")
+    strongest = tracker.by_signal()[0]
+    print(f"strongest: {format_mac(strongest.address)} avg {strongest.rssi_avg:.1f} dBm "
+          f"(min {strongest.rssi_min}, max {strongest.rssi_max}, {strongest.count} advertisements)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+import time
+import random
+import argparse
+
+import numpy as np
+
+import fixtures  # puts the repository root on sys.path
+from fixtures import random_mac
+from oui import mac_to_int
+from records import AccessPoint
+from channels import ChannelPlanner, CHANNELS_24, CHANNELS_5
+
+
+def make_aps(count, rng):
+    channels = list(CHANNELS_24) + list(CHANNELS_5)
+    return [AccessPoint(mac_to_int(random_mac(rng)), "", -rng.randrange(30, 95), rng.choice(channels), "WPA2",
+                        data=rng.randrange(100000) if rng.random() < 0.3 else 0) for _ in range(count)]
+
+
+def count_per_channel(aps):
+    """The previous analysis: least used channel, no overlap or signal weighting"""
+    usage = {}
+    for ap in aps:
+        usage[ap.channel] = usage.get(ap.channel, 0) + 1
+    return min(usage, key=usage.get, default=None)
+
+
+def timed(function, *args, repeat=5):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(*args)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Wi-Fi channel planning benchmark: batch scoring and live updates")
+    parser.add_argument("--aps", type=int, default=5000)
+    parser.add_argument("--updates", type=int, default=20000, help="Live AP events (signal/channel changes, new, lost)")
+    parser.add_argument("--width", type=int, default=20, choices=(20, 40, 80))
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    aps = make_aps(args.aps, rng)
+
+    _, elapsed = timed(count_per_channel, aps)
+    print(f"count    : {elapsed * 1000:8.2f} ms for {args.aps} APs (previous per-channel count)")
+    planner, elapsed = timed(lambda: ChannelPlanner(args.width).build(aps))
+    print(f"build    : {elapsed * 1000:8.2f} ms for {args.aps} APs x {len(planner.options)} candidates")
+    _, elapsed = timed(planner.recommend)
+    print(f"recommend: {elapsed * 1000:8.2f} ms")
+
+    # Live mode: one event at a time, against rebuilding the whole plan for each event
+    live = {ap.bssid: ap for ap in aps}
+    events = []
+    for _ in range(args.updates):
+        roll = rng.random()
+        if roll < 0.05:
+            ap = make_aps(1, rng)[0]
+        elif roll < 0.1:
+            events.append(("lost", rng.choice(aps).bssid))
+            continue
+        else:
+            ap = rng.choice(aps)._replace(signal=-rng.randrange(30, 95))
+        events.append(("update", ap))
+
+    start = time.perf_counter()
+    for kind, value in events:
+        if kind == "lost":
+            live.pop(value, None)
+            planner.remove(value)
+        else:
+            live[value.bssid] = value
+            planner.update(value.bssid, value.channel, value.signal, value.data)
+    elapsed = time.perf_counter() - start
+    print(f"update   : {elapsed / len(events) * 1e6:8.2f} us per event ({len(events)} events)")
+
+    _, rebuild = timed(lambda: ChannelPlanner(args.width).build(list(live.values())), repeat=3)
+    print(f"rebuild  : {rebuild * 1e6:8.2f} us per event if the plan were rebuilt from scratch")
+
+    exact = ChannelPlanner(args.width).build(list(live.values()))
+    drift = np.max(np.abs(planner.levels() - exact.levels()) / np.maximum(exact.levels(), 1e-12))
+    print(f"check    : {len(planner)} APs tracked, relative drift {drift:.1e}, "
+          f"counts {'match' if (planner.count == exact.count).all() else 'DIFFER'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+import time
+import random
+import argparse
+
+import fixtures  # puts the repository root on sys.path
+from correlate import RandomizationIndex, jaccard, probe_features, BLE_ROTATION_GAP, MAX_ROTATION_GAP
+
+# Device counting under MAC randomization on a synthetic survey: phones that rotate their
+# address every few minutes, grouped in a few models sharing the same advertisement layout.
+#   index      RandomizationIndex (MinHash + LSH buckets) over every address
+#   pairwise   the same linking rule comparing every pair of addresses, on a subset
+# Each line reports the device estimate against the real number of phones.
+
+MODELS = [frozenset({f"mfr:{company:04x}", f"layout:{company:04x}:{size}:{kind:02x}", f"tx:{tx}", f"interval:{interval}"})
+          for company, size, kind, tx, interval in ((0x004c, 23, 0x10, 12, 8), (0x004c, 27, 0x07, 12, 8),
+                                                    (0x0075, 25, 0x42, 7, 9), (0x00e0, 20, 0x00, 0, 10),
+                                                    (0x0006, 30, 0x01, -21, 7), (0x0087, 18, 0x05, 4, 9))]
+
+
+def random_local_mac(rng):
+    return ":".join([f"{rng.randrange(256) & 0xFC | 0x02:02X}"] + [f"{rng.randrange(256):02X}" for _ in range(5)])
+
+
+def make_survey(phones, hours, rotation, kind, seed=1):
+    """[(address, features, first seen, last seen, signal)], [phone of each address]"""
+    rng = random.Random(seed)
+    essids = [f"Network-{i}" for i in range(300)]
+    addresses = []
+    for phone in range(phones):
+        if kind == "wifi":
+            features = probe_features(rng.sample(essids, rng.randint(1, 5)))
+        else:
+            features = MODELS[rng.randrange(len(MODELS))]
+            if rng.random() < 0.2:
+                features = features | {f"uuid:{rng.randrange(1 << 16):04x}"}
+        signal = rng.uniform(-90, -40)
+        start = rng.uniform(0, hours * 3600)
+        end = min(hours * 3600, start + rng.expovariate(1 / 3600))
+        t = start
+        while t < end:
+            last = min(end, t + rng.uniform(0.7, 1.3) * rotation)
+            addresses.append(((random_local_mac(rng), features, t, last, signal + rng.gauss(0, 3)), phone))
+            t = last + rng.uniform(0, 3)
+    rng.shuffle(addresses)
+    return [address for address, _ in addresses], [phone for _, phone in addresses]
+
+
+def indexed(addresses, max_gap):
+    index = RandomizationIndex(max_gap=max_gap)
+    for address in addresses:
+        index.add(*address)
+    return index.correlate()
+
+
+def pairwise(addresses, max_gap):
+    """Every pair checked with the index's rule; returns the device estimate"""
+    options = RandomizationIndex(max_gap=max_gap)
+    scored = []
+    for old, (_, old_features, _, last, old_signal) in enumerate(addresses):
+        for new, (_, new_features, first, new_last, new_signal) in enumerate(addresses):
+            if (new == old or not old_features or new_last <= last or first < last - options.overlap
+                    or first > last + options.max_gap or abs(old_signal - new_signal) > options.signal_delta):
+                continue
+            similarity = jaccard(old_features, new_features)
+            if similarity >= options.threshold:
+                scored.append((-similarity, abs(first - last), old, new))
+    scored.sort()
+    successors, predecessors = {}, set()
+    for _, _, old, new in scored:
+        if old not in successors and new not in predecessors:
+            successors[old] = new
+            predecessors.add(new)
+    return len(addresses) - len(successors)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MAC randomization correlation benchmark")
+    parser.add_argument("--kind", choices=("ble", "wifi"), default="ble", help="BLE advertisement features or probed ESSIDs")
+    parser.add_argument("--phones", type=int, default=2000)
+    parser.add_argument("--hours", type=float, default=4)
+    parser.add_argument("--rotation", type=float, default=900, help="Seconds between address changes")
+    parser.add_argument("--pairwise", type=int, default=3000, help="Addresses compared pairwise (0 to skip)")
+    args = parser.parse_args()
+    max_gap = BLE_ROTATION_GAP if args.kind == "ble" else MAX_ROTATION_GAP
+
+    addresses, phones = make_survey(args.phones, args.hours, args.rotation, args.kind)
+    start = time.perf_counter()
+    correlation = indexed(addresses, max_gap)
+    elapsed = time.perf_counter() - start
+    print(f"index    : {correlation.addresses} addresses from {len(set(phones))} phones -> ~{correlation.devices} devices "
+          f"in {elapsed:.2f}s")
+
+    if args.pairwise:
+        # Sorted by phone, so the subset holds whole rotation chains
+        subset = [address for _, address in sorted(zip(phones, addresses))[:args.pairwise]]
+        subset_phones = len(set(sorted(phones)[:args.pairwise]))
+        start = time.perf_counter()
+        sub = indexed(subset, max_gap)
+        indexed_elapsed = time.perf_counter() - start
+        start = time.perf_counter()
+        devices = pairwise(subset, max_gap)
+        elapsed = time.perf_counter() - start
+        print(f"pairwise : {len(subset)} addresses from {subset_phones} phones -> ~{devices} devices in {elapsed:.2f}s "
+              f"(index: ~{sub.devices} devices in {indexed_elapsed:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
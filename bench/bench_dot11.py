@@ -0,0 +1,67 @@
+import os
+import time
+import argparse
+import tempfile
+
+from fixtures import make_pcap
+from dot11 import FrameTracker, PcapWatcher, READ_CHUNK, load_pcap
+
+# Frame-level Wi-Fi ingest on a synthetic radiotap capture:
+#   parse    FrameTracker.feed over the capture, already in memory
+#   load     load_pcap from disk, including the AirodumpCapture it builds
+#   watch    PcapWatcher.poll until the end of the file, with the AP/client events
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def parse(data, chunk):
+    tracker = FrameTracker()
+    for offset in range(0, len(data), chunk):
+        tracker.feed(data[offset:offset + chunk])
+    return tracker
+
+
+def watch(path):
+    watcher = PcapWatcher(path)
+    events = 0
+    while not watcher.finished:
+        events += len(watcher.poll())
+    watcher.close()
+    return watcher, events
+
+
+def main():
+    parser = argparse.ArgumentParser(description="radiotap / 802.11 pcap ingest benchmark")
+    parser.add_argument("--frames", type=int, default=1000000)
+    parser.add_argument("--aps", type=int, default=500)
+    parser.add_argument("--stations", type=int, default=5000)
+    parser.add_argument("--chunk", type=int, default=READ_CHUNK, help="Bytes fed per call (pipe reads are 64 KiB)")
+    parser.add_argument("--pcap", help="Capture to read instead of the synthetic one")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.pcap
+        if path is None:
+            path = os.path.join(tmp, "airodump-01.cap")
+            make_pcap(path, args.frames, args.aps, args.stations)
+        size = os.path.getsize(path)
+        with open(path, "rb") as file:
+            data = file.read()
+
+        tracker, elapsed = timed(parse, data, args.chunk)
+        print(f"fixture : {tracker.frames} frames, {size / 1e6:.1f} MB, {len(tracker.aps)} APs, {len(tracker.stations)} stations")
+        print(f"parse   : {elapsed:6.2f}s | {tracker.frames / elapsed:10,.0f} frames/s | {size / elapsed / 1e6:6.1f} MB/s")
+
+        capture, elapsed = timed(load_pcap, path)
+        print(f"load    : {elapsed:6.2f}s | {tracker.frames / elapsed:10,.0f} frames/s | {len(capture)} APs in the capture")
+
+        (watcher, events), elapsed = timed(watch, path)
+        print(f"watch   : {elapsed:6.2f}s | {watcher.tracker.frames / elapsed:10,.0f} frames/s | {events} events")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+import os
+import time
+import random
+import argparse
+import functools
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import fixtures  # puts the repository root on sys.path
+from fixtures import random_mac
+from PySide6.QtWidgets import QApplication, QTableWidget, QTableWidgetItem, QTableView, QHeaderView
+from gui_models import KeyedTableModel, make_proxy
+
+# Both tables use the GUI's view settings. The keyed model re-sorts and the proxy remaps on
+# every tick, a roughly fixed cost of a few ms: below about 1000 rows it is no faster than
+# the unsorted rebuild (and can be slower), its gain is at Wi-Fi audit sizes where the
+# rebuild takes most of the 1 s tick.
+
+COLUMNS = [("SSID", "SSID"), ("BSSID", "BSSID"), ("Signal", "Signal"), ("Channel", "Channel"),
+           ("Security", "Security"), ("Clients", lambda ap: len(ap["Clients"]))]
+
+
+def make_rows(count, rng):
+    return [{"SSID": f"Network-{i}", "BSSID": random_mac(rng), "Signal": -rng.randrange(30, 95),
+             "Channel": rng.choice((1, 6, 11, 36, 44)), "Security": "WPA2", "Clients": []} for i in range(count)]
+
+
+def next_tick(rows, rng, changed=0.1, churn=0.01):
+    """One refresh: `changed` of the APs get a new signal, `churn` disappear and as many new ones show up"""
+    rows = [dict(row, Signal=-rng.randrange(30, 95)) if rng.random() < changed else row for row in rows]
+    for _ in range(int(len(rows) * churn)):
+        rows.pop(rng.randrange(len(rows)))
+    return rows + make_rows(int(len(rows) * churn), rng)
+
+
+def rebuild(table, rows):
+    """The previous QTableWidget refresh"""
+    table.setRowCount(0)
+    for row_index, ap in enumerate(rows):
+        table.insertRow(row_index)
+        table.setItem(row_index, 0, QTableWidgetItem(ap["SSID"]))
+        table.setItem(row_index, 1, QTableWidgetItem(ap["BSSID"]))
+        table.setItem(row_index, 2, QTableWidgetItem(str(ap["Signal"])))
+        table.setItem(row_index, 3, QTableWidgetItem(str(ap["Channel"])))
+        table.setItem(row_index, 4, QTableWidgetItem(ap["Security"]))
+        table.setItem(row_index, 5, QTableWidgetItem(str(len(ap["Clients"]))))
+
+
+def configure(view):
+    """Same view settings as AirspyGUI.make_table_view"""
+    if isinstance(view, QTableWidget):
+        view.setColumnCount(len(COLUMNS))
+    view.setSelectionBehavior(QTableView.SelectRows)
+    view.verticalHeader().setVisible(False)
+    view.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+    view.resize(1200, 800)
+    view.show()
+
+
+def run(name, ticks, update, app):
+    times = []
+    for rows in ticks:
+        start = time.perf_counter()
+        update(rows)
+        app.processEvents()
+        times.append(time.perf_counter() - start)
+    steady = sorted(times[1:])
+    print(f"{name:8}: first fill {times[0] * 1000:8.1f} ms | refresh p50 {steady[len(steady) // 2] * 1000:8.1f} ms, "
+          f"max {steady[-1] * 1000:8.1f} ms (budget at 1 Hz: 1000 ms)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="GUI table refresh benchmark: QTableWidget rebuild vs keyed model")
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--ticks", type=int, default=10, help="Refreshes (one per second in the GUI)")
+    args = parser.parse_args()
+
+    app = QApplication([])
+    rng = random.Random(1)
+    ticks = [make_rows(args.rows, rng)]
+    for _ in range(args.ticks):
+        ticks.append(next_tick(ticks[-1], rng))
+
+    table = QTableWidget()
+    configure(table)
+    run("rebuild", ticks, functools.partial(rebuild, table), app)
+    table.close()
+
+    model = KeyedTableModel(COLUMNS, "BSSID")
+    proxy = make_proxy(model, 2)
+    view = QTableView()
+    view.setModel(proxy)
+    view.horizontalHeader().setSortIndicator(proxy.sortColumn(), proxy.sortOrder())
+    view.setSortingEnabled(True)
+    configure(view)
+    run("model", ticks, model.update, app)
+    view.close()
+
+    # Tear Qt down in order (views, then models, then the application) rather than at interpreter exit
+    view.setModel(None)
+    del view, proxy, model, table
+    app.shutdown()
+    del app
+
+
+if __name__ == "__main__":
+    main()
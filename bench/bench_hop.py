@@ -0,0 +1,101 @@
+import os
+import sys
+import random
+import asyncio
+import argparse
+
+import fixtures  # puts the repository root on sys.path
+from rtl_hop import DwellScheduler, hop_rtl433, MIN_DWELL, REVISIT
+
+FAKE_RTL433 = [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "fake_rtl433.py")]
+
+# One SDR shared by several bands, adaptive dwells against a fixed split:
+#   simulated  sensors transmitting at random (Poisson) on each band, many runs, no processes
+#   live       hop_rtl433 restarting fake_rtl433.py --bands on each band, in real time
+# Both report the unique sensors found per second of radio time.
+
+BANDS = {"433.92M": (60, 45), "868M": (8, 60), "315M": (0, 60), "915M": (3, 300)}  # sensors, seconds between transmissions
+RESTART = 1.0                      # seconds rtl_433 takes to start on a new band
+
+
+class FixedSplit:
+    """The previous behaviour: every band in turn, the same dwell each"""
+
+    def __init__(self, bands, dwell):
+        self.bands = list(bands)
+        self.dwell = dwell
+        self.turn = 0
+
+    def next(self, now):
+        band = self.bands[self.turn % len(self.bands)]
+        self.turn += 1
+        return band, self.dwell
+
+    def record(self, band, started, ended, new_devices, transmissions):
+        pass
+
+
+def simulate(scheduler, bands, duration, seed):
+    """Unique sensors heard in `duration` seconds of radio time"""
+    rng = random.Random(seed)
+    # (arrival, seconds between transmissions) per sensor: sensors join over the run
+    sensors = {band: [(rng.uniform(0, duration), period) for _ in range(count)] for band, (count, period) in bands.items()}
+    heard = set()
+    now = 0.0
+    while now < duration:
+        band, dwell = scheduler.next(now)
+        dwell = min(dwell, duration - now)
+        start, end = now + RESTART, now + dwell
+        new_devices = transmissions = 0
+        for i, (arrival, period) in enumerate(sensors[band]):
+            if arrival > end:
+                continue
+            # Transmissions of a sensor present since `arrival`, while rtl_433 listens
+            listening = end - max(start, arrival)
+            hits = 0
+            t = rng.expovariate(1 / period)
+            while t < listening:
+                hits += 1
+                t += rng.expovariate(1 / period)
+            if hits:
+                transmissions += hits
+                if (band, i) not in heard:
+                    heard.add((band, i))
+                    new_devices += 1
+        scheduler.record(band, now, end, new_devices, transmissions)
+        now = end
+    return len(heard)
+
+
+async def live(bands, duration, scheduler):
+    spec = ",".join(f"{band}:{count / period:g}:{count}" for band, (count, period) in bands.items() if count)
+    return await hop_rtl433(list(bands), duration, scheduler=scheduler,
+                            command=lambda band: FAKE_RTL433 + ["-f", band, "--bands", spec])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Adaptive SDR band hopping benchmark")
+    parser.add_argument("--duration", type=float, default=600, help="Simulated seconds of radio time")
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--dwell", type=float, default=30, help="Fixed split dwell (audit default: 30s per band)")
+    parser.add_argument("--live", type=float, default=0, help="Also hop fake_rtl433.py for this many real seconds")
+    args = parser.parse_args()
+
+    total = sum(count for count, _ in BANDS.values())
+    for name, make in (("fixed", lambda: FixedSplit(BANDS, args.dwell)), ("adaptive", lambda: DwellScheduler(list(BANDS)))):
+        found = [simulate(make(), BANDS, args.duration, seed) for seed in range(args.runs)]
+        mean = sum(found) / len(found)
+        print(f"{name:9}: {mean:6.1f} / {total} sensors in {args.duration:g}s | {mean / args.duration:.3f} sensors per radio second")
+
+    if args.live:
+        scheduler = DwellScheduler(list(BANDS), min_dwell=min(MIN_DWELL, args.live / 8), revisit=min(REVISIT, args.live / 2),
+                                   base_dwell=args.live / 10)
+        asyncio.run(live(BANDS, args.live, scheduler))
+        print(f"live     : {scheduler.devices()} sensors in {scheduler.radio_time:.1f}s of radio time "
+              f"({scheduler.devices() / scheduler.radio_time:.3f}/s)")
+        for band, dwells, radio_time, transmissions, devices, rate in scheduler.summary():
+            print(f"   {band:>8}: {dwells} dwells, {radio_time:5.1f}s, {transmissions} transmissions, {devices} sensors ({rate:.3f}/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+import os
+import sys
+import time
+import asyncio
+import argparse
+
+import fixtures  # puts the repository root on sys.path
+from rtl_multi import SdrPool, read_receivers, event_time
+
+FAKE_RTL433 = [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "fake_rtl433.py")]
+
+# Several fake rtl_433 processes read at once and merged into one stream:
+#   throughput  merged events per second over all receivers
+#   order       events released out of timestamp order (should be 0)
+#   latency     from the fake writing an event to the merged stream handing it on
+#   health      per-receiver counters; --flaky makes the last receiver exit every N
+#               events, so its restarts show up
+
+FREQUENCIES = ["433.92M", "868M", "315M", "915M", "345M", "390M", "310M", "303.875M"]
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))] if values else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Multi-SDR merged capture benchmark")
+    parser.add_argument("--receivers", type=int, default=4)
+    parser.add_argument("--rate", type=float, default=500, help="Events per second from each receiver")
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--flaky", type=int, default=0, help="The last receiver exits after this many events (0 = never)")
+    args = parser.parse_args()
+
+    frequencies = FREQUENCIES[:args.receivers]
+    flaky = frequencies[-1] if args.flaky else None
+
+    def command(device, band):
+        extra = ["--count", str(args.flaky)] if band == flaky else []
+        return FAKE_RTL433 + ["-f", band, "-d", device, "-M", "time:usec", "--rate", str(args.rate),
+                              "--seed", device] + extra
+
+    pool = SdrPool([f"{frequency}@{i}" for i, frequency in enumerate(frequencies)], command=command)
+    latencies, stamps = [], []
+
+    def on_event(event):
+        latencies.append(time.time() - event.values["sent"])
+        stamps.append(event_time(event, 0.0))
+
+    start = time.perf_counter()
+    asyncio.run(read_receivers(None, args.seconds, on_event, pool=pool))
+    elapsed = time.perf_counter() - start
+
+    disorder = sum(1 for a, b in zip(stamps, stamps[1:]) if b < a)
+    merger = pool.merger
+    print(f"merged   : {merger.merged} events from {len(frequencies)} receivers in {elapsed:.1f}s "
+          f"({merger.merged / elapsed:,.0f}/s), peak {merger.peak} pending")
+    print(f"order    : {disorder} out of order in the stream ({merger.late} released late)")
+    print(f"latency  : p50 {percentile(latencies, 0.5) * 1000:.0f} ms, p99 {percentile(latencies, 0.99) * 1000:.0f} ms, "
+          f"max {max(latencies, default=0) * 1000:.0f} ms")
+    for receiver, health, events, rate, starts, failures in pool.summary():
+        print(f"   {receiver:>12}: {health}, {events} events ({rate:.0f}/s), {starts} starts, {failures} failures")
+
+
+if __name__ == "__main__":
+    main()
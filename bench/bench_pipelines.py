@@ -0,0 +1,126 @@
+import os
+import time
+import asyncio
+import argparse
+import tempfile
+import tracemalloc
+from contextlib import redirect_stdout
+
+import fixtures  # puts the repository root on sys.path
+from fixtures import make_recording
+from replay import Replay, tap_scanner, AIRODUMP, RTL433, BLE
+from wifi import scan_wifi_live
+from rtl import scan_rtl433_live
+from bluetooth import scan_bluetooth_live
+
+# Replays a recording through the live Wi-Fi, rtl_433 and BLE scans, exactly as
+# `Airspy.py --replay FILE --replay-speed N` does, with output discarded:
+#   throughput  as fast as possible, records per second
+#   memory      the same run under tracemalloc, peak Python allocations
+#   latency     at --speed, delay from a record being handed out by the replay to its
+#               observation reaching the sink
+
+
+class BenchReplay(Replay):
+    """Replay that timestamps what it hands out: rtl_433 events get a "sent" field and the
+    first pending advertisement of each BLE address is remembered"""
+
+    def __init__(self, path, speed):
+        super().__init__(path, speed)
+        self.pending = {}
+
+    def rtl433_command(self, stamp=False):
+        return super().rtl433_command(stamp=True)
+
+    def scanner_factory(self, stop=None):
+        return tap_scanner(super().scanner_factory(stop),
+                           lambda device, adv: self.pending.setdefault(device.address, time.time()))
+
+
+class LatencySink:
+    def __init__(self, replay, pipeline):
+        self.replay = replay
+        self.pipeline = pipeline
+        self.latencies = []
+
+    def put(self, record):
+        now = time.time()
+        if self.pipeline == AIRODUMP:
+            sent = self.replay.emitted_at
+        elif self.pipeline == RTL433:
+            sent = record.get("sent")
+        else:
+            sent = self.replay.pending.pop(record["key"], None)
+        if sent is not None:
+            self.latencies.append(now - sent)
+
+
+def run(pipeline, replay, sink=None):
+    with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+        if pipeline == AIRODUMP:
+            scan_wifi_live(sink=sink, replay=replay)
+        elif pipeline == RTL433:
+            scan_rtl433_live(sink=sink, replay=replay, status_interval=3600)
+        else:
+            asyncio.run(scan_bluetooth_live(sink, replay=replay))
+
+
+def percentile(values, fraction):
+    return sorted(values)[min(len(values) - 1, int(len(values) * fraction))] * 1000 if values else 0.0
+
+
+def bench(pipeline, path, speed):
+    replay = Replay(path, 0)
+    records = len(replay.records[pipeline])
+    if pipeline == AIRODUMP:
+        rows = sum(len(lines) for _, lines in replay.records[AIRODUMP])
+        unit = f"snapshots ({rows / max(1, records):.0f} rows each)"
+    elif pipeline == RTL433:
+        unit = "events"
+    else:
+        unit = "advertisements"
+
+    start = time.perf_counter()
+    run(pipeline, replay)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    run(pipeline, Replay(path, 0))
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    replay = BenchReplay(path, speed)
+    sink = LatencySink(replay, pipeline)
+    run(pipeline, replay, sink)
+
+    print(f"{pipeline:8}: {records} {unit} in {elapsed:.2f}s ({records / elapsed:,.0f}/s) | "
+          f"peak {peak / 1048576:.1f} MiB | latency at {speed:g}x p50 {percentile(sink.latencies, 0.5):.1f} ms, "
+          f"p99 {percentile(sink.latencies, 0.99):.1f} ms, max {percentile(sink.latencies, 1):.1f} ms "
+          f"({len(sink.latencies)} observations)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Wi-Fi / rtl_433 / BLE pipeline benchmark on a replay file")
+    parser.add_argument("--replay", help="Replay file (default: a synthetic recording)")
+    parser.add_argument("--seconds", type=int, default=30, help="Length of the synthetic recording")
+    parser.add_argument("--aps", type=int, default=500)
+    parser.add_argument("--stations", type=int, default=5000)
+    parser.add_argument("--rtl-rate", type=int, default=20, help="rtl_433 transmissions per second (3 packets each)")
+    parser.add_argument("--ble-rate", type=int, default=500, help="BLE advertisements per second")
+    parser.add_argument("--speed", type=float, default=10, help="Replay speed of the latency run")
+    parser.add_argument("--pipelines", default="airodump,rtl433,ble")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = args.replay
+        if path is None:
+            path = os.path.join(directory, "recording.airspy.gz")
+            recorder = make_recording(path, args.seconds, args.aps, args.stations, args.rtl_rate, args.ble_rate)
+            print(f"fixture : {args.seconds}s recording, {os.path.getsize(path) / 1048576:.1f} MiB, "
+                  f"{', '.join(f'{count} {source}' for source, count in recorder.counts.items())}")
+        for pipeline in args.pipelines.split(","):
+            bench(pipeline, path, args.speed)
+
+
+if __name__ == "__main__":
+    main()
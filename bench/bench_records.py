@@ -0,0 +1,94 @@
+import json
+import time
+import random
+import argparse
+import tracemalloc
+from datetime import datetime
+
+import fixtures  # puts the repository root on sys.path
+from fixtures import random_mac
+from oui import pack_mac
+from airodump import parse_ap_row, parse_client_row, parse_signal, parse_security, parse_count, parse_time, parse_probes
+from ble_tracker import BleDevice
+from records import rtl_event
+
+# Memory held by N observations of each kind, built from the scanners' raw text:
+#   before  the previous dicts (string MACs, CamelCase keys), as the parsers returned them
+#   after   the typed records with 48-bit int MACs
+# Only what is still referenced once the objects are built is counted.
+
+
+def ap_dict(row):
+    """The previous parse_ap_row, kept as the baseline"""
+    channel = row[3].strip()
+    return {"BSSID": row[0].strip(), "Signal": parse_signal(row[8]), "Channel": int(channel) if channel.isdigit() else -1,
+            "Security": parse_security(row), "ESSID": row[13].strip(), "Beacons": parse_count(row[9]),
+            "Data": parse_count(row[10]), "LastSeen": parse_time(row[2])}
+
+
+def client_dict(row):
+    return {"Station": row[0].strip(), "BSSID": row[5].strip(), "Signal": parse_signal(row[3]),
+            "LastSeen": parse_time(row[2]), "FirstSeen": parse_time(row[1]), "Probes": parse_probes(row)}
+
+
+def ap_rows(count, rng, now):
+    for i in range(count):
+        yield [f"{random_mac(rng)}", now, now, f"{rng.choice((1, 6, 11, 36)):3d}", " 54", " WPA2", " CCMP", " PSK",
+               f" {-rng.randrange(30, 95)}", f"{rng.randrange(5000):8d}", f"{rng.randrange(500):8d}", " 0.0.0.0", " 10",
+               f" Network-{i}", ""]
+
+
+def client_rows(count, rng, now):
+    for _ in range(count):
+        yield [f"{random_mac(rng)}", now, now, f" {-rng.randrange(30, 95)}", "  12", f" {random_mac(rng)}", ""]
+
+
+def ble_addresses(count, rng):
+    for _ in range(count):
+        yield random_mac(rng)
+
+
+def rtl_lines(count, rng):
+    for i in range(count):
+        yield json.dumps({"time": "2024-05-01 12:00:00", "model": "Acurite-Tower", "id": i, "channel": "A",
+                          "battery_ok": 1, "temperature_C": round(rng.uniform(-10, 30), 1), "humidity": rng.randrange(100)})
+
+
+def retained(build, source):
+    """Bytes still allocated once build's result is made"""
+    tracemalloc.start()
+    result = build(source)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return size
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Observation record memory benchmark")
+    parser.add_argument("--count", type=int, default=100000, help="Observations of each kind")
+    args = parser.parse_args()
+
+    now = datetime.now().strftime(" %Y-%m-%d %H:%M:%S")
+    stamp = time.time()
+    kinds = [
+        ("AP", lambda rng: ap_rows(args.count, rng, now),
+         lambda rows: [ap_dict(row) for row in rows], lambda rows: [parse_ap_row(row) for row in rows]),
+        ("Client", lambda rng: client_rows(args.count, rng, now),
+         lambda rows: [client_dict(row) for row in rows], lambda rows: [parse_client_row(row) for row in rows]),
+        ("BLE", lambda rng: ble_addresses(args.count, rng),
+         lambda addresses: [BleDevice(address, None, -60, stamp) for address in addresses],
+         lambda addresses: [BleDevice(pack_mac(address), None, -60, stamp) for address in addresses]),
+        ("RtlEvent", lambda rng: rtl_lines(args.count, rng),
+         lambda lines: [json.loads(line) for line in lines],
+         lambda lines: [rtl_event(json.loads(line), stamp) for line in lines]),
+    ]
+    for name, source, before, after in kinds:
+        old = retained(before, source(random.Random(1)))
+        new = retained(after, source(random.Random(1)))
+        print(f"{name:9}: before {old / args.count:5.0f} B/obs ({old / 1e6:5.1f} MB) | "
+              f"after {new / args.count:5.0f} B/obs ({new / 1e6:5.1f} MB) | {1 - new / old:4.0%} less")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+import os
+import time
+import random
+import argparse
+import tempfile
+import tracemalloc
+
+import fixtures  # puts the repository root on sys.path
+from fixtures import random_mac
+from report import AuditReport, render_report
+
+# An audit section with N access points, written two ways:
+#   before  the previous audit.txt: the whole section built with string += then written
+#   after   one JSON Lines record per AP through AuditReport, then rendered to Markdown
+# Reports time, then peak traced memory on a second run; the streamed writer's peak should
+# not grow with N.
+
+
+def access_points(count, rng):
+    for i in range(count):
+        yield {"essid": f"Network-{i}", "bssid": random_mac(rng), "vendor": "Unknown", "signal": -rng.randrange(30, 95),
+               "channel": rng.choice((1, 6, 11, 36)), "security": "WPA2 CCMP PSK", "clients": rng.randrange(5)}
+
+
+def concatenated(path, aps):
+    text = "Wi-Fi Scan Results:\n-------------------\n"
+    for ap in aps:
+        text += f"\nSSID: {ap['essid']}\n"
+        text += f"   - BSSID: {ap['bssid']} -> {ap['vendor']}\n"
+        text += f"   - Signal Strength: {ap['signal']} dBm\n"
+        text += f"   - Security: {ap['security']}\n"
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text + "\n")
+
+
+def streamed(path, aps):
+    with AuditReport(path) as report:
+        section = report.section("wifi", duration=20)
+        for count, ap in enumerate(aps, 1):
+            section.add("ap", ap)
+        section.summary({"aps": count})
+    render_report(path, path + ".md")
+
+
+def measure(write, path, count):
+    start = time.perf_counter()
+    write(path, access_points(count, random.Random(1)))
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    write(path, access_points(count, random.Random(1)))
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Audit report writer benchmark")
+    parser.add_argument("--aps", type=int, default=100000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, write in (("before", concatenated), ("after", streamed)):
+            for count in (args.aps // 10, args.aps):
+                path = os.path.join(tmp, f"{name}-{count}")
+                elapsed, peak = measure(write, path, count)
+                size = sum(os.path.getsize(os.path.join(tmp, f)) for f in os.listdir(tmp) if f.startswith(f"{name}-{count}"))
+                print(f"{name:6}: {count:7} APs in {elapsed:6.2f}s, peak {peak / 1e6:6.1f} MB, "
+                      f"{size / 1e6:5.1f} MB written")
+
+
+if __name__ == "__main__":
+    main()
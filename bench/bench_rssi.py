@@ -0,0 +1,82 @@
+import time
+import random
+import argparse
+import tracemalloc
+
+from fixtures import random_mac
+from rssi import RssiHistory
+
+# Per-device RSSI histories over a long simulated scan:
+#   ingest     RssiHistory.add for every reading (Kalman update, ring buffer, bucket means)
+#   memory     array bytes per device and peak Python allocations, against keeping every
+#              reading in a dict of lists
+#   rank       sorting every device by its smoothed signal
+#   export     the downsampled history of every device
+
+
+def readings(device_count, hours, count, seed=1):
+    """(mac, rssi, time) in time order: each device drifts around its own level"""
+    rng = random.Random(seed)
+    macs = [random_mac(rng) for _ in range(device_count)]
+    levels = [rng.uniform(-90, -35) for _ in range(device_count)]
+    start = time.time()
+    step = hours * 3600 / count
+    for i in range(count):
+        device = rng.randrange(device_count)
+        levels[device] = min(-30, max(-95, levels[device] + rng.gauss(0, 0.3)))
+        yield macs[device], round(levels[device] + rng.gauss(0, 4)), start + i * step
+
+
+def ingest_history(data):
+    history = RssiHistory()
+    for mac, rssi, now in data:
+        history.add(mac, rssi, now)
+    return history
+
+
+def ingest_lists(data):
+    history = {}
+    for mac, rssi, now in data:
+        history.setdefault(mac, []).append((now, rssi))
+    return history
+
+
+def peak_memory(function, data):
+    tracemalloc.start()
+    result = function(data)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-device RSSI history benchmark")
+    parser.add_argument("--devices", type=int, default=50000)
+    parser.add_argument("--hours", type=float, default=4)
+    parser.add_argument("--readings", type=int, default=1000000)
+    args = parser.parse_args()
+
+    data = list(readings(args.devices, args.hours, args.readings))
+
+    start = time.perf_counter()
+    history = ingest_history(data)
+    elapsed = time.perf_counter() - start
+    print(f"ingest  : {len(data)} readings, {len(history)} devices over {args.hours:g} h in {elapsed:.2f}s "
+          f"({len(data) / elapsed:,.0f}/s)")
+
+    _, peak = peak_memory(ingest_history, data)
+    _, baseline = peak_memory(ingest_lists, data)
+    print(f"memory  : arrays {history.nbytes() / 1048576:.1f} MiB ({history.nbytes() / len(history):.0f} B/device) | "
+          f"peak {peak / 1048576:.1f} MiB, dict of lists {baseline / 1048576:.1f} MiB")
+
+    start = time.perf_counter()
+    ranked = sorted(history.slots, key=history.smoothed, reverse=True)
+    print(f"rank    : {len(ranked)} devices by smoothed signal in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    start = time.perf_counter()
+    points = sum(len(series) for _, series in history.export(step=600))
+    print(f"export  : {points} points (10 min steps) in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
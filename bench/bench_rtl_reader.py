@@ -0,0 +1,74 @@
+import os
+import sys
+import json
+import time
+import select
+import argparse
+import subprocess
+
+import fixtures  # puts the repository root on sys.path
+from rtl_reader import run_rtl433, JSON_BACKEND
+from records import rtl_event
+
+FAKE_RTL433 = [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "fake_rtl433.py")]
+
+
+def read_select(command, timeout, on_event):
+    """The previous select() + readline() reader, kept as the baseline. Its events are made
+    into RtlEvent records too, so both readers hand on the same thing."""
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, bufsize=1)
+    start_time = time.time()
+    count = 0
+    try:
+        while time.time() - start_time < timeout:
+            rlist, _, _ = select.select([process.stdout], [], [], 0.5)
+            if rlist:
+                line = process.stdout.readline().strip()
+                if not line and process.poll() is not None:
+                    break
+                if line:
+                    try:
+                        on_event(rtl_event(json.loads(line), time.time()))
+                        count += 1
+                    except json.JSONDecodeError:
+                        continue
+    finally:
+        process.terminate()
+        process.wait()
+    return count
+
+
+def throughput(reader, count):
+    command = FAKE_RTL433 + ["--count", str(count)]
+    start = time.perf_counter()
+    decoded = reader(command, 60, lambda event: None)
+    elapsed = time.perf_counter() - start
+    return decoded, decoded / elapsed
+
+
+def latency(reader, rate, seconds):
+    delays = []
+    command = FAKE_RTL433 + ["--rate", str(rate)]
+    reader(command, seconds, lambda event: delays.append(time.time() - event.values["sent"]))
+    delays.sort()
+    if not delays:
+        return 0, 0, 0
+    return len(delays), delays[len(delays) // 2] * 1000, delays[int(len(delays) * 0.99)] * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="rtl_433 reader throughput / latency benchmark")
+    parser.add_argument("--count", type=int, default=200000, help="Events for the throughput run")
+    parser.add_argument("--rate", type=float, default=500, help="Events/s for the latency run")
+    parser.add_argument("--seconds", type=float, default=3)
+    args = parser.parse_args()
+
+    print(f"JSON backend: {JSON_BACKEND}")
+    for name, reader in (("asyncio", run_rtl433), ("select", read_select)):
+        decoded, rate = throughput(reader, args.count)
+        received, p50, p99 = latency(reader, args.rate, args.seconds)
+        print(f"{name:8}: {decoded} events at {rate:10.0f} events/s | latency p50 {p50:6.2f} ms, p99 {p99:6.2f} ms ({received} events)")
+
+
+if __name__ == "__main__":
+    main()
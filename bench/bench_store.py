@@ -0,0 +1,75 @@
+import os
+import time
+import random
+import argparse
+import tempfile
+
+import fixtures  # puts the repository root on sys.path
+from fixtures import random_mac
+from sinks import StoreSink, observation, rtl433_observation
+from store import ObservationStore
+from records import RtlEvent
+
+
+def make_records(count, devices, seed=1):
+    """Mixed Wi-Fi / BLE / rtl_433 observations from a fixed population of devices"""
+    rng = random.Random(seed)
+    aps = [random_mac(rng) for _ in range(devices // 4)]
+    clients = [random_mac(rng) for _ in range(devices // 2)]
+    ble = [random_mac(rng) for _ in range(devices // 4)]
+    now = time.time() - count / 1000
+    records = []
+    for i in range(count):
+        now += 0.001
+        kind = rng.random()
+        if kind < 0.25:
+            records.append(observation("wifi_ap", rng.choice(aps), {"essid": "Net", "signal": -rng.randrange(30, 95),
+                                                                     "channel": 6, "security": "WPA2"}, now))
+        elif kind < 0.6:
+            records.append(observation("wifi_client", rng.choice(clients), {"bssid": rng.choice(aps),
+                                                                             "signal": -rng.randrange(30, 95)}, now))
+        elif kind < 0.85:
+            records.append(observation("ble", rng.choice(ble), {"name": None, "rssi": -rng.randrange(40, 100)}, now))
+        else:
+            records.append(rtl433_observation(RtlEvent(now, "Acurite-Tower", rng.randrange(50), "A",
+                                                       {"temperature_C": 20.5, "humidity": 40})))
+    return records, aps
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SQLite observation store ingest / query benchmark")
+    parser.add_argument("--count", type=int, default=200000, help="Observations to ingest")
+    parser.add_argument("--devices", type=int, default=5000, help="Distinct devices")
+    parser.add_argument("--queries", type=int, default=1000)
+    args = parser.parse_args()
+
+    records, aps = make_records(args.count, args.devices)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "airspy.db")
+
+        # Same path as live mode: records go through the sink's queue and writer thread.
+        # The queue holds the whole run so the figure is the sustained write rate.
+        start = time.perf_counter()
+        sink = StoreSink(path, queue_size=len(records) + 1)
+        for record in records:
+            sink.put(record)
+        sink.close()
+        elapsed = time.perf_counter() - start
+        print(f"ingest : {sink.written} observations in {elapsed:.2f}s ({sink.written / elapsed:,.0f}/s), "
+              f"{sink.dropped} dropped, {os.path.getsize(path) / 1e6:.1f} MB")
+
+        store = ObservationStore(path)
+        rng = random.Random(2)
+        for name, query in (("last_seen", lambda mac: store.last_seen(mac)),
+                            ("history", lambda mac: store.observations(mac, limit=20)),
+                            ("last 60s", lambda mac: store.observations(since=time.time() - 60, limit=100))):
+            start = time.perf_counter()
+            for _ in range(args.queries):
+                query(rng.choice(aps).lower())
+            elapsed = time.perf_counter() - start
+            print(f"{name:9}: {elapsed / args.queries * 1e6:8.1f} us/query")
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
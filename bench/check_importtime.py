@@ -0,0 +1,74 @@
+import os
+import sys
+import argparse
+import subprocess
+
+import fixtures  # puts the repository root on sys.path
+from backends import BACKENDS
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MARKER = "@@ start"
+
+# Startup budget per scan mode (ms of import time, Airspy.py included) and the modules
+# that mode must not pull in. Budgets leave room for slower machines; run with
+# --scale to tighten or loosen them all.
+BUDGETS = {
+    "cli":   (150, ("wifi", "bluetooth", "rtl", "audit")),
+    "wifi":  (200, ("bluetooth", "rtl", "audit")),
+    "ble":   (200, ("wifi", "rtl", "audit")),
+    "sdr":   (200, ("wifi", "bluetooth", "audit")),
+    "audit": (250, ()),
+}
+# Heavy or optional packages no scan mode may import at startup
+NEVER = ("pywifi", "bleak", "requests", "pyshark", "numpy", "PySide6", "urllib.request")
+
+
+def measure(mode):
+    """Runs a fresh interpreter with -X importtime; returns (ms, {module: self us})"""
+    code = f"import sys; sys.stderr.write('{MARKER}\\n'); import Airspy"
+    if mode in BACKENDS:
+        code += f"; import importlib; importlib.import_module({BACKENDS[mode].module!r})"
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=ROOT,
+                            capture_output=True, text=True)
+    if result.returncode:
+        raise RuntimeError(f"{mode}: {result.stderr.strip().splitlines()[-1]}")
+    modules = {}
+    started = False
+    for line in result.stderr.splitlines():
+        if line == MARKER:
+            started = True
+        elif started and line.startswith("import time:") and "|" in line:
+            own, _, name = line[len("import time:"):].split("|")
+            if own.strip().isdigit():
+                modules[name.strip()] = int(own)
+    return sum(modules.values()) / 1000, modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Startup import-time budget per scan mode (python -X importtime)")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per mode; the fastest run counts")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiply every budget")
+    parser.add_argument("--top", type=int, default=5, help="Slowest modules shown per mode")
+    args = parser.parse_args()
+
+    failures = []
+    for mode, (budget, forbidden) in BUDGETS.items():
+        elapsed, modules = min((measure(mode) for _ in range(args.runs)), key=lambda run: run[0])
+        budget *= args.scale
+        loaded = [name for name in NEVER + forbidden if name in modules]
+        slowest = sorted(modules.items(), key=lambda item: -item[1])[:args.top]
+        status = "ok" if elapsed <= budget and not loaded else "FAIL"
+        print(f"{mode:6}: {elapsed:7.1f} ms (budget {budget:.0f} ms), {len(modules):3d} modules  {status}")
+        print(f"        slowest: {', '.join(f'{name} {us / 1000:.1f}' for name, us in slowest)}")
+        if elapsed > budget:
+            failures.append(f"{mode} imports take {elapsed:.1f} ms, over the {budget:.0f} ms budget")
+        if loaded:
+            failures.append(f"{mode} imports {', '.join(loaded)} at startup")
+
+    for failure in failures:
+        print(f"[!] {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
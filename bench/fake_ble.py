@@ -0,0 +1,65 @@
+import time
+import random
+import asyncio
+from types import SimpleNamespace
+
+from fixtures import random_mac
+
+# Stand-in for BleakScanner: replays synthetic advertisements into a detection
+# callback, as fast as possible or at a given rate. Pass it to ble_tracker.track_ble()
+# (or bluetooth.scan_bluetooth*) as scanner_factory.
+
+
+def make_advertisements(count, devices=200, seed=1):
+    """(BLEDevice-like, AdvertisementData-like) pairs; each device has its own mean RSSI"""
+    rng = random.Random(seed)
+    population = [(SimpleNamespace(address=random_mac(rng), name=None),
+                   f"Device-{i}" if rng.random() > 0.5 else None, -rng.randrange(40, 95))
+                  for i in range(devices)]
+    advertisements = []
+    for _ in range(count):
+        device, name, mean = rng.choice(population)
+        rssi = max(-127, min(0, int(rng.gauss(mean, 4))))
+        advertisements.append((device, SimpleNamespace(local_name=name, rssi=rssi)))
+    return advertisements
+
+
+class MockScanner:
+    def __init__(self, detection_callback, advertisements=(), rate=None, burst=100, loop_forever=False):
+        self.detection_callback = detection_callback
+        self.advertisements = advertisements
+        self.rate = rate
+        self.burst = burst
+        self.loop_forever = loop_forever
+        self.delivered = 0
+        self.task = None
+
+    async def replay(self):
+        start = time.perf_counter()
+        while True:
+            for i in range(0, len(self.advertisements), self.burst):
+                for device, advertisement in self.advertisements[i:i + self.burst]:
+                    self.detection_callback(device, advertisement)
+                self.delivered += min(self.burst, len(self.advertisements) - i)
+                if self.rate:
+                    delay = start + self.delivered / self.rate - time.perf_counter()
+                    await asyncio.sleep(max(0.0, delay))
+                else:
+                    await asyncio.sleep(0)
+            if not self.loop_forever:
+                return
+
+    async def __aenter__(self):
+        self.task = asyncio.ensure_future(self.replay())
+        return self
+
+    async def __aexit__(self, *exc):
+        self.task.cancel()
+        try:
+            await self.task
+        except asyncio.CancelledError:
+            pass
+
+
+def mock_scanner_factory(advertisements, **kwargs):
+    return lambda detection_callback: MockScanner(detection_callback, advertisements, **kwargs)
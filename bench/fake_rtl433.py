@@ -0,0 +1,113 @@
+import os
+import sys
+import json
+import time
+import random
+import argparse
+
+# Stand-in for rtl_433: accepts (and mostly ignores) rtl_433's options and prints
+# JSON events on stdout, either synthetic or replayed from a recording. With --bands, the
+# rate and the sensors depend on -f, so band hopping can be tested: a band missing from
+# the list stays silent. `-M time:usec` adds microseconds to the timestamps, like rtl_433.
+
+MODELS = ["Acurite-Tower", "LaCrosse-TX141THBv2", "Oregon-THGR122N", "Nexus-TH", "Fineoffset-WH2"]
+
+
+def synthetic_events(frequency, devices, burst, rng, first_id=0):
+    while True:
+        device = rng.randrange(devices)
+        event = {"model": MODELS[device % len(MODELS)], "id": first_id + device, "channel": device % 3 + 1,
+                 "battery_ok": 1, "temperature_C": round(rng.uniform(-10, 35), 1),
+                 "humidity": rng.randrange(20, 90), "mic": "CRC", "freq": frequency}
+        # rtl_433 typically decodes the same packet several times per burst
+        for _ in range(burst):
+            yield event
+
+
+def parse_bands(spec):
+    """'433.92M:20:50,868M:0.5:5' -> {frequency: (events per second, sensors, first sensor id)}"""
+    bands = {}
+    for i, band in enumerate(spec.split(",")):
+        frequency, rate, devices = band.split(":")
+        bands[frequency] = (float(rate), int(devices), i * 1000)
+    return bands
+
+
+def timestamp(usec):
+    now = time.time()
+    stamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(now))
+    return f"{stamp}.{int(now % 1 * 1e6):06d}" if usec else stamp
+
+
+def recorded_events(path):
+    while True:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-f", dest="frequency", default="433.92M")
+    parser.add_argument("-d", dest="device")
+    parser.add_argument("-F", dest="format", default="json")
+    parser.add_argument("-g", dest="gain")
+    parser.add_argument("-R", dest="protocol")
+    parser.add_argument("-M", dest="meta", action="append", default=[])
+    parser.add_argument("--rate", type=float, default=0, help="Events per second (0 = as fast as possible)")
+    parser.add_argument("--count", type=int, default=0, help="Stop after this many events (0 = never)")
+    parser.add_argument("--devices", type=int, default=20)
+    parser.add_argument("--burst", type=int, default=1)
+    parser.add_argument("--replay", help="JSON lines recording to replay")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--bands", help="Per-band traffic for -f: frequency:rate:sensors,... (other bands are silent)")
+    args, _ = parser.parse_known_args()
+    usec = "time:usec" in args.meta
+
+    first_id = 0
+    if args.bands:
+        bands = parse_bands(args.bands)
+        if args.frequency not in bands:
+            try:
+                time.sleep(1e6)
+            except KeyboardInterrupt:
+                pass
+            return
+        args.rate, args.devices, first_id = bands[args.frequency]
+    # Every hop restarts the process: vary the sequence, or each dwell would hear the same sensors first
+    rng = random.Random(f"{args.seed}-{os.getpid()}" if args.bands else args.seed)
+    events = recorded_events(args.replay) if args.replay else synthetic_events(args.frequency, args.devices, args.burst, rng, first_id)
+    out = sys.stdout.buffer
+    interval = 1.0 / args.rate if args.rate else 0
+    start = time.time()
+
+    try:
+        if not interval:
+            # Throughput mode: encode a block of events once and write it repeatedly
+            block = [json.dumps(dict(next(events), time=timestamp(usec), sent=start)).encode()
+                     for _ in range(1000)]
+            block = b"\n".join(block) + b"\n"
+            sent = 0
+            while not args.count or sent < args.count:
+                lines = 1000 if not args.count else min(1000, args.count - sent)
+                out.write(block if lines == 1000 else b"".join(block.splitlines(True)[:lines]))
+                sent += lines
+            out.flush()
+            return
+        for sent, event in enumerate(events, 1):
+            event = dict(event, time=timestamp(usec), sent=time.time())
+            out.write(json.dumps(event).encode() + b"\n")
+            out.flush()
+            delay = start + sent * interval - time.time()
+            if delay > 0:
+                time.sleep(delay)
+            if args.count and sent >= args.count:
+                break
+    except (BrokenPipeError, KeyboardInterrupt):
+        pass
+
+
+if __name__ == "__main__":
+    main()
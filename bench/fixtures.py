@@ -0,0 +1,146 @@
+import os
+import sys
+import random
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Synthetic captures shared by the benchmarks in this directory.
+
+AP_HEADER = "BSSID, First time seen, Last time seen, channel, Speed, Privacy, Cipher, Authentication, Power, # beacons, # IV, LAN IP, ID-length, ESSID, Key"
+STATION_HEADER = "Station MAC, First time seen, Last time seen, Power, # packets, BSSID, Probed ESSIDs"
+
+
+def random_mac(rng):
+    return ":".join(f"{rng.randrange(256):02X}" for _ in range(6))
+
+
+def make_airodump_csv(path, ap_count=2000, station_count=50000, seed=1):
+    """Writes an airodump-ng style CSV and returns (bssids, stations)"""
+    rng = random.Random(seed)
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    bssids = [random_mac(rng) for _ in range(ap_count)]
+    stations = [random_mac(rng) for _ in range(station_count)]
+
+    with open(path, "w", encoding="ISO-8859-1", newline="") as f:
+        f.write("\r\n" + AP_HEADER + "\r\n")
+        for i, bssid in enumerate(bssids):
+            essid = f"Network-{i}" if rng.random() > 0.1 else ""
+            f.write(f"{bssid}, {now}, {now}, {rng.choice((1, 6, 11, 36, 44, 149)):2d},  54, WPA2, CCMP, PSK, "
+                    f"{-rng.randrange(30, 95):3d}, {rng.randrange(5000):8d}, {rng.randrange(500):8d},   0.  0.  0.  0, "
+                    f"{len(essid):2d}, {essid}, \r\n")
+        f.write("\r\n" + STATION_HEADER + "\r\n")
+        for station in stations:
+            bssid = rng.choice(bssids) if rng.random() > 0.3 else "(not associated)"
+            f.write(f"{station}, {now}, {now}, {-rng.randrange(30, 95):3d}, {rng.randrange(1000):8d}, {bssid}, \r\n")
+        f.write("\r\n")
+    return bssids, stations
+
+
+def make_recording(path, seconds=60, ap_count=500, station_count=5000, rtl_rate=20, ble_rate=500, seed=1):
+    """Writes a replay file: one airodump-ng snapshot per second (10% of the rows change each
+    time), rtl_433 events in bursts of 3 repeats and BLE advertisements. Returns the Recorder."""
+    from replay import Recorder, RTL433, BLE
+    from fake_ble import make_advertisements
+    from fake_rtl433 import MODELS
+
+    rng = random.Random(seed)
+    recorder = Recorder(path)
+    start = recorder.start
+    stamp = lambda t: datetime.fromtimestamp(start + t).strftime("%Y-%m-%d %H:%M:%S")
+    aps = [[random_mac(rng), rng.choice((1, 6, 11, 36, 44, 149)), -rng.randrange(30, 95), 0, f"Network-{i}"]
+           for i in range(ap_count)]
+    stations = [[random_mac(rng), rng.choice(aps)[0], -rng.randrange(30, 95), 0] for _ in range(station_count)]
+    advertisements = iter(make_advertisements(seconds * ble_rate, max(1, ble_rate), seed))
+
+    for second in range(seconds):
+        for row in rng.sample(aps, max(1, ap_count // 10)):
+            row[2], row[3] = -rng.randrange(30, 95), second
+        for row in rng.sample(stations, max(1, station_count // 10)):
+            row[2], row[3] = -rng.randrange(30, 95), second
+        lines = ["", AP_HEADER]
+        lines += [f"{bssid}, {stamp(0)}, {stamp(seen)}, {channel:2d},  54, WPA2, CCMP, PSK, {signal:3d}, "
+                  f"{100 * (seen + 1):8d}, {10 * seen:8d},   0.  0.  0.  0, {len(essid):2d}, {essid}, "
+                  for bssid, channel, signal, seen, essid in aps]
+        lines += ["", STATION_HEADER]
+        lines += [f"{station}, {stamp(0)}, {stamp(seen)}, {signal:3d}, {10 * seen:8d}, {bssid}, "
+                  for station, bssid, signal, seen in stations]
+        recorder.add_snapshot(lines + [""], start + second)
+
+        for i in range(rtl_rate):
+            device = rng.randrange(20)
+            event = {"time": stamp(second), "model": MODELS[device % len(MODELS)], "id": device, "channel": device % 3 + 1,
+                     "battery_ok": 1, "temperature_C": round(rng.uniform(-10, 35), 1), "humidity": rng.randrange(20, 90), "mic": "CRC"}
+            for repeat in range(3):
+                recorder.add(RTL433, event, start + second + (i + repeat * 0.1) / rtl_rate)
+
+        for i in range(ble_rate):
+            device, advertisement = next(advertisements)
+            recorder.add(BLE, [device.address, advertisement.local_name, advertisement.rssi], start + second + i / ble_rate)
+
+    recorder.close()
+    return recorder
+
+
+def make_pcap(path, frame_count=1000000, ap_count=500, station_count=5000, seed=1):
+    """Writes a radiotap pcap like airodump-ng's .cap: beacons (every 102.4 ms per AP, with
+    jitter), probe requests, data to and from the APs and ACKs, some frames with an FCS.
+    Returns (bssids, stations) as MAC strings."""
+    import struct
+
+    rng = random.Random(seed)
+    macs = lambda count: [bytes(rng.randrange(256) & (0xfe if i == 0 else 0xff) for i in range(6)) for _ in range(count)]
+    bssids, stations = macs(ap_count), macs(station_count)
+    broadcast = b"\xff" * 6
+    channels = [rng.choice((1, 6, 11, 36, 44, 149)) for _ in bssids]
+    frequency = lambda channel: 2407 + 5 * channel if channel <= 13 else 5000 + 5 * channel
+    rsn = bytes([48, 20, 1, 0, 0, 0x0f, 0xac, 4, 1, 0, 0, 0x0f, 0xac, 4, 1, 0, 0, 0x0f, 0xac, 2, 0, 0])
+    beacon_bodies = []
+    for i, channel in enumerate(channels):
+        ssid = f"Network-{i}".encode() if rng.random() > 0.1 else b""
+        ies = bytes([0, len(ssid)]) + ssid + bytes([1, 8, 0x82, 0x84, 0x8b, 0x96, 0x0c, 0x12, 0x18, 0x24, 3, 1, channel,
+                                                    5, 4, 0, 1, 0, 0]) + rsn
+        beacon_bodies.append(struct.pack("<QHH", 0, 100, 0x0411) + ies)
+    assigned = [rng.randrange(ap_count) for _ in stations]
+    probes = [bytes([0, 0])] + [bytes([0, len(name)]) + name for name in (b"HomeWiFi", b"eduroam", b"Airport_Free", b"Office")]
+    payload = bytes(rng.randrange(256) for _ in range(120))
+
+    def radiotap(channel, signal, fcs):
+        return struct.pack("<BBHIQBBHHbB", 0, 0, 24, 0x82f, 0, 0x10 if fcs else 0, 12, frequency(channel), 0x00a0, signal, 0)
+
+    # 30% of the frames are beacons, so this spacing gives each AP one beacon per 102.4 ms
+    gap = 0.1024 * 0.3 / ap_count
+    next_beacon = [rng.uniform(0, 0.1024) for _ in bssids]
+    beacons = 0
+    t = 0.0
+    with open(path, "wb") as f:
+        f.write(struct.pack("<IHHiIII", 0xa1b2c3d4, 2, 4, 0, 0, 65535, 127))
+        for n in range(frame_count):
+            t += gap
+            kind = rng.random()
+            if kind < 0.3:
+                ap = beacons % ap_count
+                beacons += 1
+                next_beacon[ap] += 0.1024
+                stamp = next_beacon[ap] + rng.gauss(0, 0.0005)
+                frame = struct.pack("<BBH6s6s6sH", 0x80, 0, 0, broadcast, bssids[ap], bssids[ap], n & 0xfff0) + beacon_bodies[ap]
+                channel, signal = channels[ap], -30 - (ap % 60) + rng.randrange(-3, 4)
+            else:
+                stamp = t
+                station = rng.randrange(station_count)
+                ap = assigned[station]
+                channel, signal = channels[ap], -40 - (station % 50) + rng.randrange(-3, 4)
+                if kind < 0.35:
+                    frame = struct.pack("<BBH6s6s6sH", 0x40, 0, 0, broadcast, stations[station], broadcast, n & 0xfff0) + probes[station % 5]
+                elif kind < 0.6:
+                    frame = struct.pack("<BBH6s6s6sHH", 0x88, 0x41, 44, bssids[ap], stations[station], broadcast, n & 0xfff0, 0) + payload
+                elif kind < 0.85:
+                    frame = struct.pack("<BBH6s6s6sHH", 0x88, 0x42, 44, stations[station], bssids[ap], bssids[ap], n & 0xfff0, 0) + payload
+                    signal = -30 - (ap % 60)
+                else:
+                    frame = struct.pack("<BBH6s", 0xd4, 0, 0, stations[station])
+            fcs = n % 4 == 0
+            data = radiotap(channel, signal, fcs) + frame + (b"\0\0\0\0" if fcs else b"")
+            f.write(struct.pack("<IIII", int(stamp), int(stamp % 1 * 1e6), len(data), len(data)) + data)
+    name = lambda mac: ":".join(f"{byte:02X}" for byte in mac)
+    return [name(mac) for mac in bssids], [name(mac) for mac in stations]
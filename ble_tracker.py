@@ -0,0 +1,167 @@
+import time
+import asyncio
+
+from oui import pack_mac
+from correlate import advertisement_features
+
+###### BLE ADVERTISEMENT TRACKER ######
+
+BLE_ALPHA = 0.3                    # EWMA weight of the newest RSSI sample
+BLE_SNAPSHOT_INTERVAL = 2.0        # seconds between snapshots handed to the UI / sinks
+BLE_LOST_AFTER = 120               # seconds without advertisements before a device is forgotten
+STOP_POLL = 0.25
+FEATURE_EVERY = 16                 # advertisements between two readings of a device's correlation features
+
+
+class BleDevice:
+    __slots__ = ("address", "name", "count", "rssi", "rssi_min", "rssi_max", "rssi_avg", "first_seen", "last_seen",
+                 "features")
+
+    def __init__(self, address, name, rssi, now, features=frozenset()):
+        self.address = address     # 48-bit int (oui.pack_mac), or the platform's UUID text on macOS
+        self.name = name
+        self.count = 1
+        self.rssi = rssi
+        self.rssi_min = rssi
+        self.rssi_max = rssi
+        self.rssi_avg = None if rssi is None else float(rssi)
+        self.first_seen = now
+        self.last_seen = now
+        self.features = features   # rotation-stable advertisement tokens (correlate.py)
+
+
+class BleTracker:
+    """Folds BLE advertisements into one BleDevice per address.
+
+    Every advertisement updates the device's last RSSI, min/max and an exponentially
+    weighted moving average (`alpha`), so a scan keeps the whole signal history of a
+    device in constant memory instead of the single RSSI discover() returns. With an
+    RssiHistory, devices are ranked by its Kalman estimate and keep rolling percentiles.
+    """
+
+    def __init__(self, alpha=BLE_ALPHA, lost_after=BLE_LOST_AFTER, history=None):
+        self.alpha = alpha
+        self.lost_after = lost_after
+        self.history = history
+        self.devices = {}
+        self.packed = {}           # address text from the scanner -> pack_mac() value
+        self.changed = set()       # addresses updated since the last take_changed()
+        self.advertisements = 0
+
+    def __len__(self):
+        return len(self.devices)
+
+    def __iter__(self):
+        return iter(self.devices.values())
+
+    def add(self, address, name=None, rssi=None, now=None, features=None):
+        now = time.time() if now is None else now
+        self.advertisements += 1
+        self.changed.add(address)
+        if rssi is not None and self.history is not None:
+            self.history.add(address, rssi, now)
+        device = self.devices.get(address)
+        if device is None:
+            device = self.devices[address] = BleDevice(address, name, rssi, now, features or frozenset())
+            return device
+
+        device.count += 1
+        device.last_seen = now
+        if name:
+            device.name = name
+        if features and features is not device.features and not features <= device.features:
+            device.features = device.features | features
+        if rssi is not None:
+            device.rssi = rssi
+            if device.rssi_avg is None:
+                device.rssi_min = device.rssi_max = rssi
+                device.rssi_avg = float(rssi)
+            else:
+                device.rssi_min = min(device.rssi_min, rssi)
+                device.rssi_max = max(device.rssi_max, rssi)
+                device.rssi_avg += self.alpha * (rssi - device.rssi_avg)
+        return device
+
+    def on_detection(self, device, advertisement_data):
+        """Bleak detection callback: (BLEDevice, AdvertisementData)"""
+        rssi = getattr(advertisement_data, "rssi", None)
+        if rssi is None:
+            rssi = getattr(device, "rssi", None)
+        name = advertisement_data.local_name or device.name
+        address = self.packed.get(device.address)
+        if address is None:
+            if len(self.packed) > 2 * len(self.devices) + 1024:
+                self.packed.clear()    # addresses of expired devices
+            address = self.packed[device.address] = pack_mac(device.address)
+        known = self.devices.get(address)
+        features = None
+        if known is None or known.count % FEATURE_EVERY == 0:
+            features = advertisement_features(advertisement_data, name)
+        self.add(address, name, rssi, features=features)
+
+    def take_changed(self):
+        """Devices updated since the previous call"""
+        changed = [self.devices[address] for address in self.changed if address in self.devices]
+        self.changed = set()
+        return changed
+
+    def expire(self, now=None):
+        """Forgets devices silent for more than `lost_after` seconds and returns them"""
+        cutoff = (time.time() if now is None else now) - self.lost_after
+        lost = [device for device in self.devices.values() if device.last_seen < cutoff]
+        for device in lost:
+            del self.devices[device.address]
+            if self.history is not None:
+                self.history.forget(device.address)
+        return lost
+
+    def signal(self, device):
+        """Smoothed RSSI of the device (the history's estimate, else the EWMA), or None"""
+        if self.history is not None:
+            return self.history.smoothed(device.address, device.rssi_avg)
+        return device.rssi_avg
+
+    def by_signal(self):
+        """Strongest (smoothed) devices first"""
+        signal = self.signal
+        return sorted(self.devices.values(),
+                      key=lambda d: signal(d) if d.rssi_avg is not None else -1000, reverse=True)
+
+
+async def track_ble(timeout=None, on_snapshot=None, interval=BLE_SNAPSHOT_INTERVAL, tracker=None, stop=None,
+                    scanner_factory=None):
+    """Scans continuously with a Bleak detection callback and calls on_snapshot(tracker) every
+    `interval` seconds, plus once at the end.
+
+    Returns after `timeout` seconds, or once the optional threading.Event `stop` is set.
+    `scanner_factory(detection_callback=...)` must return an async context manager that scans
+    while entered; it defaults to BleakScanner.
+    """
+    if scanner_factory is None:
+        from bleak import BleakScanner
+        scanner_factory = BleakScanner
+    tracker = tracker if tracker is not None else BleTracker()
+    loop = asyncio.get_running_loop()
+    deadline = None if timeout is None else loop.time() + timeout
+    next_snapshot = loop.time() + interval
+
+    async with scanner_factory(detection_callback=tracker.on_detection):
+        while stop is None or not stop.is_set():
+            now = loop.time()
+            if deadline is not None and now >= deadline:
+                break
+            wake = next_snapshot if on_snapshot else now + interval
+            if deadline is not None:
+                wake = min(wake, deadline)
+            if stop is not None:
+                wake = min(wake, now + STOP_POLL)
+            await asyncio.sleep(max(0.0, wake - now))
+            if on_snapshot and loop.time() >= next_snapshot:
+                on_snapshot(tracker)
+                next_snapshot = max(next_snapshot + interval, loop.time())
+
+    if on_snapshot:
+        on_snapshot(tracker)
+    return tracker
+
+###### END BLE ADVERTISEMENT TRACKER ######
@@ -1,53 +1,95 @@
-import sys
-import argparse
+import signal
+import threading
 import asyncio
-import pywifi
-from pywifi import const
-from bleak import BleakScanner
-import subprocess
-import json
-import time
-import select
-import requests
-import re
-import csv
 from datetime import datetime
 import warnings
 warnings.simplefilter(action='ignore', category=FutureWarning)
 
 from color import *
+from oui import color_vendor, lookup_vendor, format_mac
+from vendor_cache import resolve_vendors_async
+from sinks import observation
+from ble_tracker import BleTracker, track_ble, BLE_SNAPSHOT_INTERVAL
+from correlate import correlate_ble, format_correlation
 
-def get_mac_vendor(mac_address):
-    url = f"https://api.macvendors.com/{mac_address}"
-    try:
-        response = requests.get(url, timeout=2)
-        if response.status_code == 200:
-            return f"{Color.GREEN}{Style.BRIGHT}{response.text.strip()}{Style.RESET_ALL}"
-        else:
-            return f"{Color.RED}{Style.BRIGHT}Unknown{Style.RESET_ALL}"
-    except requests.RequestException:
-        return f"{Color.RED}{Style.BRIGHT}Unknown{Style.RESET_ALL}"
-
-async def scan_bluetooth(timeout):
-    print(f"\n{Color.GREEN}{Style.BRIGHT}[*]{Style.RESET_ALL} Scanning Bluetooth devices...")
+def ble_observation(device, vendor=None):
+    return observation("ble", format_mac(device.address), {"name": device.name, "rssi": None if device.rssi_avg is None else round(device.rssi_avg, 1), "rssi_last": device.rssi,
+                                               "rssi_min": device.rssi_min, "rssi_max": device.rssi_max,
+                                               "advertisements": device.count, "vendor": vendor}, device.last_seen)
+
+def format_rssi(device):
+    if device.rssi_avg is None:
+        return "? dBm"
+    return f"{device.rssi_avg:.0f} dBm (min {device.rssi_min}, max {device.rssi_max})"
+
+async def scan_bluetooth(timeout, online_vendors=False, sink=None, scanner_factory=None, recorder=None, replay=None):
+    print(f"\n{Color.GREEN}{Style.BRIGHT}[*]{Style.RESET_ALL} Scanning Bluetooth devices for {timeout}s...")
+    stop = threading.Event()
+    if replay:
+        scanner_factory = replay.scanner_factory(stop)
+    if recorder:
+        scanner_factory = recorder.wrap_scanner(scanner_factory)
     try:
-        devices = await asyncio.wait_for(BleakScanner.discover(), timeout=timeout)
-    except asyncio.TimeoutError:
-        print(f"{Color.RED}{Style.BRIGHT}[!]{Style.RESET_ALL} Bluetooth scan interrupted (timeout)")
+        tracker = await track_ble(timeout, stop=stop, scanner_factory=scanner_factory)
+    except Exception as e:
+        print(f"{Color.RED}{Style.BRIGHT}[!]{Style.RESET_ALL} Bluetooth scan failed: {e}")
         return
 
-    results = []
+    devices = tracker.by_signal()
+    vendors = await resolve_vendors_async([dev.address for dev in devices], online_vendors)
+
+    print(f"\n{Color.GREEN}{Style.BRIGHT}=== DETECTED BLUETOOTH DEVICES ==={Style.RESET_ALL}")
     for dev in devices:
-        vendor = get_mac_vendor(dev.address)
-        results.append({
-            "Name": dev.name or dev.address,
-            "Address": dev.address,
-            "Vendor": vendor,
-            "RSSI": dev.rssi
-        })
+        if sink:
+            sink.put(ble_observation(dev, vendors[dev.address]))
+        address = format_mac(dev.address)
+        print(f"Name: {dev.name or address} | BSSID: {address} -> {color_vendor(vendors[dev.address])} | "
+              f"Signal: {format_rssi(dev)} | Advertisements: {dev.count}")
+    print(f"\n{Color.GREEN}{Style.BRIGHT}[*]{Style.RESET_ALL} {format_correlation(correlate_ble(devices))}, {tracker.advertisements} advertisements")
 
-    results.sort(key=lambda x: x["RSSI"], reverse=True)
+def print_ble_snapshot(tracker, known, sink=None):
+    """Prints devices that appeared or went silent since the previous snapshot and a summary line"""
+    stamp = datetime.now().strftime('%H:%M:%S')
+    for dev in tracker.take_changed():
+        vendor = lookup_vendor(dev.address)
+        if sink:
+            sink.put(ble_observation(dev, vendor))
+        if dev.address not in known:
+            known.add(dev.address)
+            print(f"[{stamp}] {Color.GREEN}{Style.BRIGHT}{'NEW BLE':<12}{Style.RESET_ALL} {dev.name or 'Unknown'} | "
+                  f"{format_mac(dev.address)} -> {color_vendor(vendor)} | Signal: {format_rssi(dev)}")
+    for dev in tracker.expire():
+        known.discard(dev.address)
+        print(f"[{stamp}] {Color.RED}{Style.BRIGHT}{'BLE LOST':<12}{Style.RESET_ALL} {dev.name or 'Unknown'} | "
+              f"{format_mac(dev.address)} | seen {dev.count}x, last signal {dev.rssi} dBm")
+    strongest = ", ".join(f"{dev.name or format_mac(dev.address)} {dev.rssi_avg:.0f}" for dev in tracker.by_signal()[:3]
+                          if dev.rssi_avg is not None)
+    print(f"[{stamp}] {Color.CYAN}{Style.BRIGHT}{'BLE':<12}{Style.RESET_ALL} {len(tracker)} devices, "
+          f"{tracker.advertisements} advertisements | strongest: {strongest or '-'}")
 
-    print(f"\n{Color.GREEN}{Style.BRIGHT}=== DETECTED BLUETOOTH DEVICES ==={Style.RESET_ALL}")
-    for dev in results:
-        print(f"Name: {dev['Name']} | BSSID: {dev['Address']} -> {dev['Vendor']} | Signal: {dev['RSSI']} dBm")
\ No newline at end of file
+async def scan_bluetooth_live(sink=None, interval=BLE_SNAPSHOT_INTERVAL, scanner_factory=None, recorder=None, replay=None):
+    """Streams BLE devices from the advertisement callback until CTRL+C (or the end of a replay)"""
+    print(f"\n{Color.GREEN}{Style.BRIGHT}[*]{Style.RESET_ALL} Monitoring Bluetooth devices... (Press CTRL+C to stop)")
+    stop = threading.Event()
+    if replay:
+        scanner_factory = replay.scanner_factory(stop)
+    if recorder:
+        scanner_factory = recorder.wrap_scanner(scanner_factory)
+    loop = asyncio.get_running_loop()
+    try:
+        loop.add_signal_handler(signal.SIGINT, stop.set)
+    except (NotImplementedError, RuntimeError):
+        pass
+    known = set()
+    tracker = BleTracker()
+    try:
+        await track_ble(None, lambda t: print_ble_snapshot(t, known, sink), interval, tracker, stop, scanner_factory)
+    except Exception as e:
+        print(f"{Color.RED}{Style.BRIGHT}[!]{Style.RESET_ALL} Bluetooth scan failed: {e}")
+    finally:
+        try:
+            loop.remove_signal_handler(signal.SIGINT)
+        except (NotImplementedError, RuntimeError):
+            pass
+    print(f"\n{Color.YELLOW}{Style.BRIGHT}[!] Monitoring stopped by user.{Style.RESET_ALL}")
+    return tracker
@@ -0,0 +1,172 @@
+import os
+import re
+import glob
+import time
+import atexit
+import signal
+import shutil
+import tempfile
+import subprocess
+
+###### CAPTURE SESSIONS ######
+
+# Every airodump-ng run gets its own directory (airspy-capture-<pid>-XXXX in the temp dir),
+# so concurrent scans never share /tmp/airodump-01.csv and nothing needs `sudo rm`.
+# Sessions still open at exit are stopped and removed; directories left behind by a
+# process that was killed are swept by the next session that starts.
+# airodump-ng runs in its own session under sudo, which cannot relay SIGKILL: it is
+# stopped by signalling its whole process group.
+
+MONITOR_INTERFACE = "wlan0mon"
+DIRECTORY_PREFIX = "airspy-capture-"
+STOP_TIMEOUT = 5.0                 # seconds airodump-ng gets to exit before it is killed
+STOP_POLL = 0.05
+PID_FILE = "airodump.pid"         # process group of sudo + airodump-ng
+
+SESSIONS = set()
+
+
+def pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def runs_airodump(pid):
+    """True when `pid` is still an airodump-ng (or the sudo running it), not a process that reused the PID"""
+    try:
+        with open(f"/proc/{pid}/cmdline", "rb") as file:
+            return b"airodump-ng" in file.read()
+    except OSError:
+        return False
+
+
+def signal_group(pgid, signum):
+    """Signals a process group; False when it is gone or not ours to signal"""
+    try:
+        os.killpg(pgid, signum)
+    except (ProcessLookupError, PermissionError):
+        return False
+    return True
+
+
+def sweep_stale_sessions(directory=None):
+    """Removes capture directories whose Airspy process is gone, stopping their airodump-ng if it survived"""
+    for path in glob.glob(os.path.join(directory or tempfile.gettempdir(), DIRECTORY_PREFIX + "*")):
+        match = re.match(re.escape(DIRECTORY_PREFIX) + r"(\d+)-", os.path.basename(path))
+        if not match or pid_alive(int(match.group(1))):
+            continue
+        try:
+            with open(os.path.join(path, PID_FILE)) as file:
+                pgid = int(file.read())
+        except (OSError, ValueError):
+            pgid = None
+        if pgid is not None and runs_airodump(pgid):
+            signal_group(pgid, signal.SIGTERM)
+        shutil.rmtree(path, ignore_errors=True)
+
+
+class CaptureSession:
+    """One airodump-ng process writing into a private directory.
+
+    The session can be used wherever a CSV path is expected (os.fspath gives the current
+    output file), so AirodumpWatcher and load_capture read it directly. Use it as a context
+    manager, or call close(), to stop airodump-ng and remove the directory.
+    """
+
+    def __init__(self, interface=MONITOR_INTERFACE, write_interval=None, output_format="csv", bssid=None,
+                 channel=None, prefix="airodump"):
+        self.interface = interface
+        self.write_interval = write_interval
+        self.output_format = output_format
+        self.bssid = bssid
+        self.channel = channel
+        self.prefix = prefix
+        self.directory = None
+        self.process = None
+
+    def command(self):
+        command = ["sudo", "airodump-ng", self.interface, "--write", os.path.join(self.directory, self.prefix)]
+        if self.output_format:
+            command.extend(["--output-format", self.output_format])
+        if self.write_interval:
+            command.extend(["--write-interval", str(max(1, int(self.write_interval)))])
+        if self.bssid:
+            command.extend(["-d", self.bssid])
+        if self.channel:
+            command.extend(["-c", str(self.channel)])
+        return command
+
+    def start(self):
+        sweep_stale_sessions()
+        self.directory = tempfile.mkdtemp(prefix=f"{DIRECTORY_PREFIX}{os.getpid()}-")
+        SESSIONS.add(self)
+        try:
+            self.process = subprocess.Popen(self.command(), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                                            start_new_session=True)
+        except OSError:
+            self.close()
+            raise
+        with open(os.path.join(self.directory, PID_FILE), "w") as file:
+            file.write(str(self.process.pid))
+        return self
+
+    def output(self, extension="csv"):
+        """Newest <prefix>-NN.<extension> airodump-ng wrote, or the name it will use first"""
+        files = glob.glob(os.path.join(glob.escape(self.directory), f"{glob.escape(self.prefix)}-[0-9][0-9].{extension}"))
+        return max(files) if files else os.path.join(self.directory, f"{self.prefix}-01.{extension}")
+
+    @property
+    def csv_file(self):
+        return self.output("csv")
+
+    def __fspath__(self):
+        return self.csv_file
+
+    def running(self):
+        return self.process is not None and self.process.poll() is None
+
+    def stop(self):
+        if self.process is None:
+            return
+        # Signal the whole group, even when sudo already exited: sudo may exit before
+        # airodump-ng, and cannot relay SIGKILL
+        group = self.process.pid
+        deadline = time.monotonic() + STOP_TIMEOUT
+        if not signal_group(group, signal.SIGTERM) and self.process.poll() is None:
+            self.process.terminate()
+        try:
+            self.process.wait(STOP_TIMEOUT)
+        except subprocess.TimeoutExpired:
+            pass
+        while signal_group(group, 0) and time.monotonic() < deadline:
+            time.sleep(STOP_POLL)
+        if self.process.poll() is None or signal_group(group, 0):
+            if not signal_group(group, signal.SIGKILL) and self.process.poll() is None:
+                self.process.kill()
+            self.process.wait()
+
+    def close(self):
+        self.stop()
+        SESSIONS.discard(self)
+        if self.directory:
+            shutil.rmtree(self.directory, ignore_errors=True)
+            self.directory = None
+
+    def __enter__(self):
+        return self.start() if self.directory is None else self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+@atexit.register
+def close_sessions():
+    for session in list(SESSIONS):
+        session.close()
+
+###### END CAPTURE SESSIONS ######
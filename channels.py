@@ -0,0 +1,216 @@
+import math
+from collections import namedtuple
+
+import numpy as np
+
+###### WI-FI CHANNEL PLANNING ######
+
+# Each candidate channel (or bonded block for 40/80 MHz) gets an interference score:
+#   sum over APs of  spectral overlap x received power (mW) x traffic load
+# reported in dBm; lower is better. Per AP, the overlap is the share of its occupied
+# band that falls inside the candidate's band. 2.4 GHz APs occupy 22 MHz, so channels
+# 1 and 3 overlap by 60% and 1 and 6 do not overlap.
+
+BAND_24 = "2.4GHz"
+BAND_5 = "5GHz"
+WIDTHS = (20, 40, 80)
+
+CHANNELS_24 = range(1, 14)
+CHANNELS_5 = (36, 40, 44, 48, 52, 56, 60, 64, 100, 104, 108, 112, 116, 120, 124, 128, 132, 136, 140, 144,
+              149, 153, 157, 161, 165)
+# Bonded 5 GHz blocks: first channel of each 40 / 80 MHz block
+BLOCKS_5 = {40: (36, 44, 52, 60, 100, 108, 116, 124, 132, 140, 149, 157),
+            80: (36, 52, 100, 116, 132, 149)}
+
+AP_WIDTH_24 = 22.0                 # DSSS/OFDM spectral mask, MHz
+AP_WIDTH_5 = 20.0
+UNKNOWN_SIGNAL = -90               # airodump-ng reports -1 when it could not measure the AP
+LOAD_IDLE = 0.25                   # an AP that only beacons still takes airtime
+LOAD_SATURATION = 100000           # data frames at which an AP counts as fully loaded
+REBUILD_EVERY = 10000              # incremental updates between exact recomputations
+CLEAR_LEVEL = 1e-13                # mW (-130 dBm): below this a channel counts as clear
+
+ChannelOption = namedtuple("ChannelOption", "band width channel label low high")
+ChannelScore = namedtuple("ChannelScore", "option score aps")
+
+
+def center_frequency(channel):
+    """Center frequency in MHz of a 2.4 GHz (1-14) or 5 GHz channel, None if unknown"""
+    if 1 <= channel <= 13:
+        return 2407 + 5 * channel
+    if channel == 14:
+        return 2484
+    if 32 <= channel <= 177:
+        return 5000 + 5 * channel
+    return None
+
+
+def channel_options(width=20):
+    """Candidate channels/blocks for one channel width, both bands"""
+    options = []
+    if width == 20:
+        for channel in CHANNELS_24:
+            center = center_frequency(channel)
+            options.append(ChannelOption(BAND_24, 20, channel, str(channel), center - AP_WIDTH_24 / 2, center + AP_WIDTH_24 / 2))
+        for channel in CHANNELS_5:
+            center = center_frequency(channel)
+            options.append(ChannelOption(BAND_5, 20, channel, str(channel), center - 10, center + 10))
+    elif width == 40:
+        # 2.4 GHz: primary channel plus the secondary one 4 channels above
+        for channel in range(1, 10):
+            options.append(ChannelOption(BAND_24, 40, channel, f"{channel}+{channel + 4}",
+                                         center_frequency(channel) - AP_WIDTH_24 / 2,
+                                         center_frequency(channel + 4) + AP_WIDTH_24 / 2))
+    if width in BLOCKS_5:
+        for channel in BLOCKS_5[width]:
+            low = center_frequency(channel) - 10
+            last = channel + 4 * (width // 20 - 1)
+            options.append(ChannelOption(BAND_5, width, channel, f"{channel}-{last}", low, low + width))
+    if not options:
+        raise ValueError(f"Unsupported channel width: {width}")
+    return options
+
+
+def ap_band(channel):
+    """(low, high) MHz occupied by an AP on `channel`, None if the channel is unknown"""
+    center = center_frequency(channel)
+    if center is None:
+        return None
+    half = (AP_WIDTH_24 if center < 3000 else AP_WIDTH_5) / 2
+    return center - half, center + half
+
+
+def ap_weight(signal, data=0):
+    """Received power in mW scaled by the AP's traffic load"""
+    if signal is None or signal >= 0 or signal == -1:
+        signal = UNKNOWN_SIGNAL
+    load = LOAD_IDLE + (1 - LOAD_IDLE) * min(1.0, math.log1p(max(0, data)) / math.log1p(LOAD_SATURATION))
+    return 10 ** (signal / 10) * load
+
+
+def to_dbm(power):
+    return float(10 * np.log10(power)) if power > 0 else None
+
+
+class ChannelPlanner:
+    """Interference score of every candidate channel for a channel width.
+
+    APs are stored in NumPy columns (one slot per BSSID). build() scores everything as one
+    candidates x APs overlap matrix; update()/remove() adjust the scores for a single AP in
+    O(candidates), which is what live mode uses.
+    """
+
+    def __init__(self, width=20, capacity=256):
+        self.width = width
+        self.options = channel_options(width)
+        self.option_low = np.array([o.low for o in self.options])
+        self.option_high = np.array([o.high for o in self.options])
+        self.low = np.zeros(capacity)
+        self.high = np.zeros(capacity)
+        self.ap_width = np.ones(capacity)
+        self.weight = np.zeros(capacity)     # 0 for free slots
+        self.slots = {}                      # BSSID -> slot
+        self.free = list(range(capacity - 1, -1, -1))
+        self.power = np.zeros(len(self.options))
+        self.count = np.zeros(len(self.options), dtype=np.int64)
+        self.updates = 0
+
+    def __len__(self):
+        return len(self.slots)
+
+    def overlap(self, low, high, ap_width):
+        """Candidates x APs matrix of overlap fractions (broadcasts over AP arrays)"""
+        inside = np.minimum(self.option_high[:, None], high) - np.maximum(self.option_low[:, None], low)
+        return np.clip(inside, 0, None) / ap_width
+
+    def grow(self):
+        capacity = len(self.weight)
+        for name in ("low", "high", "weight"):
+            setattr(self, name, np.concatenate([getattr(self, name), np.zeros(capacity)]))
+        self.ap_width = np.concatenate([self.ap_width, np.ones(capacity)])
+        self.free.extend(range(2 * capacity - 1, capacity - 1, -1))
+
+    def build(self, aps):
+        """Scores a whole scan: `aps` are AccessPoint records"""
+        self.slots = {}
+        rows = []
+        for ap in aps:
+            band = ap_band(ap.channel)
+            if band is not None and ap.bssid not in self.slots:
+                self.slots[ap.bssid] = len(rows)
+                rows.append((band[0], band[1], ap_weight(ap.signal, ap.data)))
+        capacity = max(256, 2 * len(rows))
+        columns = np.array(rows, dtype=float).reshape(-1, 3)
+        self.low, self.high, self.weight = (np.zeros(capacity) for _ in range(3))
+        self.low[:len(rows)], self.high[:len(rows)], self.weight[:len(rows)] = columns.T
+        self.ap_width = np.maximum(self.high - self.low, 1.0)
+        self.free = list(range(capacity - 1, len(rows) - 1, -1))
+        self.rebuild()
+        return self
+
+    def rebuild(self):
+        """Exact recomputation of every score (also clears floating point drift)"""
+        overlap = self.overlap(self.low, self.high, self.ap_width)
+        self.power = overlap @ self.weight
+        self.count = ((overlap > 0) & (self.weight > 0)).sum(axis=1)
+        self.updates = 0
+
+    def apply(self, slot, sign):
+        overlap = self.overlap(self.low[slot], self.high[slot], self.ap_width[slot])[:, 0]
+        self.power += sign * overlap * self.weight[slot]
+        self.count += sign * (overlap > 0)
+
+    def update(self, bssid, channel, signal, data=0):
+        """Adds or moves one AP; returns False when its channel is unknown"""
+        band = ap_band(channel)
+        if band is None:
+            self.remove(bssid)
+            return False
+        slot = self.slots.get(bssid)
+        if slot is None:
+            if not self.free:
+                self.grow()
+            slot = self.slots[bssid] = self.free.pop()
+        else:
+            self.apply(slot, -1)
+        self.low[slot], self.high[slot] = band
+        self.ap_width[slot] = band[1] - band[0]
+        self.weight[slot] = ap_weight(signal, data)
+        self.apply(slot, 1)
+        self.changed()
+        return True
+
+    def remove(self, bssid):
+        slot = self.slots.pop(bssid, None)
+        if slot is None:
+            return
+        self.apply(slot, -1)
+        self.weight[slot] = 0.0
+        self.free.append(slot)
+        self.changed()
+
+    def changed(self):
+        self.updates += 1
+        if self.updates >= REBUILD_EVERY:
+            self.rebuild()
+
+    def levels(self):
+        """Interference power per candidate in mW; incremental leftovers below CLEAR_LEVEL are 0"""
+        return np.where(self.power < CLEAR_LEVEL, 0.0, self.power)
+
+    def scores(self):
+        """ChannelScore for every candidate, score in dBm (None when nothing overlaps)"""
+        return [ChannelScore(option, to_dbm(p), int(n)) for option, p, n in zip(self.options, self.levels(), self.count)]
+
+    def recommend(self, band=None, count=3):
+        """Best candidates first, per band if `band` is None: {band: [ChannelScore, ...]}"""
+        ranked = {}
+        order = np.lexsort((self.count, self.levels()))
+        scores = self.scores()
+        for i in order:
+            option = self.options[i]
+            if band is None or option.band == band:
+                ranked.setdefault(option.band, []).append(scores[i])
+        return {b: entries[:count] for b, entries in ranked.items()}
+
+###### END WI-FI CHANNEL PLANNING ######
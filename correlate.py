@@ -0,0 +1,210 @@
+import math
+import random
+import hashlib
+from bisect import bisect_left, bisect_right
+from collections import namedtuple
+
+from oui import is_locally_administered
+from rssi import valid_rssi
+
+###### MAC RANDOMIZATION CORRELATION ######
+
+# Phones rotate their BLE and Wi-Fi probe addresses every few minutes, so a long survey
+# sees one phone as many devices. Each address is described by features that survive a
+# rotation (advertisement layout, manufacturer id, service UUIDs, TX power, advertising
+# interval, probed ESSIDs), MinHashed and bucketed with LSH. Only addresses sharing a
+# bucket are compared, instead of every pair. Two randomized addresses are linked when
+# their features are similar, the second appears just as the first goes silent and their
+# signals are close; each address gets at most one successor, so links form rotation chains
+# and the device estimate is the number of chains.
+
+MINHASH_PERMUTATIONS = 64
+LSH_BANDS = 32                     # 2 rows per band: pairs above ~0.4 Jaccard usually share a bucket
+SIMILARITY_THRESHOLD = 0.6         # minimum Jaccard similarity of two linked feature sets
+MAX_ROTATION_GAP = 300             # seconds between the old address going silent and the new one appearing
+BLE_ROTATION_GAP = 10              # BLE devices advertise every few hundred ms: a rotation leaves no real gap
+ROTATION_OVERLAP = 5               # seconds both addresses may be seen at once around a rotation
+SIGNAL_DELTA = 15                  # dB between the average signals of linked addresses
+FEATURE_CACHE_SIZE = 4096
+MERSENNE_61 = (1 << 61) - 1
+
+Correlation = namedtuple("Correlation", "addresses devices randomized linked chains")
+
+FEATURE_CACHE = {}
+
+
+def advertisement_features(advertisement_data, name=None):
+    """Rotation-stable tokens of one BLE advertisement (bleak AdvertisementData or a stand-in).
+    Payload bytes are not used, only their layout: the bytes themselves rotate with the address."""
+    manufacturer = getattr(advertisement_data, "manufacturer_data", None)
+    uuids = getattr(advertisement_data, "service_uuids", None)
+    service_data = getattr(advertisement_data, "service_data", None)
+    key = (name, tuple(sorted((company, len(payload), payload[:1]) for company, payload in manufacturer.items())) if manufacturer else (),
+           tuple(sorted(uuids)) if uuids else (), tuple(sorted(service_data)) if service_data else (),
+           getattr(advertisement_data, "tx_power", None))
+    features = FEATURE_CACHE.get(key)
+    if features is None:
+        name, layouts, uuids, service_data, tx_power = key
+        tokens = [f"name:{name}"] if name else []
+        for company, size, first in layouts:
+            tokens.append(f"mfr:{company:04x}")
+            tokens.append(f"layout:{company:04x}:{size}:{first.hex()}")
+        tokens.extend(f"uuid:{uuid}" for uuid in uuids)
+        tokens.extend(f"sdata:{uuid}" for uuid in service_data)
+        if tx_power is not None:
+            tokens.append(f"tx:{tx_power}")
+        if len(FEATURE_CACHE) >= FEATURE_CACHE_SIZE:
+            FEATURE_CACHE.clear()
+        features = FEATURE_CACHE[key] = frozenset(tokens)
+    return features
+
+
+def probe_features(probes):
+    return frozenset(f"essid:{essid}" for essid in probes if essid)
+
+
+def interval_feature(count, first_seen, last_seen):
+    """Advertising interval on a log2 scale: phones keep it across rotations"""
+    if count < 3 or last_seen <= first_seen:
+        return None
+    return f"interval:{round(math.log2(1000 * (last_seen - first_seen) / (count - 1)))}"
+
+
+class MinHasher:
+    def __init__(self, permutations=MINHASH_PERMUTATIONS, seed=1):
+        rng = random.Random(seed)
+        self.parameters = [(rng.randrange(1, MERSENNE_61), rng.randrange(MERSENNE_61)) for _ in range(permutations)]
+        self.token_hashes = {}
+
+    def token_hash(self, token):
+        value = self.token_hashes.get(token)
+        if value is None:
+            value = self.token_hashes[token] = int.from_bytes(
+                hashlib.blake2b(token.encode(), digest_size=8).digest(), "little")
+        return value
+
+    def signature(self, tokens):
+        values = [self.token_hash(token) for token in tokens]
+        return tuple(min((a * value + b) % MERSENNE_61 for value in values) for a, b in self.parameters)
+
+
+def jaccard(a, b):
+    return len(a & b) / len(a | b) if a or b else 0.0
+
+
+class RandomizationIndex:
+    """Estimates how many physical devices are behind a set of (possibly randomized) addresses"""
+
+    def __init__(self, permutations=MINHASH_PERMUTATIONS, bands=LSH_BANDS, threshold=SIMILARITY_THRESHOLD,
+                 max_gap=MAX_ROTATION_GAP, overlap=ROTATION_OVERLAP, signal_delta=SIGNAL_DELTA):
+        self.hasher = MinHasher(permutations)
+        self.rows = max(1, permutations // bands)
+        self.bands = permutations // self.rows
+        self.threshold = threshold
+        self.max_gap = max_gap
+        self.overlap = overlap
+        self.signal_delta = signal_delta
+        self.addresses = []        # (address, features, first seen, last seen, signal)
+        self.fixed = 0             # globally unique addresses: one device each
+        self.buckets = {}          # (band, band signature) -> [address index, ...]
+
+    def add(self, address, features, first_seen, last_seen, signal=None):
+        if not is_locally_administered(address):
+            self.fixed += 1
+            return
+        index = len(self.addresses)
+        self.addresses.append((address, features, first_seen, last_seen, signal))
+        if not features:
+            return                 # nothing to compare: counted as its own device
+        signature = self.hasher.signature(features)
+        rows = self.rows
+        for band in range(self.bands):
+            self.buckets.setdefault((band, signature[band * rows:band * rows + rows]), []).append(index)
+
+    def candidates(self):
+        """(old, new) address index pairs sharing a bucket whose lifetimes follow each other"""
+        addresses, pairs, done = self.addresses, set(), set()
+        for members in self.buckets.values():
+            if len(members) < 2:
+                continue
+            # Identical feature sets fill the same buckets in every band: scan each group once
+            group = tuple(members)
+            if group in done:
+                continue
+            done.add(group)
+            members = sorted(members, key=lambda i: addresses[i][2])
+            starts = [addresses[i][2] for i in members]
+            for old in members:
+                last = addresses[old][3]
+                low = bisect_left(starts, last - self.overlap)
+                high = bisect_right(starts, last + self.max_gap)
+                for new in members[low:high]:
+                    if new != old and addresses[new][3] > last:
+                        pairs.add((old, new))
+        return pairs
+
+    def links(self):
+        """{old address index: new address index}, best matches first, one successor and one predecessor each"""
+        addresses, scored = self.addresses, []
+        for old, new in self.candidates():
+            _, old_features, _, last, old_signal = addresses[old]
+            _, new_features, first, _, new_signal = addresses[new]
+            if old_signal is not None and new_signal is not None and abs(old_signal - new_signal) > self.signal_delta:
+                continue
+            similarity = jaccard(old_features, new_features)
+            if similarity >= self.threshold:
+                scored.append((-similarity, abs(first - last), old, new))
+        scored.sort()
+        successors, predecessors = {}, set()
+        for _, _, old, new in scored:
+            if old not in successors and new not in predecessors:
+                successors[old] = new
+                predecessors.add(new)
+        return successors
+
+    def correlate(self):
+        successors = self.links()
+        linked = set(successors.values())
+        heads = [i for i in range(len(self.addresses)) if i not in linked]
+        chains = []
+        for i in heads:
+            chain = [self.addresses[i][0]]
+            while i in successors:
+                i = successors[i]
+                chain.append(self.addresses[i][0])
+            chains.append(chain)
+        return Correlation(self.fixed + len(self.addresses), self.fixed + len(chains), len(self.addresses),
+                           len(successors), [chain for chain in chains if len(chain) > 1])
+
+
+def correlate_ble(devices, **options):
+    """Correlation of BleTracker devices"""
+    options.setdefault("max_gap", BLE_ROTATION_GAP)
+    index = RandomizationIndex(**options)
+    for dev in devices:
+        features = dev.features
+        interval = interval_feature(dev.count, dev.first_seen, dev.last_seen)
+        if features and interval:
+            features = features | {interval}
+        index.add(dev.address, features, dev.first_seen, dev.last_seen, dev.rssi_avg)
+    return index.correlate()
+
+
+def correlate_stations(stations, **options):
+    """Correlation of Wi-Fi stations: Client records (station, probes, first / last seen and signal)"""
+    index = RandomizationIndex(**options)
+    for station in stations:
+        first, last = station.first_seen, station.last_seen
+        if first is None or last is None:
+            first = last = 0.0
+        signal = station.signal
+        index.add(station.station, probe_features(station.probes), first, last, signal if valid_rssi(signal) else None)
+    return index.correlate()
+
+
+def format_correlation(correlation, noun="devices"):
+    """'N addresses, ~M devices (K randomized addresses linked)'"""
+    text = f"{correlation.addresses} addresses, ~{correlation.devices} {noun}"
+    return f"{text} ({correlation.linked} randomized addresses linked)" if correlation.linked else text
+
+###### END MAC RANDOMIZATION CORRELATION ######
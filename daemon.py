@@ -0,0 +1,240 @@
+import os
+import json
+import time
+import signal
+import asyncio
+import threading
+
+from color import *
+from airodump import AirodumpWatcher
+from ble_tracker import BleTracker, track_ble
+from rtl_reader import rtl433_command, read_rtl433
+from rtl_hop import hop_rtl433, parse_bands
+from rtl_multi import SdrPool, read_receivers
+from rtl_aggregate import DeviceAggregator, DEDUP_WINDOW, LIVE_MAX_DEVICES, LIVE_IDLE
+from records import ap_json, client_json
+from sinks import rtl433_observation
+from wifi import start_airodump, remove_capture, wifi_event_observation
+from bluetooth import ble_observation
+from daemon_client import DAEMON_SOCKET, WIFI, BLE, RTL433, SOURCE_TYPES, daemon_status
+
+###### AIRSPY DAEMON ######
+
+WIFI_POLL = 1.0                    # seconds between airodump-ng CSV reads
+SUBSCRIBER_QUEUE = 10000           # observations buffered per client before the oldest are dropped
+MAX_REQUEST = 1 << 16
+
+
+class Subscriber:
+    """Observation queue of one streaming client; None in the queue ends the stream"""
+
+    def __init__(self, kinds):
+        self.kinds = frozenset(kinds)
+        self.queue = asyncio.Queue(SUBSCRIBER_QUEUE)
+        self.dropped = 0
+
+    def put(self, record):
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(record)
+
+
+class AirspyDaemon:
+    """Keeps airodump-ng, the BLE scanner and rtl_433 running and serves their state.
+
+    Everything runs on one event loop: rtl_433 and BLE are read asynchronously, airodump-ng's
+    CSV is parsed in a worker thread. Clients connect to a Unix socket (see daemon_client).
+    """
+
+    def __init__(self, path=DAEMON_SOCKET, wifi=True, ble=True, frequency=None, gain=None, protocol=None,
+                 sink=None, replay=None, dedup_window=DEDUP_WINDOW, receivers=None):
+        self.path = path
+        self.frequency = frequency
+        self.gain = gain
+        self.protocol = protocol
+        self.sink = sink
+        self.replay = replay
+        # Several SDRs ('FREQ@DEVICE'), merged into one stream; a replay stands in for all of them
+        self.pool = SdrPool(receivers, gain, protocol) if receivers and not replay else None
+        self.started = time.time()
+        self.stop = threading.Event()
+        self.subscribers = set()
+        self.watcher = None
+        self.wifi_lock = threading.Lock()   # the watcher is updated from a worker thread
+        self.tracker = BleTracker() if ble else None
+        self.devices = DeviceAggregator(dedup_window, LIVE_MAX_DEVICES, LIVE_IDLE) if frequency or receivers else None
+        self.sources = {}          # source -> {"running": bool, ...}
+        if wifi:
+            self.sources[WIFI] = {"running": False}
+        if ble:
+            self.sources[BLE] = {"running": False}
+        if frequency or receivers:
+            self.sources[RTL433] = {"running": False, "frequency": frequency}
+        if receivers:
+            self.sources[RTL433]["receivers"] = list(receivers)
+
+    def publish(self, record):
+        if self.sink:
+            self.sink.put(record)
+        for subscriber in self.subscribers:
+            if record["type"] in subscriber.kinds:
+                subscriber.put(record)
+
+    def poll_wifi(self, now):
+        with self.wifi_lock:
+            return self.watcher.poll(now)
+
+    async def run_wifi(self):
+        process, csv_file = start_airodump(WIFI_POLL, self.replay)
+        self.watcher = AirodumpWatcher(csv_file)
+        try:
+            while not self.stop.is_set() and process.poll() is None:
+                now = process.clock() if self.replay is not None else None
+                for event in await asyncio.to_thread(self.poll_wifi, now):
+                    self.publish(wifi_event_observation(event))
+                await asyncio.sleep(WIFI_POLL if self.replay is None or self.replay.speed else 0)
+        finally:
+            process.terminate()
+            process.wait()
+            remove_capture(csv_file, self.replay)
+
+    def on_ble_snapshot(self, tracker):
+        for dev in tracker.take_changed():
+            self.publish(ble_observation(dev))
+        for dev in tracker.expire():
+            self.publish(dict(ble_observation(dev), event="lost"))
+
+    async def run_ble(self):
+        stop = threading.Event()
+        scanner_factory = self.replay.scanner_factory(stop) if self.replay else None
+        watch = asyncio.ensure_future(asyncio.to_thread(self.stop.wait))
+        watch.add_done_callback(lambda _: stop.set())
+        try:
+            await track_ble(None, self.on_ble_snapshot, tracker=self.tracker, stop=stop, scanner_factory=scanner_factory)
+        finally:
+            stop.set()
+
+    def on_rtl_event(self, event):
+        if self.devices.add(event) is not None:
+            self.publish(rtl433_observation(event))
+
+    async def run_rtl433(self):
+        if self.pool is not None:
+            await read_receivers(None, None, self.on_rtl_event, self.stop, self.pool)
+            return
+        bands = parse_bands(self.frequency)
+        if len(bands) > 1 and not self.replay:
+            await hop_rtl433(bands, None, self.on_rtl_event, self.stop, gain=self.gain, protocol=self.protocol)
+            return
+        command = self.replay.rtl433_command() if self.replay else rtl433_command(self.frequency, self.gain, self.protocol)
+        await read_rtl433(command, None, self.on_rtl_event, self.stop)
+
+    async def run_source(self, name, run):
+        self.sources[name]["running"] = True
+        try:
+            await run()
+        except Exception as e:
+            self.sources[name]["error"] = str(e)
+            print(f"{Color.RED}{Style.BRIGHT}[!]{Style.RESET_ALL} {name} source stopped: {e}")
+        finally:
+            self.sources[name]["running"] = False
+
+    def status(self):
+        if self.pool is not None:
+            self.sources[RTL433]["health"] = self.pool.status()
+        return {"pid": os.getpid(), "uptime": time.time() - self.started, "sources": self.sources,
+                "subscribers": len(self.subscribers), "dropped": sum(s.dropped for s in self.subscribers)}
+
+    def snapshot(self, kinds):
+        result = {}
+        if WIFI in kinds and self.watcher is not None:
+            with self.wifi_lock:
+                result[WIFI] = {"aps": [ap_json(ap) for ap in self.watcher.aps.values()],
+                                "clients": [client_json(client) for client in self.watcher.clients.values()]}
+        if BLE in kinds and self.tracker is not None:
+            result[BLE] = [ble_observation(dev) for dev in self.tracker.by_signal()]
+        if RTL433 in kinds and self.devices is not None:
+            self.devices.evict()       # sensors idle past LIVE_IDLE, even when nothing new was heard
+            result[RTL433] = [{"label": stats.label, "model": stats.model, "id": stats.id, "channel": stats.channel,
+                               "count": stats.count, "packets": stats.packets, "first_seen": stats.first_seen,
+                               "last_seen": stats.last_seen, "last": stats.last} for stats in self.devices.by_activity()]
+        return result
+
+    async def stream(self, kinds, writer):
+        subscriber = Subscriber(kinds)
+        self.subscribers.add(subscriber)
+        try:
+            writer.write(b'{"ok": true}\n')
+            while True:
+                records = [await subscriber.queue.get()]
+                while not subscriber.queue.empty():
+                    records.append(subscriber.queue.get_nowait())
+                closing = None in records
+                writer.write("".join(json.dumps(record) + "\n" for record in records if record is not None).encode())
+                await writer.drain()
+                if closing:
+                    return
+        finally:
+            self.subscribers.discard(subscriber)
+
+    async def handle_client(self, reader, writer):
+        try:
+            request = json.loads(await reader.readline() or b"{}")
+            command = request.get("cmd")
+            if command == "status":
+                reply = self.status()
+            elif command == "snapshot":
+                reply = self.snapshot(request.get("kinds") or list(self.sources))
+            elif command == "subscribe":
+                kinds = request.get("kinds") or [kind for source in self.sources for kind in SOURCE_TYPES[source]]
+                await self.stream(kinds, writer)
+                return
+            elif command == "stop":
+                self.stop.set()
+                reply = {"ok": True}
+            else:
+                reply = {"error": f"unknown command: {command}"}
+            writer.write(json.dumps(reply).encode() + b"\n")
+            await writer.drain()
+        except (ValueError, AttributeError) as e:
+            writer.write(json.dumps({"error": f"bad request: {e}"}).encode() + b"\n")
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self):
+        if os.path.exists(self.path):
+            if daemon_status(self.path) is not None:
+                raise RuntimeError(f"another daemon is already listening on {self.path}")
+            os.unlink(self.path)
+        server = await asyncio.start_unix_server(self.handle_client, self.path, limit=MAX_REQUEST)
+        os.chmod(self.path, 0o600)
+
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(signum, self.stop.set)
+            except (NotImplementedError, RuntimeError):
+                pass
+
+        runners = {WIFI: self.run_wifi, BLE: self.run_ble, RTL433: self.run_rtl433}
+        tasks = [asyncio.ensure_future(self.run_source(name, runners[name])) for name in self.sources]
+        rtl = ", ".join(self.sources[RTL433]["receivers"]) if self.pool is not None else self.frequency
+        described = ", ".join(name if name != RTL433 else f"rtl433 {rtl}" for name in self.sources)
+        print(f"{Color.GREEN}{Style.BRIGHT}[*]{Style.RESET_ALL} Airspy daemon listening on {self.path} ({described}). Press CTRL+C to stop.")
+        try:
+            await asyncio.to_thread(self.stop.wait)
+        finally:
+            self.stop.set()
+            server.close()
+            for subscriber in self.subscribers:
+                subscriber.put(None)
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await server.wait_closed()
+            if os.path.exists(self.path):
+                os.unlink(self.path)
+            print(f"\n{Color.YELLOW}{Style.BRIGHT}[!] Airspy daemon stopped.{Style.RESET_ALL}")
+
+###### END AIRSPY DAEMON ######
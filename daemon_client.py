@@ -0,0 +1,217 @@
+import os
+import json
+import signal
+import socket
+import asyncio
+from datetime import datetime
+
+from color import *
+from oui import color_vendor, lookup_vendor, format_mac
+from records import ap_from_json, client_from_json
+from airodump import parse_channels
+
+###### DAEMON CLIENT ######
+
+# Airspy.py talks to a running `Airspy.py --daemon` over a Unix socket, one JSON
+# request per line:
+#   {"cmd": "status"}                       -> sources, uptime, subscribers
+#   {"cmd": "snapshot", "kinds": [...]}     -> current Wi-Fi / BLE / rtl_433 state
+#   {"cmd": "subscribe", "kinds": [...]}    -> {"ok": true}, then one observation per line
+#   {"cmd": "stop"}                         -> shuts the daemon down
+# Observations have the same fields as the --output sinks.
+
+DAEMON_SOCKET = os.path.join(os.environ.get("XDG_RUNTIME_DIR") or "/tmp", "airspy.sock")
+DAEMON_TIMEOUT = 5.0
+MAX_LINE = 1 << 20                  # longest observation line accepted from the stream
+WIFI, BLE, RTL433 = "wifi", "ble", "rtl433"
+# Observation types streamed by each source
+SOURCE_TYPES = {WIFI: ("wifi_ap", "wifi_client"), BLE: ("ble",), RTL433: ("rtl433",)}
+
+
+class DaemonError(Exception):
+    pass
+
+
+def connect(path=DAEMON_SOCKET, timeout=DAEMON_TIMEOUT):
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    client.settimeout(timeout)
+    try:
+        client.connect(path)
+    except OSError:
+        client.close()
+        raise
+    return client
+
+
+def daemon_request(request, path=DAEMON_SOCKET, timeout=DAEMON_TIMEOUT):
+    """Sends one request and returns the decoded reply"""
+    with connect(path, timeout) as client:
+        client.sendall(json.dumps(request).encode() + b"\n")
+        with client.makefile("rb") as reader:
+            line = reader.readline()
+    if not line:
+        raise DaemonError("daemon closed the connection")
+    reply = json.loads(line)
+    if isinstance(reply, dict) and "error" in reply:
+        raise DaemonError(reply["error"])
+    return reply
+
+
+def daemon_status(path=DAEMON_SOCKET):
+    """The daemon's status, or None when no daemon answers on `path`"""
+    try:
+        return daemon_request({"cmd": "status"}, path, timeout=1.0)
+    except (OSError, ValueError, DaemonError):
+        return None
+
+
+async def follow_daemon(kinds, on_record, path=DAEMON_SOCKET):
+    """Calls on_record(observation) for everything the daemon streams, until the connection closes"""
+    reader, writer = await asyncio.open_unix_connection(path, limit=MAX_LINE)
+    try:
+        writer.write(json.dumps({"cmd": "subscribe", "kinds": list(kinds)}).encode() + b"\n")
+        await writer.drain()
+        reply = json.loads(await reader.readline() or b"{}")
+        if "error" in reply or not reply.get("ok"):
+            raise DaemonError(reply.get("error", "subscription refused"))
+        while line := await reader.readline():
+            on_record(json.loads(line))
+    finally:
+        writer.close()
+
+
+def wanted_sources(args, status):
+    """Daemon sources the command line asks for, or None when the daemon's SDR setup differs"""
+    sources = status.get("sources", {})
+    wanted = []
+    if args.wifi or args.live_wifi:
+        wanted.append(WIFI)
+    if args.bluetooth or args.live_ble:
+        wanted.append(BLE)
+    if args.frequency or args.sdr:
+        rtl = sources.get(RTL433, {})
+        if rtl.get("frequency") != args.frequency or rtl.get("receivers") != args.sdr:
+            return None
+        wanted.append(RTL433)
+    return wanted
+
+
+def daemon_covers(args, status):
+    """True when everything requested on the command line can be answered by the daemon:
+    each wanted source is configured and still running"""
+    sources = status.get("sources", {})
+    wanted = wanted_sources(args, status)
+    return bool(wanted) and all(sources.get(source, {}).get("running") for source in wanted)
+
+
+def print_wifi_snapshot(snapshot, filter_ssid=None, filter_channel=None, min_signal=None):
+    channels = set(parse_channels(filter_channel)) if filter_channel else None
+    clients = {}
+    for client in map(client_from_json, snapshot["clients"]):
+        clients.setdefault(client.bssid, []).append(client)
+    print("\n=== DETECTED WI-FI NETWORKS ===")
+    for ap in sorted(map(ap_from_json, snapshot["aps"]), key=lambda ap: ap.signal, reverse=True):
+        if not ap.essid or (filter_ssid and ap.essid != filter_ssid):
+            continue
+        if (channels and ap.channel not in channels) or (min_signal is not None and ap.signal < min_signal):
+            continue
+        print(f"\nSSID: {Color.GREEN}{Style.BRIGHT}{ap.essid}{Style.RESET_ALL} | BSSID: {format_mac(ap.bssid)} -> {color_vendor(lookup_vendor(ap.bssid))} | "
+              f"Signal: {ap.signal} dBm | Security: {ap.security} | Channel: {ap.channel}")
+        if clients.get(ap.bssid):
+            print("   +- CONNECTED DEVICES")
+            for client in clients[ap.bssid]:
+                print(f"   Device: {format_mac(client.station)} -> {color_vendor(lookup_vendor(client.station))} | Signal: {client.signal} dBm")
+
+
+def print_ble_snapshot(devices):
+    print(f"\n{Color.GREEN}{Style.BRIGHT}=== DETECTED BLUETOOTH DEVICES ==={Style.RESET_ALL}")
+    for dev in devices:
+        rssi = "? dBm" if dev["rssi"] is None else f"{dev['rssi']:.0f} dBm (min {dev['rssi_min']}, max {dev['rssi_max']})"
+        print(f"Name: {dev['name'] or dev['key']} | BSSID: {dev['key']} -> {color_vendor(lookup_vendor(dev['key']))} | "
+              f"Signal: {rssi} | Advertisements: {dev['advertisements']}")
+    print(f"\n{Color.GREEN}{Style.BRIGHT}[*]{Style.RESET_ALL} {len(devices)} devices")
+
+
+def print_rtl_snapshot(devices):
+    print(f"\n{Color.GREEN}{Style.BRIGHT}=== DETECTED DEVICES ==={Style.RESET_ALL}")
+    if not devices:
+        print(f"{Color.RED}{Style.BRIGHT}[!]{Style.RESET_ALL} No devices detected.")
+    for dev in devices:
+        seen = f"{datetime.fromtimestamp(dev['first_seen']).strftime('%H:%M:%S')} -> {datetime.fromtimestamp(dev['last_seen']).strftime('%H:%M:%S')}"
+        print(f"\n{Color.MAGENTA}{Style.BRIGHT}--> {dev['label']}{Style.RESET_ALL} "
+              f"({dev['count']} transmissions, {dev['packets']} packets, seen {seen})")
+        for x, y in dev["last"].items():
+            print(f"   - {x} : {y}")
+
+
+def print_observation(record):
+    stamp = datetime.fromtimestamp(record["time"]).strftime('%H:%M:%S')
+    kind = record["type"]
+    if kind == "wifi_ap":
+        print(f"[{stamp}] {Color.GREEN}{Style.BRIGHT}{record.get('event', 'ap'):<12}{Style.RESET_ALL} SSID: {record['essid'] or '<Hidden>'} | "
+              f"BSSID: {record['key']} | Signal: {record['signal']} dBm | Channel: {record['channel']}")
+    elif kind == "wifi_client":
+        print(f"[{stamp}] {Color.MAGENTA}{Style.BRIGHT}{record.get('event', 'client'):<12}{Style.RESET_ALL} Device: {record['key']} | "
+              f"AP: {record['bssid']} | Signal: {record['signal']} dBm")
+    elif kind == "ble":
+        print(f"[{stamp}] {Color.CYAN}{Style.BRIGHT}{record.get('event', 'ble'):<12}{Style.RESET_ALL} {record['name'] or 'Unknown'} | "
+              f"{record['key']} | Signal: {record['rssi']} dBm | Advertisements: {record['advertisements']}")
+    else:
+        values = ", ".join(f"{k}: {v}" for k, v in record.items() if k not in ("time", "type", "key", "model", "id", "channel"))
+        print(f"[{stamp}] {Color.YELLOW}{Style.BRIGHT}{'rtl433':<12}{Style.RESET_ALL} {record['key']} | {values}")
+
+
+async def serve_from_daemon(args, path=DAEMON_SOCKET):
+    """Answers -w / -b / -f from the daemon's state and streams the --live-* modes.
+    Returns False when no daemon can answer the whole request; only the errors of the
+    daemon's stopped sources are printed then."""
+    status = daemon_status(path)
+    if status is None:
+        return False
+    if not daemon_covers(args, status):
+        for source in wanted_sources(args, status) or []:
+            error = status["sources"].get(source, {}).get("error")
+            if error:
+                print(f"{Color.YELLOW}{Style.BRIGHT}[!]{Style.RESET_ALL} The daemon's {source} source stopped ({error}), scanning locally")
+        return False
+    print(f"{Color.GREEN}{Style.BRIGHT}[*]{Style.RESET_ALL} Answered by the Airspy daemon (pid {status['pid']}, up {status['uptime']:.0f}s)")
+
+    kinds = [kind for kind, wanted in ((WIFI, args.wifi and not args.live_wifi), (BLE, args.bluetooth and not args.live_ble),
+                                        (RTL433, (args.frequency or args.sdr) and not args.live_sdr)) if wanted]
+    if kinds:
+        snapshot = daemon_request({"cmd": "snapshot", "kinds": kinds}, path)
+        if WIFI in snapshot:
+            print_wifi_snapshot(snapshot[WIFI], args.filter_ssid, args.filter_channel, args.min_signal)
+            if args.wifi_channels:
+                from wifi import analyze_wifi_channels  # NumPy only when planning channels
+                analyze_wifi_channels([ap_from_json(ap) for ap in snapshot[WIFI]["aps"]], args.channel_width)
+        if BLE in snapshot:
+            print_ble_snapshot(snapshot[BLE])
+        if RTL433 in snapshot:
+            print_rtl_snapshot(snapshot[RTL433])
+
+    live = [kind for source, wanted in ((WIFI, args.live_wifi), (BLE, args.live_ble), (RTL433, args.live_sdr))
+            if wanted for kind in SOURCE_TYPES[source]]
+    if live:
+        print(f"\n{Color.GREEN}{Style.BRIGHT}[*]{Style.RESET_ALL} Streaming from the daemon... (Press CTRL+C to stop)")
+        task = asyncio.ensure_future(follow_daemon(live, print_observation, path))
+        loop = asyncio.get_running_loop()
+        try:
+            loop.add_signal_handler(signal.SIGINT, task.cancel)
+        except (NotImplementedError, RuntimeError):
+            pass
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        except (OSError, ValueError, DaemonError) as e:
+            print(f"{Color.RED}{Style.BRIGHT}[!]{Style.RESET_ALL} Daemon stream failed: {e}")
+        finally:
+            try:
+                loop.remove_signal_handler(signal.SIGINT)
+            except (NotImplementedError, RuntimeError):
+                pass
+        print(f"\n{Color.YELLOW}{Style.BRIGHT}[!] Monitoring stopped by user.{Style.RESET_ALL}")
+    return True
+
+###### END DAEMON CLIENT ######
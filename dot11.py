@@ -0,0 +1,506 @@
+import os
+import sys
+import time
+import struct
+import argparse
+
+from oui import format_mac
+from records import AccessPoint, Client
+from airodump import AirodumpWatcher, AirodumpCapture
+
+###### 802.11 FRAMES ######
+
+# Reads pcap captures of 802.11 frames (airodump-ng's .cap output, or `tcpdump -w -` on a
+# monitor interface) and keeps the same AP / client model as the airodump-ng CSV, updated
+# on every frame: per-frame radiotap signal, beacon interval jitter, probed ESSIDs and
+# devices too short-lived to make it into a CSV rewrite.
+#
+# Frames are decoded in place with struct.unpack_from at offsets into the read buffer; the
+# only per-frame objects are the 6-byte MAC keys. Radiotap layouts are resolved once per
+# distinct `present` bitmap and cached.
+
+PCAP_MAGIC_US = 0xa1b2c3d4
+PCAP_MAGIC_NS = 0xa1b23c4d
+PCAPNG_MAGIC = 0x0a0d0d0a
+LINKTYPE_IEEE802_11 = 105
+LINKTYPE_RADIOTAP = 127
+READ_CHUNK = 1 << 22               # bytes read from the capture per poll
+IE_REFRESH = 100                   # beacons between full re-parses of an unchanged IE layout
+UNKNOWN_SIGNAL = -1                # airodump-ng's power for frames without a radiotap signal
+
+PCAP_HEADER_LE = struct.Struct("<IHHiIII")
+PCAP_HEADER_BE = struct.Struct(">IHHiIII")
+RECORD_LE = struct.Struct("<IIII")
+RECORD_BE = struct.Struct(">IIII")
+U16 = struct.Struct("<H")
+U32 = struct.Struct("<I")
+RADIOTAP = struct.Struct("<HI")    # it_len, first it_present word
+S8 = tuple(range(128)) + tuple(range(-128, 0))
+
+# Radiotap fields up to dBm antenna signal: bit -> (alignment, size)
+RADIOTAP_FIELDS = ((8, 8), (1, 1), (1, 1), (2, 4), (2, 2), (1, 1))
+RT_FLAGS, RT_CHANNEL, RT_SIGNAL = 1, 3, 5
+FLAG_FCS = 0x10                    # frame ends with a 4-byte FCS
+FLAG_BAD_FCS = 0x40
+
+CIPHERS = {1: "WEP40", 2: "TKIP", 4: "CCMP", 5: "WEP104", 8: "GCMP", 9: "GCMP256", 10: "CCMP256"}
+AKMS = {1: "MGT", 2: "PSK", 3: "MGT", 4: "PSK", 5: "MGT", 6: "PSK", 8: "SAE", 9: "SAE", 12: "MGT", 18: "OWE"}
+WPA_IE = b"\x00\x50\xf2\x01"
+
+
+def frequency_channel(frequency):
+    if frequency == 2484:
+        return 14
+    if 2412 <= frequency < 2484:
+        return (frequency - 2407) // 5
+    if 5000 <= frequency < 5925:
+        return (frequency - 5000) // 5
+    if 5925 <= frequency <= 7125:
+        return (frequency - 5950) // 5
+    return -1
+
+
+def radiotap_layout(present, words):
+    """(flags, channel, signal) offsets from the start of the radiotap header, 0 when absent,
+    and the end of those fields"""
+    offset = 4 + 4 * words
+    found = [0, 0, 0, 0, 0, 0]
+    for bit, (align, size) in enumerate(RADIOTAP_FIELDS):
+        if present & (1 << bit):
+            offset = (offset + align - 1) & -align
+            found[bit] = offset
+            offset += size
+    return found[RT_FLAGS], found[RT_CHANNEL], found[RT_SIGNAL], offset
+
+
+def parse_ssid(buf, start, end):
+    if start + 2 > end or buf[start] != 0:
+        return None
+    ssid = buf[start + 2:min(end, start + 2 + buf[start + 1])]
+    return "" if not ssid.strip(b"\x00") else ssid.decode("utf-8", "replace")
+
+
+def parse_suites(buf, offset, end, names):
+    """Names of a counted list of cipher / AKM suites; returns (names, next offset)"""
+    if offset + 2 > end:
+        return [], end
+    count = U16.unpack_from(buf, offset)[0]
+    offset += 2
+    found = []
+    for _ in range(count):
+        if offset + 4 > end:
+            break
+        name = names.get(buf[offset + 3])
+        if name and name not in found:
+            found.append(name)
+        offset += 4
+    return found, offset
+
+
+def parse_rsn(buf, offset, end):
+    """(ciphers, akms) of an RSN or WPA element body (after the version field)"""
+    offset += 4                    # group cipher
+    ciphers, offset = parse_suites(buf, offset, end, CIPHERS)
+    akms, offset = parse_suites(buf, offset, end, AKMS)
+    return ciphers, akms
+
+
+def beacon_security(capability, rsn, wpa):
+    """airodump-ng's "Privacy Cipher Authentication" string, as parse_security builds it"""
+    ciphers, akms = rsn or wpa or ([], [])
+    if rsn:
+        privacy = "WPA3 WPA2" if "SAE" in akms and "PSK" in akms else "WPA3" if "SAE" in akms else "WPA2"
+        if wpa:
+            privacy += " WPA"
+    elif wpa:
+        privacy = "WPA"
+    elif capability & 0x10:
+        privacy, ciphers = "WEP", ["WEP"]
+    else:
+        privacy = "OPN"
+    return f"{privacy} {' '.join(ciphers) or 'Unknown'} {' '.join(akms) or 'Unknown'}"
+
+
+class FrameAp:
+    __slots__ = ("bssid", "signal", "signal_min", "signal_max", "frames", "beacons", "data", "channel", "essid",
+                 "security", "interval", "first_seen", "last_seen", "last_beacon", "jitter", "jitter_count",
+                 "ies_length", "ies_age")
+
+    def __init__(self, bssid, now):
+        self.bssid = bssid
+        self.signal = UNKNOWN_SIGNAL
+        self.signal_min = self.signal_max = None
+        self.frames = self.beacons = self.data = 0
+        self.channel = -1
+        self.essid = ""
+        self.security = "OPN Unknown Unknown"
+        self.interval = 0.0        # nominal beacon interval, seconds
+        self.first_seen = self.last_seen = now
+        self.last_beacon = None
+        self.jitter = 0.0
+        self.jitter_count = 0
+        self.ies_length = -1
+        self.ies_age = 0
+
+
+class FrameStation:
+    __slots__ = ("station", "bssid", "signal", "signal_min", "signal_max", "frames", "probes", "first_seen", "last_seen")
+
+    def __init__(self, station, now):
+        self.station = station
+        self.bssid = None          # raw BSSID bytes
+        self.signal = UNKNOWN_SIGNAL
+        self.signal_min = self.signal_max = None
+        self.frames = 0
+        self.probes = []
+        self.first_seen = self.last_seen = now
+
+
+class FrameTracker:
+    """AP / station state built from raw pcap bytes, fed in chunks of any size"""
+
+    def __init__(self, history=None):
+        self.aps = {}              # raw BSSID bytes -> FrameAp
+        self.stations = {}         # raw MAC bytes -> FrameStation
+        self.changed_aps = set()
+        self.changed_stations = set()
+        self.layouts = {}
+        self.pending = b""
+        self.header = None         # (record Struct, timestamp scale, linktype) once the pcap header is read
+        self.frames = 0
+        self.clock = None          # capture time of the latest frame
+        self.history = history     # RssiHistory fed with every frame's signal, keyed by MAC
+
+    @staticmethod
+    def mac(raw):
+        return int.from_bytes(raw, "big")
+
+    def read_header(self, buf):
+        magic = U32.unpack_from(buf)[0]
+        if magic == PCAPNG_MAGIC:
+            raise ValueError("pcapng captures are not supported, convert with: editcap -F pcap in.pcapng out.cap")
+        for layout in (PCAP_HEADER_LE, PCAP_HEADER_BE):
+            magic, _, _, _, _, _, linktype = layout.unpack_from(buf)
+            if magic in (PCAP_MAGIC_US, PCAP_MAGIC_NS):
+                break
+        else:
+            raise ValueError("not a pcap capture")
+        if linktype not in (LINKTYPE_RADIOTAP, LINKTYPE_IEEE802_11):
+            raise ValueError(f"pcap link type {linktype} is not 802.11 (radiotap or raw 802.11 expected)")
+        record = RECORD_LE if layout is PCAP_HEADER_LE else RECORD_BE
+        self.header = (record, 1e-9 if magic == PCAP_MAGIC_NS else 1e-6, linktype)
+
+    def feed(self, data):
+        """Parses every complete record in pending + data; returns the number of frames"""
+        buf = self.pending + data if self.pending else bytes(data)
+        position = 0
+        if self.header is None:
+            if len(buf) < PCAP_HEADER_LE.size:
+                self.pending = buf
+                return 0
+            self.read_header(buf)
+            position = PCAP_HEADER_LE.size
+        record, scale, linktype = self.header
+        unpack_record = record.unpack_from
+        frame = self.radiotap_frame if linktype == LINKTYPE_RADIOTAP else self.frame
+        size = len(buf)
+        count = 0
+        while position + 16 <= size:
+            seconds, fraction, length, _ = unpack_record(buf, position)
+            start = position + 16
+            if start + length > size:
+                break
+            frame(buf, start, length, seconds + fraction * scale, None)
+            position = start + length
+            count += 1
+        self.pending = buf[position:]
+        self.frames += count
+        return count
+
+    def radiotap_frame(self, buf, start, length, now, signal):
+        if length < 8:
+            return
+        header_length, present = RADIOTAP.unpack_from(buf, start + 2)
+        if header_length > length:
+            return                                         # truncated record or corrupt header
+        if present & 0x80000000:
+            words = 1
+            while words * 4 + 8 <= header_length and U32.unpack_from(buf, start + 4 + 4 * words)[0] & 0x80000000:
+                words += 1
+            present |= (words + 1) << 32   # the field offsets also depend on the number of bitmap words
+        layout = self.layouts.get(present)
+        if layout is None:
+            layout = self.layouts[present] = radiotap_layout(present & 0xffffffff, (present >> 32) or 1)
+        flags_at, channel_at, signal_at, fields_end = layout
+        if fields_end > header_length:
+            return
+        flags = buf[start + flags_at] if flags_at else 0
+        if flags & FLAG_BAD_FCS:
+            return
+        if signal_at:
+            signal = S8[buf[start + signal_at]]
+        length -= header_length + (4 if flags & FLAG_FCS else 0)
+        frequency = U16.unpack_from(buf, start + channel_at)[0] if channel_at else 0
+        self.frame(buf, start + header_length, length, now, signal, frequency)
+
+    def frame(self, buf, p, length, now, signal, frequency=0):
+        if length < 24:
+            return
+        self.clock = now
+        control = buf[p]
+        kind = control & 0x0c
+        if kind == 0x00:                                   # management
+            subtype = control >> 4
+            if subtype == 8 or subtype == 5:
+                self.beacon(buf, p, length, now, signal, frequency, subtype == 8)
+            elif subtype == 4:
+                self.probe_request(buf, p, length, now, signal)
+            elif subtype in (0, 2, 11):                    # (re)association request, authentication
+                station, bssid = buf[p + 10:p + 16], buf[p + 16:p + 22]
+                if station != bssid:
+                    self.station_frame(station, bssid, now, signal)
+        elif kind == 0x08:                                 # data
+            direction = buf[p + 1] & 3
+            if direction == 1:                             # to the AP
+                bssid, station = buf[p + 4:p + 10], buf[p + 10:p + 16]
+            elif direction == 2:                           # from the AP
+                bssid, station = buf[p + 10:p + 16], buf[p + 4:p + 10]
+            elif direction == 0:
+                bssid, station = buf[p + 16:p + 22], buf[p + 10:p + 16]
+            else:
+                return
+            ap = self.aps.get(bssid)
+            if ap is not None:
+                ap.frames += 1
+                ap.last_seen = now
+                if not control & 0x40:                     # not a null (no data) frame
+                    ap.data += 1
+                if direction == 2 and signal is not None:
+                    ap.signal = signal
+                    if self.history is not None:
+                        self.history.add(ap.bssid, signal, now)
+                self.changed_aps.add(bssid)
+            if not station[0] & 1:                         # unicast only
+                self.station_frame(station, bssid, now, None if direction == 2 else signal)
+
+    def beacon(self, buf, p, length, now, signal, frequency, is_beacon):
+        key = buf[p + 16:p + 22]
+        ap = self.aps.get(key)
+        if ap is None:
+            ap = self.aps[key] = FrameAp(self.mac(key), now)
+        ap.frames += 1
+        ap.last_seen = now
+        if signal is not None:
+            ap.signal = signal
+            if ap.signal_min is None or signal < ap.signal_min:
+                ap.signal_min = signal
+            if ap.signal_max is None or signal > ap.signal_max:
+                ap.signal_max = signal
+            if self.history is not None:
+                self.history.add(ap.bssid, signal, now)
+        if length < 36:
+            return
+        end = p + length
+        if is_beacon:
+            ap.beacons += 1
+            interval = ap.interval
+            if ap.last_beacon is not None and interval:
+                # Distance to the nearest multiple of the interval, so missed beacons do not count
+                remainder = (now - ap.last_beacon) % interval
+                ap.jitter += min(remainder, interval - remainder)
+                ap.jitter_count += 1
+            ap.last_beacon = now
+            if end - p - 36 != ap.ies_length or ap.ies_age >= IE_REFRESH:
+                self.parse_beacon(ap, buf, p, end, frequency)
+            else:
+                ap.ies_age += 1
+        elif not ap.essid:                                 # probe responses reveal hidden SSIDs
+            ap.essid = parse_ssid(buf, p + 36, end) or ""
+            if ap.channel < 0 and frequency:
+                ap.channel = frequency_channel(frequency)
+        self.changed_aps.add(key)
+
+    def parse_beacon(self, ap, buf, p, end, frequency):
+        ap.interval = U16.unpack_from(buf, p + 32)[0] * 1.024e-3
+        capability = U16.unpack_from(buf, p + 34)[0]
+        offset = p + 36
+        ap.ies_length = end - offset
+        ap.ies_age = 0
+        channel = frequency_channel(frequency) if frequency else -1
+        rsn = wpa = None
+        while offset + 2 <= end:
+            element, size = buf[offset], buf[offset + 1]
+            body = offset + 2
+            if body + size > end:
+                break
+            if element == 0:
+                ap.essid = parse_ssid(buf, offset, end) or ap.essid
+            elif element == 3 and size >= 1:
+                channel = buf[body]
+            elif element == 48 and size >= 2:
+                rsn = parse_rsn(buf, body + 2, body + size)
+            elif element == 221 and size >= 6 and buf[body:body + 4] == WPA_IE:
+                wpa = parse_rsn(buf, body + 6, body + size)
+            offset = body + size
+        ap.channel = channel
+        ap.security = beacon_security(capability, rsn, wpa)
+
+    def probe_request(self, buf, p, length, now, signal):
+        key = buf[p + 10:p + 16]
+        if key[0] & 1:
+            return
+        station = self.station_frame(key, None, now, signal)
+        ssid = parse_ssid(buf, p + 24, p + length)
+        if ssid and ssid not in station.probes:
+            station.probes.append(ssid)
+
+    def station_frame(self, key, bssid, now, signal):
+        station = self.stations.get(key)
+        if station is None:
+            station = self.stations[key] = FrameStation(self.mac(key), now)
+        station.frames += 1
+        station.last_seen = now
+        if bssid is not None and not bssid[0] & 1:
+            station.bssid = bssid
+        if signal is not None:
+            station.signal = signal
+            if station.signal_min is None or signal < station.signal_min:
+                station.signal_min = signal
+            if station.signal_max is None or signal > station.signal_max:
+                station.signal_max = signal
+            if self.history is not None:
+                self.history.add(station.station, signal, now)
+        self.changed_stations.add(key)
+        return station
+
+    def ap(self, key):
+        """The AP as an AccessPoint, like an airodump-ng CSV row (frame-level fields stay on self.aps)"""
+        ap = self.aps[key]
+        return AccessPoint(ap.bssid, ap.essid, ap.signal, ap.channel, ap.security, ap.beacons, ap.data, ap.last_seen)
+
+    def client(self, key):
+        """The station as a Client, like an airodump-ng CSV row (frame-level fields stay on self.stations)"""
+        station = self.stations[key]
+        return Client(station.station, self.mac(station.bssid) if station.bssid else None, station.signal,
+                      tuple(station.probes), station.first_seen, station.last_seen)
+
+    def take_changed(self):
+        """(AP keys, station keys) updated since the previous call"""
+        aps, stations = self.changed_aps, self.changed_stations
+        self.changed_aps, self.changed_stations = set(), set()
+        return aps, stations
+
+    def capture(self):
+        """AirodumpCapture of everything seen so far"""
+        capture = AirodumpCapture()
+        for ap in self.aps.values():
+            capture.add_ap(ap.bssid, ap.signal, ap.channel, ap.security, ap.essid, ap.beacons, ap.data)
+        for station in self.stations.values():
+            capture.add_client(station.station, self.mac(station.bssid) if station.bssid else None, station.signal,
+                               tuple(station.probes), station.first_seen, station.last_seen)
+        return capture
+
+
+class PcapWatcher(AirodumpWatcher):
+    """AirodumpWatcher fed by 802.11 frames instead of CSV rewrites: the same events, from a
+    pcap file (read to its end, or followed while airodump-ng writes it) or a pipe ("-" for stdin).
+
+    Devices expire in capture time (the frames' timestamps), or on the wall clock for live
+    sources: a followed file, or a pipe whose frames are recent.
+    """
+
+    def __init__(self, source, lost_after=60, signal_delta=3, follow=False):
+        super().__init__(None, lost_after, signal_delta)
+        self.tracker = FrameTracker()
+        self.source = source
+        self.follow = follow
+        self.file = None
+        self.pipe = source == "-" or hasattr(source, "read")
+        self.finished = False
+
+    def read(self):
+        if self.file is None:
+            if self.source == "-":
+                self.file = sys.stdin.buffer
+            elif hasattr(self.source, "read"):
+                self.file = self.source
+            else:
+                try:
+                    self.file = open(self.source, "rb")
+                except FileNotFoundError:
+                    if not self.follow:
+                        raise
+                    return b""     # airodump-ng has not written it yet
+            if self.pipe:
+                os.set_blocking(self.file.fileno(), False)
+        if self.pipe:
+            try:
+                data = os.read(self.file.fileno(), READ_CHUNK)
+            except BlockingIOError:
+                return b""
+            self.finished = not data
+            return data
+        data = self.file.read(READ_CHUNK)
+        self.finished = not data and not self.follow
+        return data
+
+    def poll(self, now=None):
+        events = []
+        data = self.read()
+        if data:
+            self.tracker.feed(data)
+        aps, stations = self.tracker.take_changed()
+        for key in aps:
+            self.update_ap(self.tracker.ap(key), events)
+        for key in stations:
+            self.update_client(self.tracker.client(key), events)
+        if now is None:
+            now = self.tracker.clock
+            if (self.pipe or self.follow) and (now is None or time.time() - now < self.lost_after):
+                now = time.time()
+        if now is not None:
+            self.expire(now, events)
+        return events
+
+    def close(self):
+        if self.file is not None and self.file is not sys.stdin.buffer and not hasattr(self.source, "read"):
+            self.file.close()
+
+
+def load_pcap(path, history=None):
+    """AirodumpCapture built from every frame of a pcap file ('-' for stdin), or None when the file does not exist.
+    `history` (an RssiHistory) receives the signal of every frame."""
+    tracker = FrameTracker(history)
+    try:
+        with (open(path, "rb") if path != "-" else sys.stdin.buffer) as file:
+            while data := file.read(READ_CHUNK):
+                tracker.feed(data)
+    except FileNotFoundError:
+        return None
+    return tracker.capture()
+
+###### END 802.11 FRAMES ######
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize the APs and stations of an 802.11 pcap capture")
+    parser.add_argument("path", help="pcap file (radiotap or raw 802.11), '-' for stdin")
+    parser.add_argument("--top", type=int, default=10, help="APs listed, strongest first")
+    args = parser.parse_args()
+
+    tracker = FrameTracker()
+    start = time.perf_counter()
+    with (open(args.path, "rb") if args.path != "-" else sys.stdin.buffer) as file:
+        while data := file.read(READ_CHUNK):
+            tracker.feed(data)
+    elapsed = time.perf_counter() - start
+    print(f"{args.path}: {tracker.frames} frames in {elapsed:.2f}s ({tracker.frames / max(elapsed, 1e-9):,.0f}/s), "
+          f"{len(tracker.aps)} APs, {len(tracker.stations)} stations")
+    for ap in sorted(tracker.aps.values(), key=lambda ap: ap.signal, reverse=True)[:args.top]:
+        jitter = f"{ap.jitter / ap.jitter_count * 1000:.2f} ms" if ap.jitter_count else "-"
+        print(f"   {format_mac(ap.bssid)}  ch {ap.channel:>3}  {ap.signal:>4} dBm ({ap.signal_min}..{ap.signal_max})  "
+              f"{ap.beacons:>6} beacons  jitter {jitter:>9}  {ap.security:<22} {ap.essid or '<Hidden>'}")
+
+
+if __name__ == "__main__":
+    main()
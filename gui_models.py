@@ -0,0 +1,183 @@
+from operator import itemgetter
+
+from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex, QSortFilterProxyModel
+
+###### GUI TABLE MODELS ######
+
+DISPLAY_ROLE = Qt.DisplayRole
+
+class KeyedTableModel(QAbstractTableModel):
+    """Table model over a list of rows (dicts or records) identified by a key (BSSID, address, device id).
+
+    update() takes the full current list and only signals what differs from the previous
+    one: dataChanged for the changed cells, rowsInserted for new keys and rowsRemoved for
+    missing ones. Views keep their selection, scroll position and sort order.
+    `columns` is a list of (header, field) where field is a dict key or a function of the row.
+
+    Sorting is done here with a Python sort over the cached column values, rather than by
+    QSortFilterProxyModel, which calls data() twice per comparison.
+    """
+
+    def __init__(self, columns, key, parent=None):
+        super().__init__(parent)
+        self.headers = [header for header, _ in columns]
+        self.getters = [field if callable(field) else itemgetter(field) for _, field in columns]
+        self.key = key if callable(key) else itemgetter(key)
+        self.rows = []             # source rows
+        self.values = []           # per row: tuple of column values
+        self.keys = []
+        self.positions = {}        # key -> row
+        self.sort_column = -1
+        self.sort_order = Qt.AscendingOrder
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.headers)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.headers[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        # Views ask for several roles per visible cell on every paint: answer the others first
+        if role != DISPLAY_ROLE or not index.isValid():
+            return None
+        value = self.values[index.row()][index.column()]
+        return "" if value is None else str(value)
+
+    def row_data(self, row):
+        return self.rows[row]
+
+    def row_of(self, key):
+        return self.positions.get(key)
+
+    def row_values(self, row):
+        return tuple([getter(row) for getter in self.getters])
+
+    def update(self, rows):
+        """Replaces the content with `rows`, signalling only the differences"""
+        incoming = {}
+        for row in rows:
+            incoming[self.key(row)] = row
+
+        # Removed keys, from the bottom up so earlier positions stay valid
+        gone = sorted(self.positions[key] for key in self.positions if key not in incoming)
+        for first, last in reversed(runs(gone)):
+            self.beginRemoveRows(QModelIndex(), first, last)
+            del self.rows[first:last + 1]
+            del self.values[first:last + 1]
+            del self.keys[first:last + 1]
+            self.endRemoveRows()
+        if gone:
+            self.positions = {key: i for i, key in enumerate(self.keys)}
+
+        start_count = len(self.rows)
+
+        # Changed rows: one dataChanged per run of consecutive rows
+        changed = []
+        for i, key in enumerate(self.keys):
+            row = incoming.pop(key)
+            values = self.row_values(row)
+            self.rows[i] = row
+            if values != self.values[i]:
+                self.values[i] = values
+                changed.append(i)
+        for first, last in runs(changed):
+            self.dataChanged.emit(self.index(first, 0), self.index(last, len(self.headers) - 1), [Qt.DisplayRole])
+
+        # New keys are appended; the proxy places them in sort order
+        if incoming:
+            start = len(self.rows)
+            self.beginInsertRows(QModelIndex(), start, start + len(incoming) - 1)
+            for key, row in incoming.items():
+                self.positions[key] = len(self.rows)
+                self.keys.append(key)
+                self.rows.append(row)
+                self.values.append(self.row_values(row))
+            self.endInsertRows()
+
+        if changed or start_count != len(self.rows) or gone:
+            self.resort()
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        self.sort_column = column
+        self.sort_order = order
+        self.resort()
+
+    def resort(self):
+        """Reorders rows by the sort column, moving persistent indexes (selection, current row) along"""
+        if self.sort_column < 0 or not self.rows:
+            return
+        column = self.sort_column
+        order = sorted(range(len(self.rows)), key=lambda i: sort_key(self.values[i][column]),
+                       reverse=self.sort_order == Qt.DescendingOrder)
+        if all(i == row for i, row in enumerate(order)):
+            return
+
+        self.layoutAboutToBeChanged.emit()
+        new_row = [0] * len(order)
+        for new, old in enumerate(order):
+            new_row[old] = new
+        self.rows = [self.rows[i] for i in order]
+        self.values = [self.values[i] for i in order]
+        self.keys = [self.keys[i] for i in order]
+        self.positions = {key: i for i, key in enumerate(self.keys)}
+        old_indexes = self.persistentIndexList()
+        new_indexes = [self.index(new_row[index.row()], index.column()) for index in old_indexes]
+        self.changePersistentIndexList(old_indexes, new_indexes)
+        self.layoutChanged.emit()
+
+    def clear(self):
+        self.beginResetModel()
+        self.rows, self.values, self.keys, self.positions = [], [], [], {}
+        self.endResetModel()
+
+
+def sort_key(value):
+    """Numbers before text, missing values first (last in descending order)"""
+    if value is None:
+        return (0, 0)
+    if isinstance(value, (int, float)):
+        return (1, value)
+    return (2, str(value))
+
+
+def runs(positions):
+    """Groups ascending row numbers into (first, last) runs of consecutive rows"""
+    result = []
+    for position in positions:
+        if result and position == result[-1][1] + 1:
+            result[-1] = (result[-1][0], position)
+        else:
+            result.append((position, position))
+    return result
+
+
+class TableProxy(QSortFilterProxyModel):
+    """Filter proxy that leaves sorting to the KeyedTableModel underneath"""
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        self.sourceModel().sort(column, order)
+
+    def sortColumn(self):
+        return self.sourceModel().sort_column
+
+    def sortOrder(self):
+        return self.sourceModel().sort_order
+
+
+def make_proxy(model, sort_column=-1, order=Qt.DescendingOrder):
+    """Case-insensitive filter on every column, sorted by `sort_column`"""
+    proxy = TableProxy(model.parent())
+    proxy.setSourceModel(model)
+    proxy.setDynamicSortFilter(True)
+    proxy.setFilterKeyColumn(-1)
+    proxy.setFilterCaseSensitivity(Qt.CaseInsensitive)
+    if sort_column >= 0:
+        model.sort(sort_column, order)
+    return proxy
+
+###### END GUI TABLE MODELS ######
@@ -0,0 +1,252 @@
+import os
+import re
+import sys
+import csv
+import pickle
+
+from color import *
+
+###### OUI VENDOR DATABASE ######
+
+# Registries are searched in this order; the first ones found are merged.
+# AIRSPY_OUI_DB may point to one or more files separated by os.pathsep.
+OUI_SOURCES = [
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "oui.csv"),
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "mam.csv"),
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "oui36.csv"),
+    "/usr/share/ieee-data/oui.csv",
+    "/usr/share/ieee-data/mam.csv",
+    "/usr/share/ieee-data/oui36.csv",
+    "/usr/share/ieee-data/oui.txt",
+    "/etc/aircrack-ng/airodump-ng-oui.txt",
+    "/usr/share/wireshark/manuf",
+]
+OUI_CACHE = os.path.join(os.path.expanduser("~"), ".cache", "airspy", "oui.pickle")
+INDEX_VERSION = 1                  # bump when OuiIndex or the registry parsing changes: stale pickles are rebuilt
+
+RANDOMIZED = "Randomized (locally administered)"
+MULTICAST = "Multicast"
+UNKNOWN = "Unknown"
+
+IEEE_REGISTRY_BITS = {"MA-L": 24, "MA-M": 28, "MA-S": 36, "CID": 24, "IAB": 36}
+TXT_LINE = re.compile(r"^\s*([0-9A-Fa-f]{2})[-:]([0-9A-Fa-f]{2})[-:]([0-9A-Fa-f]{2})\s+\(hex\)\s+(.+?)\s*$")
+MANUF_LINE = re.compile(r"^([0-9A-Fa-f:.\-]+?)(?:/(\d+))?\s+(\S+)(?:\s+(.+?))?\s*$")
+HEX_DIGITS = re.compile(r"[^0-9A-Fa-f]")
+PREFIX_BITS = (36, 28, 24)
+
+
+def mac_to_int(mac_address):
+    """Returns the 48-bit integer value of a MAC address (text, or already an int), or None if it is malformed"""
+    if isinstance(mac_address, int):
+        return mac_address if 0 <= mac_address < 1 << 48 else None
+    if mac_address and len(mac_address) == 17 and mac_address[2] == ":":
+        try:
+            return int(mac_address.replace(":", ""), 16)
+        except ValueError:
+            pass
+    digits = HEX_DIGITS.sub("", mac_address or "")
+    if len(digits) != 12:
+        return None
+    return int(digits, 16)
+
+
+def pack_mac(address):
+    """48-bit int for a MAC address; anything else (a CoreBluetooth UUID) is kept as it is"""
+    value = mac_to_int(address)
+    return address if value is None else value
+
+
+def format_mac(value):
+    """'AA:BB:CC:DD:EE:FF' for a 48-bit int; other addresses are returned unchanged"""
+    if not isinstance(value, int):
+        return value
+    digits = f"{value:012X}"
+    return f"{digits[0:2]}:{digits[2:4]}:{digits[4:6]}:{digits[6:8]}:{digits[8:10]}:{digits[10:12]}"
+
+
+def is_locally_administered(mac_address):
+    """True for randomized / locally administered addresses (U/L bit set)"""
+    value = mac_to_int(mac_address)
+    return value is not None and bool((value >> 40) & 0x02)
+
+
+class OuiIndex:
+    """Longest-prefix index over the IEEE MA-L (24 bit), MA-M (28 bit) and MA-S (36 bit) registries"""
+    __slots__ = ("vendors", "tables", "vendor_ids", "blocks")
+
+    def __init__(self):
+        self.vendors = []
+        # {prefix length in bits: {prefix value: vendor index}}, longest first on lookup
+        self.tables = {36: {}, 28: {}, 24: {}}
+        self.vendor_ids = {}
+        self.blocks = None         # {24-bit OUI: 28 or 36} for the MA-L blocks split into MA-M / MA-S
+
+    def __len__(self):
+        return sum(len(table) for table in self.tables.values())
+
+    def __getstate__(self):
+        # vendor_ids is only needed while building, it is not pickled
+        return None, {"vendors": self.vendors, "tables": self.tables}
+
+    def __setstate__(self, state):
+        self.vendors = state[1]["vendors"]
+        self.tables = state[1]["tables"]
+        self.vendor_ids = None
+        self.blocks = None
+
+    def add(self, prefix, bits, vendor):
+        if self.vendor_ids is None:
+            self.vendor_ids = {name: i for i, name in enumerate(self.vendors)}
+        vendor_id = self.vendor_ids.get(vendor)
+        if vendor_id is None:
+            vendor_id = len(self.vendors)
+            self.vendors.append(vendor)
+            self.vendor_ids[vendor] = vendor_id
+        self.tables[bits][prefix] = vendor_id
+        self.blocks = None
+
+    def block_bits(self, value):
+        """Prefix length of the IEEE assignment holding a MAC (int): 28 or 36 inside the MA-L
+        blocks the registries split into MA-M / MA-S assignments, 24 otherwise"""
+        if self.blocks is None:
+            blocks = {prefix >> 4: 28 for prefix in self.tables[28]}
+            blocks.update((prefix >> 12, 36) for prefix in self.tables[36])
+            self.blocks = blocks
+        return self.blocks.get(value >> 24, 24)
+
+    def lookup_int(self, value):
+        tables = self.tables
+        for bits in PREFIX_BITS:
+            vendor_id = tables[bits].get(value >> (48 - bits))
+            if vendor_id is not None:
+                return self.vendors[vendor_id]
+        return None
+
+    def lookup(self, mac_address):
+        """Returns the registered organisation for a MAC, a randomized/multicast label, or None"""
+        value = mac_to_int(mac_address)
+        if value is None:
+            return None
+        vendor = self.lookup_int(value)
+        if vendor:
+            return vendor
+        first_octet = value >> 40
+        if first_octet & 0x02:
+            return RANDOMIZED
+        if first_octet & 0x01:
+            return MULTICAST
+        return None
+
+
+def load_registry(index, path):
+    """Loads an IEEE CSV, IEEE/aircrack 'oui.txt' or Wireshark 'manuf' file into the index"""
+    with open(path, "r", encoding="utf-8", errors="replace") as file:
+        first_line = file.readline()
+        file.seek(0)
+
+        if first_line.startswith("Registry"):
+            for row in csv.DictReader(file):
+                assignment = (row.get("Assignment") or "").strip()
+                vendor = (row.get("Organization Name") or "").strip()
+                bits = IEEE_REGISTRY_BITS.get((row.get("Registry") or "").strip(), len(assignment) * 4)
+                if assignment and vendor and bits in PREFIX_BITS:
+                    try:
+                        index.add(int(assignment, 16), bits, vendor)
+                    except ValueError:
+                        continue
+            return
+
+        # IEEE / aircrack 'oui.txt' files are read with TXT_LINE only: the IEEE one repeats
+        # each OUI on a '002272     (base 16)' line, which MANUF_LINE would misread
+        txt = False
+        for line in file:
+            if not line.strip() or line.startswith("#"):
+                continue
+            match = TXT_LINE.match(line)
+            if match:
+                index.add(int("".join(match.group(1, 2, 3)), 16), 24, match.group(4))
+                txt = True
+                continue
+            if txt or "(base 16)" in line:
+                continue
+            match = MANUF_LINE.match(line)
+            if match:
+                digits = HEX_DIGITS.sub("", match.group(1))
+                bits = int(match.group(2)) if match.group(2) else len(digits) * 4
+                if not digits or bits not in PREFIX_BITS:
+                    continue
+                prefix = int(digits.ljust(12, "0"), 16) >> (48 - bits)
+                index.add(prefix, bits, match.group(4) or match.group(3))
+
+
+def find_sources():
+    paths = [p for p in os.environ.get("AIRSPY_OUI_DB", "").split(os.pathsep) if p]
+    return [p for p in paths + OUI_SOURCES if os.path.isfile(p)]
+
+
+def build_index(sources=None, cache_file=OUI_CACHE):
+    """Builds the OUI index once and pickles it, rebuilding only when a registry file or INDEX_VERSION changes"""
+    sources = find_sources() if sources is None else sources
+    signature = (INDEX_VERSION, [(path, os.path.getmtime(path), os.path.getsize(path)) for path in sources])
+
+    if cache_file and os.path.isfile(cache_file):
+        try:
+            with open(cache_file, "rb") as f:
+                cached_signature, index = pickle.load(f)
+            if cached_signature == signature:
+                return index
+        except (OSError, pickle.UnpicklingError, EOFError, ValueError, AttributeError):
+            pass
+
+    index = OuiIndex()
+    for path in sources:
+        try:
+            load_registry(index, path)
+        except OSError:
+            continue
+
+    if cache_file and sources:
+        try:
+            os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+            with open(cache_file, "wb") as f:
+                pickle.dump((signature, index), f, protocol=pickle.HIGHEST_PROTOCOL)
+        except OSError:
+            pass
+    return index
+
+
+_index = None
+
+def get_oui_index():
+    global _index
+    if _index is None:
+        _index = build_index()
+    return _index
+
+
+def lookup_vendor(mac_address):
+    """Offline vendor lookup, returns None when the prefix is not registered"""
+    return get_oui_index().lookup(mac_address)
+
+
+def color_vendor(vendor):
+    """Terminal rendering of a vendor name returned by lookup_vendor / resolve_vendors"""
+    if vendor in (RANDOMIZED, MULTICAST):
+        return f"{Color.YELLOW}{Style.BRIGHT}{vendor}{Style.RESET_ALL}"
+    if vendor:
+        return f"{Color.GREEN}{Style.BRIGHT}{vendor}{Style.RESET_ALL}"
+    return f"{Color.RED}{Style.BRIGHT}{UNKNOWN}{Style.RESET_ALL}"
+
+
+def get_mac_vendor(mac_address):
+    """Vendor name for display, UNKNOWN when not registered. Plain text: color_vendor colours it"""
+    return lookup_vendor(mac_address) or UNKNOWN
+
+###### END OUI VENDOR DATABASE ######
+
+
+if __name__ == "__main__":
+    index = get_oui_index()
+    print(f"{Color.GREEN}{Style.BRIGHT}[*]{Style.RESET_ALL} {len(index)} prefixes loaded from {len(find_sources())} registries")
+    for mac in sys.argv[1:]:
+        print(f"{mac} -> {color_vendor(lookup_vendor(mac))}")
@@ -0,0 +1,66 @@
+from collections import namedtuple
+
+from oui import format_mac, mac_to_int
+
+###### OBSERVATION RECORDS ######
+
+# One record type per kind of observation, shared by the scanners, the audit, the daemon
+# and the GUI. MACs are 48-bit ints and signals are ints in dBm; MACs, vendors and units
+# are only turned into text when a record is displayed or written out. Namedtuples have
+# no per-instance __dict__. BLE devices are the slotted BleDevice of ble_tracker, whose
+# address follows the same rule. rtl_433 events become RtlEvent records in the reader,
+# and everything after it (hopping, merging, aggregation, sinks) takes them.
+
+AccessPoint = namedtuple("AccessPoint", "bssid essid signal channel security beacons data last_seen",
+                         defaults=(0, 0, None))
+Client = namedtuple("Client", "station bssid signal probes first_seen last_seen", defaults=((), None, None))
+
+
+class RtlEvent(namedtuple("RtlEvent", "time model id channel values")):
+    """One rtl_433 event: when it was read, the sensor's identity, and its other fields
+    (rtl_433's own 'time' string included) as `values`"""
+    __slots__ = ()
+
+    @property
+    def key(self):
+        """(model, id, channel), which identifies a physical sensor"""
+        return (self.model, self.id, self.channel)
+
+
+def rtl_event(data, now):
+    """RtlEvent of one decoded rtl_433 event dict. The identity fields are popped from
+    `data`, which is kept as `values` without being copied (rtl_reader inlines this)."""
+    return RtlEvent(now, data.pop("model", "Unknown"), data.pop("id", None), data.pop("channel", None), data)
+
+
+def rtl_json(event):
+    """The rtl_433 event dict again (recordings), without the read time"""
+    data = {"model": event.model}
+    if event.id is not None:
+        data["id"] = event.id
+    if event.channel is not None:
+        data["channel"] = event.channel
+    data.update(event.values)
+    return data
+
+
+def ap_json(ap):
+    """JSON-ready dict of an AccessPoint (daemon snapshots)"""
+    return dict(ap._asdict(), bssid=format_mac(ap.bssid))
+
+
+def client_json(client):
+    return dict(client._asdict(), station=format_mac(client.station), probes=list(client.probes),
+                bssid=None if client.bssid is None else format_mac(client.bssid))
+
+
+def ap_from_json(data):
+    return AccessPoint(**dict(data, bssid=mac_to_int(data["bssid"])))
+
+
+def client_from_json(data):
+    bssid = data.get("bssid")
+    return Client(**dict(data, station=mac_to_int(data["station"]), probes=tuple(data.get("probes") or ()),
+                         bssid=None if bssid is None else mac_to_int(bssid)))
+
+###### END OBSERVATION RECORDS ######
@@ -0,0 +1,362 @@
+import os
+import sys
+import gzip
+import json
+import time
+import signal
+import asyncio
+import argparse
+import tempfile
+import threading
+import subprocess
+from bisect import bisect_right
+from types import SimpleNamespace
+
+###### RECORD / REPLAY ######
+
+# A replay file is gzipped JSON lines: a header, then one [t, source, payload] per record,
+# t being seconds since the start of the recording.
+#   airodump  the CSV each time airodump-ng rewrote it. Lines are stored as text, or as
+#             [first, count] runs copied from the previous snapshot, so unchanged rows cost
+#             a few bytes.
+#   rtl433    one rtl_433 event (dict)
+#   ble       one advertisement: [address, name, rssi], plus {"m": {company: payload hex},
+#             "u": [service UUIDs], "s": [service data UUIDs], "t": tx power} when it has any
+
+REPLAY_FORMAT = "airspy-replay"
+REPLAY_VERSION = 2                 # 2: BLE advertisements may carry a fourth (payload) field
+AIRODUMP = "airodump"
+RTL433 = "rtl433"
+BLE = "ble"
+SOURCES = (AIRODUMP, RTL433, BLE)
+FAST_BATCH = 100                   # BLE advertisements delivered between event loop yields
+
+
+def advertisement_record(device, adv):
+    record = [device.address, adv.local_name or device.name, getattr(adv, "rssi", None)]
+    payload = {}
+    manufacturer = getattr(adv, "manufacturer_data", None)
+    if manufacturer:
+        payload["m"] = {str(company): bytes(data).hex() for company, data in manufacturer.items()}
+    for field, attribute in (("u", "service_uuids"), ("s", "service_data")):
+        values = getattr(adv, attribute, None)
+        if values:
+            payload[field] = list(values)
+    if getattr(adv, "tx_power", None) is not None:
+        payload["t"] = adv.tx_power
+    if payload:
+        record.append(payload)
+    return record
+
+
+def advertisement_from_record(record):
+    """(BLEDevice-like, AdvertisementData-like) for a recorded advertisement"""
+    address, name, rssi, *rest = record
+    payload = rest[0] if rest else {}
+    advertisement = SimpleNamespace(
+        local_name=name, rssi=rssi, tx_power=payload.get("t"), service_uuids=payload.get("u", []),
+        service_data=dict.fromkeys(payload.get("s", ()), b""),
+        manufacturer_data={int(company): bytes.fromhex(data) for company, data in payload.get("m", {}).items()})
+    return SimpleNamespace(address=address, name=name, rssi=rssi), advertisement
+
+
+def encode_snapshot(lines, previous):
+    """`previous` maps each line of the previous snapshot to its position"""
+    encoded = []
+    for line in lines:
+        position = previous.get(line)
+        if position is None:
+            encoded.append(line)
+        elif encoded and isinstance(encoded[-1], list) and sum(encoded[-1]) == position:
+            encoded[-1][1] += 1
+        else:
+            encoded.append([position, 1])
+    return encoded
+
+
+def decode_snapshot(encoded, previous):
+    lines = []
+    for item in encoded:
+        if isinstance(item, list):
+            lines.extend(previous[item[0]:item[0] + item[1]])
+        else:
+            lines.append(item)
+    return lines
+
+
+class Recorder:
+    """Writes raw scanner input (airodump-ng CSV, rtl_433 events, BLE advertisements) to a replay file"""
+
+    def __init__(self, path):
+        self.path = path
+        self.start = time.time()
+        self.file = gzip.open(path, "wt", encoding="utf-8", compresslevel=6)
+        self.file.write(json.dumps({"format": REPLAY_FORMAT, "version": REPLAY_VERSION, "start": self.start}) + "\n")
+        self.lock = threading.Lock()
+        self.counts = dict.fromkeys(SOURCES, 0)
+        self.file_state = None
+        self.previous = {}        # line -> position in the previous airodump snapshot
+
+    def add(self, source, payload, now=None):
+        now = time.time() if now is None else now
+        record = json.dumps([round(now - self.start, 6), source, payload], separators=(",", ":"))
+        with self.lock:
+            self.file.write(record + "\n")
+            self.counts[source] += 1
+
+    def add_snapshot(self, lines, now=None):
+        self.add(AIRODUMP, encode_snapshot(lines, self.previous), now)
+        self.previous = {line: i for i, line in enumerate(lines)}
+
+    def snapshot(self, csv_file):
+        """Records the airodump-ng CSV if it changed since the previous call"""
+        try:
+            stat = os.stat(csv_file)
+            if (stat.st_mtime_ns, stat.st_size) == self.file_state:
+                return
+            with open(csv_file, "r", encoding="ISO-8859-1") as file:
+                lines = file.read().splitlines()
+        except FileNotFoundError:
+            return
+        self.file_state = (stat.st_mtime_ns, stat.st_size)
+        self.add_snapshot(lines)
+
+    def wrap_scanner(self, scanner_factory=None):
+        """Scanner factory that records every advertisement before the tracker sees it"""
+        return tap_scanner(scanner_factory, lambda device, adv: self.add(BLE, advertisement_record(device, adv)))
+
+    def close(self):
+        with self.lock:
+            self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def tap_scanner(scanner_factory, on_advertisement):
+    """Wraps a scanner factory so on_advertisement(device, adv) sees each detection first"""
+    if scanner_factory is None:
+        from bleak import BleakScanner
+        scanner_factory = BleakScanner
+
+    def factory(detection_callback):
+        def callback(device, advertisement_data):
+            on_advertisement(device, advertisement_data)
+            detection_callback(device, advertisement_data)
+        return scanner_factory(detection_callback=callback)
+    return factory
+
+
+def read_replay(path):
+    """Returns (header, {source: [(t, payload), ...]})"""
+    records = {source: [] for source in SOURCES}
+    with gzip.open(path, "rt", encoding="utf-8") as file:
+        header = json.loads(file.readline() or "{}")
+        if header.get("format") != REPLAY_FORMAT:
+            raise ValueError(f"{path} is not an Airspy replay file")
+        if header.get("version", 0) > REPLAY_VERSION:
+            raise ValueError(f"{path} was written by a newer Airspy (replay version {header['version']})")
+        previous = []
+        for line in file:
+            t, source, payload = json.loads(line)
+            if source == AIRODUMP:
+                payload = previous = decode_snapshot(payload, previous)
+            records[source].append((t, payload))
+    return header, records
+
+
+class Replay:
+    """Feeds a recording back through the normal scan paths.
+
+    speed is a multiplier of the recorded timing (1 = real time); 0 or None replays as fast
+    as the consumer reads. `emitted_at` is the wall time of the latest snapshot or advertisement
+    handed out, for latency measurements.
+    """
+
+    def __init__(self, path, speed=1.0):
+        self.path = path
+        self.speed = speed or None
+        self.header, self.records = read_replay(path)
+        self.start = self.header["start"]
+        self.emitted_at = None
+
+    def __len__(self):
+        return sum(len(records) for records in self.records.values())
+
+    def duration(self, source=None):
+        sources = [source] if source else SOURCES
+        return max((self.records[s][-1][0] for s in sources if self.records[s]), default=0.0)
+
+    def airodump(self, csv_file=None):
+        """Process-like stand-in for airodump-ng writing `csv_file` (a new temporary file by default)"""
+        if csv_file is None:
+            handle, csv_file = tempfile.mkstemp(prefix="airspy-replay-", suffix=".csv")
+            os.close(handle)
+        return AirodumpReplay(self, csv_file)
+
+    def rtl433_command(self, stamp=False):
+        """Command printing the recorded rtl_433 events as JSON lines, like rtl_433 -F json"""
+        command = [sys.executable, os.path.abspath(__file__), self.path, "--emit", RTL433,
+                   "--speed", str(self.speed or 0)]
+        return command + ["--stamp"] if stamp else command
+
+    def scanner_factory(self, stop=None):
+        """BleakScanner stand-in; sets the threading.Event `stop` once every advertisement is out"""
+        return lambda detection_callback: ReplayScanner(self, detection_callback, stop)
+
+
+class AirodumpReplay:
+    """Rewrites the CSV with the recorded snapshots, following the Popen interface the scans use.
+
+    Snapshots are written from the caller's poll()/wait() calls: in real time the latest one
+    due, as fast as possible the next one on every poll().
+    """
+
+    def __init__(self, replay, csv_file):
+        self.replay = replay
+        self.csv_file = csv_file
+        self.snapshots = replay.records[AIRODUMP]
+        self.times = [t for t, _ in self.snapshots]
+        self.position = 0
+        self.returncode = None
+        self.started = time.monotonic()
+
+    def elapsed(self):
+        """Recorded seconds replayed so far"""
+        if self.replay.speed is None:
+            return self.times[self.position - 1] if self.position else 0.0
+        return (time.monotonic() - self.started) * self.replay.speed
+
+    def clock(self):
+        """Wall time of the recording at the current replay position"""
+        return self.replay.start + self.elapsed()
+
+    def write(self, position):
+        if position <= self.position:
+            return
+        self.position = position
+        temporary = self.csv_file + ".replay"
+        with open(temporary, "w", encoding="ISO-8859-1", newline="") as file:
+            file.writelines(line + "\r\n" for line in self.snapshots[position - 1][1])
+        os.replace(temporary, self.csv_file)
+        self.replay.emitted_at = time.time()
+
+    def poll(self):
+        if self.returncode is None:
+            if self.position >= len(self.snapshots):
+                self.returncode = 0
+            elif self.replay.speed is None:
+                self.write(self.position + 1)
+            else:
+                self.write(bisect_right(self.times, self.elapsed()))
+        return self.returncode
+
+    def wait(self, timeout=None):
+        if self.returncode is not None or not self.snapshots:
+            self.returncode = 0 if self.returncode is None else self.returncode
+            return self.returncode
+        if self.replay.speed is None:
+            # As fast as possible: jump to what a `timeout` second capture would have seen
+            limit = self.times[-1] if timeout is None else min(timeout, self.times[-1])
+            self.write(bisect_right(self.times, limit))
+        else:
+            delay = (self.times[-1] - self.elapsed()) / self.replay.speed
+            time.sleep(max(0.0, delay if timeout is None else min(delay, timeout)))
+            self.write(bisect_right(self.times, self.elapsed()))
+        if self.position < len(self.snapshots):
+            raise subprocess.TimeoutExpired("airodump-ng replay", timeout)
+        self.returncode = 0
+        return self.returncode
+
+    def terminate(self):
+        if self.returncode is None:
+            self.returncode = -signal.SIGTERM
+
+    kill = terminate
+
+
+class ReplayScanner:
+    """Async context manager delivering the recorded advertisements to a detection callback"""
+
+    def __init__(self, replay, detection_callback, stop=None):
+        self.replay = replay
+        self.detection_callback = detection_callback
+        self.stop = stop
+        self.task = None
+        self.delivered = 0
+
+    async def run(self):
+        advertisements = self.replay.records[BLE]
+        speed = self.replay.speed
+        started = time.monotonic()
+        for i, (t, record) in enumerate(advertisements):
+            if speed is not None:
+                delay = started + t / speed - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            elif i % FAST_BATCH == 0:
+                await asyncio.sleep(0)
+            self.replay.emitted_at = time.time()
+            self.detection_callback(*advertisement_from_record(record))
+            self.delivered += 1
+        if self.stop is not None:
+            self.stop.set()
+
+    async def __aenter__(self):
+        self.task = asyncio.ensure_future(self.run())
+        return self
+
+    async def __aexit__(self, *exc):
+        self.task.cancel()
+        try:
+            await self.task
+        except asyncio.CancelledError:
+            pass
+
+
+def emit_rtl433(replay, stamp=False, out=None):
+    """Prints the rtl_433 events with their recorded timing; `stamp` adds the send time as "sent" """
+    out = out or sys.stdout.buffer
+    started = time.monotonic()
+    try:
+        for t, event in replay.records[RTL433]:
+            if replay.speed is not None:
+                delay = started + t / replay.speed - time.monotonic()
+                if delay > 0:
+                    out.flush()
+                    time.sleep(delay)
+            if stamp:
+                event = dict(event, sent=time.time())
+            out.write(json.dumps(event).encode() + b"\n")
+        out.flush()
+    except (BrokenPipeError, KeyboardInterrupt):
+        pass
+
+
+###### END RECORD / REPLAY ######
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show an Airspy replay file, or play one of its sources")
+    parser.add_argument("path")
+    parser.add_argument("--emit", choices=(RTL433,), help="Print the rtl_433 events as JSON lines (rtl_433 stand-in)")
+    parser.add_argument("--speed", type=float, default=1.0, help="Replay speed, 0 = as fast as possible (default: 1)")
+    parser.add_argument("--stamp", action="store_true", help="Add the send time to each event as \"sent\"")
+    args = parser.parse_args()
+
+    replay = Replay(args.path, args.speed)
+    if args.emit:
+        emit_rtl433(replay, args.stamp)
+        return
+    started = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(replay.start))
+    print(f"{args.path}: recorded {started}, {replay.duration():.1f}s")
+    for source in SOURCES:
+        if replay.records[source]:
+            print(f"   - {source:<8} : {len(replay.records[source])} records over {replay.duration(source):.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,270 @@
+import json
+import html
+import time
+import argparse
+import threading
+from itertools import chain
+from datetime import datetime
+
+from color import *
+
+###### AUDIT REPORT ######
+
+# The audit streams its results through one open handle as JSON Lines: an "audit" header,
+# then for each scan a "section" record, one record per device ("ap", "client", "ble",
+# "rtl433") and a "summary" record with the scan's totals, and an "end" record. Lines are
+# written as the scans produce them, nothing is accumulated, so memory does not grow with
+# the number of devices. Steps running at the same time interleave their lines, each
+# carrying its section number.
+# Markdown and HTML reports are rendered from that file, reading it line by line again:
+# one pass for the section list and summaries, then one per device table, which only
+# decodes the lines starting with that table's record prefix.
+
+REPORT_FORMATS = ["markdown", "html"]
+REPORT_EXTENSIONS = {"markdown": ".md", "html": ".html"}
+STAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Device tables of each kind of section, and their columns: (header, field)
+SECTION_TABLES = {"wifi": ("ap", "client"), "bluetooth": ("ble",), "rtl433": ("rtl433",)}
+TABLES = {
+    "ap": ("Access points", [("SSID", "essid"), ("BSSID", "bssid"), ("Vendor", "vendor"), ("Signal (dBm)", "signal"),
+                             ("Channel", "channel"), ("Security", "security"), ("Clients", "clients")]),
+    "client": ("Clients", [("Station", "station"), ("Vendor", "vendor"), ("BSSID", "bssid"), ("Signal (dBm)", "signal"),
+                           ("Probes", "probes"), ("First seen", "first_seen"), ("Last seen", "last_seen")]),
+    "ble": ("Bluetooth devices", [("Address", "address"), ("Vendor", "vendor"), ("Name", "name"), ("RSSI (dBm)", "rssi"),
+                                  ("Min", "rssi_min"), ("Max", "rssi_max"), ("Advertisements", "advertisements"),
+                                  ("First seen", "first_seen"), ("Last seen", "last_seen")]),
+    "rtl433": ("Devices", [("Model", "model"), ("ID", "id"), ("Channel", "channel"), ("Transmissions", "count"),
+                           ("Packets", "packets"), ("First seen", "first_seen"), ("Last seen", "last_seen"),
+                           ("Last data", "data")]),
+}
+TIME_FIELDS = frozenset(("time", "started", "first_seen", "last_seen"))
+SECTION_TITLES = {"wifi": "Wi-Fi", "bluetooth": "Bluetooth", "rtl433": "RTL433"}
+SUMMARY_LABELS = {"aps": "APs"}
+
+
+class ReportSection:
+    """The records of one audit step"""
+    __slots__ = ("report", "number", "scan")
+
+    def __init__(self, report, number, scan):
+        self.report = report
+        self.number = number
+        self.scan = scan
+
+    def add(self, kind, data):
+        self.report.write({"record": kind, "section": self.number, **data})
+
+    def summary(self, data):
+        self.report.write({"record": "summary", "section": self.number, **data})
+        self.report.flush()
+
+    def error(self, message):
+        self.summary({"error": message})
+
+
+class AuditReport:
+    """JSON Lines audit report, written as the scans go. Safe to share between the
+    audit's threads: each record is written as one line under a lock."""
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.sections = 0
+        self.records = 0
+        self.file = open(path, "w", encoding="utf-8")
+        self.write({"record": "audit", "started": time.time()})
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def write(self, record):
+        line = json.dumps(record, ensure_ascii=False, default=str) + "\n"
+        with self.lock:
+            self.file.write(line)
+            self.records += 1
+
+    def flush(self):
+        with self.lock:
+            self.file.flush()
+
+    def section(self, scan, **fields):
+        with self.lock:
+            self.sections += 1
+            number = self.sections
+        self.write({"record": "section", "section": number, "scan": scan, "time": time.time(), **fields})
+        return ReportSection(self, number, scan)
+
+    def close(self):
+        if self.file.closed:
+            return
+        self.write({"record": "end", "time": time.time(), "sections": self.sections})
+        with self.lock:
+            self.file.close()
+
+
+def record_prefix(kind, section):
+    """Start of the lines AuditReport writes for the `kind` records of a section"""
+    return json.dumps({"record": kind, "section": section})[:-1] + ", "
+
+
+def read_report(path, prefix=None):
+    """The records of a JSON Lines report, one at a time; only the lines starting with
+    `prefix` when given"""
+    with open(path, "r", encoding="utf-8") as file:
+        for line in file:
+            if prefix is not None and not line.startswith(prefix):
+                continue
+            if line.strip():
+                yield json.loads(line)
+
+
+def format_value(field, value):
+    if value is None:
+        return ""
+    if field in TIME_FIELDS and isinstance(value, (int, float)):
+        return datetime.fromtimestamp(value).strftime(STAMP_FORMAT)
+    if isinstance(value, dict):
+        return ", ".join(f"{k}: {v}" for k, v in value.items())
+    if isinstance(value, list):
+        return "; ".join(format_value(field, item) for item in value)
+    return str(value)
+
+
+class MarkdownWriter:
+    def __init__(self, out):
+        self.out = out
+
+    @staticmethod
+    def cell(text):
+        return text.replace("|", "\\|").replace("\n", " ")
+
+    def title(self, text):
+        self.out.write(f"# {text}\n")
+
+    def heading(self, text):
+        self.out.write(f"\n## {text}\n\n")
+
+    def fields(self, items):
+        for key, value in items:
+            self.out.write(f"- **{key}**: {self.cell(value)}\n")
+
+    def table(self, title, headers, rows):
+        self.out.write(f"\n### {title}\n\n")
+        first = next(rows, None)
+        if first is None:
+            self.out.write("None.\n")
+            return
+        self.out.write("| " + " | ".join(headers) + " |\n")
+        self.out.write("|" + "---|" * len(headers) + "\n")
+        for row in chain([first], rows):
+            self.out.write("| " + " | ".join(self.cell(value) for value in row) + " |\n")
+
+    def end(self):
+        pass
+
+
+class HtmlWriter:
+    STYLE = ("body{font-family:sans-serif;margin:2em}table{border-collapse:collapse;margin-bottom:1em}"
+             "th,td{border:1px solid #ccc;padding:2px 8px;text-align:left}th{background:#eee}")
+
+    def __init__(self, out):
+        self.out = out
+
+    def title(self, text):
+        text = html.escape(text)
+        self.out.write(f"<!DOCTYPE html>\n<html><head><meta charset=\"utf-8\"><title>{text}</title>"
+                       f"<style>{self.STYLE}</style></head><body>\n<h1>{text}</h1>\n")
+
+    def heading(self, text):
+        self.out.write(f"<h2>{html.escape(text)}</h2>\n")
+
+    def fields(self, items):
+        self.out.write("<ul>\n")
+        for key, value in items:
+            self.out.write(f"<li><b>{html.escape(key)}</b>: {html.escape(value)}</li>\n")
+        self.out.write("</ul>\n")
+
+    def table(self, title, headers, rows):
+        self.out.write(f"<h3>{html.escape(title)}</h3>\n")
+        first = next(rows, None)
+        if first is None:
+            self.out.write("<p>None.</p>\n")
+            return
+        self.out.write("<table>\n<tr>" + "".join(f"<th>{html.escape(header)}</th>" for header in headers) + "</tr>\n")
+        for row in chain([first], rows):
+            self.out.write("<tr>" + "".join(f"<td>{html.escape(value)}</td>" for value in row) + "</tr>\n")
+        self.out.write("</table>\n")
+
+    def end(self):
+        self.out.write("</body></html>\n")
+
+
+WRITERS = {"markdown": MarkdownWriter, "html": HtmlWriter}
+
+
+def section_label(section):
+    scan = section.get("scan", "")
+    label = SECTION_TITLES.get(scan, scan)
+    target = ", ".join(section["receivers"]) if section.get("receivers") else section.get("frequency")
+    return f"{label} ({target})" if target else label
+
+
+def section_fields(section, summary):
+    items = []
+    if section.get("time") is not None:
+        items.append(("Started", format_value("time", section["time"])))
+    if section.get("duration") is not None:
+        items.append(("Duration", f"{section['duration']}s"))
+    for key, value in (summary or {"error": "the scan did not finish"}).items():
+        if key not in ("record", "section"):
+            items.append((SUMMARY_LABELS.get(key) or key.replace("_", " ").capitalize(), format_value(key, value)))
+    return items
+
+
+def render_report(path, out_path, fmt="markdown"):
+    """Renders the JSON Lines report at `path` to `out_path` as Markdown or HTML"""
+    sections, summaries, header, end = {}, {}, {}, {}
+    for record in read_report(path):
+        kind = record.get("record")
+        if kind == "section":
+            sections[record["section"]] = record
+        elif kind == "summary":
+            summaries[record["section"]] = record
+        elif kind == "audit":
+            header = record
+        elif kind == "end":
+            end = record
+
+    with open(out_path, "w", encoding="utf-8") as out:
+        writer = WRITERS[fmt](out)
+        started = format_value("started", header.get("started"))
+        writer.title(f"Full Audit Report - {started}".strip(" -"))
+        if end:
+            writer.fields([("Finished", format_value("time", end.get("time"))), ("Sections", str(len(sections)))])
+        for number, section in sorted(sections.items()):
+            writer.heading(section_label(section))
+            writer.fields(section_fields(section, summaries.get(number)))
+            for kind in SECTION_TABLES.get(section.get("scan"), ()):
+                title, columns = TABLES[kind]
+                rows = ([format_value(field, record.get(field)) for _, field in columns]
+                        for record in read_report(path, record_prefix(kind, number)))
+                writer.table(title, [name for name, _ in columns], rows)
+        writer.end()
+    return out_path
+
+###### END AUDIT REPORT ######
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Render an audit's JSON Lines report as Markdown or HTML")
+    parser.add_argument("path", help="JSON Lines report written by --audit (audit.jsonl)")
+    parser.add_argument("--format", choices=REPORT_FORMATS, default="markdown")
+    parser.add_argument("--out", help="Output file (default: the report's name with .md / .html)")
+    args = parser.parse_args()
+    base = args.path[:-len(".jsonl")] if args.path.endswith(".jsonl") else args.path
+    out = render_report(args.path, args.out or base + REPORT_EXTENSIONS[args.format], args.format)
+    print(f"{Color.GREEN}{Style.BRIGHT}[*]{Style.RESET_ALL} Report written to {out}")
@@ -0,0 +1,212 @@
+import time
+from array import array
+from collections import OrderedDict
+
+###### RSSI HISTORY ######
+
+# Signal histories for many devices in preallocated arrays, one fixed-size block per device:
+#   recent    the last `samples` readings and their times (ring buffer)
+#   history   one mean per `bucket` seconds for the last `buckets` buckets (ring buffer)
+# plus a Kalman-filtered estimate used to rank devices. At the defaults a device costs
+# well under 1 KiB whatever the scan length. Past `max_devices`, the device seen least
+# recently gives its block to the new one.
+
+RSSI_SAMPLES = 32
+RSSI_BUCKET = 60                   # seconds per downsampled history entry
+RSSI_BUCKETS = 120                 # two hours of history
+RSSI_MAX_DEVICES = 50000
+MEASUREMENT_NOISE = 16.0           # dB^2: variance of one reading around the true signal
+PROCESS_NOISE = 0.5                # dB^2 per second: how fast the true signal drifts
+NO_DATA = -32768
+GROW = 1024                        # device blocks added at a time
+
+
+def valid_rssi(rssi):
+    """False for the placeholders the parsers use when there is no reading (-1, -100, None)"""
+    return rssi is not None and -128 <= rssi < -1 and rssi != -100
+
+
+class RssiHistory:
+    """Per-device RSSI ring buffers with Kalman smoothing, rolling percentiles and a
+    downsampled history. Keys are any hashable device id (48-bit integer MACs here)."""
+
+    def __init__(self, samples=RSSI_SAMPLES, bucket=RSSI_BUCKET, buckets=RSSI_BUCKETS, max_devices=RSSI_MAX_DEVICES,
+                 measurement_noise=MEASUREMENT_NOISE, process_noise=PROCESS_NOISE):
+        self.samples = samples
+        self.bucket = bucket
+        self.buckets = buckets
+        self.max_devices = max_devices
+        self.measurement_noise = measurement_noise
+        self.process_noise = process_noise
+        self.origin = None         # wall time of the first reading; times are stored relative to it
+        self.slots = OrderedDict() # key -> block number, least recently updated first
+        self.free = []
+        self.capacity = 0
+
+        self.values = array('h')   # samples per block
+        self.times = array('f')
+        self.head = array('H')
+        self.count = array('H')
+        self.estimate = array('f')
+        self.variance = array('f')
+        self.last = array('d')
+        self.means = array('h')    # buckets per block
+        self.bucket_no = array('i')
+        self.bucket_sum = array('q')
+        self.bucket_count = array('I')
+        self.empty = array('h', [NO_DATA]) * buckets
+
+    def __len__(self):
+        return len(self.slots)
+
+    def __contains__(self, key):
+        return key in self.slots
+
+    def nbytes(self):
+        """Bytes held by the arrays (the key index is not counted)"""
+        return sum(column.itemsize * len(column) for column in (
+            self.values, self.times, self.head, self.count, self.estimate, self.variance, self.last,
+            self.means, self.bucket_no, self.bucket_sum, self.bucket_count))
+
+    def grow(self):
+        blocks = min(GROW, self.max_devices - self.capacity)
+        self.values.extend(array('h', [0]) * (blocks * self.samples))
+        self.times.extend(array('f', [0.0]) * (blocks * self.samples))
+        self.means.extend(array('h', [NO_DATA]) * (blocks * self.buckets))
+        for column in (self.head, self.count, self.bucket_no, self.bucket_sum, self.bucket_count,
+                       self.estimate, self.variance, self.last):
+            column.extend(array(column.typecode, [0]) * blocks)
+        self.free.extend(range(self.capacity + blocks - 1, self.capacity - 1, -1))
+        self.capacity += blocks
+
+    def allocate(self, key, rssi, t):
+        if not self.free:
+            if self.capacity < self.max_devices:
+                self.grow()
+            else:
+                _, slot = self.slots.popitem(last=False)
+                self.free.append(slot)
+        slot = self.free.pop()
+        self.slots[key] = slot
+        self.head[slot] = self.count[slot] = 0
+        self.estimate[slot] = rssi
+        self.variance[slot] = self.measurement_noise
+        self.last[slot] = t
+        self.bucket_no[slot] = int(t // self.bucket)
+        self.bucket_sum[slot] = self.bucket_count[slot] = 0
+        start = slot * self.buckets
+        self.means[start:start + self.buckets] = self.empty
+        return slot
+
+    def add(self, key, rssi, now=None):
+        """Records one reading and returns the smoothed signal. Readings not newer than the
+        device's previous one (a CSV rewrite without a new frame) and placeholders are ignored."""
+        if not valid_rssi(rssi):
+            return self.smoothed(key)
+        rssi = round(rssi)
+        now = time.time() if now is None else now
+        if self.origin is None:
+            self.origin = now
+        t = now - self.origin
+        slot = self.slots.get(key)
+        if slot is None:
+            slot = self.allocate(key, rssi, t)
+            estimate = rssi
+        else:
+            last = self.last[slot]
+            if t <= last:
+                return self.estimate[slot]
+            self.slots.move_to_end(key)
+            # Kalman filter on a random walk: uncertainty grows with the time since the last reading
+            p = self.variance[slot] + self.process_noise * (t - last)
+            gain = p / (p + self.measurement_noise)
+            estimate = self.estimate[slot]
+            estimate += gain * (rssi - estimate)
+            self.estimate[slot] = estimate
+            self.variance[slot] = (1 - gain) * p
+            self.last[slot] = t
+            number = int(t // self.bucket)
+            if number != self.bucket_no[slot]:
+                self.close_bucket(slot, number)
+
+        head, samples = self.head[slot], self.samples
+        i = slot * samples + head
+        self.values[i] = rssi
+        self.times[i] = t
+        self.head[slot] = head + 1 if head + 1 < samples else 0
+        if self.count[slot] < samples:
+            self.count[slot] += 1
+        self.bucket_sum[slot] += rssi
+        self.bucket_count[slot] += 1
+        return estimate
+
+    def close_bucket(self, slot, number):
+        current = self.bucket_no[slot]
+        start = slot * self.buckets
+        count = self.bucket_count[slot]
+        self.means[start + current % self.buckets] = round(self.bucket_sum[slot] / count) if count else NO_DATA
+        skipped = min(number - current - 1, self.buckets)
+        if skipped > 0:
+            # Buckets without readings, possibly wrapping around the end of the ring
+            first = (current + 1) % self.buckets
+            tail = min(skipped, self.buckets - first)
+            self.means[start + first:start + first + tail] = self.empty[:tail]
+            self.means[start:start + skipped - tail] = self.empty[:skipped - tail]
+        self.bucket_no[slot] = number
+        self.bucket_sum[slot] = self.bucket_count[slot] = 0
+
+    def smoothed(self, key, default=None):
+        slot = self.slots.get(key)
+        return default if slot is None else self.estimate[slot]
+
+    def recent(self, key):
+        """[(time, rssi), ...] of the readings still in the ring, oldest first"""
+        slot = self.slots.get(key)
+        if slot is None:
+            return []
+        start, count, head = slot * self.samples, self.count[slot], self.head[slot]
+        order = range(head - count, head)
+        return [(self.origin + self.times[start + i % self.samples], self.values[start + i % self.samples]) for i in order]
+
+    def percentile(self, key, fraction):
+        """Nearest-rank percentile of the recent readings (fraction 0..1), or None"""
+        slot = self.slots.get(key)
+        if slot is None or not self.count[slot]:
+            return None
+        start = slot * self.samples
+        values = sorted(self.values[start:start + self.count[slot]])
+        return values[min(len(values) - 1, int(fraction * len(values)))]
+
+    def history(self, key, step=None):
+        """[(bucket start time, mean rssi), ...] oldest first, the current bucket included.
+        `step` (a multiple of the bucket length, in seconds) averages buckets further."""
+        slot = self.slots.get(key)
+        if slot is None:
+            return []
+        start, current = slot * self.buckets, self.bucket_no[slot]
+        series = []
+        for number in range(current - self.buckets + 1, current):
+            mean = self.means[start + number % self.buckets]
+            if number >= 0 and mean != NO_DATA:
+                series.append((number, mean))
+        if self.bucket_count[slot]:
+            series.append((current, self.bucket_sum[slot] / self.bucket_count[slot]))
+        group = max(1, int((step or self.bucket) // self.bucket))
+        if group > 1:
+            grouped = {}
+            for number, mean in series:
+                grouped.setdefault(number // group * group, []).append(mean)
+            series = [(number, sum(means) / len(means)) for number, means in grouped.items()]
+        return [(self.origin + number * self.bucket, mean) for number, mean in series]
+
+    def export(self, step=None):
+        """Yields (key, history) for every device"""
+        for key in list(self.slots):
+            yield key, self.history(key, step)
+
+    def forget(self, key):
+        slot = self.slots.pop(key, None)
+        if slot is not None:
+            self.free.append(slot)
+
+###### END RSSI HISTORY ######
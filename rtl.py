@@ -1,116 +1,172 @@
-import sys
-import argparse
-import asyncio
-import pywifi
-from pywifi import const
-from bleak import BleakScanner
-import subprocess
-import json
-import time
-import select
-import requests
-import re
-import csv
+import threading
 from datetime import datetime
 import warnings
 warnings.simplefilter(action='ignore', category=FutureWarning)
 
 from color import *
+from rtl_reader import rtl433_command, run_rtl433, run_reader
+from rtl_hop import DwellScheduler, hop_rtl433, parse_bands, REVISIT
+from rtl_multi import SdrPool, read_receivers
+from rtl_aggregate import DeviceAggregator, DEDUP_WINDOW, LIVE_MAX_DEVICES
+from rtl_window import EventWindow
+from sinks import rtl433_observation
+from records import rtl_json
+from replay import RTL433
+
+def print_rtl_device(stats):
+    seen = f"{datetime.fromtimestamp(stats.first_seen).strftime('%H:%M:%S')} -> {datetime.fromtimestamp(stats.last_seen).strftime('%H:%M:%S')}"
+    print(f"\n{Color.MAGENTA}{Style.BRIGHT}--> {stats.label}{Style.RESET_ALL} "
+          f"({stats.count} transmissions, {stats.packets} packets, seen {seen})")
+    for x, y in stats.last.items():
+        print(f"   - {x} : {y}")
+
+
+def print_hop_summary(scheduler):
+    radio_time = scheduler.radio_time
+    devices = scheduler.devices()
+    print(f"\n{Color.GREEN}{Style.BRIGHT}[*]{Style.RESET_ALL} {devices} devices in {radio_time:.0f}s of radio time "
+          f"({devices / radio_time if radio_time else 0:.3f} per second)")
+    for band, dwells, band_time, transmissions, band_devices, rate in scheduler.summary():
+        print(f"   - {band}: {dwells} dwells, {band_time:.0f}s, {transmissions} transmissions, {band_devices} devices ({rate:.3f}/s)")
+
+
+def print_pool_summary(pool):
+    merger = pool.merger
+    late = f", {merger.late} out of order" if merger and merger.late else ""
+    print(f"\n{Color.GREEN}{Style.BRIGHT}[*]{Style.RESET_ALL} {len(pool.stats)} receivers, {pool.events} events merged{late}")
+    for receiver, health, events, rate, starts, failures in pool.summary():
+        print(f"   - {receiver}: {health}, {events} events ({rate:.2f}/s), {starts} starts, {failures} failures")
+    for stats in pool.stats:
+        if stats.scheduler is not None:
+            print_hop_summary(stats.scheduler)
+
+
+def scan_label(frequency, receivers):
+    return f"with {len(receivers)} receivers ({', '.join(map(str, receivers))})" if receivers else f"at {frequency}Hz"
+
+
+def run_receivers(receivers, timeout, on_event, gain=None, protocol=None, revisit=REVISIT):
+    """Runs one rtl_433 per receiver ('FREQ@DEVICE'), their events merged in time order.
+    Returns the SdrPool with the per-receiver counters."""
+    try:
+        pool = SdrPool(receivers, gain, protocol, revisit=revisit)
+    except ValueError as e:
+        print(f"{Color.RED}{Style.BRIGHT}[!]{Style.RESET_ALL} Cannot start the receivers: {e}")
+        return None
+    try:
+        run_reader(lambda stop: read_receivers(None, timeout, on_event, stop, pool))
+    except KeyboardInterrupt:
+        print_pool_summary(pool)
+        raise
+    return pool
+
+
+def run_bands(frequency, timeout, on_event, gain=None, protocol=None, replay=None, revisit=REVISIT):
+    """Runs rtl_433 on `frequency` (or the replay), hopping with a DwellScheduler when it lists
+    several bands ('433.92M,868M'). Returns the scheduler, or None without hopping."""
+    bands = parse_bands(frequency)
+    if replay is not None or len(bands) < 2:
+        command = replay.rtl433_command() if replay else rtl433_command(frequency, gain, protocol)
+        run_rtl433(command, timeout, on_event)
+        return None
+    try:
+        scheduler = DwellScheduler(bands, revisit=revisit)
+    except ValueError as e:
+        print(f"{Color.RED}{Style.BRIGHT}[!]{Style.RESET_ALL} Cannot hop: {e}")
+        return None
+    try:
+        run_reader(lambda stop: hop_rtl433(bands, timeout, on_event, stop, scheduler, gain, protocol))
+    except KeyboardInterrupt:
+        print_hop_summary(scheduler)
+        raise
+    return scheduler
 
-def scan_rtl433(timeout, frequency="433.92M", gain=None, protocol=None, output_format="json"):
-
-    print(f"\n{Color.GREEN}{Style.BRIGHT}[*]{Style.RESET_ALL} Scanning at {frequency}Hz for {timeout}s...")
 
-    command = ["rtl_433", "-d", "soapy", "-f", frequency, "-F", output_format]
+def scan_rtl433(timeout, frequency="433.92M", gain=None, protocol=None, sink=None, dedup_window=DEDUP_WINDOW,
+                recorder=None, replay=None, revisit=REVISIT, receivers=None):
 
-    if gain:
-        command.extend(["-g", gain])
+    receivers = receivers if replay is None else None
+    print(f"\n{Color.GREEN}{Style.BRIGHT}[*]{Style.RESET_ALL} Scanning {scan_label(frequency, receivers)} for {timeout}s...")
 
-    if protocol:
-        command.extend(["-R", protocol])
+    devices = DeviceAggregator(dedup_window)
 
-    process = subprocess.Popen(
-        command,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.DEVNULL,
-        text=True,
-        bufsize=1
-    )
-    
-    results = []
-    start_time = time.time()
+    def on_event(event):
+        if recorder:
+            recorder.add(RTL433, rtl_json(event), event.time)
+        if devices.add(event) is not None and sink:
+            sink.put(rtl433_observation(event))
 
+    scheduler = pool = None
     try:
-        while time.time() - start_time < timeout:
-            rlist, _, _ = select.select([process.stdout], [], [], 0.5)
-            if rlist:
-                line = process.stdout.readline().strip()
-                if line:
-                    try:
-                        data = json.loads(line)
-                        results.append(data)
-                    except json.JSONDecodeError:
-                        continue
+        if receivers:
+            pool = run_receivers(receivers, timeout, on_event, gain, protocol, revisit)
+        else:
+            scheduler = run_bands(frequency, timeout, on_event, gain, protocol, replay, revisit)
     except KeyboardInterrupt:
         pass
-    finally:
-        process.terminate()
-        process.wait()
-
-    print(f"\n{Color.GREEN}{Style.BRIGHT}=== DETECTED TRANSMISSIONS ==={Style.RESET_ALL}")
-    if results:
-        for device in results:
-            print(f"\n{Color.MAGENTA}{Style.BRIGHT}--> {device.get('model', 'Unknown Device')}{Style.RESET_ALL}")
-            for x, y in device.items(): 
-                if x != "model":
-                    print(f"   - {x} : {y}")
+
+    print(f"\n{Color.GREEN}{Style.BRIGHT}=== DETECTED DEVICES ==={Style.RESET_ALL}")
+    if devices:
+        for stats in devices.by_activity():
+            print_rtl_device(stats)
+        print(f"\n{Color.GREEN}{Style.BRIGHT}[*]{Style.RESET_ALL} {len(devices)} devices, {devices.packets} packets ({devices.duplicates} repeats merged)")
     else:
         print(f"{Color.RED}{Style.BRIGHT}[!]{Style.RESET_ALL} No devices detected.")
+    if scheduler:
+        print_hop_summary(scheduler)
+    if pool:
+        print_pool_summary(pool)
 
-            
-            
 
+def print_rtl_window(window, minutes):
+    activity = window.activity(minutes)
+    print(f"\n{Color.GREEN}{Style.BRIGHT}[*]{Style.RESET_ALL} Last {minutes} min: {sum(activity.values())} transmissions from {len(activity)} devices "
+          f"| stored: {len(window)} events, {len(window.devices)} devices, {window.memory_footprint() / 1024:.0f} KiB")
+    for key, count in sorted(activity.items(), key=lambda item: item[1], reverse=True):
+        print(f"   - {' | '.join(str(part) for part in key if part is not None)} : {count}")
 
-def scan_rtl433_live(frequency="433.92M", gain=None, protocol=None, output_format="json"):
- 
-    print(f"\n{Color.GREEN}{Style.BRIGHT}[*]{Style.RESET_ALL} Monitoring at {frequency}Hz... (Press CTRL+C to stop)")
-
-    command = ["rtl_433", "-d", "soapy", "-f", frequency, "-F", output_format]
-
-    if gain:
-        command.extend(["-g", gain])
-
-    if protocol:
-        command.extend(["-R", protocol])
-
-    process = subprocess.Popen(
-        command,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.DEVNULL,
-        text=True,
-        bufsize=1
-    )
 
+def scan_rtl433_live(frequency="433.92M", gain=None, protocol=None, sink=None, dedup_window=DEDUP_WINDOW,
+                     window_minutes=60, status_interval=60, recorder=None, replay=None, revisit=REVISIT, receivers=None):
+ 
+    receivers = receivers if replay is None else None
+    print(f"\n{Color.GREEN}{Style.BRIGHT}[*]{Style.RESET_ALL} Monitoring {scan_label(frequency, receivers)}... (Press CTRL+C to stop)")
+
+    # Sensors are forgotten once they leave the event window, so both stay bounded
+    devices = DeviceAggregator(dedup_window, LIVE_MAX_DEVICES, window_minutes * 60)
+    window = EventWindow(max_age=window_minutes * 60)
+    lock = threading.Lock()        # events arrive on the reader's thread, the status on its own
+    done = threading.Event()
+
+    def on_event(event):
+        if recorder:
+            recorder.add(RTL433, rtl_json(event), event.time)
+        with lock:
+            stats = devices.add(event)
+            if stats is not None:
+                window.add(event.key, stats.last, event.time)
+                print_rtl_device(stats)
+        if stats is not None and sink:
+            sink.put(rtl433_observation(event))
+
+    def report_status():
+        # On a timer, so a quiet band still gets its status and its idle sensors evicted
+        while not done.wait(status_interval):
+            with lock:
+                devices.evict()
+                window.evict()
+                print_rtl_window(window, min(10, window_minutes))
+
+    threading.Thread(target=report_status, name="rtl-status", daemon=True).start()
     try:
-        while True:
-            rlist, _, _ = select.select([process.stdout], [], [], 0.5)
-            if rlist:
-                line = process.stdout.readline().strip()
-                if line:
-                    try:
-                        data = json.loads(line)
-                        print(f"\n{Color.MAGENTA}{Style.BRIGHT}--> {data.get('model', 'Unknown Device')}{Style.RESET_ALL}")
-                        for x, y in data.items():
-                            if x != "model":
-                                print(f"   - {x} : {y}")
-                    except json.JSONDecodeError:
-                        continue
-
+        if receivers:
+            run_receivers(receivers, None, on_event, gain, protocol, revisit)
+        else:
+            run_bands(frequency, None, on_event, gain, protocol, replay, revisit)
     except KeyboardInterrupt:
         print(f"\n{Color.YELLOW}{Style.BRIGHT}[!] Monitoring stopped by user.{Style.RESET_ALL}")
-
     finally:
-        process.terminate()
-        process.wait()
+        done.set()
 
-  
\ No newline at end of file
+    print_rtl_window(window, window_minutes)
+    return window
@@ -0,0 +1,116 @@
+import time
+from collections import OrderedDict
+
+###### RTL_433 DEVICE AGGREGATION ######
+
+DEDUP_WINDOW = 2.0
+LIVE_MAX_DEVICES = 10000           # sensors kept by long-running scans (live mode, daemon, GUI)
+LIVE_IDLE = 3600                   # seconds without a packet before they forget a sensor
+
+# Fields that change between repeats of the same packet and must not make it look new
+VOLATILE_FIELDS = frozenset(("time", "mic", "mod", "freq", "freq1", "freq2", "rssi", "snr", "noise", "sent"))
+
+
+def payload(values):
+    return {k: v for k, v in values.items() if k not in VOLATILE_FIELDS}
+
+
+class DeviceStats:
+    __slots__ = ("model", "id", "channel", "count", "packets", "first_seen", "last_seen", "last", "last_new")
+
+    def __init__(self, key, values, now):
+        self.model, self.id, self.channel = key
+        self.count = 1
+        self.packets = 1
+        self.first_seen = now
+        self.last_seen = now
+        self.last = values
+        self.last_new = now        # first packet of the current transmission, where the dedup window starts
+
+    @property
+    def key(self):
+        return (self.model, self.id, self.channel)
+
+    @property
+    def label(self):
+        parts = [str(self.model)]
+        if self.id is not None:
+            parts.append(f"id {self.id}")
+        if self.channel is not None:
+            parts.append(f"ch {self.channel}")
+        return " | ".join(parts)
+
+
+class DeviceAggregator:
+    """Folds rtl_433 events (RtlEvent) into one DeviceStats per sensor, keyed by (model, id, channel).
+
+    A packet from the same sensor with the same payload within `dedup_window` seconds of the
+    first packet of that transmission is a repeat: it only bumps the packet counter. The
+    window does not slide with the repeats, so a sensor sending the same reading more
+    often than `dedup_window` still counts one transmission per window.
+    Memory grows with the number of sensors, not the number of packets. Long-running scans
+    bound it: sensors not heard for `idle` seconds are forgotten, and past `max_devices` the
+    one heard least recently makes room (rolling IDs such as TPMS keep adding new sensors).
+    """
+
+    def __init__(self, dedup_window=DEDUP_WINDOW, max_devices=None, idle=None):
+        self.dedup_window = dedup_window
+        self.max_devices = max_devices
+        self.idle = idle
+        self.devices = OrderedDict()   # key -> DeviceStats, least recently heard first
+        self.packets = 0
+        self.duplicates = 0
+        self.evicted = 0
+
+    def __len__(self):
+        return len(self.devices)
+
+    def __iter__(self):
+        return iter(self.devices.values())
+
+    def add(self, event, now=None):
+        """Returns the device's DeviceStats for a new transmission, None for a duplicate.
+        `now` defaults to the time the event was read."""
+        now = event.time if now is None else now
+        self.packets += 1
+        key = event.key
+        values = payload(event.values)
+        stats = self.devices.get(key)
+
+        if stats is None:
+            stats = self.devices[key] = DeviceStats(key, values, now)
+            if self.max_devices is not None or self.idle is not None:
+                self.evict(now)
+            return stats
+
+        self.devices.move_to_end(key)
+        stats.packets += 1
+        stats.last_seen = now
+        if now - stats.last_new <= self.dedup_window and values == stats.last:
+            self.duplicates += 1
+            return None
+        stats.count += 1
+        stats.last = values
+        stats.last_new = now
+        return stats
+
+    def evict(self, now=None):
+        """Forgets the sensors idle for too long, and the least recently heard ones past max_devices.
+        Returns how many were forgotten."""
+        devices = self.devices
+        cutoff = None if self.idle is None else (time.time() if now is None else now) - self.idle
+        evicted = 0
+        while devices:
+            stats = next(iter(devices.values()))
+            if (cutoff is None or stats.last_seen >= cutoff) and (self.max_devices is None or len(devices) <= self.max_devices):
+                break
+            devices.popitem(last=False)
+            evicted += 1
+        self.evicted += evicted
+        return evicted
+
+    def by_activity(self):
+        """Devices with the most transmissions first"""
+        return sorted(self.devices.values(), key=lambda d: (d.count, d.last_seen), reverse=True)
+
+###### END RTL_433 DEVICE AGGREGATION ######
@@ -0,0 +1,188 @@
+import math
+import asyncio
+from collections import OrderedDict
+
+from rtl_reader import rtl433_command, read_rtl433
+from rtl_aggregate import LIVE_MAX_DEVICES, LIVE_IDLE
+
+###### SDR BAND HOPPING ######
+
+# One SDR covering several bands: rtl_433 is restarted on the next band after each dwell.
+# Bands are picked by a bandit (discounted UCB) on the rate of new devices per second of
+# radio time, with a small reward for transmissions from known ones, and dwells are
+# stretched in proportion to that rate. Busy bands get more airtime, but every band is
+# revisited at least every `revisit` seconds, so a quiet band is never dropped.
+# Devices count as new when not heard within LIVE_IDLE (at most LIVE_MAX_DEVICES are
+# remembered), so hopping for days with rolling-ID sensors stays within a fixed memory.
+
+MIN_DWELL = 5.0
+MAX_DWELL = 60.0
+BASE_DWELL = 15.0                  # dwell of a band doing as well as the average band
+REVISIT = 120.0                    # longest time a band may go unheard
+DISCOUNT = 0.8                     # weight kept by a band's past dwells at each new one
+EXPLORATION = 0.5
+EVENT_WEIGHT = 0.1                 # a transmission from a known device, relative to a new device
+RESTART_BACKOFF = 1.0              # pause after rtl_433 exits early, so a failing radio is not respawned in a loop
+
+
+def remember(heard, key, now, max_devices, idle):
+    """Marks `key` heard in an LRU of device keys (key -> last heard); True when it was not in it"""
+    cutoff = now - idle
+    last = heard.pop(key, None)
+    heard[key] = now
+    while len(heard) > max_devices or next(iter(heard.values())) < cutoff:
+        heard.popitem(last=False)
+    return last is None or last < cutoff
+
+
+def parse_bands(frequency):
+    """'433.92M,868M' -> ['433.92M', '868M']"""
+    return [band.strip() for band in (frequency or "").split(",") if band.strip()]
+
+
+class BandStats:
+    __slots__ = ("band", "dwells", "radio_time", "transmissions", "devices", "heard", "last_end", "reward", "weight")
+
+    def __init__(self, band):
+        self.band = band
+        self.dwells = 0
+        self.radio_time = 0.0
+        self.transmissions = 0
+        self.devices = 0           # new devices heard on this band
+        self.heard = OrderedDict()  # device key -> last heard, least recent first
+        self.last_end = None
+        self.reward = 0.0          # discounted new devices (+ weighted transmissions)
+        self.weight = 0.0          # discounted radio seconds
+
+    @property
+    def rate(self):
+        return self.reward / self.weight if self.weight else 0.0
+
+
+class DwellScheduler:
+    """Picks the next band and how long to stay on it"""
+
+    def __init__(self, bands, min_dwell=MIN_DWELL, max_dwell=MAX_DWELL, revisit=REVISIT, base_dwell=BASE_DWELL,
+                 discount=DISCOUNT, exploration=EXPLORATION, max_devices=LIVE_MAX_DEVICES, idle=LIVE_IDLE):
+        if not bands:
+            raise ValueError("no band to scan")
+        if min_dwell * (len(bands) - 1) > revisit:
+            raise ValueError(f"{len(bands)} bands of {min_dwell:g}s cannot all be revisited every {revisit:g}s")
+        self.bands = {band: BandStats(band) for band in bands}
+        self.min_dwell = min_dwell
+        self.max_dwell = max(min_dwell, max_dwell)
+        self.revisit = revisit
+        self.base_dwell = base_dwell
+        self.discount = discount
+        self.exploration = exploration
+        self.max_devices = max_devices
+        self.idle = idle
+        self.dwells = 0
+        self.heard = OrderedDict()  # device key -> last heard on any band
+        self.device_count = 0
+
+    def scores(self):
+        """Upper confidence bound of each band's rate"""
+        rates = [stats.rate for stats in self.bands.values()]
+        scale = sum(rates) / len(rates) + 0.01
+        log_total = math.log(self.dwells + 1)
+        return {band: stats.rate + self.exploration * scale * math.sqrt(log_total / stats.dwells)
+                for band, stats in self.bands.items() if stats.dwells}
+
+    def slack(self, band, due, now):
+        """Longest dwell on `band` that still lets every other band, served earliest deadline
+        first with the shortest dwell, start again before its revisit deadline"""
+        deadlines = sorted(deadline for other, deadline in due.items() if other != band)
+        return min((deadline - now - k * self.min_dwell for k, deadline in enumerate(deadlines)), default=math.inf)
+
+    def next(self, now):
+        """(band, dwell seconds) for a dwell starting at `now` (a monotonic clock)"""
+        unvisited = [band for band, stats in self.bands.items() if stats.last_end is None]
+        due = {band: stats.last_end + self.revisit for band, stats in self.bands.items() if stats.last_end is not None}
+        if unvisited:
+            band, dwell = unvisited[0], self.base_dwell
+        else:
+            scores = self.scores()
+            band = max(scores, key=scores.get)
+            if self.slack(band, due, now) < self.min_dwell:
+                band = min(due, key=due.get)
+            mean = sum(scores.values()) / len(scores)
+            dwell = self.base_dwell * scores[band] / mean if mean > 0 else self.base_dwell
+        dwell = min(dwell, self.slack(band, due, now))
+        return band, max(self.min_dwell, min(self.max_dwell, dwell))
+
+    def hear(self, band, key, now):
+        """A transmission from device `key` on `band` at `now`; True when the device is new on the band"""
+        stats = self.bands[band]
+        if remember(self.heard, key, now, self.max_devices, self.idle):
+            self.device_count += 1
+        if not remember(stats.heard, key, now, self.max_devices, self.idle):
+            return False
+        stats.devices += 1
+        return True
+
+    def record(self, band, started, ended, new_devices, transmissions):
+        stats = self.bands[band]
+        dwell = max(0.0, ended - started)
+        stats.dwells += 1
+        stats.radio_time += dwell
+        stats.transmissions += transmissions
+        stats.last_end = ended
+        stats.reward = self.discount * stats.reward + new_devices + EVENT_WEIGHT * transmissions
+        stats.weight = self.discount * stats.weight + dwell
+        self.dwells += 1
+
+    @property
+    def radio_time(self):
+        return sum(stats.radio_time for stats in self.bands.values())
+
+    def devices(self):
+        """Devices heard on any band (one heard again after `idle` seconds of silence counts again)"""
+        return self.device_count
+
+    def summary(self):
+        """[(band, dwells, radio seconds, transmissions, devices, devices per radio second)]"""
+        return [(band, stats.dwells, stats.radio_time, stats.transmissions, stats.devices,
+                 stats.devices / stats.radio_time if stats.radio_time else 0.0) for band, stats in self.bands.items()]
+
+
+async def hop_rtl433(bands, timeout=None, on_event=None, stop=None, scheduler=None, gain=None, protocol=None,
+                     command=None, return_on_exit=False):
+    """Scans `bands` with one rtl_433 at a time, for `timeout` seconds (or until `stop` is set),
+    calling on_event(RtlEvent) for every event. `command(band)` builds the rtl_433 command line.
+    With `return_on_exit`, returns as soon as an rtl_433 exits before the end of its dwell, so
+    the caller can count and restart a failing radio; otherwise it pauses and hops on.
+    Returns the DwellScheduler, which holds the per-band statistics."""
+    scheduler = scheduler if scheduler is not None else DwellScheduler(bands)
+    command = command or (lambda band: rtl433_command(band, gain, protocol))
+    on_event = on_event or (lambda event: None)
+    loop = asyncio.get_running_loop()
+    deadline = None if timeout is None else loop.time() + timeout
+
+    while stop is None or not stop.is_set():
+        now = loop.time()
+        if deadline is not None and now >= deadline:
+            break
+        band, dwell = scheduler.next(now)
+        if deadline is not None:
+            dwell = min(dwell, deadline - now)
+        new_devices = transmissions = 0
+
+        def on_band_event(event):
+            nonlocal new_devices, transmissions
+            transmissions += 1
+            if scheduler.hear(band, event.key, event.time):
+                new_devices += 1
+            on_event(event)
+
+        await read_rtl433(command(band), dwell, on_band_event, stop)
+        ended = loop.time()
+        scheduler.record(band, now, ended, new_devices, transmissions)
+        exited = ended - now < dwell and (stop is None or not stop.is_set())
+        if exited and return_on_exit:
+            break
+        if exited and ended - now < dwell / 2 and not transmissions:
+            await asyncio.sleep(RESTART_BACKOFF)
+    return scheduler
+
+###### END SDR BAND HOPPING ######
@@ -0,0 +1,285 @@
+import math
+import time
+import heapq
+import asyncio
+from collections import namedtuple
+from datetime import datetime
+
+from rtl_reader import rtl433_command, read_rtl433
+from rtl_hop import DwellScheduler, hop_rtl433, parse_bands, REVISIT
+
+###### MULTI-SDR CAPTURE ######
+
+# Several dongles at once (e.g. 315/433.92/868/915 MHz): one rtl_433 per receiver, each
+# bound to its device selector (-d) and frequency. Their events are merged into one stream
+# ordered by rtl_433's own timestamps (microsecond precision is requested), with a k-way
+# merge: an event is released once every running receiver has reported a later one, or
+# after MERGE_DELAY seconds, so a quiet receiver only delays the stream that long.
+# A receiver whose rtl_433 exits (dongle unplugged or busy) is restarted with a backoff,
+# whether it listens on one band or hops between several.
+
+MERGE_DELAY = 1.0                  # longest time an event waits for the other receivers
+MERGE_TICK = 0.1
+RESTART_BACKOFF = 1.0              # first restart delay, doubled on each failure in a row
+MAX_BACKOFF = 30.0
+HEALTHY_RUN = 30.0                 # a run this long resets the failure streak
+SILENT_AFTER = 60.0                # a running receiver with no event for this long is reported silent
+STAMP_CACHE_SIZE = 4096
+
+RUNNING, RESTARTING, STOPPED = "running", "restarting", "stopped"
+
+Receiver = namedtuple("Receiver", "frequency device")
+
+STAMP_CACHE = {}
+
+
+def parse_receiver(spec):
+    """'433.92M@0' -> Receiver('433.92M', '0'). The device is rtl_433's -d selector
+    (index, ':serial' or a SoapySDR string); bands may be comma-separated to hop."""
+    if isinstance(spec, Receiver):
+        return spec
+    frequency, _, device = spec.partition("@")
+    if not parse_bands(frequency) or not device:
+        raise ValueError(f"bad receiver '{spec}': expected FREQ@DEVICE, e.g. 433.92M@0")
+    return Receiver(frequency, device)
+
+
+def parse_receivers(specs):
+    receivers = [parse_receiver(spec) for spec in specs]
+    devices = [receiver.device for receiver in receivers]
+    if len(set(devices)) < len(devices):
+        raise ValueError("each receiver needs its own device")
+    return receivers
+
+
+def format_receiver(receiver):
+    return f"{receiver.frequency}@{receiver.device}"
+
+
+def event_time(event, default=None):
+    """rtl_433's 'time' field of an RtlEvent as a Unix timestamp: local 'YYYY-MM-DD
+    HH:MM:SS[.ffffff]', ISO or Unix seconds. `default` (the time the event was read when
+    None) when missing or unreadable."""
+    default = event.time if default is None else default
+    value = event.values.get("time")
+    if isinstance(value, (int, float)):
+        return float(value)
+    if not isinstance(value, str):
+        return default
+    second, _, fraction = value.partition(".")
+    base = STAMP_CACHE.get(second)
+    if base is None:
+        try:
+            base = datetime.fromisoformat(second).timestamp()
+        except ValueError:
+            try:
+                return float(value)
+            except ValueError:
+                return default
+        if len(STAMP_CACHE) >= STAMP_CACHE_SIZE:
+            STAMP_CACHE.clear()
+        STAMP_CACHE[second] = base
+    return base + float("0." + fraction) if fraction.isdigit() else base
+
+
+class EventMerger:
+    """k-way merge of per-receiver event streams, each already in time order"""
+
+    def __init__(self, sources, on_event, delay=MERGE_DELAY):
+        self.on_event = on_event
+        self.delay = delay
+        self.heap = []             # (timestamp, arrival, sequence, event)
+        self.watermarks = [None] * sources   # latest timestamp from each receiver
+        self.active = set(range(sources))
+        self.sequence = 0
+        self.last = None
+        self.merged = 0
+        self.late = 0              # events released after a later one (arrived past the delay)
+        self.peak = 0
+
+    def push(self, source, event, now=None):
+        now = event.time if now is None else now
+        stamp = event_time(event, now)
+        heapq.heappush(self.heap, (stamp, now, self.sequence, event))
+        self.sequence += 1
+        watermark = self.watermarks[source]
+        if watermark is None or stamp > watermark:
+            self.watermarks[source] = stamp
+        if len(self.heap) > self.peak:
+            self.peak = len(self.heap)
+        self.release(now)
+
+    def open(self, source, now=None):
+        """The receiver (re)starts: its events will not be older than now"""
+        now = time.time() if now is None else now
+        self.active.add(source)
+        watermark = self.watermarks[source]
+        self.watermarks[source] = now if watermark is None else max(watermark, now)
+
+    def close(self, source, now=None):
+        """The receiver stopped: the others no longer wait for it"""
+        self.active.discard(source)
+        self.release(time.time() if now is None else now)
+
+    def release(self, now):
+        heap = self.heap
+        if not heap:
+            return
+        watermarks = [self.watermarks[source] for source in self.active]
+        if not watermarks:
+            low = math.inf
+        else:
+            low = None if None in watermarks else min(watermarks)
+        expired = now - self.delay
+        while heap and ((low is not None and heap[0][0] <= low) or heap[0][1] <= expired):
+            self.emit(heapq.heappop(heap))
+
+    def flush(self):
+        while self.heap:
+            self.emit(heapq.heappop(self.heap))
+
+    def emit(self, entry):
+        stamp = entry[0]
+        if self.last is not None and stamp < self.last:
+            self.late += 1
+        else:
+            self.last = stamp
+        self.merged += 1
+        self.on_event(entry[3])
+
+
+class ReceiverStats:
+    """Health and throughput of one receiver"""
+    __slots__ = ("receiver", "state", "starts", "failures", "streak", "events", "started", "first_event", "last_event",
+                 "scheduler")
+
+    def __init__(self, receiver, scheduler=None):
+        self.receiver = receiver
+        self.state = STOPPED
+        self.starts = 0
+        self.failures = 0          # rtl_433 exits before the end of the scan
+        self.streak = 0            # failures in a row
+        self.events = 0
+        self.started = None
+        self.first_event = None
+        self.last_event = None
+        self.scheduler = scheduler  # DwellScheduler when the receiver hops between bands
+
+    def rate(self, now=None):
+        if self.started is None:
+            return 0.0
+        elapsed = (time.time() if now is None else now) - self.started
+        return self.events / elapsed if elapsed > 0 else 0.0
+
+    def health(self, now=None):
+        now = time.time() if now is None else now
+        if self.state == RESTARTING:
+            return f"restarting ({self.failures} failures)"
+        if self.state == RUNNING:
+            quiet = now - (self.last_event or self.started or now)
+            return f"silent for {quiet:.0f}s" if quiet >= SILENT_AFTER else "ok"
+        return f"stopped ({self.failures} failures)" if self.failures else STOPPED
+
+
+class SdrPool:
+    """The receivers of a multi-SDR capture, their counters and the merge counters"""
+
+    def __init__(self, receivers, gain=None, protocol=None, command=None, revisit=REVISIT, delay=MERGE_DELAY):
+        self.receivers = parse_receivers(receivers)
+        if not self.receivers:
+            raise ValueError("no receiver")
+        self.gain = gain
+        self.protocol = protocol
+        # command(device, band) builds the rtl_433 command line
+        self.command = command or (lambda device, band: rtl433_command(band, gain, protocol, device, usec=True))
+        self.stats = []
+        for receiver in self.receivers:
+            bands = parse_bands(receiver.frequency)
+            self.stats.append(ReceiverStats(receiver, DwellScheduler(bands, revisit=revisit) if len(bands) > 1 else None))
+        self.delay = delay
+        self.merger = None
+
+    @property
+    def events(self):
+        return sum(stats.events for stats in self.stats)
+
+    def summary(self, now=None):
+        """[(receiver, health, events, events per second, starts, failures)]"""
+        now = time.time() if now is None else now
+        return [(format_receiver(stats.receiver), stats.health(now), stats.events, stats.rate(now), stats.starts,
+                 stats.failures) for stats in self.stats]
+
+    def status(self, now=None):
+        """JSON-ready summary, for the daemon"""
+        return [{"receiver": receiver, "health": health, "events": events, "rate": round(rate, 3), "starts": starts,
+                 "failures": failures} for receiver, health, events, rate, starts, failures in self.summary(now)]
+
+
+async def run_receiver(pool, index, timeout, stop):
+    """Keeps one receiver's rtl_433 running until `timeout` or `stop`, restarting it when it exits"""
+    stats = pool.stats[index]
+    receiver = stats.receiver
+    merger = pool.merger
+    loop = asyncio.get_running_loop()
+    deadline = None if timeout is None else loop.time() + timeout
+
+    def on_event(event):
+        now = event.time
+        stats.events += 1
+        if stats.first_event is None:
+            stats.first_event = now
+        stats.last_event = now
+        merger.push(index, event, now)
+
+    stats.started = time.time()
+    try:
+        while stop is None or not stop.is_set():
+            remaining = None if deadline is None else deadline - loop.time()
+            if remaining is not None and remaining <= 0:
+                break
+            stats.state = RUNNING
+            stats.starts += 1
+            merger.open(index)
+            started = loop.time()
+            if stats.scheduler is not None:
+                await hop_rtl433(list(stats.scheduler.bands), remaining, on_event, stop, stats.scheduler,
+                                 command=lambda band: pool.command(receiver.device, band), return_on_exit=True)
+            else:
+                await read_rtl433(pool.command(receiver.device, receiver.frequency), remaining, on_event, stop)
+            if (stop is not None and stop.is_set()) or (deadline is not None and loop.time() >= deadline):
+                break
+            # rtl_433 exited on its own: the dongle is missing, busy or was unplugged
+            stats.failures += 1
+            stats.streak = 1 if loop.time() - started >= HEALTHY_RUN else stats.streak + 1
+            stats.state = RESTARTING
+            merger.close(index)
+            backoff = min(MAX_BACKOFF, RESTART_BACKOFF * 2 ** (stats.streak - 1))
+            await asyncio.sleep(backoff if deadline is None else max(0.0, min(backoff, deadline - loop.time())))
+    finally:
+        stats.state = STOPPED
+        merger.close(index)
+
+
+async def read_receivers(receivers, timeout=None, on_event=None, stop=None, pool=None, gain=None, protocol=None,
+                         command=None):
+    """Runs one rtl_433 per receiver ('FREQ@DEVICE' or Receiver) for `timeout` seconds (or
+    until `stop` is set) and calls on_event(RtlEvent) for every event, in timestamp order across
+    receivers. Returns the SdrPool, which holds the per-receiver counters."""
+    pool = pool if pool is not None else SdrPool(receivers, gain, protocol, command)
+    pool.merger = merger = EventMerger(len(pool.stats), on_event or (lambda event: None), pool.delay)
+    tasks = [asyncio.ensure_future(run_receiver(pool, index, timeout, stop)) for index in range(len(pool.stats))]
+    try:
+        pending = tasks
+        while pending:
+            _, pending = await asyncio.wait(pending, timeout=MERGE_TICK)
+            merger.release(time.time())
+            if stop is not None and stop.is_set():
+                break
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        merger.flush()
+    return pool
+
+###### END MULTI-SDR CAPTURE ######
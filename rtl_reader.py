@@ -0,0 +1,148 @@
+import json
+import time
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from records import RtlEvent
+
+###### RTL_433 EVENT READER ######
+
+# Fastest JSON decoder available. orjson parses straight from a memoryview, the
+# others need the line as bytes.
+try:
+    import orjson
+    JSON_BACKEND = "orjson"
+    decode_json = orjson.loads
+except ImportError:
+    try:
+        import ujson
+        JSON_BACKEND = "ujson"
+        def decode_json(line):
+            return ujson.loads(bytes(line))
+    except ImportError:
+        JSON_BACKEND = "json"
+        def decode_json(line):
+            return json.loads(bytes(line))
+
+READ_CHUNK = 1 << 16
+STOP_POLL = 0.25
+
+
+def rtl433_command(frequency="433.92M", gain=None, protocol=None, device="soapy", usec=False):
+    # Always JSON: other output formats are produced by Airspy's own sinks
+    command = ["rtl_433", "-d", device, "-f", frequency, "-F", "json"]
+    if usec:
+        # Microsecond timestamps, to order the events of several receivers
+        command.extend(["-M", "time:usec"])
+    if gain:
+        command.extend(["-g", gain])
+    if protocol:
+        command.extend(["-R", protocol])
+    return command
+
+
+def decode_lines(buffer, on_event, now):
+    """Decodes every complete line in buffer into RtlEvent records read at `now`, removes
+    them from it and returns the count. Lines are handed to the decoder as memoryview
+    slices, without copying."""
+    end = buffer.rfind(b"\n")
+    if end < 0:
+        return 0
+    count = 0
+    start = 0
+    make = tuple.__new__           # skips the namedtuple's Python-level __new__, once per event
+    with memoryview(buffer) as view:
+        while start <= end:
+            stop = buffer.find(b"\n", start, end + 1)
+            if stop - start > 1:
+                try:
+                    data = decode_json(view[start:stop])
+                except ValueError:
+                    data = None
+                if isinstance(data, dict):
+                    on_event(make(RtlEvent, (now, data.pop("model", "Unknown"), data.pop("id", None),
+                                             data.pop("channel", None), data)))
+                    count += 1
+            start = stop + 1
+    del buffer[:end + 1]
+    return count
+
+
+async def read_rtl433(command, timeout=None, on_event=None, stop=None, chunk_size=READ_CHUNK):
+    """Runs rtl_433 (or anything printing JSON lines) and calls on_event(RtlEvent) for every event.
+
+    Returns after exactly `timeout` seconds, when the process exits, or once the optional
+    threading.Event `stop` is set. Returns the number of decoded events.
+    """
+    process = await asyncio.create_subprocess_exec(
+        *command, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.DEVNULL)
+    loop = asyncio.get_running_loop()
+    deadline = None if timeout is None else loop.time() + timeout
+    on_event = on_event or (lambda event: None)
+    buffer = bytearray()
+    count = 0
+
+    try:
+        while stop is None or not stop.is_set():
+            wait = None
+            if deadline is not None:
+                wait = deadline - loop.time()
+                if wait <= 0:
+                    break
+            if stop is not None:
+                wait = STOP_POLL if wait is None else min(wait, STOP_POLL)
+            try:
+                chunk = await asyncio.wait_for(process.stdout.read(chunk_size), wait)
+            except asyncio.TimeoutError:
+                continue
+            if not chunk:
+                break
+            buffer += chunk
+            count += decode_lines(buffer, on_event, time.time())
+        if buffer and process.stdout.at_eof():
+            buffer += b"\n"
+            count += decode_lines(buffer, on_event, time.time())
+    finally:
+        if process.returncode is None:
+            process.terminate()
+            try:
+                await asyncio.wait_for(process.wait(), 2)
+            except asyncio.TimeoutError:
+                process.kill()
+                await process.wait()
+    return count
+
+
+def run_reader(reader):
+    """Runs the coroutine reader(stop) to completion, from plain code or from inside a running
+    event loop. `stop` is a threading.Event (None when no loop is running) the reader must honour."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(reader(None))
+
+    # Already inside a loop (Airspy.py's main): read from a worker thread, and
+    # make CTRL+C in this thread stop the reader too.
+    stop = threading.Event()
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        future = executor.submit(asyncio.run, reader(stop))
+        try:
+            return future.result()
+        except KeyboardInterrupt:
+            stop.set()
+            raise
+
+
+def run_rtl433(command, timeout=None, on_event=None):
+    """Blocking wrapper around read_rtl433"""
+    return run_reader(lambda stop: read_rtl433(command, timeout, on_event, stop))
+
+
+def collect_rtl433(command, timeout):
+    """Returns every event decoded during `timeout` seconds"""
+    results = []
+    run_rtl433(command, timeout, results.append)
+    return results
+
+###### END RTL_433 EVENT READER ######
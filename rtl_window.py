@@ -0,0 +1,132 @@
+import sys
+import time
+from collections import deque
+
+from records import RtlEvent
+
+###### RTL_433 TIME-WINDOWED EVENT STORE ######
+
+WINDOW_MAX_AGE = 3600              # seconds
+WINDOW_PER_DEVICE = 256            # events kept per sensor
+WINDOW_MAX_EVENTS = 100000
+WINDOW_MAX_BYTES = 64 * 1024 * 1024
+
+# Bookkeeping cost of one stored event: the ring entry tuple, the eviction
+# order tuple and their deque slots.
+EVENT_OVERHEAD = sys.getsizeof((0, 0.0, 0, None)) + sys.getsizeof((0, 0.0, None)) + 16
+
+
+def event_size(values):
+    """Approximate memory used by one decoded event (dict plus its keys and values)"""
+    size = sys.getsizeof(values) + EVENT_OVERHEAD
+    for key, value in values.items():
+        size += sys.getsizeof(key) + sys.getsizeof(value)
+    return size
+
+
+class EventWindow:
+    """Recent rtl_433 events for long-running live monitoring, with a fixed memory ceiling.
+
+    Each sensor has its own ring buffer of at most `per_device` events. On top of that,
+    events are evicted oldest first once they are older than `max_age` seconds or when
+    the whole store exceeds `max_events` / `max_bytes`.
+    """
+
+    def __init__(self, max_age=WINDOW_MAX_AGE, per_device=WINDOW_PER_DEVICE,
+                 max_events=WINDOW_MAX_EVENTS, max_bytes=WINDOW_MAX_BYTES):
+        self.max_age = max_age
+        self.per_device = per_device
+        self.max_events = max_events
+        self.max_bytes = max_bytes
+        self.devices = {}          # key -> deque of (seq, timestamp, size, values)
+        self.order = deque()       # (seq, timestamp, key) in arrival order, may hold stale entries
+        self.seq = 0
+        self.events = 0
+        self.bytes = 0
+        self.evicted = 0
+
+    def __len__(self):
+        return self.events
+
+    def add(self, key, values, now=None):
+        now = time.time() if now is None else now
+        size = event_size(values)
+        self.seq += 1
+        ring = self.devices.get(key)
+        if ring is None:
+            ring = self.devices[key] = deque()
+        ring.append((self.seq, now, size, values))
+        self.order.append((self.seq, now, key))
+        self.events += 1
+        self.bytes += size
+
+        if len(ring) > self.per_device:
+            # Its entry in self.order becomes stale and is skipped on eviction
+            self.drop(ring)
+        self.evict(now)
+
+    def drop(self, ring):
+        _, _, size, _ = ring.popleft()
+        self.events -= 1
+        self.bytes -= size
+        self.evicted += 1
+
+    def is_live(self, seq, key):
+        ring = self.devices.get(key)
+        return ring is not None and seq >= ring[0][0]
+
+    def evict(self, now=None):
+        now = time.time() if now is None else now
+        cutoff = now - self.max_age
+        order = self.order
+        while order:
+            seq, timestamp, key = order[0]
+            if not self.is_live(seq, key):
+                order.popleft()
+                continue
+            if timestamp >= cutoff and self.events <= self.max_events and self.bytes <= self.max_bytes:
+                break
+            order.popleft()
+            ring = self.devices[key]
+            self.drop(ring)
+            if not ring:
+                del self.devices[key]
+
+        # Chatty sensors hitting their per-device cap leave stale entries behind
+        if len(order) > 2 * self.events + 1024:
+            self.order = deque(entry for entry in order if self.is_live(entry[0], entry[2]))
+
+    def last_minutes(self, minutes, now=None):
+        """Events of the last `minutes` minutes as RtlEvent records, oldest first"""
+        now = time.time() if now is None else now
+        cutoff = now - minutes * 60
+        events = []
+        for key, ring in self.devices.items():
+            for _, timestamp, _, values in reversed(ring):
+                if timestamp < cutoff:
+                    break
+                events.append(RtlEvent(timestamp, *key, values))
+        events.sort(key=lambda event: event.time)
+        return events
+
+    def device_history(self, key, minutes=None, now=None):
+        ring = self.devices.get(key, ())
+        if minutes is None:
+            return [(timestamp, values) for _, timestamp, _, values in ring]
+        cutoff = (time.time() if now is None else now) - minutes * 60
+        return [(timestamp, values) for _, timestamp, _, values in ring if timestamp >= cutoff]
+
+    def activity(self, minutes, now=None):
+        """{key: number of events in the last `minutes` minutes}"""
+        counts = {}
+        for event in self.last_minutes(minutes, now):
+            key = (event.model, event.id, event.channel)
+            counts[key] = counts.get(key, 0) + 1
+        return counts
+
+    def memory_footprint(self):
+        """Approximate bytes held by stored events, the index structures included"""
+        return (self.bytes + sys.getsizeof(self.devices) + sys.getsizeof(self.order)
+                + sum(sys.getsizeof(ring) for ring in self.devices.values()))
+
+###### END RTL_433 TIME-WINDOWED EVENT STORE ######
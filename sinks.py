@@ -0,0 +1,437 @@
+import io
+import sys
+import csv
+import json
+import time
+import queue
+import socket
+import struct
+import threading
+from urllib.parse import urlparse
+
+from oui import format_mac
+from records import rtl_json
+from store import ObservationStore, STORE_PATH
+
+###### OUTPUT SINKS ######
+
+# Every scanner hands observations to a sink as flat dicts:
+#   {"time": <epoch>, "type": "rtl433" | "wifi_ap" | "wifi_client" | "ble", "key": <device>, ...fields}
+# Sinks buffer them on their own thread and write in batches, so a slow disk,
+# socket or broker never blocks the code reading the radio.
+
+SINK_BATCH = 500
+SINK_FLUSH_INTERVAL = 1.0
+SINK_QUEUE = 20000
+OUTPUT_FORMATS = ["json", "csv", "log", "mqtt", "influx", "sqlite"]
+DEFAULT_TARGETS = {"json": "airspy.jsonl", "csv": "airspy.csv", "log": "airspy.log",
+                   "influx": "airspy.influx", "mqtt": "localhost:1883", "sqlite": STORE_PATH}
+
+
+def observation(kind, key, data, now=None):
+    record = {"time": time.time() if now is None else now, "type": kind, "key": key}
+    record.update((k, v) for k, v in data.items() if k not in record)
+    return record
+
+
+def ap_observation(ap, fields=None, now=None):
+    """Observation of an AccessPoint record; `fields` adds to it (the watcher's event kind)"""
+    data = {"essid": ap.essid, "signal": ap.signal, "channel": ap.channel, "security": ap.security}
+    return observation("wifi_ap", format_mac(ap.bssid), dict(fields, **data) if fields else data, now)
+
+
+def client_observation(client, fields=None, now=None):
+    data = {"bssid": None if client.bssid is None else format_mac(client.bssid), "signal": client.signal}
+    return observation("wifi_client", format_mac(client.station), dict(fields, **data) if fields else data, now)
+
+
+def rtl433_observation(event, now=None):
+    """Observation of an RtlEvent, timed when it was read"""
+    key = "/".join(str(part) for part in event.key if part is not None)
+    return observation("rtl433", key, rtl_json(event), event.time if now is None else now)
+
+
+class Sink:
+    """Base class: bounded queue + writer thread flushing every `batch_size` records or `flush_interval` seconds.
+    When the queue is full the oldest record is dropped (and counted) instead of blocking put()."""
+
+    def __init__(self, batch_size=SINK_BATCH, flush_interval=SINK_FLUSH_INTERVAL, queue_size=SINK_QUEUE):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.written = 0
+        self.dropped = 0
+        self.errors = 0
+        self.closed = False
+        self.thread = threading.Thread(target=self.run, name=type(self).__name__, daemon=True)
+        self.thread.start()
+
+    def put(self, record):
+        if self.closed:
+            return
+        while True:
+            try:
+                self.queue.put_nowait(record)
+                return
+            except queue.Full:
+                try:
+                    self.queue.get_nowait()
+                    self.dropped += 1
+                except queue.Empty:
+                    pass
+
+    def run(self):
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+        running = True
+        while running:
+            try:
+                record = self.queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                if record is None:
+                    running = False
+                else:
+                    batch.append(record)
+            except queue.Empty:
+                pass
+            if batch and (len(batch) >= self.batch_size or time.monotonic() >= deadline or not running):
+                try:
+                    self.write_batch(batch)
+                    self.written += len(batch)
+                except Exception as e:
+                    self.errors += 1
+                    print(f"[!] {type(self).__name__}: {e}", file=sys.stderr)
+                batch = []
+            if time.monotonic() >= deadline:
+                self.idle()
+                deadline = time.monotonic() + self.flush_interval
+        self.finish()
+
+    def write_batch(self, batch):
+        raise NotImplementedError
+
+    def idle(self):
+        """Called once per flush interval, even without data"""
+
+    def finish(self):
+        """Called on the writer thread after the last batch"""
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        while True:
+            try:
+                self.queue.put(None, timeout=0.1)
+                break
+            except queue.Full:
+                try:
+                    self.queue.get_nowait()
+                    self.dropped += 1
+                except queue.Empty:
+                    pass
+        self.thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class FileSink(Sink):
+    """Sink writing text to a file ('-' for stdout)"""
+
+    def __init__(self, path, **kwargs):
+        self.path = path
+        self.file = sys.stdout if path == "-" else open(path, "a", encoding="utf-8", newline="")
+        self.begin()
+        super().__init__(**kwargs)
+
+    def begin(self):
+        """Called before the writer thread starts (file headers)"""
+
+    def write_batch(self, batch):
+        self.file.write(self.format_batch(batch))
+        self.file.flush()
+
+    def finish(self):
+        if self.file is not sys.stdout:
+            self.file.close()
+
+
+class JsonLinesSink(FileSink):
+    def format_batch(self, batch):
+        return "".join(json.dumps(record, default=str) + "\n" for record in batch)
+
+
+class LogSink(FileSink):
+    def format_batch(self, batch):
+        lines = []
+        for record in batch:
+            stamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(record["time"]))
+            fields = " ".join(f"{k}={v}" for k, v in record.items() if k not in ("time", "type", "key"))
+            lines.append(f"{stamp} [{record['type']}] {record['key']} {fields}\n")
+        return "".join(lines)
+
+
+class CsvSink(FileSink):
+    """Fixed columns so records of every type fit one file: the remaining fields go to 'data' as JSON"""
+    COLUMNS = ["time", "type", "key", "signal", "data"]
+
+    def __init__(self, path, **kwargs):
+        self.write_header = path == "-" or not has_content(path)
+        super().__init__(path, **kwargs)
+
+    def begin(self):
+        if self.write_header:
+            self.file.write(",".join(self.COLUMNS) + "\r\n")
+
+    def format_batch(self, batch):
+        out = io.StringIO()
+        writer = csv.writer(out)
+        for record in batch:
+            signal = record.get("signal", record.get("rssi", ""))
+            data = {k: v for k, v in record.items() if k not in ("time", "type", "key", "signal", "rssi")}
+            writer.writerow([f"{record['time']:.3f}", record["type"], record["key"], signal, json.dumps(data, default=str)])
+        return out.getvalue()
+
+
+def has_content(path):
+    try:
+        with open(path, "rb") as f:
+            return bool(f.read(1))
+    except OSError:
+        return False
+
+
+def influx_escape(value, characters=", ="):
+    value = str(value)
+    for c in characters:
+        value = value.replace(c, "\\" + c)
+    return value
+
+
+def influx_line(record, tag_keys=("type", "key", "model", "id", "channel", "essid", "name")):
+    """InfluxDB line protocol: measurement,tags fields timestamp(ns)"""
+    tags = [f"{k}={influx_escape(record[k])}" for k in tag_keys[1:]
+            if record.get(k) not in (None, "") and not isinstance(record[k], (dict, list))]
+    fields = []
+    for key, value in record.items():
+        if key in tag_keys or key == "time" or value is None:
+            continue
+        if isinstance(value, bool):
+            fields.append(f"{influx_escape(key)}={'true' if value else 'false'}")
+        elif isinstance(value, int):
+            fields.append(f"{influx_escape(key)}={value}i")
+        elif isinstance(value, float):
+            fields.append(f"{influx_escape(key)}={value!r}")
+        else:
+            text = json.dumps(value, default=str) if isinstance(value, (dict, list)) else str(value)
+            text = text.replace("\\", "\\\\").replace('"', '\\"')
+            fields.append(f'{influx_escape(key)}="{text}"')
+    if not fields:
+        fields.append("seen=1i")
+    measurement = influx_escape(record["type"], ", ")
+    head = ",".join([measurement] + tags)
+    return f"{head} {','.join(fields)} {int(record['time'] * 1e9)}\n"
+
+
+class InfluxSink(Sink):
+    """Line protocol to a file ('-' for stdout), or to a socket with udp://host:port or tcp://host:port"""
+
+    def __init__(self, target, **kwargs):
+        self.target = target
+        url = urlparse(target)
+        self.file = None
+        self.sock = None
+        self.scheme = url.scheme
+        if url.scheme in ("udp", "tcp"):
+            self.address = (url.hostname, url.port or 8089)
+        else:
+            self.file = sys.stdout if target == "-" else open(target, "a", encoding="utf-8")
+        super().__init__(**kwargs)
+
+    def connect(self):
+        if self.sock is None:
+            if self.scheme == "udp":
+                self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            else:
+                self.sock = socket.create_connection(self.address, timeout=5)
+        return self.sock
+
+    def write_batch(self, batch):
+        lines = [influx_line(record) for record in batch]
+        if self.file:
+            self.file.write("".join(lines))
+            self.file.flush()
+            return
+        try:
+            sock = self.connect()
+            if self.scheme == "udp":
+                # Keep datagrams below a typical MTU-safe size
+                chunk = []
+                for line in lines:
+                    chunk.append(line)
+                    if sum(map(len, chunk)) > 1200:
+                        sock.sendto("".join(chunk).encode(), self.address)
+                        chunk = []
+                if chunk:
+                    sock.sendto("".join(chunk).encode(), self.address)
+            else:
+                sock.sendall("".join(lines).encode())
+        except OSError:
+            if self.sock:
+                self.sock.close()
+            self.sock = None
+            raise
+
+    def finish(self):
+        if self.file and self.file is not sys.stdout:
+            self.file.close()
+        if self.sock:
+            self.sock.close()
+
+
+def mqtt_string(value):
+    data = value.encode("utf-8")
+    return struct.pack("!H", len(data)) + data
+
+
+def mqtt_topic_level(value):
+    """One topic level: '/' would split it and '+' / '#' are wildcards, so they are %-escaped"""
+    value = str(value)
+    for c in "%/+#":
+        if c in value:
+            value = value.replace(c, f"%{ord(c):02X}")
+    return value
+
+
+def recv_exactly(sock, size):
+    """recv() until `size` bytes or end of stream"""
+    data = b""
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            break
+        data += chunk
+    return data
+
+
+def mqtt_length(length):
+    out = bytearray()
+    while True:
+        byte, length = length % 128, length // 128
+        out.append(byte | (0x80 if length else 0))
+        if not length:
+            return bytes(out)
+
+
+class MqttSink(Sink):
+    """Minimal MQTT 3.1.1 publisher (QoS 0) so no client library is needed.
+    Records go to <topic>/<type>/<key> as JSON, the key as a single topic level
+    ('Acurite-Tower/1/A' -> 'airspy/rtl433/Acurite-Tower%2F1%2FA')."""
+
+    def __init__(self, target="localhost:1883", topic="airspy", client_id=None, keepalive=60, **kwargs):
+        url = urlparse(target if "://" in target else "mqtt://" + target)
+        self.address = (url.hostname or "localhost", url.port or 1883)
+        self.username = url.username
+        self.password = url.password
+        self.topic = (url.path.strip("/") or topic)
+        self.client_id = client_id or f"airspy-{socket.gethostname()}-{id(self) & 0xffff:x}"
+        self.keepalive = keepalive
+        self.sock = None
+        self.last_send = 0.0
+        super().__init__(**kwargs)
+
+    def connect(self):
+        if self.sock is not None:
+            return self.sock
+        sock = socket.create_connection(self.address, timeout=5)
+        flags = 0x02  # clean session
+        payload = mqtt_string(self.client_id)
+        if self.username:
+            flags |= 0x80
+            payload += mqtt_string(self.username)
+            if self.password:
+                flags |= 0x40
+                payload += mqtt_string(self.password)
+        variable = mqtt_string("MQTT") + bytes([4, flags]) + struct.pack("!H", self.keepalive)
+        body = variable + payload
+        sock.sendall(b"\x10" + mqtt_length(len(body)) + body)
+        connack = recv_exactly(sock, 4)
+        if len(connack) < 4 or connack[0] != 0x20 or connack[3] != 0:
+            sock.close()
+            raise ConnectionError(f"MQTT broker refused the connection ({connack!r})")
+        self.sock = sock
+        self.last_send = time.monotonic()
+        return sock
+
+    def publish_packet(self, topic, payload):
+        body = mqtt_string(topic) + payload
+        return b"\x30" + mqtt_length(len(body)) + body
+
+    def write_batch(self, batch):
+        packets = b"".join(
+            self.publish_packet(f"{self.topic}/{record['type']}/{mqtt_topic_level(record['key'])}",
+                                json.dumps(record, default=str).encode())
+            for record in batch)
+        try:
+            self.connect().sendall(packets)
+            self.last_send = time.monotonic()
+        except OSError:
+            if self.sock:
+                self.sock.close()
+            self.sock = None
+            raise
+
+    def idle(self):
+        # PINGREQ keeps the session open when nothing was published for a while
+        if self.sock is not None and time.monotonic() - self.last_send > self.keepalive / 2:
+            try:
+                self.sock.sendall(b"\xc0\x00")
+                self.last_send = time.monotonic()
+            except OSError:
+                self.sock.close()
+                self.sock = None
+
+    def finish(self):
+        if self.sock is not None:
+            try:
+                self.sock.sendall(b"\xe0\x00")  # DISCONNECT
+            except OSError:
+                pass
+            self.sock.close()
+
+
+class StoreSink(Sink):
+    """Queryable SQLite observation store (see store.py), one transaction per batch"""
+
+    def __init__(self, path=STORE_PATH, **kwargs):
+        self.store = ObservationStore(path)
+        super().__init__(**kwargs)
+
+    def write_batch(self, batch):
+        self.store.add_many(batch)
+
+    def finish(self):
+        self.store.close()
+
+
+def make_sink(output_format, target=None, **kwargs):
+    """Sink for one of OUTPUT_FORMATS; target is a file path, '-', a database, udp://, tcp:// or host:port for MQTT"""
+    target = target or DEFAULT_TARGETS[output_format]
+    if output_format == "json":
+        return JsonLinesSink(target, **kwargs)
+    if output_format == "csv":
+        return CsvSink(target, **kwargs)
+    if output_format == "log":
+        return LogSink(target, **kwargs)
+    if output_format == "influx":
+        return InfluxSink(target, **kwargs)
+    if output_format == "mqtt":
+        return MqttSink(target, **kwargs)
+    if output_format == "sqlite":
+        return StoreSink(target, **kwargs)
+    raise ValueError(f"Unknown output format: {output_format}")
+
+###### END OUTPUT SINKS ######
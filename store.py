@@ -0,0 +1,240 @@
+import os
+import re
+import json
+import time
+import sqlite3
+import threading
+from datetime import datetime
+
+from color import *
+from oui import mac_to_int, format_mac
+
+###### OBSERVATION STORE ######
+
+# Every observation handed to a sink (see sinks.py) can also be kept in SQLite:
+#   observations: one row per sighting, indexed by (key, time) and by time
+#   devices:      one row per (type, key), updated in the same transaction, so
+#                 "when was this BSSID last seen, and how strong" is a single lookup
+STORE_PATH = "airspy.db"
+STORE_HISTORY = 20
+
+RECORD_FIELDS = ("time", "type", "key", "signal", "rssi")
+MAC_TEXT = re.compile(r"[0-9A-Fa-f:.\-]+")
+
+
+def record_signal(record):
+    signal = record.get("signal", record.get("rssi"))
+    return signal if isinstance(signal, (int, float)) and not isinstance(signal, bool) else None
+
+
+def store_key(key):
+    """Key as stored, from what the user typed: a MAC in any notation -> 'AA:BB:CC:DD:EE:FF'"""
+    if MAC_TEXT.fullmatch(key):
+        value = mac_to_int(key)
+        if value is not None:
+            return format_mac(value)
+    return key
+
+
+def record_label(record):
+    return record.get("essid") or record.get("name") or record.get("model") or None
+
+
+class ObservationStore:
+    """Append-optimized SQLite (WAL) store of Wi-Fi, BLE and rtl_433 observations.
+
+    Records are the flat dicts built by sinks.observation(); add_many() writes a whole
+    batch in one transaction. Keys (MACs, model/id/channel) compare case-insensitively.
+    """
+
+    def __init__(self, path=STORE_PATH):
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.row_factory = sqlite3.Row
+        self.db.execute("PRAGMA journal_mode=WAL")
+        # With WAL, NORMAL only syncs at checkpoints: a power cut can lose the last
+        # batches but never corrupts the file.
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS observations (
+                time REAL NOT NULL,
+                type TEXT NOT NULL,
+                key TEXT NOT NULL COLLATE NOCASE,
+                signal REAL,
+                data TEXT);
+            CREATE INDEX IF NOT EXISTS observations_key_time ON observations(key, time);
+            CREATE INDEX IF NOT EXISTS observations_time ON observations(time);
+            CREATE TABLE IF NOT EXISTS devices (
+                type TEXT NOT NULL,
+                key TEXT NOT NULL COLLATE NOCASE,
+                label TEXT,
+                first_seen REAL NOT NULL,
+                last_seen REAL NOT NULL,
+                count INTEGER NOT NULL,
+                last_signal REAL,
+                min_signal REAL,
+                max_signal REAL,
+                PRIMARY KEY (type, key));
+            CREATE INDEX IF NOT EXISTS devices_key ON devices(key);
+            CREATE INDEX IF NOT EXISTS devices_last_seen ON devices(last_seen);
+        """)
+        self.lock = threading.Lock()
+
+    def add_many(self, records):
+        rows = []
+        devices = {}
+        for record in records:
+            signal = record_signal(record)
+            data = {k: v for k, v in record.items() if k not in RECORD_FIELDS}
+            rows.append((record["time"], record["type"], record["key"], signal,
+                         json.dumps(data, default=str) if data else None))
+
+            # Fold the batch per device first: one upsert per device instead of per row
+            ident = (record["type"], record["key"])
+            device = devices.get(ident)
+            if device is None:
+                devices[ident] = [record_label(record), record["time"], record["time"], 1, signal, signal, signal]
+                continue
+            label = record_label(record)
+            device[3] += 1
+            if label:
+                device[0] = label
+            if record["time"] < device[1]:
+                device[1] = record["time"]
+            if record["time"] >= device[2]:
+                device[2] = record["time"]
+                if signal is not None:
+                    device[4] = signal
+            if signal is not None:
+                device[5] = signal if device[5] is None else min(device[5], signal)
+                device[6] = signal if device[6] is None else max(device[6], signal)
+
+        with self.lock, self.db:
+            self.db.executemany("INSERT INTO observations VALUES (?, ?, ?, ?, ?)", rows)
+            self.db.executemany("""
+                INSERT INTO devices VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(type, key) DO UPDATE SET
+                    label = coalesce(excluded.label, label),
+                    first_seen = min(first_seen, excluded.first_seen),
+                    last_signal = CASE WHEN excluded.last_seen >= last_seen
+                                       THEN coalesce(excluded.last_signal, last_signal) ELSE last_signal END,
+                    last_seen = max(last_seen, excluded.last_seen),
+                    count = count + excluded.count,
+                    min_signal = min(coalesce(min_signal, excluded.min_signal), coalesce(excluded.min_signal, min_signal)),
+                    max_signal = max(coalesce(max_signal, excluded.max_signal), coalesce(excluded.max_signal, max_signal))
+                """, [ident + tuple(device) for ident, device in devices.items()])
+        return len(rows)
+
+    def last_seen(self, key):
+        """Summary of a device (type, label, first/last seen, count, last/min/max signal), or None"""
+        with self.lock:
+            row = self.db.execute("SELECT * FROM devices WHERE key = ? ORDER BY last_seen DESC LIMIT 1",
+                                  (key,)).fetchone()
+        return dict(row) if row else None
+
+    def devices(self, kind=None, since=None, limit=None):
+        """Device summaries, most recently seen first"""
+        query = "SELECT * FROM devices WHERE 1"
+        params = []
+        if kind:
+            query += " AND type = ?"
+            params.append(kind)
+        if since is not None:
+            query += " AND last_seen >= ?"
+            params.append(since)
+        query += " ORDER BY last_seen DESC"
+        if limit:
+            query += " LIMIT ?"
+            params.append(limit)
+        with self.lock:
+            return [dict(row) for row in self.db.execute(query, params)]
+
+    def observations(self, key=None, kind=None, since=None, until=None, limit=STORE_HISTORY):
+        """Stored records (same shape as sinks.observation()), newest first"""
+        query = "SELECT time, type, key, signal, data FROM observations WHERE 1"
+        params = []
+        if key:
+            query += " AND key = ?"
+            params.append(key)
+        if kind:
+            query += " AND type = ?"
+            params.append(kind)
+        if since is not None:
+            query += " AND time >= ?"
+            params.append(since)
+        if until is not None:
+            query += " AND time < ?"
+            params.append(until)
+        query += " ORDER BY time DESC"
+        if limit:
+            query += " LIMIT ?"
+            params.append(limit)
+        with self.lock:
+            rows = self.db.execute(query, params).fetchall()
+        records = []
+        for row in rows:
+            record = {"time": row["time"], "type": row["type"], "key": row["key"]}
+            if row["signal"] is not None:
+                record["signal"] = row["signal"]
+            if row["data"]:
+                record.update(json.loads(row["data"]))
+            records.append(record)
+        return records
+
+    def __len__(self):
+        with self.lock:
+            return self.db.execute("SELECT COUNT(*) FROM observations").fetchone()[0]
+
+    def close(self):
+        with self.lock:
+            self.db.close()
+
+
+def format_time(timestamp):
+    return datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def format_signal(value):
+    return "?" if value is None else f"{value:g}"
+
+
+def query_store(path=STORE_PATH, key=None, since_minutes=None, limit=STORE_HISTORY):
+    """Prints a device's last sighting and history, or every device seen (optionally in the last minutes)"""
+    if not os.path.isfile(path):
+        print(f"{Color.RED}{Style.BRIGHT}[!]{Style.RESET_ALL} No observation store at {path} (record one with --output sqlite).")
+        return
+    store = ObservationStore(path)
+    since = time.time() - since_minutes * 60 if since_minutes else None
+    try:
+        if not key:
+            devices = store.devices(since=since, limit=limit)
+            print(f"\n{Color.GREEN}{Style.BRIGHT}=== STORED DEVICES ({len(store)} observations) ==={Style.RESET_ALL}")
+            for device in devices:
+                print(f"{format_time(device['last_seen'])}  {device['type']:<11} {device['key']:<24} "
+                      f"{device['label'] or '':<20} seen {device['count']}x, signal {format_signal(device['last_signal'])}")
+            if not devices:
+                print(f"{Color.RED}{Style.BRIGHT}[!]{Style.RESET_ALL} Nothing stored for this period.")
+            return
+
+        key = store_key(key)
+        device = store.last_seen(key)
+        if device is None:
+            print(f"{Color.RED}{Style.BRIGHT}[!]{Style.RESET_ALL} {key} was never seen.")
+            return
+        print(f"\n{Color.GREEN}{Style.BRIGHT}=== {device['key']} ({device['type']}) ==={Style.RESET_ALL}")
+        if device["label"]:
+            print(f"Name: {device['label']}")
+        print(f"First seen: {format_time(device['first_seen'])}")
+        print(f"Last seen:  {format_time(device['last_seen'])} at {format_signal(device['last_signal'])} "
+              f"(min {format_signal(device['min_signal'])}, max {format_signal(device['max_signal'])})")
+        print(f"Sightings:  {device['count']}")
+        print(f"\n{Color.CYAN}{Style.BRIGHT}Latest observations:{Style.RESET_ALL}")
+        for record in store.observations(key, since=since, limit=limit):
+            fields = " ".join(f"{k}={v}" for k, v in record.items() if k not in ("time", "type", "key"))
+            print(f"   - {format_time(record['time'])} [{record['type']}] {fields}")
+    finally:
+        store.close()
+
+###### END OBSERVATION STORE ######
@@ -0,0 +1,82 @@
+import os
+import sys
+import asyncio
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from ble_tracker import BleTracker, track_ble
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "bench"))
+
+from fake_ble import mock_scanner_factory
+
+
+def detection(address, rssi, name=None, **fields):
+    return SimpleNamespace(address=address, name=None), SimpleNamespace(local_name=name, rssi=rssi, **fields)
+
+
+def test_rssi_statistics():
+    tracker = BleTracker(alpha=0.5)
+    tracker.add(1, rssi=None, now=10.0)
+    device = tracker.add(1, "Tag", -60, now=11.0)
+    assert (device.rssi_min, device.rssi_max, device.rssi_avg) == (-60, -60, -60.0)
+    tracker.add(1, rssi=-80, now=12.0)
+    tracker.add(1, rssi=-50, now=13.0)
+    assert (device.count, device.name, device.rssi) == (4, "Tag", -50)
+    assert (device.rssi_min, device.rssi_max, device.rssi_avg) == (-80, -50, -60.0)
+    assert (device.first_seen, device.last_seen) == (10.0, 13.0)
+
+
+def test_changed_expire_and_ranking():
+    tracker = BleTracker(lost_after=60)
+    tracker.add(1, rssi=-70, now=100.0)
+    tracker.add(2, rssi=-40, now=100.0)
+    tracker.add(3, now=150.0)
+    assert sorted(device.address for device in tracker.take_changed()) == [1, 2, 3]
+    assert tracker.take_changed() == []
+    assert [device.address for device in tracker.by_signal()] == [2, 1, 3]
+
+    tracker.add(1, rssi=-70, now=130.0)
+    assert [device.address for device in tracker.expire(now=170.0)] == [2]
+    assert len(tracker) == 2 and tracker.advertisements == 4
+
+
+def test_detection_callback_packs_addresses():
+    tracker = BleTracker()
+    tracker.on_detection(*detection("aa:bb:cc:dd:ee:ff", -55, "Watch", tx_power=4))
+    tracker.on_detection(*detection("AA:BB:CC:DD:EE:FF", -65))
+    tracker.on_detection(*detection("9F1B2C3D-0000-4000-8000-000000000000", -70))
+    watch = tracker.devices[0xAABBCCDDEEFF]
+    assert (watch.count, watch.name, watch.rssi) == (2, "Watch", -65)
+    assert watch.features == {"name:Watch", "tx:4"}
+    assert "9F1B2C3D-0000-4000-8000-000000000000" in tracker.devices
+
+
+def test_track_ble_snapshots():
+    advertisements = [detection(f"00:00:00:00:00:{i % 3:02X}", -50 - i) for i in range(30)]
+    snapshots = []
+    # One advertisement every 0.5 ms: all 30 are out well before the scan ends
+    scanner_factory = mock_scanner_factory(advertisements, rate=2000, burst=1)
+    tracker = asyncio.run(track_ble(timeout=0.1, interval=0.01, scanner_factory=scanner_factory,
+                                    on_snapshot=lambda tracker: snapshots.append(tracker.advertisements)))
+    assert tracker.advertisements == 30 and len(tracker) == 3
+    assert len(snapshots) >= 2 and snapshots[-1] == 30
+    assert snapshots == sorted(snapshots)
+    assert tracker.devices[2].rssi == -79
+
+
+def test_track_ble_stops_on_event():
+    stop = threading.Event()
+    stop.set()
+    tracker = asyncio.run(track_ble(timeout=None, stop=stop, scanner_factory=mock_scanner_factory([])))
+    assert len(tracker) == 0
+
+
+@pytest.mark.parametrize("alpha", [0.1, 0.9])
+def test_ewma_moves_toward_new_readings(alpha):
+    tracker = BleTracker(alpha=alpha)
+    tracker.add(1, rssi=-90, now=0.0)
+    device = tracker.add(1, rssi=-50, now=1.0)
+    assert device.rssi_avg == pytest.approx(-90 + alpha * 40)
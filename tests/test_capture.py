@@ -0,0 +1,110 @@
+import os
+import sys
+import time
+import signal
+import tempfile
+import subprocess
+
+import pytest
+
+import capture
+from capture import CaptureSession, sweep_stale_sessions, DIRECTORY_PREFIX, PID_FILE
+
+pytestmark = pytest.mark.skipif(not os.path.isdir("/proc/self"), reason="needs /proc")
+
+# Stand-in for sudo: runs a child that outlives it when sudo itself is terminated, as
+# airodump-ng does when sudo exits without relaying the signal
+FAKE_SUDO = """#!/bin/sh
+sleep 300 &
+echo $! > "$AIRSPY_TEST_CHILD"
+trap 'exit 0' TERM
+wait
+"""
+
+
+def gone(pid):
+    """Exited (a zombie waiting for init counts as exited)"""
+    try:
+        with open(f"/proc/{pid}/stat") as file:
+            return file.read().rsplit(")", 1)[1].split()[0] == "Z"
+    except OSError:
+        return True
+
+
+def wait_gone(pid, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not gone(pid) and time.monotonic() < deadline:
+        time.sleep(0.02)
+    return gone(pid)
+
+
+@pytest.fixture
+def fake_sudo(tmp_path, monkeypatch):
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    (bin_dir / "sudo").write_text(FAKE_SUDO)
+    (bin_dir / "sudo").chmod(0o755)
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+    monkeypatch.setenv("AIRSPY_TEST_CHILD", str(tmp_path / "child.pid"))
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_path))
+    monkeypatch.setattr(capture, "STOP_TIMEOUT", 1.0)
+
+    def start():
+        session = CaptureSession().start()
+        deadline = time.monotonic() + 5
+        while not (tmp_path / "child.pid").exists() or not (tmp_path / "child.pid").read_text().strip():
+            assert time.monotonic() < deadline
+            time.sleep(0.02)
+        return session, int((tmp_path / "child.pid").read_text())
+
+    return start
+
+
+def test_close_stops_the_whole_group(fake_sudo):
+    session, child = fake_sudo()
+    directory = session.directory
+    session.close()
+    assert wait_gone(child)
+    assert not os.path.exists(directory)
+
+
+def test_close_after_sudo_was_terminated(fake_sudo):
+    # wifi.py terminates the sudo process itself, then closes the session
+    session, child = fake_sudo()
+    session.process.terminate()
+    session.process.wait()
+    assert not gone(child)
+    session.close()
+    assert wait_gone(child)
+
+
+def stale_directory(tmp_path, pgid):
+    finished = subprocess.Popen(["true"])
+    finished.wait()                               # a dead Airspy pid
+    path = tmp_path / f"{DIRECTORY_PREFIX}{finished.pid}-test{pgid}"
+    path.mkdir()
+    (path / PID_FILE).write_text(str(pgid))
+    return path
+
+
+def test_sweep_only_stops_airodump(tmp_path):
+    airodump = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(300)", "airodump-ng"], start_new_session=True)
+    unrelated = subprocess.Popen(["sleep", "300"], start_new_session=True)   # reused the recorded PID
+    try:
+        paths = [stale_directory(tmp_path, airodump.pid), stale_directory(tmp_path, unrelated.pid)]
+        sweep_stale_sessions(str(tmp_path))
+        assert airodump.wait(5) == -signal.SIGTERM
+        assert unrelated.poll() is None
+        assert not any(path.exists() for path in paths)
+    finally:
+        for process in (airodump, unrelated):
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+
+
+def test_live_sessions_are_kept(tmp_path):
+    path = tmp_path / f"{DIRECTORY_PREFIX}{os.getpid()}-live"
+    path.mkdir()
+    sweep_stale_sessions(str(tmp_path))
+    assert path.exists()
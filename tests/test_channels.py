@@ -0,0 +1,82 @@
+import random
+
+import numpy as np
+import pytest
+
+from channels import BAND_24, BAND_5, ChannelPlanner, ap_band, channel_options, center_frequency
+from records import AccessPoint
+
+
+def ap(bssid, channel, signal=-50, data=0):
+    return AccessPoint(bssid, f"Net {bssid}", signal, channel, "WPA2", 10, data, 0.0)
+
+
+def labels(ranked):
+    return [score.option.label for score in ranked]
+
+
+def test_channel_option_tables():
+    assert [o.label for o in channel_options(40) if o.band == BAND_24] == [f"{c}+{c + 4}" for c in range(1, 10)]
+    assert labels(ChannelPlanner(80).recommend(BAND_5, count=6)[BAND_5]) == [
+        "36-48", "52-64", "100-112", "116-128", "132-144", "149-161"]
+    first = channel_options(40)[0]
+    assert (first.low, first.high) == (2401, 2443)
+    block = next(o for o in channel_options(80) if o.channel == 100)
+    assert (block.low, block.high) == (5490, 5570)
+    assert len(channel_options(20)) == 13 + 25
+    assert not [o for o in channel_options(80) if o.band == BAND_24]
+    with pytest.raises(ValueError):
+        channel_options(160)
+
+
+def test_unknown_channels():
+    assert [center_frequency(c) for c in (0, -1, 15, 6, 14, 36)] == [None, None, None, 2437, 2484, 5180]
+    assert ap_band(0) is None and ap_band(-1) is None
+    planner = ChannelPlanner().build([ap(1, 0), ap(2, -1), ap(3, 6)])
+    assert len(planner) == 1
+    assert planner.update(4, 0, -40) is False and len(planner) == 1
+    assert planner.update(3, 0, -40) is False and len(planner) == 0     # moved to an unknown channel
+    assert all(score.score is None and score.aps == 0 for score in planner.scores())
+
+
+def test_rankings():
+    planner = ChannelPlanner().build([ap(1, 6, -40), ap(2, 36, -40), ap(3, 44, -80)])
+    ranked = planner.recommend()
+    # 1, 11, 12 and 13 do not reach channel 6's 22 MHz; ties keep the channel order
+    assert labels(ranked[BAND_24]) == ["1", "11", "12"]
+    assert labels(ranked[BAND_5]) == ["40", "48", "52"]
+    worst = planner.recommend(BAND_5, count=25)[BAND_5][-2:]
+    assert labels(worst) == ["44", "36"]
+    assert round(worst[-1].score, 1) == -46.0 and worst[-1].aps == 1
+
+    bonded = ChannelPlanner(40).build([ap(1, 36, -40), ap(2, 52, -60), ap(3, 1, -50)])
+    assert labels(bonded.recommend(BAND_5)[BAND_5]) == ["44-48", "60-64", "100-104"]
+    assert labels(bonded.recommend(BAND_24)[BAND_24]) == ["6+10", "7+11", "8+12"]   # 5+9 starts at 2421 MHz
+
+
+@pytest.mark.parametrize("width", [20, 40, 80])
+def test_incremental_matches_build(width):
+    rng = random.Random(width)
+    channels = list(range(-1, 15)) + [36, 40, 44, 52, 100, 149, 165]
+    planner = ChannelPlanner(width, capacity=4)    # small, so update() has to grow it
+    live = {}
+    for _ in range(2000):
+        bssid = rng.randrange(60)
+        if rng.random() < 0.2:
+            planner.remove(bssid)
+            live.pop(bssid, None)
+        else:
+            live[bssid] = ap(bssid, rng.choice(channels), rng.randint(-95, -20), rng.randint(0, 200000))
+            planner.update(bssid, live[bssid].channel, live[bssid].signal, live[bssid].data)
+            if ap_band(live[bssid].channel) is None:
+                del live[bssid]
+
+    fresh = ChannelPlanner(width).build(live.values())
+    assert set(planner.slots) == set(fresh.slots)
+    assert np.allclose(planner.levels(), fresh.levels(), rtol=1e-9, atol=0)
+    assert list(planner.count) == list(fresh.count)
+    for band, ranked in fresh.recommend(count=5).items():
+        assert labels(planner.recommend(band, count=5)[band]) == labels(ranked)
+
+    planner.rebuild()
+    assert np.allclose(planner.power, fresh.power, rtol=1e-12, atol=0)
@@ -0,0 +1,64 @@
+from types import SimpleNamespace
+
+from ble_tracker import BleDevice
+from correlate import RandomizationIndex, advertisement_features, correlate_ble, correlate_stations, probe_features
+from records import Client
+
+FIXED = 0x3C22FB000001                         # globally unique: one device on its own
+PROBES = ("Home", "Office", "Gym")
+
+
+def randomized(n):
+    return 0xDA0000000000 + n                   # U/L bit set
+
+
+def station(n, first, last, signal=-50, probes=PROBES):
+    return Client(randomized(n), None, signal, probes, first, last)
+
+
+def ble(n, first, last, rssi=-60, count=100):
+    advertisement = SimpleNamespace(manufacturer_data={0x004c: bytes([0x10, 5, 1, 2, 3, 4, 5])},
+                                    service_uuids=["0000fe9f-0000-1000-8000-00805f9b34fb"], tx_power=12)
+    device = BleDevice(randomized(n), None, rssi, first, advertisement_features(advertisement))
+    device.count, device.last_seen = count, last
+    return device
+
+
+def test_rotation_is_linked():
+    stations = [station(1, 0.0, 100.0), station(2, 150.0, 300.0, signal=-55),
+                Client(FIXED, None, -50, PROBES, 0.0, 300.0)]
+    correlation = correlate_stations(stations)
+    assert (correlation.addresses, correlation.devices, correlation.randomized, correlation.linked) == (3, 2, 2, 1)
+    assert correlation.chains == [[randomized(1), randomized(2)]]
+
+
+def test_gap_and_signal_mismatch_are_not_linked():
+    too_late = [station(1, 0.0, 100.0), station(2, 401.0, 500.0)]
+    assert correlate_stations(too_late).chains == []
+    too_far = [station(1, 0.0, 100.0, signal=-40), station(2, 150.0, 300.0, signal=-70)]
+    correlation = correlate_stations(too_far)
+    assert (correlation.devices, correlation.linked) == (2, 0)
+    other_networks = [station(1, 0.0, 100.0), station(2, 150.0, 300.0, probes=("Airport", "Hotel"))]
+    assert correlate_stations(other_networks).linked == 0
+
+
+def test_one_successor_per_address():
+    index = RandomizationIndex()
+    features = probe_features(PROBES)
+    index.add(randomized(1), features, 0.0, 100.0, -50)
+    index.add(randomized(2), features, 130.0, 400.0, -50)
+    index.add(randomized(3), features, 120.0, 400.0, -50)
+    index.add(randomized(4), frozenset(), 110.0, 400.0, -50)    # no features: never a candidate
+    assert index.candidates() == {(0, 1), (0, 2)}
+    assert index.links() == {0: 2}               # the address that appeared closest to the rotation
+    correlation = index.correlate()
+    assert correlation.chains == [[randomized(1), randomized(3)]]
+    assert correlation.devices == 3
+
+
+def test_ble_rotation_chain():
+    devices = [ble(1, 0.0, 60.0), ble(2, 62.0, 120.0, count=97), ble(3, 121.0, 180.0, rssi=-64),
+               ble(4, 250.0, 300.0)]            # 70 s after the last rotation: another phone
+    correlation = correlate_ble(devices)
+    assert correlation.chains == [[randomized(1), randomized(2), randomized(3)]]
+    assert (correlation.devices, correlation.linked) == (2, 2)
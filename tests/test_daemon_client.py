@@ -0,0 +1,77 @@
+import asyncio
+from argparse import Namespace
+
+import pytest
+
+import daemon_client
+from airodump import parse_channels
+from daemon_client import daemon_covers, print_wifi_snapshot, serve_from_daemon
+from records import AccessPoint, Client, ap_json, client_json
+
+
+def snapshot():
+    aps = [AccessPoint(0x001122330000 + channel, f"net-{channel}", -40 - channel, channel, "WPA2") for channel in (1, 3, 6, 11)]
+    clients = [Client(0xAABBCC000001, aps[2].bssid, -60)]
+    return {"aps": [ap_json(ap) for ap in aps], "clients": [client_json(client) for client in clients]}
+
+
+def shown(capsys, **filters):
+    print_wifi_snapshot(snapshot(), **filters)
+    out = capsys.readouterr().out
+    return [name for name in ("net-1", "net-3", "net-6", "net-11") if name + "\x1b" in out]
+
+
+def test_parse_channels():
+    assert parse_channels("6") == [6]
+    assert parse_channels("1-6-11") == [1, 6, 11]
+    assert parse_channels("1,6") == [1, 6]
+    with pytest.raises(ValueError):
+        parse_channels("six")
+
+
+def test_single_channel(capsys):
+    assert shown(capsys, filter_channel="6") == ["net-6"]
+
+
+def test_channel_list_matches_local_scan(capsys):
+    # '1-6' lists channels 1 and 6, as AirodumpCapture.select reads it, not the range 1..6
+    assert shown(capsys, filter_channel="1-6") == ["net-1", "net-6"]
+
+
+def test_no_filter_and_min_signal(capsys):
+    assert shown(capsys) == ["net-1", "net-3", "net-6", "net-11"]
+    assert shown(capsys, min_signal=-45) == ["net-1", "net-3"]
+
+
+def test_clients_listed_under_their_ap(capsys):
+    print_wifi_snapshot(snapshot(), filter_channel="6")
+    assert "AA:BB:CC:00:00:01" in capsys.readouterr().out
+
+
+def request(**wanted):
+    return Namespace(**dict(dict(wifi=False, live_wifi=False, bluetooth=False, live_ble=False, frequency=None, sdr=None),
+                            **wanted))
+
+
+def status(**sources):
+    return {"pid": 1, "uptime": 5.0, "sources": sources}
+
+
+def test_daemon_covers_running_sources_only():
+    running = status(wifi={"running": True}, rtl433={"running": True, "frequency": "433.92M"})
+    assert daemon_covers(request(wifi=True), running)
+    assert daemon_covers(request(wifi=True, frequency="433.92M"), running)
+    assert not daemon_covers(request(wifi=True, bluetooth=True), running)
+    assert not daemon_covers(request(frequency="868M"), running)
+    assert not daemon_covers(request(), running)
+    stopped = status(wifi={"running": False, "error": "No such file or directory: 'sudo'"})
+    assert not daemon_covers(request(wifi=True), stopped)
+
+
+def test_stopped_source_falls_back_to_a_local_scan(monkeypatch, capsys):
+    stopped = status(wifi={"running": False, "error": "No such file or directory: 'sudo'"})
+    monkeypatch.setattr(daemon_client, "daemon_status", lambda path: stopped)
+    assert asyncio.run(serve_from_daemon(request(wifi=True))) is False
+    out = capsys.readouterr().out
+    assert "wifi source stopped (No such file or directory: 'sudo'), scanning locally" in out
+    assert "Answered by the Airspy daemon" not in out
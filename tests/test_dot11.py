@@ -0,0 +1,83 @@
+import struct
+
+import pytest
+
+from dot11 import FrameTracker, frequency_channel, load_pcap
+
+BSSID = bytes.fromhex("0011223344aa")
+STATION = bytes.fromhex("3c22fb000001")
+BROADCAST = b"\xff" * 6
+PCAP_HEADER = struct.pack("<IHHiIII", 0xa1b2c3d4, 2, 4, 0, 0, 65535, 127)
+RSN = bytes([48, 20, 1, 0, 0, 0x0f, 0xac, 4, 1, 0, 0, 0x0f, 0xac, 4, 1, 0, 0, 0x0f, 0xac, 2, 0, 0])
+
+
+def radiotap(signal, frequency=2437, fcs=False):
+    """Radiotap header with TSFT, flags, rate, channel and dBm antenna signal"""
+    return struct.pack("<BBHIQBBHHbB", 0, 0, 24, 0x2f, 0, 0x10 if fcs else 0, 12, frequency, 0x00a0, signal, 0)
+
+
+def beacon(ssid=b"Home"):
+    ies = bytes([0, len(ssid)]) + ssid + bytes([3, 1, 6]) + RSN
+    return struct.pack("<BBH6s6s6sH", 0x80, 0, 0, BROADCAST, BSSID, BSSID, 0) + struct.pack("<QHH", 0, 100, 0x0411) + ies
+
+
+def to_ap(payload=b"x" * 40):
+    return struct.pack("<BBH6s6s6sHH", 0x88, 0x41, 44, BSSID, STATION, BSSID, 0, 0) + payload
+
+
+def record(data, stamp=1700000000.5, length=None):
+    length = len(data) if length is None else length
+    return struct.pack("<IIII", int(stamp), int(stamp % 1 * 1e6), length, length) + data
+
+
+def capture(*records):
+    return PCAP_HEADER + b"".join(records)
+
+
+def test_beacon_and_data_frames():
+    tracker = FrameTracker()
+    data = capture(record(radiotap(-42) + beacon()), record(radiotap(-60, fcs=True) + to_ap() + b"\0" * 4, 1700000001.0))
+    assert tracker.feed(data) == 2
+    ap = tracker.ap(BSSID)
+    assert (ap.essid, ap.signal, ap.channel, ap.security, ap.beacons, ap.data) == ("Home", -42, 6, "WPA2 CCMP PSK", 1, 1)
+    client = tracker.client(STATION)
+    assert (client.bssid, client.signal, client.last_seen) == (int.from_bytes(BSSID, "big"), -60, 1700000001.0)
+
+
+def test_records_split_across_chunks():
+    data = capture(*(record(radiotap(-40 - i) + beacon(), 1700000000 + i) for i in range(5)))
+    tracker = FrameTracker()
+    frames = sum(tracker.feed(data[i:i + 7]) for i in range(0, len(data), 7))
+    assert frames == tracker.frames == 5
+    assert tracker.ap(BSSID).signal == -44 and tracker.clock == 1700000004
+
+
+def test_truncated_radiotap_header_is_skipped():
+    # The last record stops inside its radiotap header, before the signal field
+    header = radiotap(-42)
+    data = capture(record(header + beacon()), record(header[:12]))
+    tracker = FrameTracker()
+    assert tracker.feed(data) == 2
+    assert tracker.aps[BSSID].signal == -42 and tracker.aps[BSSID].frames == 1
+
+
+def test_fields_past_the_radiotap_length_are_skipped():
+    header = bytearray(radiotap(-42))
+    struct.pack_into("<H", header, 2, 12)         # it_len too short for the fields it says are present
+    tracker = FrameTracker()
+    tracker.feed(capture(record(bytes(header) + beacon())))
+    assert tracker.aps == {}
+
+
+def test_bad_captures(tmp_path):
+    path = tmp_path / "capture.pcapng"
+    path.write_bytes(struct.pack("<I", 0x0a0d0d0a) + b"\0" * 28)
+    with pytest.raises(ValueError, match="pcapng"):
+        load_pcap(str(path))
+    path.write_bytes(struct.pack("<IHHiIII", 0xa1b2c3d4, 2, 4, 0, 0, 65535, 1))
+    with pytest.raises(ValueError, match="link type 1"):
+        load_pcap(str(path))
+
+
+def test_frequency_channel():
+    assert [frequency_channel(f) for f in (2412, 2484, 5180, 5955, 900)] == [1, 14, 36, 1, -1]
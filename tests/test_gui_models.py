@@ -0,0 +1,83 @@
+import gc
+import os
+
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+pytest.importorskip("PySide6")
+
+from PySide6.QtCore import Qt, QPersistentModelIndex
+from PySide6.QtWidgets import QApplication, QTableView
+
+from gui_models import KeyedTableModel, make_proxy, runs
+
+COLUMNS = [("SSID", "SSID"), ("BSSID", "BSSID"), ("Signal", "Signal")]
+
+
+@pytest.fixture(scope="module")
+def app():
+    return QApplication.instance() or QApplication([])
+
+
+def ap(bssid, signal, ssid="Net"):
+    return {"SSID": ssid, "BSSID": bssid, "Signal": signal}
+
+
+def column(model, number=1):
+    return [values[number] for values in model.values]
+
+
+def test_runs():
+    assert runs([]) == []
+    assert runs([1, 2, 3, 7, 9, 10]) == [(1, 3), (7, 7), (9, 10)]
+
+
+def test_update_signals_only_differences(app):
+    model = KeyedTableModel(COLUMNS, "BSSID")
+    model.update([ap("a", -50), ap("b", -60), ap("c", -70)])
+    seen = []
+    model.dataChanged.connect(lambda first, last, roles: seen.append(("changed", first.row(), last.row())))
+    model.rowsRemoved.connect(lambda parent, first, last: seen.append(("removed", first, last)))
+    model.rowsInserted.connect(lambda parent, first, last: seen.append(("inserted", first, last)))
+
+    model.update([ap("a", -50), ap("c", -65), ap("d", -80)])
+    assert seen == [("removed", 1, 1), ("changed", 1, 1), ("inserted", 2, 2)]
+    assert column(model) == ["a", "c", "d"]
+    assert model.row_of("d") == 2 and model.row_of("b") is None
+    assert model.data(model.index(1, 2)) == "-65"
+    assert model.data(model.index(1, 2), Qt.ToolTipRole) is None
+
+
+def test_resort_keeps_persistent_indexes(app):
+    model = KeyedTableModel(COLUMNS, "BSSID")
+    model.sort(2, Qt.DescendingOrder)
+    model.update([ap("a", -70), ap("b", -50), ap("c", None)])
+    assert column(model) == ["b", "a", "c"]       # missing values last in descending order
+    selected = QPersistentModelIndex(model.index(model.row_of("a"), 0))
+
+    model.update([ap("a", -40), ap("b", -50), ap("c", None)])
+    assert column(model) == ["a", "b", "c"]
+    assert selected.row() == model.row_of("a") == 0
+
+
+def test_view_sorting_goes_through_the_model(app):
+    model = KeyedTableModel(COLUMNS, "BSSID")
+    proxy = make_proxy(model, 2)
+    view = QTableView()
+    view.setModel(proxy)
+    view.horizontalHeader().setSortIndicator(proxy.sortColumn(), proxy.sortOrder())
+    view.setSortingEnabled(True)
+    model.update([ap("a", -70, "x"), ap("b", -50, "y")])
+    assert column(model) == ["b", "a"]
+
+    view.sortByColumn(0, Qt.AscendingOrder)
+    assert (model.sort_column, column(model)) == (0, ["a", "b"])
+    proxy.setFilterFixedString("Y")
+    assert proxy.rowCount() == 1
+
+    # A proxy parented to its model is destroyed inside the model's destructor, where its
+    # sort() override runs on a half-destroyed model: this teardown order used to segfault
+    assert proxy.parent() is not model
+    view.setModel(None)
+    del view, proxy, model
+    gc.collect()
@@ -0,0 +1,21 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "bench"))
+
+from check_importtime import BUDGETS, NEVER, measure
+
+# bench/check_importtime.py holds the real budgets; here they are only enforced with
+# room for a loaded CI machine, while the forbidden modules are checked exactly.
+SLACK = 3
+RUNS = 3
+
+
+@pytest.mark.parametrize("mode", list(BUDGETS))
+def test_startup_imports(mode):
+    budget, forbidden = BUDGETS[mode]
+    elapsed, modules = min((measure(mode) for _ in range(RUNS)), key=lambda run: run[0])
+    assert [name for name in NEVER + forbidden if name in modules] == []
+    assert elapsed <= budget * SLACK, f"{mode} imports take {elapsed:.1f} ms"
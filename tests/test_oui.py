@@ -0,0 +1,81 @@
+import oui
+from oui import OuiIndex, build_index, load_registry, mac_to_int, format_mac, RANDOMIZED
+
+IEEE_TXT = """OUI/MA-L                                                    Organization
+company_id                                                  Organization
+                                                            Address
+
+00-22-72   (hex)\t\tAmerican Micro-Fuel Device Corp.
+002272     (base 16)\t\tAmerican Micro-Fuel Device Corp.
+\t\t\t\t2181 Buchanan Loop
+\t\t\t\tFerndale  WA  98248
+\t\t\t\tUS
+
+00-1B-C5   (hex)\t\tIEEE Registration Authority
+001BC5     (base 16)\t\tIEEE Registration Authority
+\t\t\t\t445 Hoes Lane
+\t\t\t\tPiscataway  NJ  08554
+\t\t\t\tUS
+"""
+
+MANUF = """# Wireshark manuf
+00:00:0C\tCisco\tCisco Systems, Inc
+00:1B:C5:00:00/36\tConverg\tConverging Systems Inc.
+70:B3:D5:10/28\tShort
+"""
+
+
+def index_of(tmp_path, name, text):
+    path = tmp_path / name
+    path.write_text(text)
+    index = OuiIndex()
+    load_registry(index, str(path))
+    return index
+
+
+def test_ieee_txt_vendors(tmp_path):
+    index = index_of(tmp_path, "oui.txt", IEEE_TXT)
+    assert len(index) == 2
+    assert index.lookup("00:22:72:12:34:56") == "American Micro-Fuel Device Corp."
+    assert index.lookup("00-1b-c5-ff-ff-ff") == "IEEE Registration Authority"
+
+
+def test_manuf_longest_prefix(tmp_path):
+    index = index_of(tmp_path, "manuf", MANUF)
+    assert index.lookup("00:00:0C:01:02:03") == "Cisco Systems, Inc"
+    assert index.lookup("00:1B:C5:00:00:42") == "Converging Systems Inc."
+    assert index.lookup("70:B3:D5:1F:00:00") == "Short"
+    assert index.lookup("70:B3:D5:2F:00:00") is None
+
+
+def test_csv_registry(tmp_path):
+    index = index_of(tmp_path, "mam.csv", "Registry,Assignment,Organization Name,Organization Address\n"
+                                          "MA-M,70B3D51,\"Acme, Inc.\",Somewhere\n")
+    assert index.lookup("70:B3:D5:1A:BC:DE") == "Acme, Inc."
+
+
+def test_unregistered_addresses():
+    index = OuiIndex()
+    assert index.lookup("02:00:00:00:00:01") == RANDOMIZED
+    assert index.lookup("not a mac") is None
+
+
+def test_mac_round_trip():
+    value = mac_to_int("aa-bb-cc-dd-ee-ff")
+    assert value == 0xAABBCCDDEEFF
+    assert format_mac(value) == "AA:BB:CC:DD:EE:FF"
+    assert mac_to_int(value) == value
+
+
+def test_index_cache_follows_the_version(tmp_path, monkeypatch):
+    registry = tmp_path / "manuf"
+    registry.write_text(MANUF)
+    cache = str(tmp_path / "oui.pickle")
+    build_index([str(registry)], cache)
+    cached = build_index([str(registry)], cache)
+    assert cached.lookup("00:00:0C:12:34:56") == "Cisco Systems, Inc"
+
+    # A pickle from another index version is rebuilt, even for unchanged registries
+    monkeypatch.setattr(oui, "INDEX_VERSION", oui.INDEX_VERSION + 1)
+    monkeypatch.setattr(oui, "load_registry", lambda index, path: index.add(0x00000C, 24, "Rebuilt"))
+    assert build_index([str(registry)], cache).lookup("00:00:0C:12:34:56") == "Rebuilt"
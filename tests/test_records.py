@@ -0,0 +1,38 @@
+import json
+
+from records import RtlEvent, rtl_event, rtl_json, AccessPoint, Client, ap_json, ap_from_json, client_json, client_from_json
+from sinks import rtl433_observation
+
+
+def test_rtl_event_splits_identity_from_values():
+    data = {"time": "2024-05-01 12:00:00", "model": "Acurite-Tower", "id": 42, "channel": "A", "temperature_C": 21.5}
+    event = rtl_event(data, 1000.0)
+    assert event == RtlEvent(1000.0, "Acurite-Tower", 42, "A", {"time": "2024-05-01 12:00:00", "temperature_C": 21.5})
+    assert event.key == ("Acurite-Tower", 42, "A")
+    assert event.values is data                         # kept, not copied
+
+
+def test_rtl_event_without_identity():
+    event = rtl_event({"temperature_C": 1.0}, 5.0)
+    assert event.key == ("Unknown", None, None)
+    assert rtl_json(event) == {"model": "Unknown", "temperature_C": 1.0}
+
+
+def test_rtl_json_round_trip():
+    line = {"model": "Oregon-THGR122N", "id": 7, "channel": 1, "humidity": 40}
+    assert rtl_json(rtl_event(dict(line), 0.0)) == line
+
+
+def test_rtl433_observation():
+    record = rtl433_observation(rtl_event({"model": "Nexus-TH", "id": 3, "humidity": 55}, 1234.5))
+    assert record == {"time": 1234.5, "type": "rtl433", "key": "Nexus-TH/3", "model": "Nexus-TH", "id": 3, "humidity": 55}
+    json.dumps(record)
+
+
+def test_wifi_records_json_round_trip():
+    ap = AccessPoint(0x001122334455, "Home", -48, 6, "WPA2", 120, 7, 1000.0)
+    client = Client(0xAABBCCDDEEFF, ap.bssid, -60, ("Home", "Cafe"), 990.0, 1000.0)
+    assert ap_json(ap)["bssid"] == "00:11:22:33:44:55"
+    assert ap_from_json(json.loads(json.dumps(ap_json(ap)))) == ap
+    assert client_from_json(json.loads(json.dumps(client_json(client)))) == client
+    assert client_from_json(client_json(client._replace(bssid=None))).bssid is None
@@ -0,0 +1,79 @@
+import subprocess
+
+import pytest
+
+from replay import AIRODUMP, Recorder, Replay, decode_snapshot, encode_snapshot, read_replay
+
+HEADER = "BSSID, First time seen, Last time seen, channel, Speed, Privacy"
+SNAPSHOTS = [
+    [HEADER, "AA:BB:CC:00:00:01, x", "AA:BB:CC:00:00:02, x", "", "Station MAC, x", "", ""],
+    # a new AP, the stations block above the APs, and the blank lines repeated
+    [HEADER, "AA:BB:CC:00:00:03, x", "", "Station MAC, x", "", "AA:BB:CC:00:00:01, x", "AA:BB:CC:00:00:02, x", "", ""],
+    [HEADER, "AA:BB:CC:00:00:03, x", "AA:BB:CC:00:00:03, x", "", "", "Station MAC, x"],
+    [],
+    [HEADER, "AA:BB:CC:00:00:01, y"],
+]
+
+
+def positions(lines):
+    return {line: i for i, line in enumerate(lines)}
+
+
+def test_snapshot_runs():
+    previous = ["a", "b", "c", "d", ""]
+    assert encode_snapshot(["a", "b", "c", "d", ""], positions(previous)) == [[0, 5]]
+    encoded = encode_snapshot(["c", "d", "new", "a", "b", "b", ""], positions(previous))
+    assert encoded == [[2, 2], "new", [0, 2], [1, 1], [4, 1]]
+    assert decode_snapshot(encoded, previous) == ["c", "d", "new", "a", "b", "b", ""]
+
+
+def test_snapshot_round_trip():
+    previous = []
+    for lines in SNAPSHOTS:
+        assert decode_snapshot(encode_snapshot(lines, positions(previous)), previous) == lines
+        previous = lines
+
+
+@pytest.fixture
+def recording(tmp_path):
+    path = str(tmp_path / "scan.replay.gz")
+    with Recorder(path) as recorder:
+        for t, lines in enumerate(SNAPSHOTS):
+            recorder.add_snapshot(lines, recorder.start + t)
+    return path
+
+
+def test_recording_round_trip(recording):
+    _, records = read_replay(recording)
+    assert records[AIRODUMP] == [(float(t), lines) for t, lines in enumerate(SNAPSHOTS)]
+
+
+def read_csv(path):
+    with open(path, encoding="ISO-8859-1", newline="") as file:
+        return file.read().split("\r\n")[:-1]
+
+
+def test_airodump_replay_poll(recording, tmp_path):
+    csv_file = str(tmp_path / "scan-01.csv")
+    process = Replay(recording, speed=None).airodump(csv_file)
+    for lines in SNAPSHOTS:
+        assert process.poll() is None
+        assert read_csv(csv_file) == lines
+    assert process.poll() == 0
+    assert process.clock() == process.replay.start + len(SNAPSHOTS) - 1
+
+
+def test_airodump_replay_wait(recording, tmp_path):
+    csv_file = str(tmp_path / "scan-01.csv")
+    process = Replay(recording, speed=None).airodump(csv_file)
+    with pytest.raises(subprocess.TimeoutExpired):
+        process.wait(timeout=2.5)                  # a 2.5 s capture stops after the third snapshot
+    assert read_csv(csv_file) == SNAPSHOTS[2]
+    assert process.wait() == 0 and read_csv(csv_file) == SNAPSHOTS[-1]
+
+    realtime = Replay(recording, speed=200).airodump(csv_file)
+    assert realtime.wait() == 0 and realtime.poll() == 0
+    assert read_csv(csv_file) == SNAPSHOTS[-1]
+    stopped = Replay(recording, speed=1).airodump(csv_file)
+    stopped.terminate()
+    assert stopped.poll() == stopped.wait() < 0
@@ -0,0 +1,62 @@
+from rssi import RssiHistory
+
+START = 1700000000.0
+MAC_A, MAC_B, MAC_C = 0xAABBCC000001, 0xAABBCC000002, 0xAABBCC000003
+
+
+def test_recent_ring_wraps_around():
+    history = RssiHistory(samples=4)
+    for i in range(6):
+        history.add(MAC_A, -40 - i, START + i)
+    assert history.recent(MAC_A) == [(START + i, -40 - i) for i in range(2, 6)]
+    history.add(MAC_A, -1, START + 7)              # placeholder
+    history.add(MAC_A, -30, START + 5)             # not newer than the last reading
+    assert history.recent(MAC_A)[-1] == (START + 5, -45)
+
+
+def test_percentile():
+    history = RssiHistory(samples=8)
+    assert history.percentile(MAC_A, 0.5) is None
+    for i, rssi in enumerate([-50, -41, -47, -44, -49, -42]):
+        history.add(MAC_A, rssi, START + i)
+    assert [history.percentile(MAC_A, f) for f in (0.0, 0.5, 1.0)] == [-50, -44, -41]
+    for i in range(6, 14):                         # the ring now only holds -60..-53
+        history.add(MAC_A, -60 + i - 6, START + i)
+    assert [history.percentile(MAC_A, f) for f in (0.0, 0.25, 1.0)] == [-60, -58, -53]
+
+
+def test_skipped_buckets_wrap_around_the_ring():
+    history = RssiHistory(bucket=10, buckets=4)
+    for number, rssi in enumerate([-40, -50, -60]):
+        history.add(MAC_A, rssi, START + number * 10)
+    # Buckets 3, 4 and 5 get no reading: 4 and 5 reuse the ring entries of buckets 0 and 1
+    history.add(MAC_A, -70, START + 60)
+    assert history.history(MAC_A) == [(START + 60, -70)]
+    history.add(MAC_A, -72, START + 70)
+    assert history.history(MAC_A) == [(START + 60, -70), (START + 70, -72)]
+    history.add(MAC_A, -80, START + 1000)          # further than the whole ring
+    assert history.history(MAC_A) == [(START + 1000, -80)]
+
+
+def test_history_steps():
+    history = RssiHistory(bucket=10, buckets=8)
+    for number, rssi in enumerate([-40, -50, -60, -70]):
+        history.add(MAC_A, rssi, START + number * 10)
+    assert history.history(MAC_A, step=20) == [(START, -45), (START + 20, -65)]
+
+
+def test_least_recent_device_gives_up_its_block():
+    history = RssiHistory(samples=4, bucket=10, buckets=4, max_devices=2)
+    history.add(MAC_A, -40, START)
+    for i in range(5):
+        history.add(MAC_B, -60, START + i * 10)
+    history.add(MAC_A, -41, START + 45)            # MAC_B is now the least recently updated
+    history.add(MAC_C, -80, START + 50)
+    assert MAC_B not in history and len(history) == 2 and history.capacity == 2
+    # MAC_C starts from a clean block, nothing of MAC_B's readings or buckets is left
+    assert history.recent(MAC_C) == [(START + 50, -80)]
+    assert history.history(MAC_C) == [(START + 50, -80)]
+    assert history.smoothed(MAC_C) == -80 and history.smoothed(MAC_B, -99) == -99
+    history.forget(MAC_A)
+    history.add(MAC_B, -61, START + 60)
+    assert history.recent(MAC_B) == [(START + 60, -61)] and history.capacity == 2
@@ -0,0 +1,90 @@
+import time
+
+import rtl
+from records import rtl_event
+from daemon import AirspyDaemon
+from daemon_client import RTL433
+from rtl_aggregate import DeviceAggregator, LIVE_IDLE
+
+
+def event(sensor, temperature=20.0, now=None, **extra):
+    data = {"model": "Acurite-Tower", "id": sensor, "channel": "A", "temperature_C": temperature, **extra}
+    return rtl_event(data, time.time() if now is None else now)
+
+
+def test_repeats_are_merged():
+    devices = DeviceAggregator(dedup_window=2.0)
+    assert devices.add(event(1), now=100.0) is not None
+    assert devices.add(event(1, rssi=-3.0), now=100.5) is None
+    stats = devices.add(event(1, 21.0), now=101.0)
+    assert (stats.count, stats.packets) == (2, 3)
+    assert (devices.packets, devices.duplicates) == (3, 1)
+
+
+def test_window_starts_at_the_first_packet():
+    devices = DeviceAggregator(dedup_window=2.0)
+    new = [devices.add(event(1), now=100.0 + 1.5 * i) is not None for i in range(6)]
+    assert new == [True, False, True, False, True, False]     # 100, 103, 106: not one endless burst
+    stats = next(iter(devices))
+    assert (stats.count, stats.packets, stats.last_seen) == (3, 6, 107.5)
+
+
+def test_event_time_is_the_default_clock():
+    devices = DeviceAggregator(dedup_window=2.0)
+    devices.add(event(1, now=100.0))
+    assert devices.add(event(1, now=101.0)) is None
+    stats = devices.add(event(1, now=103.5))
+    assert (stats.first_seen, stats.last_seen, stats.count) == (100.0, 103.5, 2)
+    assert stats.last == {"temperature_C": 20.0}
+
+
+def test_max_devices_evicts_least_recently_heard():
+    devices = DeviceAggregator(max_devices=3)
+    for sensor in range(3):
+        devices.add(event(sensor), now=100.0 + sensor)
+    devices.add(event(0, 25.0), now=110.0)     # sensor 0 heard again: sensor 1 is now the oldest
+    devices.add(event(3), now=111.0)
+    assert sorted(stats.id for stats in devices) == [0, 2, 3]
+    assert devices.evicted == 1
+
+
+def test_rolling_ids_stay_bounded():
+    devices = DeviceAggregator(max_devices=100, idle=60)
+    for sensor in range(10000):                 # a TPMS-like stream of ever new IDs
+        devices.add(event(sensor), now=float(sensor))
+    assert len(devices) <= 61
+    assert devices.evicted == 10000 - len(devices)
+
+
+def test_idle_sensors_are_evicted():
+    devices = DeviceAggregator(idle=60)
+    devices.add(event(1), now=0.0)
+    devices.add(event(2), now=50.0)
+    assert devices.evict(now=100.0) == 1
+    assert [stats.id for stats in devices] == [2]
+    assert devices.evict(now=100.0) == 0
+
+
+def test_daemon_snapshot_drops_idle_sensors():
+    daemon = AirspyDaemon(wifi=False, ble=False, frequency="433.92M")
+    daemon.on_rtl_event(event(1, now=time.time() - 2 * LIVE_IDLE))   # and nothing since: add() never evicts
+    assert daemon.snapshot([RTL433])[RTL433] == []
+
+
+def test_unbounded_by_default():
+    devices = DeviceAggregator()
+    for sensor in range(1000):
+        devices.add(event(sensor), now=float(sensor))
+    devices.evict(now=1e9)
+    assert len(devices) == 1000
+
+
+def test_live_status_printed_on_a_quiet_band(monkeypatch, capsys):
+    def quiet_band(frequency, timeout, on_event, *args):
+        on_event(event(1))
+        time.sleep(0.35)                        # nothing else arrives
+
+    monkeypatch.setattr(rtl, "run_bands", quiet_band)
+    rtl.scan_rtl433_live("433.92M", status_interval=0.1, window_minutes=1)
+    out = capsys.readouterr().out
+    assert out.count("Last 1 min: 1 transmissions from 1 devices") >= 3
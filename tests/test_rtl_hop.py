@@ -0,0 +1,78 @@
+import pytest
+
+from rtl_hop import DwellScheduler, parse_bands
+
+
+def simulate(scheduler, new_per_second, duration):
+    """Drives the scheduler over `duration` seconds; new_per_second[band] new devices per radio second.
+    Returns the (band, start, dwell) decisions."""
+    decisions = []
+    now = 0.0
+    while now < duration:
+        band, dwell = scheduler.next(now)
+        decisions.append((band, now, dwell))
+        scheduler.record(band, now, now + dwell, int(new_per_second[band] * dwell), int(new_per_second[band] * dwell))
+        now += dwell
+    return decisions
+
+
+def test_parse_bands():
+    assert parse_bands(" 433.92M, 868M,,315M ") == ["433.92M", "868M", "315M"]
+    assert parse_bands(None) == []
+
+
+def test_rejects_impossible_revisit():
+    with pytest.raises(ValueError):
+        DwellScheduler([])
+    with pytest.raises(ValueError):
+        DwellScheduler(["a", "b", "c"], min_dwell=10, revisit=15)
+
+
+def test_every_band_is_tried_first_for_the_base_dwell():
+    scheduler = DwellScheduler(["a", "b", "c"], base_dwell=15)
+    decisions = simulate(scheduler, {"a": 0, "b": 0, "c": 0}, 40)
+    assert [(band, dwell) for band, _, dwell in decisions[:3]] == [("a", 15), ("b", 15), ("c", 15)]
+
+
+def test_busy_band_gets_more_and_longer_dwells():
+    scheduler = DwellScheduler(["quiet", "busy"], min_dwell=5, max_dwell=60, revisit=120)
+    decisions = simulate(scheduler, {"quiet": 0.01, "busy": 1.0}, 3600)
+    airtime = {band: sum(dwell for b, _, dwell in decisions if b == band) for band in ("quiet", "busy")}
+    assert airtime["busy"] > 3 * airtime["quiet"]
+    busy = [dwell for band, _, dwell in decisions[2:] if band == "busy"]
+    quiet = [dwell for band, _, dwell in decisions[2:] if band == "quiet"]
+    assert min(busy) > max(quiet) and quiet[-1] == 5     # exploration fades: the quiet band ends on the shortest dwell
+    assert max(busy) <= 60
+
+
+def test_quiet_bands_are_revisited_in_time():
+    bands = ["a", "b", "c", "d"]
+    scheduler = DwellScheduler(bands, min_dwell=5, max_dwell=60, revisit=60)
+    decisions = simulate(scheduler, {"a": 2.0, "b": 0, "c": 0, "d": 0}, 3600)
+    for band in bands:
+        ends = [start + dwell for b, start, dwell in decisions if b == band]
+        starts = [start for b, start, _ in decisions if b == band]
+        gaps = [start - end for end, start in zip(ends, starts[1:])]
+        assert max(gaps) <= 60 + 1e-9, band
+    assert all(5 <= dwell <= 60 for _, _, dwell in decisions)
+
+
+def test_summary_counts_radio_time_and_devices():
+    scheduler = DwellScheduler(["a", "b"])
+    scheduler.record("a", 0.0, 10.0, 2, 5)
+    assert [scheduler.hear(band, ("m", sensor, None), 1.0) for band, sensor in (("a", 1), ("a", 2), ("a", 1), ("b", 1))] \
+        == [True, True, False, True]
+    assert scheduler.radio_time == 10.0 and scheduler.devices() == 2
+    assert scheduler.summary()[0] == ("a", 1, 10.0, 5, 2, 0.2)
+
+
+def test_heard_devices_stay_bounded():
+    scheduler = DwellScheduler(["a", "b"], max_devices=100, idle=60)
+    for sensor in range(10000):                 # rolling IDs, e.g. TPMS
+        assert scheduler.hear("a", ("TPMS", sensor, None), float(sensor))
+    assert len(scheduler.heard) <= 61 and len(scheduler.bands["a"].heard) <= 61
+    assert scheduler.devices() == scheduler.bands["a"].devices == 10000
+
+    scheduler.hear("b", ("TPMS", 9999, None), 9999.0)
+    assert not scheduler.hear("b", ("TPMS", 9999, None), 10050.0)   # heard within the idle time
+    assert scheduler.hear("b", ("TPMS", 9999, None), 10200.0)       # silent for longer: new again
@@ -0,0 +1,87 @@
+import sys
+import json
+import asyncio
+
+import pytest
+
+import rtl_multi
+from records import rtl_event
+from rtl_multi import EventMerger, SdrPool, event_time, parse_receivers, read_receivers
+
+
+def event(stamp, read=None, sensor=1):
+    return rtl_event({"time": stamp, "model": "Acurite-Tower", "id": sensor}, stamp if read is None else read)
+
+
+def stamps(events):
+    return [event.values["time"] for event in events]
+
+
+def test_parse_receivers():
+    assert parse_receivers(["433.92M@0", "868M,915M@:0002"])[1] == ("868M,915M", ":0002")
+    with pytest.raises(ValueError):
+        parse_receivers(["433.92M"])
+    with pytest.raises(ValueError):
+        parse_receivers(["433.92M@0", "868M@0"])
+
+
+def test_event_time_formats():
+    assert event_time(event(1700000000.25)) == 1700000000.25
+    local = rtl_event({"time": "2024-05-01 12:00:00.500000"}, 0.0)
+    assert event_time(local) - event_time(rtl_event({"time": "2024-05-01 12:00:00"}, 0.0)) == 0.5
+    assert event_time(rtl_event({"time": "soon"}, 42.0)) == 42.0
+    assert event_time(rtl_event({}, 42.0), 7.0) == 7.0
+
+
+def test_merge_waits_for_every_receiver():
+    merged = []
+    merger = EventMerger(2, merged.append, delay=10)
+    merger.push(0, event(100.0), now=100.0)
+    merger.push(0, event(102.0), now=100.0)
+    assert merged == []                            # receiver 1 has not reported yet
+    merger.push(1, event(101.0), now=100.0)
+    assert stamps(merged) == [100.0, 101.0]
+    merger.push(1, event(103.0), now=100.0)
+    assert stamps(merged) == [100.0, 101.0, 102.0]
+    merger.flush()
+    assert stamps(merged) == [100.0, 101.0, 102.0, 103.0]
+    assert (merger.merged, merger.late) == (4, 0)
+
+
+def test_merge_delay_and_closed_receivers():
+    merged = []
+    merger = EventMerger(2, merged.append, delay=1.0)
+    merger.push(0, event(100.0), now=100.0)
+    merger.release(100.5)
+    assert merged == []
+    merger.release(101.0)                          # waited MERGE_DELAY for the quiet receiver
+    assert stamps(merged) == [100.0]
+
+    merger.push(0, event(105.0), now=105.0)
+    merger.close(1, now=105.0)                     # a stopped receiver no longer holds the others back
+    assert stamps(merged) == [100.0, 105.0]
+    merger.push(1, event(104.0), now=106.0)
+    merger.flush()
+    assert merger.late == 1
+
+
+def dying_rtl433(device, band):
+    """Prints one event for the band, then exits as an unplugged dongle would"""
+    line = json.dumps({"model": "Acurite-Tower", "id": device, "channel": band})
+    return [sys.executable, "-c", f"print({line!r})"]
+
+
+def test_hopping_receivers_restart_like_fixed_ones(monkeypatch):
+    monkeypatch.setattr(rtl_multi, "RESTART_BACKOFF", 0.05)
+    pool = SdrPool(["433.92M@0", "433.92M,868M@1"], command=dying_rtl433)
+    merged = []
+    asyncio.run(read_receivers(None, timeout=2.0, on_event=merged.append, pool=pool))
+    hopping = pool.stats[1]
+    for stats in pool.stats:
+        assert stats.failures >= 3
+        assert stats.starts in (stats.failures, stats.failures + 1)
+        assert stats.events == stats.starts
+    assert {event.channel for event in merged if event.id == "1"} == {"433.92M", "868M"}
+    assert hopping.scheduler.dwells == hopping.starts
+    assert pool.summary()[1][5] == hopping.failures
+    assert hopping.health().startswith("stopped (")
@@ -0,0 +1,176 @@
+import os
+import csv
+import json
+import socket
+import threading
+
+import pytest
+
+import sinks
+from records import rtl_event
+from sinks import (CsvSink, InfluxSink, JsonLinesSink, MqttSink, influx_line, mqtt_topic_level,
+                   rtl433_observation)
+
+
+def records(count, kind="wifi_ap"):
+    return [{"time": 1700000000.0 + i, "type": kind, "key": f"AA:BB:CC:00:00:{i:02X}", "signal": -40 - i,
+             "essid": f"Net {i}"} for i in range(count)]
+
+
+def read_packet(conn):
+    """One MQTT control packet: (type byte, body)"""
+    head = sinks.recv_exactly(conn, 1)
+    if not head:
+        return None, b""
+    length, shift = 0, 0
+    while True:
+        byte = sinks.recv_exactly(conn, 1)[0]
+        length |= (byte & 0x7f) << shift
+        shift += 7
+        if not byte & 0x80:
+            break
+    return head[0], sinks.recv_exactly(conn, length)
+
+
+class FakeBroker:
+    """Stand-in MQTT broker: answers CONNECT in two TCP segments and keeps the PUBLISH packets"""
+
+    def __init__(self, return_code=0):
+        self.server = socket.create_server(("127.0.0.1", 0))
+        self.address = self.server.getsockname()
+        self.return_code = return_code
+        self.connects = []
+        self.published = []
+        self.thread = threading.Thread(target=self.serve, daemon=True)
+        self.thread.start()
+
+    def serve(self):
+        conn, _ = self.server.accept()
+        with conn:
+            while True:
+                kind, body = read_packet(conn)
+                if kind is None or kind == 0xe0:
+                    return
+                if kind == 0x10:
+                    self.connects.append(body)
+                    conn.sendall(b"\x20\x02")
+                    conn.sendall(bytes([0, self.return_code]))
+                    if self.return_code:
+                        return
+                elif kind & 0xf0 == 0x30:
+                    size = int.from_bytes(body[:2], "big")
+                    self.published.append((body[2:2 + size].decode(), json.loads(body[2 + size:])))
+
+    def close(self):
+        self.thread.join(5)
+        self.server.close()
+
+
+@pytest.fixture
+def broker():
+    broker = FakeBroker()
+    yield broker
+    broker.close()
+
+
+def test_csv_header_comes_first(tmp_path):
+    path = tmp_path / "out.csv"
+    for _ in range(2):                           # the second sink appends without a header
+        with CsvSink(str(path), flush_interval=0.01) as sink:
+            for record in records(3):
+                sink.put(record)
+    rows = list(csv.reader(path.open(newline="")))
+    assert rows[0] == CsvSink.COLUMNS
+    assert len(rows) == 7 and rows.count(CsvSink.COLUMNS) == 1
+    assert rows[1][:4] == ["1700000000.000", "wifi_ap", "AA:BB:CC:00:00:00", "-40"]
+    assert json.loads(rows[1][4]) == {"essid": "Net 0"}
+
+
+def test_json_lines_round_trip(tmp_path):
+    path = tmp_path / "out.jsonl"
+    with JsonLinesSink(str(path), batch_size=2) as sink:
+        for record in records(5):
+            sink.put(record)
+    assert [json.loads(line) for line in path.open()] == records(5)
+    assert (sink.written, sink.dropped, sink.errors) == (5, 0, 0)
+
+
+def test_mqtt_publishes_to_escaped_topics(broker):
+    event = rtl_event({"model": "Acurite-Tower", "id": 1, "channel": "A", "temperature_C": 21.5}, 1700000000.0)
+    with MqttSink(f"{broker.address[0]}:{broker.address[1]}/home", client_id="test") as sink:
+        sink.put(rtl433_observation(event))
+        sink.put(dict(records(1)[0], key="a+b#c"))
+    broker.close()
+    assert b"\x00\x04test" in broker.connects[0]
+    assert [topic for topic, _ in broker.published] == ["home/rtl433/Acurite-Tower%2F1%2FA", "home/wifi_ap/a%2Bb%23c"]
+    assert broker.published[0][1]["temperature_C"] == 21.5
+    assert broker.published[1][1]["key"] == "a+b#c"
+    assert sink.errors == 0
+
+
+def test_mqtt_refused_connection_is_an_error(capsys):
+    broker = FakeBroker(return_code=5)
+    with MqttSink(f"{broker.address[0]}:{broker.address[1]}") as sink:
+        sink.put(records(1)[0])
+    broker.close()
+    assert (sink.written, sink.errors) == (0, 1)
+    assert "refused" in capsys.readouterr().err
+
+
+def test_mqtt_topic_level():
+    assert mqtt_topic_level("AA:BB:CC:DD:EE:FF") == "AA:BB:CC:DD:EE:FF"
+    assert mqtt_topic_level("50%/+#") == "50%25%2F%2B%23"
+
+
+def test_influx_tcp_round_trip():
+    server = socket.create_server(("127.0.0.1", 0))
+    received = []
+
+    def listen():
+        conn, _ = server.accept()
+        with conn:
+            while data := conn.recv(65536):
+                received.append(data)
+
+    thread = threading.Thread(target=listen, daemon=True)
+    thread.start()
+    host, port = server.getsockname()
+    with InfluxSink(f"tcp://{host}:{port}") as sink:
+        for record in records(3):
+            sink.put(record)
+    thread.join(5)
+    server.close()
+    assert b"".join(received).decode().splitlines(keepends=True) == [influx_line(record) for record in records(3)]
+
+
+def test_influx_udp_datagrams_stay_small():
+    listener = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    listener.bind(("127.0.0.1", 0))
+    listener.settimeout(5)
+    host, port = listener.getsockname()
+    with InfluxSink(f"udp://{host}:{port}") as sink:
+        for record in records(50):
+            sink.put(record)
+    lines = []
+    while len(lines) < 50:
+        datagram = listener.recv(65536)
+        assert len(datagram) < 1400
+        lines += datagram.decode().splitlines(keepends=True)
+    listener.close()
+    assert lines == [influx_line(record) for record in records(50)]
+
+
+def test_influx_to_stdout(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    with InfluxSink("-") as sink:
+        sink.put(records(1)[0])
+    assert capsys.readouterr().out == influx_line(records(1)[0])
+    assert not os.path.exists("-")
+    print("stdout still open")
+    assert capsys.readouterr().out == "stdout still open\n"
+
+
+def test_influx_line_escaping():
+    line = influx_line({"time": 1.5, "type": "wifi_ap", "key": "AA:BB", "essid": "My Net,1", "signal": -40,
+                        "note": 'say "hi"', "on": True})
+    assert line == 'wifi_ap,key=AA:BB,essid=My\\ Net\\,1 signal=-40i,note="say \\"hi\\"",on=true 1500000000\n'
@@ -0,0 +1,73 @@
+import time
+
+from store import ObservationStore, query_store, store_key
+
+MAC = "AA:BB:CC:DD:EE:FF"
+
+
+def sighting(stamp, signal=None, **fields):
+    record = {"time": stamp, "type": "wifi_client", "key": MAC}
+    if signal is not None:
+        record["signal"] = signal
+    return dict(record, **fields)
+
+
+def test_device_summary_across_batches(tmp_path):
+    store = ObservationStore(str(tmp_path / "airspy.db"))
+    store.add_many([sighting(100.0, -60), sighting(110.0, -50, name="Phone"), sighting(105.0)])
+    # A late batch: older sightings must not move last_seen or last_signal back
+    store.add_many([sighting(90.0, -80), sighting(120.0, -70), sighting(95.0, -40)])
+    device = store.last_seen(MAC.lower())
+    assert (device["first_seen"], device["last_seen"], device["last_signal"]) == (90.0, 120.0, -70)
+    assert (device["min_signal"], device["max_signal"], device["count"]) == (-80, -40, 6)
+    assert device["label"] == "Phone"
+    assert len(store) == 6
+    store.close()
+
+    reopened = ObservationStore(str(tmp_path / "airspy.db"))
+    assert reopened.observations(MAC)[0] == sighting(120.0, -70)
+    assert reopened.observations(MAC, since=100.0, until=120.0, limit=None) == [
+        sighting(110.0, -50, name="Phone"), sighting(105.0), sighting(100.0, -60)]
+    reopened.close()
+
+
+def test_devices_since(tmp_path):
+    store = ObservationStore(str(tmp_path / "airspy.db"))
+    store.add_many([sighting(100.0, -60), dict(sighting(200.0, -50), type="ble", key="11:22:33:44:55:66")])
+    assert [device["key"] for device in store.devices()] == ["11:22:33:44:55:66", MAC]
+    assert [device["key"] for device in store.devices(since=150.0)] == ["11:22:33:44:55:66"]
+    assert [device["key"] for device in store.devices(kind="wifi_client")] == [MAC]
+    store.close()
+
+
+def test_store_key():
+    assert {store_key(key) for key in ("aa-bb-cc-dd-ee-ff", "aabb.ccdd.eeff", "aabbccddeeff", MAC)} == {MAC}
+    assert store_key("Acurite-Tower/1/A") == "Acurite-Tower/1/A"
+    assert store_key("abc") == "abc"
+
+
+def test_query_store(tmp_path, capsys):
+    path = str(tmp_path / "airspy.db")
+    query_store(path, MAC)
+    assert "No observation store" in capsys.readouterr().out
+
+    now = time.time()
+    store = ObservationStore(path)
+    store.add_many([sighting(now - 3600, -70), sighting(now - 60, -55, name="Phone"),
+                    {"time": now - 7200, "type": "rtl433", "key": "Acurite-Tower/1/A", "temperature_C": 21.5}])
+    store.close()
+
+    query_store(path, "aa-bb-cc-dd-ee-ff", since_minutes=10)
+    out = capsys.readouterr().out
+    assert f"=== {MAC} (wifi_client) ===" in out and "Name: Phone" in out
+    assert "Sightings:  2" in out and "min -70, max -55" in out
+    assert out.count("   - ") == 1                 # only the sighting in the last 10 minutes
+
+    query_store(path, since_minutes=30)
+    out = capsys.readouterr().out
+    assert MAC in out and "Acurite-Tower/1/A" not in out
+    query_store(path)
+    assert "Acurite-Tower/1/A" in capsys.readouterr().out
+
+    query_store(path, "11:22:33:44:55:66")
+    assert "11:22:33:44:55:66 was never seen" in capsys.readouterr().out
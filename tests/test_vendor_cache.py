@@ -0,0 +1,173 @@
+import time
+import asyncio
+import threading
+from functools import partial
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import vendor_cache
+from oui import OuiIndex
+from vendor_cache import VendorCache, VendorResolver, resolve_vendors_async, vendor_key
+
+# A local stand-in for api.macvendors.com: GET /AA:BB:CC:DD:EE:FF answers with the status
+# and body configured for the MAC's OUI, and every request is recorded.
+
+
+class FakeVendorApi(ThreadingHTTPServer):
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), VendorApiHandler)
+        self.answers = {}          # OUI 'AABBCC' -> list of (status, body), the last one repeats
+        self.requests = []         # (time, path)
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/"
+
+
+class VendorApiHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.server.requests.append((time.monotonic(), self.path))
+        answers = self.server.answers.get(self.path[1:9].replace(":", ""), [(404, "Not Found")])
+        status, body = answers.pop(0) if len(answers) > 1 else answers[0]
+        self.send_response(status)
+        self.end_headers()
+        self.wfile.write(body.encode())
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def api():
+    server = FakeVendorApi()
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(vendor_cache.time, "time", lambda: now[0])
+    return now
+
+
+def resolver(api, **kwargs):
+    kwargs.setdefault("rate", 0)
+    return VendorResolver(VendorCache(":memory:"), api.url, index=OuiIndex(), **kwargs)
+
+
+def resolve(resolver, macs):
+    return asyncio.run(resolver.resolve_many(macs))
+
+
+def test_vendor_key_follows_the_registry_blocks():
+    index = OuiIndex()
+    index.add(0x70B3D5123, 36, "Small Co")
+    index.add(0x1C82591, 28, "Medium Co")
+    assert vendor_key("00:11:22:33:44:55", index) == "001122"
+    assert vendor_key("1C:82:59:F0:00:00", index) == "1C8259F"
+    assert vendor_key("70:B3:D5:AB:C0:00", index) == "70B3D5ABC"
+    assert vendor_key("nope", index) is None
+
+
+def test_one_request_per_unknown_oui(api):
+    api.answers["001122"] = [(200, "Acme Networks")]
+    r = resolver(api)
+    vendors = resolve(r, ["00:11:22:00:00:01", "00:11:22:FF:00:02", "00:11:22:12:34:56"])
+    assert set(vendors.values()) == {"Acme Networks"}
+    assert len(api.requests) == 1
+    assert resolve(r, ["00:11:22:99:99:99"]) == {"00:11:22:99:99:99": "Acme Networks"}
+    assert len(api.requests) == 1                       # answered from the cache
+
+
+def test_ttl_expiry(api, clock):
+    api.answers["001122"] = [(200, "Acme Networks")]
+    r = resolver(api)
+    resolve(r, ["00:11:22:00:00:01"])
+    clock[0] += vendor_cache.VENDOR_TTL - 1
+    resolve(r, ["00:11:22:00:00:01"])
+    assert len(api.requests) == 1
+    clock[0] += 2
+    assert resolve(r, ["00:11:22:00:00:01"]) == {"00:11:22:00:00:01": "Acme Networks"}
+    assert len(api.requests) == 2
+
+
+def test_unknown_prefix_is_cached_for_the_negative_ttl(api, clock):
+    r = resolver(api)
+    assert resolve(r, ["00:99:99:00:00:01"]) == {"00:99:99:00:00:01": None}
+    resolve(r, ["00:99:99:00:00:02"])
+    assert len(api.requests) == 1
+    clock[0] += vendor_cache.NEGATIVE_TTL + 1
+    resolve(r, ["00:99:99:00:00:03"])
+    assert len(api.requests) == 2
+
+
+def test_failures_are_cached_briefly(api, clock):
+    api.answers["00AA00"] = [(500, "oops"), (200, "Back Again")]
+    r = resolver(api, failure_ttl=60)
+    assert resolve(r, ["00:AA:00:00:00:01"]) == {"00:AA:00:00:00:01": None}
+    resolve(r, ["00:AA:00:00:00:01"])
+    assert len(api.requests) == 1
+    clock[0] += 61
+    assert resolve(r, ["00:AA:00:00:00:01"]) == {"00:AA:00:00:00:01": "Back Again"}
+
+
+def test_rate_limit_spaces_requests(api):
+    macs = [f"00:00:{i:02X}:00:00:01" for i in range(5)]
+    r = resolver(api, rate=20)
+    start = time.monotonic()
+    resolve(r, macs)
+    assert len(api.requests) == 5
+    assert time.monotonic() - start >= 4 / 20
+    stamps = sorted(stamp for stamp, _ in api.requests)
+    assert all(b - a >= 0.04 for a, b in zip(stamps, stamps[1:]))
+
+
+def test_429_is_retried(api):
+    api.answers["00BB00"] = [(429, "Too Many Requests"), (200, "Patient Inc")]
+    r = resolver(api)
+    start = time.monotonic()
+    assert resolve(r, ["00:BB:00:00:00:01"]) == {"00:BB:00:00:00:01": "Patient Inc"}
+    assert len(api.requests) == 2
+    assert time.monotonic() - start >= 1.0              # pushed back by a second
+
+
+def test_concurrent_lookups_share_one_request(api):
+    api.answers["00CC00"] = [(200, "Shared Ltd")]
+    r = resolver(api)
+
+    async def both():
+        return await asyncio.gather(r.resolve("00:CC:00:00:00:01"), r.resolve("00:CC:00:00:00:02"))
+
+    assert asyncio.run(both()) == ["Shared Ltd", "Shared Ltd"]
+    assert len(api.requests) == 1
+
+
+def test_resolve_vendors_closes_the_cache_it_opened(api, monkeypatch):
+    opened = []
+
+    class TrackedCache(VendorCache):
+        def __init__(self):
+            super().__init__(":memory:")
+            self.closed = False
+            opened.append(self)
+
+        def close(self):
+            self.closed = True
+            super().close()
+
+    api.answers["001122"] = [(200, "Acme Networks")]
+    monkeypatch.setattr(vendor_cache, "lookup_vendor", lambda mac: None)
+    monkeypatch.setattr(vendor_cache, "VendorCache", TrackedCache)
+    monkeypatch.setattr(vendor_cache, "VendorResolver", partial(VendorResolver, base_url=api.url, rate=0, index=OuiIndex()))
+    for _ in range(2):
+        assert asyncio.run(resolve_vendors_async(["00:11:22:00:00:01"], online=True)) == {"00:11:22:00:00:01": "Acme Networks"}
+    assert len(opened) == 2 and all(cache.closed for cache in opened)
+
+    shared = vendor_cache.VendorResolver(TrackedCache())
+    asyncio.run(resolve_vendors_async(["00:11:22:00:00:01"], online=True, resolver=shared))
+    assert not shared.cache.closed and shared.cache.get("001122") == "Acme Networks"
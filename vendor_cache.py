@@ -0,0 +1,226 @@
+import os
+import time
+import sqlite3
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from oui import get_oui_index, lookup_vendor, mac_to_int, format_mac
+
+###### ONLINE VENDOR CACHE ######
+
+VENDOR_API = "https://api.macvendors.com/"
+VENDOR_DB = os.path.join(os.path.expanduser("~"), ".cache", "airspy", "vendors.sqlite")
+VENDOR_TTL = 30 * 24 * 3600        # registered vendors rarely change
+NEGATIVE_TTL = 24 * 3600           # retry unknown prefixes once a day
+FAILURE_TTL = 300                  # errors and timeouts: retry after 5 minutes, not on every lookup
+VENDOR_MAX_ENTRIES = 50000
+VENDOR_RATE = 2.0                  # api.macvendors.com free tier: 2 requests/s
+VENDOR_CONCURRENCY = 4
+
+
+def vendor_key(mac_address, index=None):
+    """Cache key: the MAC's 24-bit OUI, or its 28/36-bit prefix inside the blocks the
+    registries split into MA-M / MA-S assignments. The key's length gives its size."""
+    value = mac_to_int(mac_address)
+    if value is None:
+        return None
+    bits = (index or get_oui_index()).block_bits(value)
+    return f"{value >> (48 - bits):0{bits // 4}X}"
+
+
+class VendorCache:
+    """On-disk vendor cache with per-entry TTL and least-recently-used eviction"""
+
+    def __init__(self, path=VENDOR_DB, ttl=VENDOR_TTL, negative_ttl=NEGATIVE_TTL, max_entries=VENDOR_MAX_ENTRIES):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("""CREATE TABLE IF NOT EXISTS vendors (
+                               prefix TEXT PRIMARY KEY,
+                               vendor TEXT NOT NULL,
+                               expires REAL NOT NULL,
+                               last_used REAL NOT NULL)""")
+        self.db.execute("CREATE INDEX IF NOT EXISTS vendors_last_used ON vendors(last_used)")
+        self.lock = threading.Lock()
+
+    def get_many(self, keys):
+        """Returns {key: vendor} for fresh entries; '' means the API does not know the prefix"""
+        keys = list(set(keys))
+        found = {}
+        now = time.time()
+        with self.lock:
+            for i in range(0, len(keys), 500):
+                chunk = keys[i:i + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self.db.execute(
+                    f"SELECT prefix, vendor FROM vendors WHERE expires > ? AND prefix IN ({placeholders})",
+                    [now] + chunk).fetchall()
+                found.update(rows)
+            if found:
+                self.db.executemany("UPDATE vendors SET last_used = ? WHERE prefix = ?", [(now, k) for k in found])
+                self.db.commit()
+        return found
+
+    def get(self, key):
+        return self.get_many([key]).get(key)
+
+    def put_many(self, items, ttl=None):
+        """Stores {key: vendor}; '' (unknown prefix) expires after negative_ttl, or after `ttl` when given"""
+        now = time.time()
+        rows = [(key, vendor or "", now + (ttl or (self.ttl if vendor else self.negative_ttl)), now)
+                for key, vendor in items.items()]
+        with self.lock:
+            self.db.executemany("INSERT OR REPLACE INTO vendors VALUES (?, ?, ?, ?)", rows)
+            self.evict()
+            self.db.commit()
+
+    def evict(self):
+        self.db.execute("DELETE FROM vendors WHERE expires <= ?", (time.time(),))
+        excess = self.db.execute("SELECT COUNT(*) FROM vendors").fetchone()[0] - self.max_entries
+        if excess > 0:
+            self.db.execute("DELETE FROM vendors WHERE prefix IN "
+                            "(SELECT prefix FROM vendors ORDER BY last_used ASC LIMIT ?)", (excess,))
+
+    def __len__(self):
+        with self.lock:
+            return self.db.execute("SELECT COUNT(*) FROM vendors").fetchone()[0]
+
+    def close(self):
+        self.db.close()
+
+
+class VendorResolver:
+    """Batched asyncio resolver: cache first, then rate-limited parallel requests for the misses.
+    Concurrent lookups of the same prefix share a single in-flight request."""
+
+    def __init__(self, cache=None, base_url=VENDOR_API, rate=VENDOR_RATE, concurrency=VENDOR_CONCURRENCY, timeout=2,
+                 failure_ttl=FAILURE_TTL, index=None):
+        self.owns_cache = cache is None
+        self.cache = cache if cache is not None else VendorCache()
+        self.failure_ttl = failure_ttl
+        self.index = index         # OuiIndex for vendor_key, the default one when None
+        self.base_url = base_url if base_url.endswith("/") else base_url + "/"
+        self.interval = 1.0 / rate if rate else 0.0
+        self.timeout = timeout
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.in_flight = {}
+        self.next_slot = 0.0
+        self.requests_sent = 0
+
+    async def wait_for_slot(self):
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        slot = max(now, self.next_slot)
+        self.next_slot = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+    def fetch(self, mac_address):
+        """Blocking HTTP lookup, run in a worker thread. Returns (status, vendor)"""
+        import urllib.error    # only loaded for --online-vendors
+        import urllib.request
+        try:
+            with urllib.request.urlopen(self.base_url + format_mac(mac_address), timeout=self.timeout) as response:
+                return response.status, response.read().decode("utf-8", "replace").strip()
+        except urllib.error.HTTPError as e:
+            return e.code, None
+        except (urllib.error.URLError, OSError, ValueError):
+            return None, None
+
+    async def query(self, key, mac_address):
+        async with self.semaphore:
+            for attempt in range(3):
+                await self.wait_for_slot()
+                self.requests_sent += 1
+                status, vendor = await asyncio.to_thread(self.fetch, mac_address)
+                if status == 429:
+                    # Rate limited anyway: push every pending request back by a second
+                    self.next_slot = max(self.next_slot, asyncio.get_running_loop().time() + 1.0)
+                    continue
+                break
+        if status == 200 and vendor:
+            self.cache.put_many({key: vendor})
+            return vendor
+        if status == 404:
+            self.cache.put_many({key: ""})
+        elif self.failure_ttl:
+            # Server error, timeout or still rate limited: keep the answer briefly
+            self.cache.put_many({key: ""}, self.failure_ttl)
+        return None
+
+    async def resolve(self, mac_address):
+        return (await self.resolve_many([mac_address])).get(mac_address)
+
+    async def resolve_many(self, mac_addresses):
+        """Returns {mac: vendor or None}"""
+        keys = {mac: vendor_key(mac, self.index) for mac in set(mac_addresses)}
+        cached = self.cache.get_many(k for k in keys.values() if k)
+
+        pending = {}
+        for mac, key in keys.items():
+            if key is None or key in cached or key in pending:
+                continue
+            task = self.in_flight.get(key)
+            if task is None:
+                task = asyncio.ensure_future(self.query(key, mac))
+                self.in_flight[key] = task
+                task.add_done_callback(lambda _, k=key: self.in_flight.pop(k, None))
+            pending[key] = task
+
+        if pending:
+            answers = await asyncio.gather(*pending.values(), return_exceptions=True)
+            for key, answer in zip(pending, answers):
+                cached[key] = None if isinstance(answer, BaseException) else answer
+
+        return {mac: (cached.get(key) or None) if key else None for mac, key in keys.items()}
+
+    def close(self):
+        """Closes the cache if the resolver opened it"""
+        if self.owns_cache:
+            self.cache.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+async def resolve_vendors_async(mac_addresses, online=False, resolver=None):
+    """Offline OUI lookup for every MAC; unknown, non-randomized ones go to the online resolver"""
+    vendors = {mac: lookup_vendor(mac) for mac in set(mac_addresses)}
+    misses = [mac for mac, vendor in vendors.items() if vendor is None]
+    if online and misses:
+        if resolver is None:
+            with VendorResolver() as resolver:
+                vendors.update(await resolver.resolve_many(misses))
+        else:
+            vendors.update(await resolver.resolve_many(misses))
+    return vendors
+
+
+def resolve_vendors(mac_addresses, online=False, resolver_factory=None):
+    """Synchronous wrapper, safe to call from code already running inside an event loop"""
+    mac_addresses = list(mac_addresses)
+    if not online:
+        return {mac: lookup_vendor(mac) for mac in set(mac_addresses)}
+
+    def run():
+        if resolver_factory is None:
+            return asyncio.run(resolve_vendors_async(mac_addresses, online))
+        with resolver_factory() as resolver:
+            return asyncio.run(resolve_vendors_async(mac_addresses, online, resolver))
+
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return run()
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(run).result()
+
+###### END ONLINE VENDOR CACHE ######
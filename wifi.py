@@ -1,129 +1,214 @@
-import sys
-import argparse
-import asyncio
-import pywifi
-from pywifi import const
-from bleak import BleakScanner
+import os
 import subprocess
-import json
 import time
-import select
-import requests
-import re
-import csv
 from datetime import datetime
 import warnings
 warnings.simplefilter(action='ignore', category=FutureWarning)
 
 from color import *
+from oui import color_vendor, lookup_vendor, format_mac
+from vendor_cache import resolve_vendors
+from airodump import *
+from capture import CaptureSession, MONITOR_INTERFACE
+from dot11 import PcapWatcher, load_pcap
+from rssi import RssiHistory
+from correlate import correlate_stations, format_correlation
+from sinks import ap_observation, client_observation
+
+def start_airodump(write_interval=None, replay=None):
+    """Returns (process, csv file): airodump-ng in its own CaptureSession (which stands for
+    its CSV path), or a Replay writing its recorded snapshots to a temporary file"""
+    if replay is not None:
+        process = replay.airodump()
+        return process, process.csv_file
+    session = CaptureSession(MONITOR_INTERFACE, write_interval).start()
+    return session.process, session
+
+def remove_capture(csv_file, replay=None):
+    if isinstance(csv_file, CaptureSession):
+        csv_file.close()
+    elif os.path.exists(csv_file):
+        os.remove(csv_file)
+
+PCAP_PIPE_POLL = 0.05             # seconds between reads of a pcap pipe, so its writer never blocks
+SIGNAL_SAMPLE_INTERVAL = 1.0      # seconds between signal readings during a timed scan
+
+def sample_signals(process, csv_file, timeout, history, replay=None, recorder=None):
+    """Lets airodump-ng run for `timeout` seconds, adding the AP and station signals of each
+    CSV rewrite to `history` instead of keeping only the last one"""
+    watcher = AirodumpWatcher(csv_file)
+    clock = process.clock if replay is not None else time.time
+    end = clock() + timeout
+    while True:
+        finished = process.poll() is not None or clock() >= end
+        now = clock()
+        watcher.poll(now)
+        if recorder:
+            recorder.snapshot(csv_file)
+        for mac, signal, seen in watcher.signals():
+            history.add(mac, signal, seen or now)
+        if finished:
+            return
+        if replay is None:
+            time.sleep(min(SIGNAL_SAMPLE_INTERVAL, max(0.0, end - clock())))
+        elif replay.speed:
+            time.sleep(min(SIGNAL_SAMPLE_INTERVAL, max(0.0, end - clock())) / replay.speed)
+
+def scan_wifi(timeout, filter_ssid=None, filter_channel=None, min_signal=None, analyze_channels=False, online_vendors=False, sink=None, channel_width=20,
+              recorder=None, replay=None, pcap=None, history=None):
+    """Scans for `timeout` seconds with airodump-ng, or reads every frame of `pcap` (a pcap file or '-').
+    Networks are ranked and shown by their smoothed signal, from the readings collected in `history`."""
+    history = RssiHistory() if history is None else history
+    if pcap is not None:
+        print(f"\n{Color.GREEN}{Style.BRIGHT}[*]{Style.RESET_ALL} Reading Wi-Fi frames from {pcap}...")
+        try:
+            capture = load_pcap(pcap, history)
+        except ValueError as e:
+            print(f"{Color.RED}{Style.BRIGHT}[!]{Style.RESET_ALL} Cannot read {pcap}: {e}")
+            return
+    else:
+        print(f"\n{Color.GREEN}{Style.BRIGHT}[*]{Style.RESET_ALL} Scanning Wi-Fi networks for {timeout}s...")
+        process, csv_file = start_airodump(SIGNAL_SAMPLE_INTERVAL, replay)
+        sample_signals(process, csv_file, timeout, history, replay, recorder)
+        process.terminate()
+        process.wait()
 
-def get_mac_vendor(mac_address):
-    url = f"https://api.macvendors.com/{mac_address}"
-    try:
-        response = requests.get(url, timeout=2)
-        if response.status_code == 200:
-            return f"{Color.GREEN}{Style.BRIGHT}{response.text.strip()}{Style.RESET_ALL}"
-        else:
-            return f"{Color.RED}{Style.BRIGHT}Unknown{Style.RESET_ALL}"
-    except requests.RequestException:
-        return f"{Color.RED}{Style.BRIGHT}Unknown{Style.RESET_ALL}"
-
-def scan_wifi(timeout, filter_ssid=None, filter_channel=None, min_signal=None, analyze_channels=False):
-    print(f"\n{Color.GREEN}{Style.BRIGHT}[*]{Style.RESET_ALL} Scanning Wi-Fi networks for {timeout}s...")
-
-    csv_file = "/tmp/airodump-01.csv"
-
-    process = subprocess.Popen(
-        ["sudo", "airodump-ng", "wlan0mon", "--write", "/tmp/airodump", "--output-format", "csv"],
-        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
-    )
-
-    time.sleep(timeout)
-    process.terminate()
-    process.wait()
-
-    try:
-        with open(csv_file, "r", encoding="ISO-8859-1") as file:
-            reader = csv.reader(file)
-            rows = list(reader)
-    except FileNotFoundError:
+        capture = load_capture(csv_file)
+        remove_capture(csv_file, replay)
+    if capture is None:
         print(f"{Color.RED}{Style.BRIGHT}[!]{Style.RESET_ALL} No networks detected. Make sure your Wi-Fi adapter is in monitor mode.")
         return
 
-    ap_list = []
-    client_list = []
-    parsing_clients = False
-
-    for row in rows:
-        if len(row) < 2:
-            continue
-        if "Station MAC" in row[0]:  
-            parsing_clients = True
-            continue
-
-        if not parsing_clients:
-            if len(row) > 13: 
-                try:
-                    bssid = row[0].strip()
-                    signal = int(row[8].strip()) if row[8].strip().lstrip('-').isdigit() else -100  
-                    channel = int(row[3].strip()) if row[3].strip().isdigit() else -1
-                    security = row[5].strip() 
-                    cipher = row[6].strip() if row[6].strip() else "Unknown"  
-                    auth = row[7].strip() if row[7].strip() else "Unknown"  
-                    essid = row[13].strip()
-
-                    ap_list.append({"BSSID": bssid, "Signal": signal, "Channel": channel, "Security": f"{security} {cipher} {auth}", "ESSID": essid})
-                except ValueError:
-                    continue
-        else:
-            if len(row) > 6:
-                try:
-                    station_mac = row[0].strip()
-                    associated_bssid = row[5].strip()
-                    signal = int(row[3].strip()) if row[3].strip().lstrip('-').isdigit() else -100  
-
-                    client_list.append({"Station": station_mac, "BSSID": associated_bssid, "Signal": signal})
-                except ValueError:
-                    continue
-    
+    channels = parse_channels(filter_channel) if filter_channel else None
+    smoothed = lambda mac, signal: round(history.smoothed(mac, signal))
+    ap_list = [capture.ap(row) for row in capture.select(filter_ssid, channels, min_signal, rank=history.smoothed)]
 
-    if filter_ssid:
-        ap_list = [net for net in ap_list if net["ESSID"] == filter_ssid]
-    if filter_channel:
-        channels = list(map(int, filter_channel.split('-')))
-        ap_list = [net for net in ap_list if net["Channel"] in channels]
-    if min_signal:
-        ap_list = [net for net in ap_list if net["Signal"] >= min_signal]
-    
-    ap_list.sort(key=lambda x: x["Signal"], reverse=True)
+    if sink:
+        for ap in ap_list:
+            sink.put(ap_observation(ap))
+            for client in capture.clients_of(ap.bssid):
+                sink.put(client_observation(client))
+
+    listed = [ap.bssid for ap in ap_list if ap.essid]
+    vendors = resolve_vendors(listed + [mac for bssid in listed for mac in capture.stations_of(bssid)], online_vendors)
     
     print("\n=== DETECTED WI-FI NETWORKS ===")
     for ap in ap_list:
-        if ap['ESSID']:
-          print(f"\nSSID: {Color.GREEN}{Style.BRIGHT}{ap['ESSID']}{Style.RESET_ALL} | BSSID: {ap['BSSID']} -> {get_mac_vendor(ap['BSSID'])} | Signal: {ap['Signal']} dBm | Security: {ap['Security']} | Channel: {ap['Channel']}")
+        if ap.essid:
+          print(f"\nSSID: {Color.GREEN}{Style.BRIGHT}{ap.essid}{Style.RESET_ALL} | BSSID: {format_mac(ap.bssid)} -> {color_vendor(vendors[ap.bssid])} | Signal: {smoothed(ap.bssid, ap.signal)} dBm | Security: {ap.security} | Channel: {ap.channel}")
           
-          associated_clients = [c for c in client_list if c["BSSID"] == ap["BSSID"]]
+          associated_clients = capture.clients_of(ap.bssid)
           if associated_clients:
               print("   +- CONNECTED DEVICES")
               for client in associated_clients:
-                  print(f"   Device: {client['Station']} -> {get_mac_vendor(client['Station'])} | Signal: {client['Signal']} dBm")
+                  print(f"   Device: {format_mac(client.station)} -> {color_vendor(vendors[client.station])} | Signal: {smoothed(client.station, client.signal)} dBm")
+
+    if capture.station:
+        print(f"\n{Color.GREEN}{Style.BRIGHT}[*]{Style.RESET_ALL} Stations: {format_correlation(correlate_stations(capture.clients()))}")
     
     if analyze_channels:
-        analyze_wifi_channels(ap_list)
-    
-    subprocess.run("sudo rm /tmp/airodump-01.csv", shell=True)
-
-def analyze_wifi_channels(networks):
+        analyze_wifi_channels(ap_list, channel_width)
+
+def print_wifi_event(event):
+    data = event.data
+    stamp = datetime.now().strftime('%H:%M:%S')
+    if event.kind in (AP_NEW, AP_UPDATED, AP_SIGNAL, AP_LOST):
+        vendor = color_vendor(lookup_vendor(event.key))
+        label, color = {AP_NEW: ("NEW AP", Color.GREEN), AP_UPDATED: ("AP CHANGED", Color.CYAN),
+                        AP_SIGNAL: ("AP SIGNAL", Color.BLUE), AP_LOST: ("AP LOST", Color.RED)}[event.kind]
+        print(f"[{stamp}] {color}{Style.BRIGHT}{label:<12}{Style.RESET_ALL} SSID: {data.essid or '<Hidden>'} | BSSID: {format_mac(event.key)} -> {vendor} | Signal: {data.signal} dBm | Channel: {data.channel}")
+    else:
+        label, color = {CLIENT_NEW: ("NEW CLIENT", Color.GREEN), CLIENT_ASSOCIATED: ("ASSOCIATED", Color.MAGENTA),
+                        CLIENT_SIGNAL: ("CLIENT SIGNAL", Color.BLUE), CLIENT_LOST: ("CLIENT LOST", Color.RED)}[event.kind]
+        print(f"[{stamp}] {color}{Style.BRIGHT}{label:<12}{Style.RESET_ALL} Device: {format_mac(event.key)} | AP: {format_mac(data.bssid) or NOT_ASSOCIATED} | Signal: {data.signal} dBm")
+
+def wifi_event_observation(event):
+    if event.kind in (AP_NEW, AP_UPDATED, AP_SIGNAL, AP_LOST):
+        return ap_observation(event.data, {"event": event.kind})
+    return client_observation(event.data, {"event": event.kind})
+
+def scan_wifi_live(interval=1.0, on_event=print_wifi_event, lost_after=60, sink=None, analyze_channels=False, channel_width=20,
+                   recorder=None, replay=None, pcap=None):
+    """Streams AP/client changes while airodump-ng runs, until CTRL+C (or the end of a replay).
+    With pcap (a file or '-'), changes come from its 802.11 frames instead, until the end of the input.
+    With analyze_channels, channel scores are updated per event and the best channels are
+    printed again whenever the top recommendation of a band changes."""
+    print(f"\n{Color.GREEN}{Style.BRIGHT}[*]{Style.RESET_ALL} Monitoring Wi-Fi networks... (Press CTRL+C to stop)")
+
+    if pcap is not None:
+        process = csv_file = None
+        watcher = PcapWatcher(pcap, lost_after=lost_after)
+        interval = min(interval, PCAP_PIPE_POLL) if watcher.pipe else 0
+        running = lambda: not watcher.finished
+    else:
+        process, csv_file = start_airodump(interval, replay)
+        if replay is not None and not replay.speed:
+            interval = 0  # every recorded snapshot, back to back
+        watcher = AirodumpWatcher(csv_file, lost_after=lost_after)
+        running = lambda: process.poll() is None
+    planner = None
+    if analyze_channels:
+        from channels import ChannelPlanner  # NumPy is only loaded for channel planning
+        planner = ChannelPlanner(channel_width)
+    best = None
 
-    channel_usage = {}
-    
-    for net in networks:
-        channel = net["Channel"]
-        channel_usage[channel] = channel_usage.get(channel, 0) + 1
-    
-    best_channel = min(channel_usage, key=channel_usage.get, default=None)
-    if best_channel:
-        print(f"\n{Color.GREEN}{Style.BRIGHT}[*]{Style.RESET_ALL} Recommended Wi-Fi Channel: {Color.MAGENTA}{Style.BRIGHT}{best_channel}{Style.RESET_ALL} (Least interference detected)\n")
+    try:
+        while running():
+            events = watcher.poll(process.clock() if replay is not None and process else None)
+            if recorder and csv_file:
+                recorder.snapshot(csv_file)
+            for event in events:
+                on_event(event)
+                if sink:
+                    sink.put(wifi_event_observation(event))
+                if planner and event.kind == AP_LOST:
+                    planner.remove(event.key)
+                elif planner and event.kind in (AP_NEW, AP_UPDATED, AP_SIGNAL):
+                    planner.update(event.key, event.data.channel, event.data.signal, event.data.data)
+            if planner and events:
+                ranking = planner.recommend()
+                top = {band: scores[0].option for band, scores in ranking.items()}
+                if top != best:
+                    best = top
+                    print_channel_ranking(ranking, len(planner))
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        print(f"\n{Color.YELLOW}{Style.BRIGHT}[!] Monitoring stopped by user.{Style.RESET_ALL}")
+    except (OSError, ValueError) as e:
+        if pcap is not None:
+            print(f"{Color.RED}{Style.BRIGHT}[!]{Style.RESET_ALL} Cannot read {pcap}: {e}")
+        else:
+            print(f"{Color.RED}{Style.BRIGHT}[!]{Style.RESET_ALL} Wi-Fi monitoring stopped: {type(e).__name__}: {e}")
+    finally:
+        if process is None:
+            watcher.close()
+        else:
+            process.terminate()
+            process.wait()
+            remove_capture(csv_file, replay)
+
+    return watcher
+
+def print_channel_ranking(ranking, ap_count):
+    from channels import BAND_24, BAND_5
+    width = next(iter(ranking.values()))[0].option.width
+    print(f"\n{Color.GREEN}{Style.BRIGHT}[*]{Style.RESET_ALL} Recommended Wi-Fi Channels ({width} MHz, {ap_count} APs, interference-weighted):")
+    for band in (BAND_24, BAND_5):
+        for rank, entry in enumerate(ranking.get(band, []), 1):
+            level = "clear" if entry.score is None else f"{entry.score:.1f} dBm"
+            print(f"   {band:<7} #{rank} Channel {Color.MAGENTA}{Style.BRIGHT}{entry.option.label:<7}{Style.RESET_ALL} Interference: {level:<10} | Overlapping APs: {entry.aps}")
+    print()
+
+def analyze_wifi_channels(networks, width=20, count=3):
+    """Ranks channels by the received power of the APs overlapping them, weighted by their traffic"""
+    from channels import ChannelPlanner
+    planner = ChannelPlanner(width).build(networks)
+    if not len(planner):
+        print(f"\n{Color.YELLOW}{Style.BRIGHT}[!]{Style.RESET_ALL} No access point on a known channel, nothing to analyze.\n")
+        return None
+    ranking = planner.recommend(count=count)
+    print_channel_ranking(ranking, len(planner))
+    return ranking
 
 def deauth(bssid, station, timeout):
     """